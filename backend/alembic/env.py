@@ -11,7 +11,24 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
 # Import the Base and all models
 from app.database import Base
-from app.models import Holding, User  # Import all models so Alembic can detect them
+from app.models import (  # Import all models so Alembic can detect them
+    Alert,
+    AlertEvent,
+    CorporateAction,
+    FxRate,
+    Holding,
+    IntradayPrice,
+    PortfolioDailyValue,
+    PriceHistory,
+    PriceSnapshot,
+    ReplicaHeartbeat,
+    SymbolPopularity,
+    TargetAllocation,
+    Transaction,
+    User,
+    Watchlist,
+    WatchlistItem,
+)
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
@@ -0,0 +1,44 @@
+"""Refetch price history stored in minor currency units
+
+Revision ID: 6e1b3d8a9c27
+Revises: 4b8e2d7f1c63
+Create Date: 2026-10-21 09:12:37.518204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6e1b3d8a9c27'
+down_revision = '4b8e2d7f1c63'
+branch_labels = None
+depends_on = None
+
+# Symbols quoted in pounds or rand, whose stored closes may be in pence / cents
+_SYMBOLS = """
+    SELECT symbol FROM holdings WHERE currency IN ('GBP', 'ZAR')
+    UNION
+    SELECT symbol FROM price_snapshots WHERE currency IN ('GBP', 'ZAR')
+"""
+
+
+def upgrade() -> None:
+    # Daily closes of London and Johannesburg listings were stored in the quote unit.
+    # Stored rows do not say which listings those were (some quote in pounds), so they
+    # are dropped, with the daily values computed from them, and refetched by the next
+    # rollup in the major currency.
+    op.execute(f"""
+        DELETE FROM portfolio_daily_values
+        WHERE user_id IN (
+            SELECT user_id FROM holdings WHERE symbol IN ({_SYMBOLS})
+            UNION
+            SELECT user_id FROM transactions WHERE symbol IN ({_SYMBOLS})
+        )
+    """)
+    op.execute(f"DELETE FROM price_history WHERE symbol IN ({_SYMBOLS})")
+
+
+def downgrade() -> None:
+    # Deleted rows are refetched on upgrade; nothing to restore
+    pass
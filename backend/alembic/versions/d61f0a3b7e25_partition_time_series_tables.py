@@ -0,0 +1,98 @@
+"""Add intraday_prices and partition time-series tables by month
+
+Revision ID: d61f0a3b7e25
+Revises: b5d8f3a0e6c1
+Create Date: 2026-10-20 10:04:12.583107
+
+On Postgres, price_history and portfolio_daily_values are rebuilt as tables
+partitioned by month on ``date``, with partitions from their earliest row through
+three months ahead. intraday_prices is created partitioned by ``fetched_at``.
+Later partitions are created by app.jobs.retention. On other databases the tables
+stay plain.
+
+"""
+from datetime import date
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd61f0a3b7e25'
+down_revision = 'b5d8f3a0e6c1'
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+
+# table -> (partition column, primary key, foreign keys)
+DAILY_TABLES = {
+    'price_history': ('date', 'symbol, date', []),
+    'portfolio_daily_values': (
+        'date',
+        'user_id, date',
+        ['FOREIGN KEY (user_id) REFERENCES users (id)'],
+    ),
+}
+
+
+def _next_month(month):
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def _create_partitions(table, first, timestamp=False):
+    """Monthly partitions from first's month through MONTHS_AHEAD months from now."""
+    last = date.today().replace(day=1)
+    for _ in range(MONTHS_AHEAD):
+        last = _next_month(last)
+    suffix = ' 00:00:00+00' if timestamp else ''
+    month = min(first, date.today()).replace(day=1)
+    while month <= last:
+        op.execute(
+            f"CREATE TABLE {table}_p{month:%Y%m} PARTITION OF {table} "
+            f"FOR VALUES FROM ('{month}{suffix}') TO ('{_next_month(month)}{suffix}')"
+        )
+        month = _next_month(month)
+
+
+def _rebuild(table, partitioned):
+    """Copy table into a new partitioned (or plain) table of the same name."""
+    column, primary_key, foreign_keys = DAILY_TABLES[table]
+    op.execute(f"ALTER TABLE {table} RENAME TO {table}_old")
+    op.execute(f"ALTER TABLE {table}_old RENAME CONSTRAINT {table}_pkey TO {table}_old_pkey")
+    partition_by = f" PARTITION BY RANGE ({column})" if partitioned else ''
+    op.execute(f"CREATE TABLE {table} (LIKE {table}_old INCLUDING DEFAULTS){partition_by}")
+    op.execute(f"ALTER TABLE {table} ADD PRIMARY KEY ({primary_key})")
+    for foreign_key in foreign_keys:
+        op.execute(f"ALTER TABLE {table} ADD {foreign_key}")
+    if partitioned:
+        first = op.get_bind().execute(sa.text(f"SELECT min({column}) FROM {table}_old")).scalar()
+        _create_partitions(table, first or date.today())
+    op.execute(f"INSERT INTO {table} SELECT * FROM {table}_old")
+    op.execute(f"DROP TABLE {table}_old CASCADE")
+
+
+def upgrade() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('intraday_prices',
+    sa.Column('symbol', sa.String(), nullable=False),
+    sa.Column('fetched_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('price', sa.Numeric(precision=14, scale=4), nullable=False),
+    sa.PrimaryKeyConstraint('symbol', 'fetched_at'),
+    postgresql_partition_by='RANGE (fetched_at)'
+    )
+    # ### end Alembic commands ###
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    _create_partitions('intraday_prices', date.today(), timestamp=True)
+    for table in DAILY_TABLES:
+        _rebuild(table, partitioned=True)
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name == 'postgresql':
+        for table in DAILY_TABLES:
+            _rebuild(table, partitioned=False)
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_table('intraday_prices')
+    # ### end Alembic commands ###
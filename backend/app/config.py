@@ -10,6 +10,106 @@ class Settings(BaseSettings):
     # CORS
     cors_origins: str = "http://localhost:3000"
 
+    # Admin API access (comma-separated emails)
+    admin_emails: str = ""
+
+    # Profiling (opt-in; requests are profiled when the header is present or sampled)
+    profiling_enabled: bool = False
+    profiling_sample_rate: float = 0.0
+    profiling_header: str = "X-Profile"
+    profiling_interval_ms: float = 5.0
+    profiling_buffer_size: int = 100
+
+    # Database connection pool (per worker process)
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+
+    # Read replicas (comma-separated URLs); read-only endpoints use them via get_read_db
+    database_replica_urls: str = ""
+    replica_max_lag_seconds: float = 5.0  # staler replicas are skipped for the primary
+    replica_heartbeat_seconds: float = 1.0
+
+    # Production server (app.server: gunicorn with uvicorn workers, app preloaded)
+    server_app: str = "app.main:app"
+    server_bind: str = "0.0.0.0:8000"
+    server_workers: int = 0  # 0: one per CPU
+    server_threads: int = 0  # threadpool for sync routes per worker; 0: DB pool size + overflow
+    server_graceful_timeout_seconds: float = 30.0  # drain time for in-flight requests
+    server_keepalive_seconds: float = 5.0
+
+    # The quote refresher runs in the one process holding a Postgres advisory lock; the
+    # others retry every background_jobs_election_seconds
+    background_jobs_lock_id: int = 7_245_101
+    background_jobs_election_seconds: float = 10.0
+
+    # Quotes
+    quote_cache_ttl_seconds: int = 60
+    quote_fetch_workers: int = 4  # threads for fetches waited on with a deadline
+    quote_metadata_retry_seconds: float = 900.0  # failed name/currency lookups retried after
+
+    # Market calendar (app.services.market_calendar): US quotes fetched after the close
+    # are final and cached until the next open
+    market_calendar_enabled: bool = True  # off: every quote uses quote_cache_ttl_seconds
+    market_close_settle_seconds: float = 900.0  # closing prices can change until then
+
+    # Quote cassettes (app.services.quote_cassette): record provider calls to a file,
+    # or serve them from one offline with recorded latencies times the scale
+    quote_cassette_record: str = ""
+    quote_cassette_replay: str = ""
+    quote_cassette_latency_scale: float = 1.0
+
+    # Dashboard: respond by this deadline, with last known prices for quotes not fetched
+    dashboard_deadline_seconds: float = 2.0
+
+    # Background quote refresher (stores fresh prices for the most widely held symbols)
+    quote_refresher_enabled: bool = False
+    quote_refresher_interval_seconds: float = 15.0
+    quote_refresher_batch_size: int = 200
+    quote_refresh_ahead_seconds: float = 15.0
+
+    # Watchlists
+    watchlist_max_symbols: int = 200
+
+    # Price alerts (evaluated on every quote cache update; firings delivered in batches)
+    alerts_enabled: bool = False
+    alert_delivery_batch_size: int = 500
+    alert_index_reload_seconds: float = 300.0
+
+    # FX rates (USD value per currency unit), refreshed with quotes
+    fx_rate_ttl_seconds: int = 3600
+    fx_fallback_ttl_seconds: int = 60  # stored rates used while the upstream fails
+
+    # Time-series retention (python -m app.jobs.retention)
+    intraday_retention_days: int = 7  # older intraday quotes are compacted to daily closes
+    partition_months_ahead: int = 3  # monthly partitions created ahead of time on Postgres
+
+    # Analytics
+    analytics_benchmark_symbol: str = "SPY"
+    analytics_lookback_days: int = 365
+    analytics_risk_free_rate: float = 0.0
+    # Daily closes are backfilled by the rollup job (python -m app.jobs.daily_rollup) for
+    # held symbols, the benchmark and the extra symbols (comma-separated, e.g. sector
+    # ETFs for simulation scenarios); analytics and simulations only read stored history
+    price_history_days: int = 3650
+    price_history_extra_symbols: str = ""
+
+    # Portfolio simulation (POST /dashboard/simulate): paths are generated in chunks,
+    # split across a process pool for runs of at least simulation_parallel_min_paths
+    simulation_chunk_paths: int = 10_000
+    simulation_parallel_min_paths: int = 50_000
+    simulation_workers: int = 0  # 0: one per CPU; 1: every chunk in the request thread
+    simulation_max_draws: int = 1_000_000_000  # paths x horizon days x positions per run
+
+    @property
+    def threadpool_size(self) -> int:
+        """
+        Threads for sync routes per worker.
+
+        Each sync request holds a DB connection for most of its run, so threads beyond
+        the pool's connections would only queue for a connection while holding a thread.
+        """
+        return self.server_threads or self.db_pool_size + self.db_max_overflow
+
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -0,0 +1,15 @@
+from fastapi import Depends, HTTPException, status
+
+from app.config import settings
+from app.dependencies.auth import get_current_user
+
+
+def get_admin_user(current_user: dict = Depends(get_current_user)) -> dict:
+    """Allow only users whose email is listed in ``settings.admin_emails``."""
+    admins = {email.strip().lower() for email in settings.admin_emails.split(",") if email.strip()}
+    email = (current_user.get("email") or "").lower()
+
+    if email not in admins:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+
+    return current_user
@@ -1,4 +1,4 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 
 from app.services.auth_service import auth_service
@@ -6,12 +6,15 @@ from app.services.auth_service import auth_service
 security = HTTPBearer()
 
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
-    """Verify JWT token and return current user info."""
+def get_current_user(
+    request: Request, credentials: HTTPAuthorizationCredentials = Depends(security)
+) -> dict:
+    """Verify JWT token and return current user info (also kept in ``request.state``)."""
     token = credentials.credentials
 
     try:
         payload = auth_service.verify_token(token)
+        request.state.user_id = payload.get("sub")
         return {
             "sub": payload.get("sub"),
             "email": payload.get("email"),
@@ -0,0 +1 @@
+"""Batch jobs run outside the request path (cron, one-off maintenance)."""
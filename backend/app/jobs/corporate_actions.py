@@ -0,0 +1,35 @@
+"""Apply pending corporate actions (splits and dividends) to all affected holdings.
+
+Usage:
+    python -m app.jobs.corporate_actions [--as-of YYYY-MM-DD] [--symbol SYMBOL]
+"""
+
+import argparse
+import logging
+from datetime import date
+
+from app.database import SessionLocal
+from app.services.corporate_actions_service import apply_pending_actions
+
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--as-of", type=date.fromisoformat, default=None, help="Last ex-date (default: today)"
+    )
+    parser.add_argument("--symbol", default=None, help="Only apply actions for this symbol")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        applied = apply_pending_actions(db, args.as_of or date.today(), symbol=args.symbol)
+        logger.info(f"Corporate actions finished: {applied} actions applied")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
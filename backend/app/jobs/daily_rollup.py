@@ -0,0 +1,28 @@
+"""Incremental daily portfolio value rollup and price history backfill.
+
+Usage:
+    python -m app.jobs.daily_rollup
+"""
+
+import logging
+
+from app.database import SessionLocal
+from app.services.history_service import backfill_price_history, rollup_all
+
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        inserted = backfill_price_history(db)
+        logger.info(f"Price history backfill finished: {inserted} closes stored")
+        written = rollup_all(db)
+        logger.info(f"Daily rollup finished: {written} rows written")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,42 @@
+"""Rebuild holdings from the transaction ledger.
+
+Usage:
+    python -m app.jobs.rebuild_holdings [--user-id UUID]
+"""
+
+import argparse
+import logging
+from uuid import UUID
+
+from app.database import SessionLocal
+from app.services.ledger_service import rebuild_holdings
+from app.services.stock_service import get_stock_price
+
+logger = logging.getLogger(__name__)
+
+
+def lookup_metadata(symbol: str) -> tuple[str, str]:
+    """Display name and quote currency of a symbol whose holding is recreated."""
+    stock_data = get_stock_price(symbol)
+    return str(stock_data["name"]), str(stock_data.get("currency", "USD"))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--user-id", type=UUID, default=None, help="Only rebuild this user")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        written = rebuild_holdings(
+            db, lookup_metadata, user_id=args.user_id, batch_size=args.batch_size
+        )
+        logger.info(f"Rebuild finished: {written} holdings written")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
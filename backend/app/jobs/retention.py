@@ -0,0 +1,49 @@
+"""Create upcoming time-series partitions and compact expired intraday quotes.
+
+Run daily; partitions are created ``settings.partition_months_ahead`` months ahead,
+so a missed run does not stop writes.
+
+Usage:
+    python -m app.jobs.retention [--today YYYY-MM-DD] [--retention-days N]
+"""
+
+import argparse
+import logging
+from datetime import date
+
+from app.config import settings
+from app.database import SessionLocal
+from app.services.retention_service import apply_retention
+
+logger = logging.getLogger(__name__)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--today", type=date.fromisoformat, default=None, help="Current date (default: today)"
+    )
+    parser.add_argument(
+        "--retention-days",
+        type=int,
+        default=settings.intraday_retention_days,
+        help="Days of intraday quotes to keep",
+    )
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    db = SessionLocal()
+    try:
+        result = apply_retention(
+            db,
+            args.today or date.today(),
+            intraday_retention_days=args.retention_days,
+            months_ahead=settings.partition_months_ahead,
+        )
+        logger.info(f"Retention finished: {result}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
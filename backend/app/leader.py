@@ -0,0 +1,124 @@
+"""Leader election for in-process background jobs.
+
+Jobs that write shared state, such as the quote refresher, must run in one
+process only, however many server workers (see ``app.server``) or servers share the database. Every
+process runs a ``JobLeader``, which tries to take a Postgres session-level
+advisory lock on a connection of its own every ``interval_seconds``; the process
+holding it runs the jobs. When that process exits or loses its connection, the
+lock is released with the session and another process takes over on its next
+attempt.
+
+Other databases (SQLite in development and tests) have no advisory locks and are
+only used by a single process, which always leads.
+"""
+
+import logging
+import threading
+from collections.abc import Callable
+
+from sqlalchemy import Connection, Engine, text
+
+logger = logging.getLogger(__name__)
+
+
+class JobLeader:
+    """Runs ``on_elected`` once this process holds the job lock, ``on_deposed`` when it stops."""
+
+    def __init__(
+        self,
+        engine: Engine,
+        lock_id: int,
+        interval_seconds: float,
+        on_elected: Callable[[], None],
+        on_deposed: Callable[[], None],
+    ):
+        self.engine = engine
+        self.lock_id = lock_id
+        self.interval_seconds = interval_seconds
+        self.on_elected = on_elected
+        self.on_deposed = on_deposed
+        self.leading = False
+        self._connection: Connection | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _acquire(self) -> bool:
+        if self.engine.dialect.name != "postgresql":
+            return True
+        connection = self.engine.connect()
+        try:
+            acquired = bool(
+                connection.scalar(
+                    text("SELECT pg_try_advisory_lock(:lock_id)"), {"lock_id": self.lock_id}
+                )
+            )
+            # The lock outlives the transaction; don't leave the connection idle in one
+            connection.commit()
+        except Exception:
+            connection.close()
+            raise
+        if acquired:
+            self._connection = connection
+        else:
+            connection.close()
+        return acquired
+
+    def _holds_lock(self) -> bool:
+        if self._connection is None:
+            return True
+        try:
+            self._connection.execute(text("SELECT 1"))
+            self._connection.commit()
+            return True
+        except Exception as e:
+            logger.warning(f"Lost the background job lock: {e}")
+            self._connection.invalidate()
+            self._connection.close()
+            self._connection = None
+            return False
+
+    def run_once(self) -> None:
+        """Take the lock if it is free, or check that it is still held."""
+        if not self.leading:
+            if self._acquire():
+                self.leading = True
+                logger.info("Running background jobs in this process")
+                self.on_elected()
+        elif not self._holds_lock():
+            self.leading = False
+            self.on_deposed()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.exception(f"Background job election failed: {e}")
+
+    def start(self) -> None:
+        # The first attempt is made right away, so a single process starts its jobs on startup
+        try:
+            self.run_once()
+        except Exception as e:
+            logger.exception(f"Background job election failed: {e}")
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="job-leader", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self.leading:
+            self.leading = False
+            self.on_deposed()
+        if self._connection is not None:
+            try:
+                self._connection.execute(
+                    text("SELECT pg_advisory_unlock(:lock_id)"), {"lock_id": self.lock_id}
+                )
+                self._connection.commit()
+            finally:
+                self._connection.close()
+                self._connection = None
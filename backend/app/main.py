@@ -1,10 +1,113 @@
-from fastapi import FastAPI
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from anyio import to_thread
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import CONTENT_TYPE_LATEST
 
 from app.config import settings
-from app.routers import auth, dashboard, holdings
+from app.database import SessionLocal, engine
+from app.leader import JobLeader
+from app.metrics import exposition
+from app.middleware.metrics import MetricsMiddleware
+from app.middleware.profiling import ProfilingMiddleware
+from app.profiling import install_query_timing, profile_buffer
+from app.replicas import ReplicaMonitor, replica_router
+from app.routers import (
+    admin,
+    alerts,
+    auth,
+    dashboard,
+    holdings,
+    transactions,
+    users,
+    watchlists,
+)
+from app.services.alerts_service import AlertDispatcher, on_quote
+from app.services.auth_service import auth_service
+from app.services.monte_carlo import shutdown_pool
+from app.services.price_snapshot_service import record_quote
+from app.services.quote_cache import quote_cache
+from app.services.quote_cassette import RecordingProvider, ReplayProvider
+from app.services.quote_refresher import QuoteRefresher
+from app.services.stock_service import get_provider, set_provider
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    # Sync routes run on AnyIO's worker threads; size them to the DB pool
+    to_thread.current_default_thread_limiter().total_tokens = settings.threadpool_size
+
+    # Clients are created here rather than at import, keeping imports (and tests) fast
+    auth_service.create_client()
+    quote_cache.add_listener(record_quote)
+
+    cassette: RecordingProvider | ReplayProvider | None = None
+    if settings.quote_cassette_replay:
+        cassette = ReplayProvider(
+            settings.quote_cassette_replay, settings.quote_cassette_latency_scale
+        )
+    elif settings.quote_cassette_record:
+        cassette = RecordingProvider(get_provider(), settings.quote_cassette_record)
+    previous_provider = set_provider(cassette) if cassette is not None else None
+
+    # Every worker evaluates alerts on the quotes it fetches; delivery dedupes across workers
+    dispatcher = None
+    if settings.alerts_enabled:
+        dispatcher = AlertDispatcher(
+            SessionLocal,
+            batch_size=settings.alert_delivery_batch_size,
+            reload_seconds=settings.alert_index_reload_seconds,
+        )
+        dispatcher.reload()
+        quote_cache.add_listener(on_quote)
+        dispatcher.start()
+
+    # The refresher writes last known prices and FX rates, so it runs in one process only
+    leader = None
+    if settings.quote_refresher_enabled:
+        refresher = QuoteRefresher(
+            SessionLocal,
+            interval_seconds=settings.quote_refresher_interval_seconds,
+            batch_size=settings.quote_refresher_batch_size,
+            refresh_ahead_seconds=settings.quote_refresh_ahead_seconds,
+        )
+        leader = JobLeader(
+            engine,
+            settings.background_jobs_lock_id,
+            settings.background_jobs_election_seconds,
+            on_elected=refresher.start,
+            on_deposed=refresher.stop,
+        )
+        leader.start()
 
-app = FastAPI(title="Foliofy API", description="Stock portfolio management API", version="0.1.0")
+    # Replica lag is measured per process, for its own routing
+    monitor = None
+    if replica_router.replicas:
+        monitor = ReplicaMonitor(replica_router, settings.replica_heartbeat_seconds)
+        monitor.start()
+    yield
+    if leader is not None:
+        leader.stop()
+    if dispatcher is not None:
+        quote_cache.remove_listener(on_quote)
+        dispatcher.stop()
+    if monitor is not None:
+        monitor.stop()
+    quote_cache.remove_listener(record_quote)
+    if cassette is not None:
+        set_provider(previous_provider)
+        cassette.close()
+    shutdown_pool()
+
+
+app = FastAPI(
+    title="Foliofy API",
+    description="Stock portfolio management API",
+    version="0.1.0",
+    lifespan=lifespan,
+)
 
 # CORS
 app.add_middleware(
@@ -13,12 +116,32 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Profiling (opt-in; not installed at all when disabled)
+if settings.profiling_enabled:
+    install_query_timing()
+    app.add_middleware(
+        ProfilingMiddleware,
+        buffer=profile_buffer,
+        header=settings.profiling_header,
+        sample_rate=settings.profiling_sample_rate,
+        interval_ms=settings.profiling_interval_ms,
+    )
+
+# Metrics (outermost, so latency includes all other middleware)
+app.add_middleware(MetricsMiddleware)
+
 # Routers
 app.include_router(auth.router)
 app.include_router(holdings.router)
 app.include_router(dashboard.router)
+app.include_router(transactions.router)
+app.include_router(users.router)
+app.include_router(alerts.router)
+app.include_router(watchlists.router)
+app.include_router(admin.router)
 
 
 @app.get("/")
@@ -29,3 +152,9 @@ def read_root():
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    """Prometheus scrape endpoint."""
+    return Response(content=exposition(), media_type=CONTENT_TYPE_LATEST)
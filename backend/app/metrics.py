@@ -0,0 +1,107 @@
+"""Prometheus metrics for the API and its upstream dependencies.
+
+Everything lives in the default registry and is exposed at ``GET /metrics``.
+Route labels use the path template (e.g. ``/holdings/{holding_id}``) to keep
+label cardinality bounded.
+
+Under the multi-worker server (``app.server``) each worker writes its samples to
+``PROMETHEUS_MULTIPROC_DIR`` and ``exposition()`` aggregates all workers, so one
+scrape covers the whole server. Gauges are summed over live workers unless noted.
+"""
+
+import os
+
+from prometheus_client import (
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Latency buckets (seconds) shared by request and upstream histograms
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+# HTTP
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being handled",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+
+# Quotes (yfinance)
+QUOTE_FETCH_DURATION = Histogram(
+    "quote_fetch_duration_seconds",
+    "Latency of one upstream quote fetch batch",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+QUOTE_FETCH_BATCH_SIZE = Histogram(
+    "quote_fetch_batch_size",
+    "Number of symbols fetched upstream per batch",
+    ["operation"],
+    buckets=(1, 2, 5, 10, 25, 50, 100, 250, 500, 1000),
+)
+QUOTE_FETCH_ERRORS = Counter(
+    "quote_fetch_errors_total",
+    "Symbols that failed to fetch upstream",
+    ["operation", "reason"],
+)
+QUOTE_CACHE_REQUESTS = Counter(
+    "quote_cache_requests_total",
+    "Quote cache lookups per symbol",
+    ["result"],
+)
+STALE_QUOTES_SERVED = Counter(
+    "stale_quotes_served_total",
+    "Last known quotes served in place of a fresh quote",
+    ["source"],
+)
+
+# Auth (Cognito JWT)
+JWT_VERIFY_DURATION = Histogram(
+    "jwt_verify_duration_seconds",
+    "Time spent verifying a JWT, including JWKS retrieval",
+    ["outcome"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0, 5.0),
+)
+
+# Database
+DB_POOL_CHECKOUT_DURATION = Histogram(
+    "db_pool_checkout_duration_seconds",
+    "Time spent waiting for a connection from the pool",
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0),
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out of the pool",
+    multiprocess_mode="livesum",
+)
+DB_READS = Counter(
+    "db_reads_total",
+    "Sessions for read-only endpoints, by the database they were routed to",
+    ["target"],
+)
+DB_REPLICA_LAG = Gauge(
+    "db_replica_lag_seconds",
+    "Replication lag measured by the heartbeat (max over workers)",
+    ["replica"],
+    multiprocess_mode="max",
+)
+
+
+def exposition() -> bytes:
+    """All metrics in the Prometheus text format, aggregated over workers if multiprocess."""
+    if "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        return generate_latest()
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry)
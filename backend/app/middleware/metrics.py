@@ -0,0 +1,47 @@
+"""Request metrics middleware.
+
+Implemented as plain ASGI middleware rather than ``BaseHTTPMiddleware`` so it adds
+no extra task or response buffering per request.
+"""
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.metrics import HTTP_REQUEST_DURATION, HTTP_REQUESTS_IN_PROGRESS
+
+
+class MetricsMiddleware:
+    """Record per-route latency and in-flight request counts."""
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_progress.dec()
+            # The router stores the matched route in the scope; unmatched paths share
+            # one label so arbitrary URLs cannot blow up cardinality.
+            route = scope.get("route")
+            template = getattr(route, "path_format", None) or "unmatched"
+            HTTP_REQUEST_DURATION.labels(method, template, str(status_code)).observe(
+                time.perf_counter() - start
+            )
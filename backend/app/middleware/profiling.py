@@ -0,0 +1,72 @@
+"""Opt-in request profiling middleware (see ``app.profiling``)."""
+
+import random
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.profiling import (
+    ProfileBuffer,
+    RequestProfile,
+    StackSampler,
+    start_profile,
+    stop_profile,
+)
+
+
+class ProfilingMiddleware:
+    """
+    Profile requests that carry the trigger header or are randomly sampled.
+
+    Only installed when ``settings.profiling_enabled`` is set, so unprofiled
+    deployments pay nothing.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        buffer: ProfileBuffer,
+        header: str = "X-Profile",
+        sample_rate: float = 0.0,
+        interval_ms: float = 5.0,
+    ):
+        self.app = app
+        self.buffer = buffer
+        self.header = header.lower().encode("latin-1")
+        self.sample_rate = sample_rate
+        self.interval_seconds = interval_ms / 1000
+
+    def _should_profile(self, scope: Scope) -> bool:
+        for name, value in scope["headers"]:
+            if name == self.header:
+                return value.strip() not in (b"", b"0", b"false")
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(method=scope["method"], path=scope["path"])
+
+        async def send_wrapper(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                message.setdefault("headers", []).append(
+                    (b"x-profile-id", profile.id.encode("latin-1"))
+                )
+            await send(message)
+
+        token = start_profile(profile)
+        sampler = StackSampler(profile, self.interval_seconds)
+        sampler.start()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profile.duration_ms = (time.perf_counter() - start) * 1000
+            sampler.stop()
+            stop_profile(token)
+            route = scope.get("route")
+            profile.route = getattr(route, "path_format", None)
+            self.buffer.add(profile)
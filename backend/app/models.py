@@ -1,7 +1,20 @@
 import uuid
+from datetime import date, datetime
+from decimal import Decimal
 
-from sqlalchemy import Column, DateTime, ForeignKey, Numeric, String
+from sqlalchemy import (
+    Boolean,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    String,
+    UniqueConstraint,
+)
 from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.sql import func
 
 from app.database import Base
@@ -10,24 +23,306 @@ from app.database import Base
 class User(Base):
     __tablename__ = "users"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    email = Column(String, unique=True, nullable=False, index=True)
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
-    updated_at = Column(
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    email: Mapped[str] = mapped_column(String, unique=True, nullable=False, index=True)
+    base_currency: Mapped[str] = mapped_column(
+        String(3), nullable=False, default="USD", server_default="USD"
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
     )
 
 
 class Holding(Base):
     __tablename__ = "holdings"
+    __table_args__ = (
+        # One holding per symbol per user. On Postgres the index also covers the
+        # dashboard query (user_id -> symbol, shares, avg_cost) for index-only scans.
+        Index(
+            "ix_holdings_user_symbol",
+            "user_id",
+            "symbol",
+            unique=True,
+            postgresql_include=["shares", "avg_cost"],
+        ),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id"), nullable=False
+    )
+    symbol: Mapped[str] = mapped_column(String, nullable=False)
+    name: Mapped[str] = mapped_column(String, nullable=False)
+    currency: Mapped[str] = mapped_column(
+        String(3), nullable=False, default="USD", server_default="USD"
+    )  # quote currency
+    shares: Mapped[Decimal] = mapped_column(Numeric(precision=10, scale=2), nullable=False)
+    avg_cost: Mapped[Decimal] = mapped_column(Numeric(precision=10, scale=2), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+
+class Transaction(Base):
+    """Ledger entry; the source of truth that holdings are materialized from."""
+
+    __tablename__ = "transactions"
+    __table_args__ = (Index("ix_transactions_user_symbol_date", "user_id", "symbol", "trade_date"),)
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id"), nullable=False
+    )
+    symbol: Mapped[str] = mapped_column(String, nullable=False)
+    type: Mapped[str] = mapped_column(
+        String, nullable=False
+    )  # buy, sell, dividend, split, adjustment
+    trade_date: Mapped[date] = mapped_column(Date, nullable=False)
+    shares: Mapped[Decimal | None] = mapped_column(Numeric(precision=14, scale=4), nullable=True)
+    price: Mapped[Decimal | None] = mapped_column(Numeric(precision=14, scale=4), nullable=True)
+    ratio: Mapped[Decimal | None] = mapped_column(Numeric(precision=10, scale=4), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class PriceHistory(Base):
+    """Daily closing price per symbol, shared by all users. Partitioned by month on Postgres."""
+
+    __tablename__ = "price_history"
+    __table_args__ = {"postgresql_partition_by": "RANGE (date)"}
+
+    symbol: Mapped[str] = mapped_column(String, primary_key=True)
+    date: Mapped[date] = mapped_column(Date, primary_key=True)
+    close: Mapped[Decimal] = mapped_column(Numeric(precision=14, scale=4), nullable=False)
+
+
+class PriceHistoryCoverage(Base):
+    """
+    Range of each symbol's daily closes already requested from the provider.
+
+    Kept apart from ``price_history``, whose stored dates also include closes
+    compacted from intraday quotes and start wherever the symbol's history does, so
+    neither hides a gap nor causes a refetch.
+    """
+
+    __tablename__ = "price_history_coverage"
+
+    symbol: Mapped[str] = mapped_column(String, primary_key=True)
+    fetched_from: Mapped[date] = mapped_column(Date, nullable=False)
+    fetched_through: Mapped[date] = mapped_column(Date, nullable=False)  # last close received
+
+
+class PriceSnapshot(Base):
+    """Last quote fetched per symbol; served, marked stale, when no fresh quote is available."""
+
+    __tablename__ = "price_snapshots"
+
+    symbol: Mapped[str] = mapped_column(String, primary_key=True)
+    name: Mapped[str] = mapped_column(String, nullable=False)
+    currency: Mapped[str] = mapped_column(String(3), nullable=False)
+    current_price: Mapped[Decimal] = mapped_column(Numeric(precision=14, scale=4), nullable=False)
+    previous_close: Mapped[Decimal] = mapped_column(Numeric(precision=14, scale=4), nullable=False)
+    fetched_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class IntradayPrice(Base):
+    """
+    Quotes fetched through the day, one row per symbol per snapshot flush.
+
+    Kept for ``settings.intraday_retention_days``, then compacted into daily closes
+    in ``price_history`` by the retention job. Partitioned by month on Postgres.
+    """
+
+    __tablename__ = "intraday_prices"
+    __table_args__ = {"postgresql_partition_by": "RANGE (fetched_at)"}
+
+    symbol: Mapped[str] = mapped_column(String, primary_key=True)
+    fetched_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True)
+    price: Mapped[Decimal] = mapped_column(Numeric(precision=14, scale=4), nullable=False)
+
+
+class ReplicaHeartbeat(Base):
+    """Time last written to the primary; read back from replicas to measure their lag."""
+
+    __tablename__ = "replica_heartbeats"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    beat_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class PortfolioDailyValue(Base):
+    """
+    Precomputed end-of-day portfolio value, maintained by the daily rollup job.
+
+    Partitioned by month on Postgres.
+    """
+
+    __tablename__ = "portfolio_daily_values"
+    __table_args__ = {"postgresql_partition_by": "RANGE (date)"}
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True
+    )
+    date: Mapped[date] = mapped_column(Date, primary_key=True)
+    total_value: Mapped[Decimal] = mapped_column(Numeric(precision=16, scale=2), nullable=False)
+    total_cost: Mapped[Decimal] = mapped_column(Numeric(precision=16, scale=2), nullable=False)
+    computed_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class SymbolPopularity(Base):
+    """How widely each symbol is held, maintained incrementally as holdings change."""
+
+    __tablename__ = "symbol_popularity"
+    __table_args__ = (Index("ix_symbol_popularity_holders", "holders"),)
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
-    symbol = Column(String, nullable=False)
-    name = Column(String, nullable=False)
-    shares = Column(Numeric(precision=10, scale=2), nullable=False)
-    avg_cost = Column(Numeric(precision=10, scale=2), nullable=False)
-    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
-    updated_at = Column(
+    symbol: Mapped[str] = mapped_column(String, primary_key=True)
+    holders: Mapped[int] = mapped_column(
+        Integer, nullable=False, default=0
+    )  # holdings with shares > 0
+    total_shares: Mapped[Decimal] = mapped_column(
+        Numeric(precision=20, scale=4), nullable=False, default=0
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+
+class FxRate(Base):
+    """Latest USD value of one unit of each currency, refreshed in batch with quotes."""
+
+    __tablename__ = "fx_rates"
+
+    currency: Mapped[str] = mapped_column(String(3), primary_key=True)
+    usd_rate: Mapped[Decimal] = mapped_column(Numeric(precision=18, scale=8), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+
+class CorporateAction(Base):
+    """Split or cash dividend of a symbol, applied to every holder by the corporate-actions job."""
+
+    __tablename__ = "corporate_actions"
+    __table_args__ = (
+        UniqueConstraint("symbol", "type", "ex_date", name="uq_corporate_actions_symbol_type_date"),
+        Index("ix_corporate_actions_status_ex_date", "status", "ex_date"),
+    )
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    symbol: Mapped[str] = mapped_column(String, nullable=False)
+    type: Mapped[str] = mapped_column(String, nullable=False)  # split, dividend
+    ex_date: Mapped[date] = mapped_column(Date, nullable=False)
+    ratio: Mapped[Decimal | None] = mapped_column(
+        Numeric(precision=10, scale=4), nullable=True
+    )  # new shares per old share
+    amount: Mapped[Decimal | None] = mapped_column(
+        Numeric(precision=14, scale=4), nullable=True
+    )  # dividend per share
+    status: Mapped[str] = mapped_column(
+        String, nullable=False, default="pending"
+    )  # pending, applied
+    holdings_affected: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    applied_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class Alert(Base):
+    """User price alert; fires once, then stays inactive."""
+
+    __tablename__ = "alerts"
+    __table_args__ = (Index("ix_alerts_user_id", "user_id"),)
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id"), nullable=False
+    )
+    symbol: Mapped[str] = mapped_column(String, nullable=False)
+    # price_above, price_below, daily_change, pnl_above, pnl_below
+    type: Mapped[str] = mapped_column(String, nullable=False)
+    threshold: Mapped[Decimal] = mapped_column(
+        Numeric(precision=14, scale=4), nullable=False
+    )  # price, or percent
+    active: Mapped[bool] = mapped_column(Boolean, nullable=False, default=True)
+    triggered_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class AlertEvent(Base):
+    """Delivered alert firing, written by the alert dispatcher."""
+
+    __tablename__ = "alert_events"
+    __table_args__ = (Index("ix_alert_events_user_fired_at", "user_id", "fired_at"),)
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    alert_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("alerts.id", ondelete="CASCADE"), nullable=False
+    )
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id"), nullable=False
+    )
+    symbol: Mapped[str] = mapped_column(String, nullable=False)
+    type: Mapped[str] = mapped_column(String, nullable=False)
+    threshold: Mapped[Decimal] = mapped_column(Numeric(precision=14, scale=4), nullable=False)
+    value: Mapped[Decimal] = mapped_column(
+        Numeric(precision=14, scale=4), nullable=False
+    )  # price or change that fired
+    fired_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+
+
+class Watchlist(Base):
+    """Named list of symbols a user follows without holding them."""
+
+    __tablename__ = "watchlists"
+    __table_args__ = (Index("ix_watchlists_user_id", "user_id"),)
+
+    id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id"), nullable=False
+    )
+    name: Mapped[str] = mapped_column(String, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+
+class WatchlistItem(Base):
+    __tablename__ = "watchlist_items"
+
+    watchlist_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("watchlists.id", ondelete="CASCADE"), primary_key=True
+    )
+    symbol: Mapped[str] = mapped_column(String, primary_key=True)
+    added_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), nullable=False
+    )
+
+
+class TargetAllocation(Base):
+    """Target weight of a symbol in a user's portfolio; the rest of 100% is held as cash."""
+
+    __tablename__ = "target_allocations"
+
+    user_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True
+    )
+    symbol: Mapped[str] = mapped_column(String, primary_key=True)
+    weight_pct: Mapped[Decimal] = mapped_column(Numeric(precision=7, scale=4), nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
     )
@@ -0,0 +1,37 @@
+"""Opaque cursors for keyset pagination.
+
+A cursor encodes the sort key of the last row returned (e.g. ``(symbol, id)``)
+as URL-safe base64 JSON, so the next page is a plain ``WHERE key > cursor``
+range scan instead of an OFFSET.
+"""
+
+import base64
+import binascii
+import json
+from typing import Any
+
+from fastapi import HTTPException, status
+
+
+def encode_cursor(*key: Any) -> str:
+    """Encode the sort key of the last returned row."""
+    raw = json.dumps([str(part) for part in key], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> list[str]:
+    """
+    Decode a cursor produced by ``encode_cursor``.
+
+    Raises:
+        HTTPException 400: If the cursor is malformed or has the wrong number of parts
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor") from e
+
+    if not isinstance(key, list) or len(key) != size or not all(isinstance(p, str) for p in key):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return key
@@ -0,0 +1,224 @@
+"""Opt-in per-request profiling.
+
+A profiled request records:
+
+- a span breakdown (time and count per span name, e.g. ``db``, ``quotes``,
+  ``compute``, ``serialize``), fed by ``span()`` blocks and SQLAlchemy cursor
+  events;
+- a sampling profile: a background thread periodically captures the stacks of the
+  threads serving the request and aggregates them into collapsed stacks
+  (flamegraph format).
+
+Finished profiles go to a bounded in-memory ring buffer read by the admin API.
+When no request is being profiled ``span()`` returns a shared no-op context
+manager, and the middleware and cursor listeners are not installed unless
+``settings.profiling_enabled`` is set.
+"""
+
+import contextvars
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from contextlib import AbstractContextManager, nullcontext
+from dataclasses import dataclass, field
+from datetime import UTC, datetime
+from typing import Any
+from uuid import uuid4
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.config import settings
+
+# Deepest stack kept per sample, counted from the innermost frame
+MAX_STACK_DEPTH = 64
+
+# Collapsed stacks kept per profile, most frequent first
+MAX_STACKS = 50
+
+_NOOP: AbstractContextManager[None] = nullcontext()
+
+
+@dataclass
+class RequestProfile:
+    """Profile of a single request, filled in while the request runs."""
+
+    method: str
+    path: str
+    id: str = field(default_factory=lambda: uuid4().hex)
+    started_at: datetime = field(default_factory=lambda: datetime.now(UTC))
+    route: str | None = None
+    status: int | None = None
+    duration_ms: float = 0.0
+    spans: dict[str, list[float]] = field(default_factory=dict)  # name -> [count, total_ms]
+    thread_ids: set[int] = field(default_factory=set)
+    samples: int = 0
+    stacks: Counter[str] = field(default_factory=Counter)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def add_span(self, name: str, elapsed_ms: float) -> None:
+        with self._lock:
+            entry = self.spans.setdefault(name, [0, 0.0])
+            entry[0] += 1
+            entry[1] += elapsed_ms
+
+    def add_sample(self, stack: str) -> None:
+        with self._lock:
+            self.stacks[stack] += 1
+            self.samples += 1
+
+    def to_dict(self, include_stacks: bool = True) -> dict[str, Any]:
+        with self._lock:
+            result: dict[str, Any] = {
+                "id": self.id,
+                "method": self.method,
+                "path": self.path,
+                "route": self.route,
+                "status": self.status,
+                "started_at": self.started_at,
+                "duration_ms": round(self.duration_ms, 3),
+                "spans": {
+                    name: {"count": int(count), "total_ms": round(total, 3)}
+                    for name, (count, total) in self.spans.items()
+                },
+                "samples": self.samples,
+            }
+            if include_stacks:
+                result["stacks"] = [
+                    {"stack": stack, "count": count}
+                    for stack, count in self.stacks.most_common(MAX_STACKS)
+                ]
+        return result
+
+
+_current_profile: contextvars.ContextVar[RequestProfile | None] = contextvars.ContextVar(
+    "current_profile", default=None
+)
+
+
+class _Span:
+    __slots__ = ("_profile", "_name", "_start")
+
+    def __init__(self, profile: RequestProfile, name: str):
+        self._profile = profile
+        self._name = name
+        self._start = 0.0
+
+    def __enter__(self) -> None:
+        self._profile.thread_ids.add(threading.get_ident())
+        self._start = time.perf_counter()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self._profile.add_span(self._name, (time.perf_counter() - self._start) * 1000)
+
+
+def span(name: str) -> AbstractContextManager[None]:
+    """
+    Time a block under ``name`` in the current request's profile.
+
+    Returns a shared no-op context manager when the request is not being profiled.
+    """
+    profile = _current_profile.get()
+    if profile is None:
+        return _NOOP
+    return _Span(profile, name)
+
+
+def start_profile(profile: RequestProfile) -> contextvars.Token[RequestProfile | None]:
+    """Make ``profile`` the active profile for the current context."""
+    profile.thread_ids.add(threading.get_ident())
+    return _current_profile.set(profile)
+
+
+def stop_profile(token: contextvars.Token[RequestProfile | None]) -> None:
+    _current_profile.reset(token)
+
+
+def _collapse(frame: Any) -> str:
+    """Render a frame's stack root-first as ``file:function;file:function;...``."""
+    parts: list[str] = []
+    while frame is not None and len(parts) < MAX_STACK_DEPTH:
+        code = frame.f_code
+        parts.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(parts))
+
+
+class StackSampler:
+    """Background thread sampling the stacks of a profile's threads at a fixed interval."""
+
+    def __init__(self, profile: RequestProfile, interval_seconds: float):
+        self.profile = profile
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        profile = self.profile
+        while not self._stop.wait(self.interval_seconds):
+            frames = sys._current_frames()
+            for thread_id in list(profile.thread_ids):
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    profile.add_sample(_collapse(frame))
+
+
+class ProfileBuffer:
+    """Thread-safe ring buffer of the most recent finished profiles."""
+
+    def __init__(self, maxlen: int):
+        self._profiles: deque[RequestProfile] = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def add(self, profile: RequestProfile) -> None:
+        with self._lock:
+            self._profiles.append(profile)
+
+    def list(self) -> list[RequestProfile]:
+        """Return profiles, newest first."""
+        with self._lock:
+            return list(reversed(self._profiles))
+
+    def get(self, profile_id: str) -> RequestProfile | None:
+        with self._lock:
+            return next((p for p in self._profiles if p.id == profile_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._profiles.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._profiles)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    if _current_profile.get() is not None:
+        conn.info.setdefault("profile_query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    profile = _current_profile.get()
+    starts = conn.info.get("profile_query_start")
+    if profile is not None and starts:
+        profile.thread_ids.add(threading.get_ident())
+        profile.add_span("db", (time.perf_counter() - starts.pop()) * 1000)
+
+
+def install_query_timing() -> None:
+    """Record time spent in SQL statements as the ``db`` span of profiled requests."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+profile_buffer = ProfileBuffer(maxlen=settings.profiling_buffer_size)
@@ -0,0 +1,193 @@
+"""Read replica routing.
+
+Replicas are configured with ``settings.database_replica_urls``. Read-only endpoints
+take their session from ``get_read_db``, which picks a replica (round robin) within
+``settings.replica_max_lag_seconds`` of the primary and falls back to the primary
+when there is none.
+
+Lag is measured with a heartbeat: ``ReplicaMonitor`` writes the current time to
+``replica_heartbeats`` on the primary and reads it back from every replica. A
+replica's lag is how far its heartbeat is behind the one just written; a replica
+whose heartbeat cannot be read is not used until it can.
+
+Read-your-writes: commits made through ``get_db`` while handling a change (a POST,
+PUT, PATCH or DELETE) are recorded for the user set on the request by
+``get_current_user``, and that user's reads only go to a replica whose heartbeat is
+newer than their last commit. Reads that commit cached market data (quotes, FX
+rates) are not writes and leave the user's reads on replicas. Commits are recorded
+per process, so a write handled by another worker is only covered by the lag bound.
+"""
+
+import itertools
+import logging
+import threading
+import time
+from collections.abc import Iterator
+from datetime import UTC, datetime
+
+from fastapi import Depends
+from sqlalchemy import Engine, event, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app import models
+from app.config import settings
+from app.database import SessionLocal, engine, get_db, replica_engines
+from app.dependencies.auth import get_current_user
+from app.metrics import DB_READS, DB_REPLICA_LAG
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_ID = 1
+
+
+class ReplicaRouter:
+    """Chooses the database for a user's reads from the last measured replica positions."""
+
+    def __init__(self, primary: Engine, replicas: list[Engine], max_lag_seconds: float):
+        self.primary = primary
+        self.replicas = replicas
+        self.max_lag_seconds = max_lag_seconds
+        # replica index -> (lag in seconds, heartbeat time seen on the replica)
+        self._positions: dict[int, tuple[float, float]] = {}
+        self._last_write: dict[str, float] = {}  # user id -> time of last commit
+        self._turn = itertools.count()
+        self._lock = threading.Lock()
+
+    def beat(self) -> datetime:
+        """Write the current time to the primary's heartbeat row."""
+        now = datetime.now(UTC)
+        values = {"id": HEARTBEAT_ID, "beat_at": now}
+        table = models.ReplicaHeartbeat.__table__
+        with Session(self.primary) as db:
+            dialect = self.primary.dialect.name
+            if dialect in ("postgresql", "sqlite"):
+                upsert = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(table)
+                db.execute(
+                    upsert.values(**values).on_conflict_do_update(
+                        index_elements=[table.c.id], set_={"beat_at": upsert.excluded.beat_at}
+                    )
+                )
+            else:
+                db.merge(models.ReplicaHeartbeat(**values))
+            db.commit()
+        return now
+
+    def measure(self, beat_at: datetime) -> None:
+        """Read every replica's heartbeat and record its lag behind ``beat_at``."""
+        for index, replica in enumerate(self.replicas):
+            try:
+                with Session(replica) as db:
+                    seen = db.scalar(
+                        select(models.ReplicaHeartbeat.beat_at).where(
+                            models.ReplicaHeartbeat.id == HEARTBEAT_ID
+                        )
+                    )
+            except Exception as e:
+                logger.warning(f"Replica {index} heartbeat unreadable: {e}")
+                seen = None
+            if seen is None:
+                with self._lock:
+                    self._positions.pop(index, None)
+                continue
+            if seen.tzinfo is None:  # SQLite stores naive UTC
+                seen = seen.replace(tzinfo=UTC)
+            # Other workers write the heartbeat too, so it can be ahead of ours
+            lag = max((beat_at - seen).total_seconds(), 0.0)
+            DB_REPLICA_LAG.labels(str(index)).set(lag)
+            with self._lock:
+                self._positions[index] = (lag, seen.timestamp())
+
+    def record_write(self, user_id: str) -> None:
+        now = time.time()
+        with self._lock:
+            self._last_write[user_id] = now
+            # Older writes are visible on every replica within the lag bound
+            expired = [u for u, at in self._last_write.items() if now - at > self.max_lag_seconds]
+            for user in expired:
+                del self._last_write[user]
+
+    def choose(self, user_id: str | None = None) -> tuple[str, Engine]:
+        """
+        Pick the database for a user's reads.
+
+        Returns:
+            ("replica", engine) for an up-to-date replica, otherwise ("primary", engine)
+        """
+        with self._lock:
+            last_write = self._last_write.get(user_id, 0.0) if user_id else 0.0
+            eligible = [
+                index
+                for index, (lag, seen_at) in self._positions.items()
+                if lag <= self.max_lag_seconds and seen_at > last_write
+            ]
+        if not eligible:
+            return "primary", self.primary
+        return "replica", self.replicas[eligible[next(self._turn) % len(eligible)]]
+
+
+class ReplicaMonitor:
+    """Measures replica lag every ``interval_seconds`` on a background thread."""
+
+    def __init__(self, router: ReplicaRouter, interval_seconds: float):
+        self.router = router
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def run_once(self) -> None:
+        self.router.measure(self.router.beat())
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.exception(f"Replica heartbeat failed: {e}")
+            self._stop.wait(self.interval_seconds)
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="replica-monitor", daemon=True)
+        self._thread.start()
+        logger.info(
+            f"Replica monitor started for {len(self.router.replicas)} replicas "
+            f"(every {self.interval_seconds}s)"
+        )
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+
+replica_router = ReplicaRouter(engine, replica_engines, settings.replica_max_lag_seconds)
+
+
+@event.listens_for(SessionLocal, "after_commit")
+def _record_commit(session: Session) -> None:
+    user_id = getattr(session.info.get("request_state"), "user_id", None)
+    if user_id and replica_router.replicas:
+        replica_router.record_write(user_id)
+
+
+def get_read_db(
+    primary_db: Session = Depends(get_db), current_user: dict = Depends(get_current_user)
+) -> Iterator[Session]:
+    """
+    Session for read-only endpoints: an up-to-date replica, or the primary.
+
+    Reads served by the primary reuse the request's ``get_db`` session, so an endpoint
+    taking both holds one primary connection, not two.
+    """
+    target, bind = replica_router.choose(current_user["sub"])
+    DB_READS.labels(target).inc()
+    if target == "primary":
+        yield primary_db
+        return
+    db = SessionLocal(bind=bind)
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,102 @@
+"""Admin API endpoints."""
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.database import get_db
+from app.dependencies.admin import get_admin_user
+from app.profiling import profile_buffer
+from app.services.popularity_service import get_popular_symbols
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(get_admin_user)])
+
+
+@router.get("/profiles", response_model=list[schemas.RequestProfileSummary])
+def list_profiles(limit: int = Query(20, ge=1, le=1000)):
+    """
+    Get the most recent request profiles, newest first.
+
+    Profiles are only recorded when ``PROFILING_ENABLED`` is set; see ``app.profiling``.
+    """
+    return [p.to_dict(include_stacks=False) for p in profile_buffer.list()[:limit]]
+
+
+@router.get("/profiles/{profile_id}", response_model=schemas.RequestProfile)
+def get_profile(profile_id: str):
+    """
+    Get one request profile including its sampled stacks (collapsed flamegraph format).
+
+    Raises:
+        HTTPException 404: If the profile is not (or no longer) in the buffer
+    """
+    profile = profile_buffer.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return profile.to_dict()
+
+
+@router.get("/symbols", response_model=list[schemas.SymbolPopularity])
+def list_popular_symbols(
+    limit: int = Query(100, ge=1, le=10000),
+    db: Session = Depends(get_db),
+):
+    """
+    Get the most widely held symbols across all users.
+
+    This is the order in which the quote refresher keeps quotes warm.
+    """
+    return get_popular_symbols(db, limit)
+
+
+@router.post(
+    "/corporate-actions",
+    response_model=schemas.CorporateAction,
+    status_code=status.HTTP_201_CREATED,
+)
+def create_corporate_action(
+    action_data: schemas.CorporateActionCreate,
+    db: Session = Depends(get_db),
+):
+    """
+    Record a split or dividend; the corporate-actions job applies it to all holders.
+
+    Raises:
+        HTTPException 409: If the same action (symbol, type, ex-date) already exists
+    """
+    action = models.CorporateAction(
+        symbol=action_data.symbol.upper(),
+        type=action_data.type,
+        ex_date=action_data.ex_date,
+        ratio=action_data.ratio if action_data.type == "split" else None,
+        amount=action_data.amount if action_data.type == "dividend" else None,
+        status="pending",
+    )
+    db.add(action)
+    try:
+        db.commit()
+    except IntegrityError as e:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT, detail="Corporate action already exists"
+        ) from e
+    db.refresh(action)
+    return action
+
+
+@router.get("/corporate-actions", response_model=list[schemas.CorporateAction])
+def list_corporate_actions(
+    status_filter: str | None = Query(None, alias="status"),
+    limit: int = Query(100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+):
+    """Get corporate actions with their progress, most recent ex-date first."""
+    query = db.query(models.CorporateAction)
+    if status_filter:
+        query = query.filter(models.CorporateAction.status == status_filter)
+    return (
+        query.order_by(models.CorporateAction.ex_date.desc(), models.CorporateAction.symbol)
+        .limit(limit)
+        .all()
+    )
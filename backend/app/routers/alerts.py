@@ -0,0 +1,137 @@
+"""Price alert API endpoints."""
+
+import logging
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.config import settings
+from app.database import get_db
+from app.dependencies.auth import get_current_user
+from app.routers.holdings import ensure_user_exists
+from app.services.alerts_service import PNL_TYPES, alert_index
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/alerts", tags=["alerts"])
+
+
+@router.get("", response_model=list[schemas.Alert])
+def list_alerts(
+    active: bool | None = None,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Get the current user's alerts, newest first.
+
+    Args:
+        active: Only return active (True) or already fired (False) alerts
+    """
+    user_id = UUID(current_user["sub"])
+    query = db.query(models.Alert).filter(models.Alert.user_id == user_id)
+    if active is not None:
+        query = query.filter(models.Alert.active.is_(active))
+    return query.order_by(models.Alert.created_at.desc()).all()
+
+
+@router.post("", response_model=schemas.Alert, status_code=status.HTTP_201_CREATED)
+def create_alert(
+    alert_data: schemas.AlertCreate,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Create an alert that fires once when a quote update meets its condition.
+
+    Types:
+        - price_above / price_below: price reaches ``threshold``
+        - daily_change: absolute daily change reaches ``threshold`` percent
+        - pnl_above / pnl_below: the position's P&L reaches ``threshold`` percent
+
+    Returns:
+        Created alert
+
+    Raises:
+        HTTPException 400: If a P&L alert is created for a symbol that is not held
+    """
+    user_id = UUID(current_user["sub"])
+    ensure_user_exists(db, user_id, current_user.get("email"))
+    symbol = alert_data.symbol.upper()
+
+    avg_cost = None
+    if alert_data.type in PNL_TYPES:
+        avg_cost = (
+            db.query(models.Holding.avg_cost)
+            .filter(models.Holding.user_id == user_id, models.Holding.symbol == symbol)
+            .scalar()
+        )
+        if avg_cost is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"No holding for {symbol}; P&L alerts need a position",
+            )
+
+    alert = models.Alert(
+        user_id=user_id, symbol=symbol, type=alert_data.type, threshold=alert_data.threshold
+    )
+    db.add(alert)
+    db.commit()
+    db.refresh(alert)
+
+    if settings.alerts_enabled:
+        alert_index.add(alert.id, user_id, symbol, alert.type, alert.threshold, avg_cost)
+    logger.info(f"Created {alert.type} alert on {symbol} at {alert.threshold}")
+
+    return alert
+
+
+@router.delete("/{alert_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_alert(
+    alert_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Delete an alert and its fired events.
+
+    Raises:
+        HTTPException 404: If alert not found
+    """
+    user_id = UUID(current_user["sub"])
+    alert = (
+        db.query(models.Alert)
+        .filter(models.Alert.id == alert_id, models.Alert.user_id == user_id)
+        .first()
+    )
+    if not alert:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Alert with id {alert_id} not found",
+        )
+
+    db.query(models.AlertEvent).filter(models.AlertEvent.alert_id == alert.id).delete(
+        synchronize_session=False
+    )
+    db.delete(alert)
+    db.commit()
+    alert_index.remove(alert.id, user_id, alert.symbol)
+
+
+@router.get("/events", response_model=list[schemas.AlertEvent])
+def list_alert_events(
+    limit: int = Query(default=100, ge=1, le=1000),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    """Get the current user's fired alerts, most recent first."""
+    user_id = UUID(current_user["sub"])
+    return (
+        db.query(models.AlertEvent)
+        .filter(models.AlertEvent.user_id == user_id)
+        .order_by(models.AlertEvent.fired_at.desc())
+        .limit(limit)
+        .all()
+    )
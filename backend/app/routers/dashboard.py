@@ -1,16 +1,39 @@
 """Dashboard API endpoint."""
 
 import logging
-from datetime import datetime
+import time
+from datetime import date, timedelta
 from decimal import Decimal
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from sqlalchemy.orm import Session
 
 from app import models, schemas
+from app.config import settings
 from app.database import get_db
 from app.dependencies.auth import get_current_user
+from app.profiling import span
+from app.replicas import get_read_db
+from app.routers.holdings import ensure_user_exists
+from app.serialization import render
+from app.services.analytics_service import InsufficientHistoryError, get_portfolio_analytics
+from app.services.dashboard_service import build_dashboard
+from app.services.fx_service import conversion_rates, get_usd_rates
+from app.services.heatmap_service import get_user_heatmap
+from app.services.history_service import get_daily_values
+from app.services.price_snapshot_service import flush_snapshots, with_last_known
+from app.services.rebalance_service import (
+    UnpricedHoldingsError,
+    build_rebalance,
+    get_targets,
+    replace_targets,
+)
+from app.services.simulation_service import (
+    ScenarioSymbolError,
+    SimulationTooLargeError,
+    get_simulation,
+)
 from app.services.stock_service import get_multiple_prices
 
 logger = logging.getLogger(__name__)
@@ -20,7 +43,9 @@ router = APIRouter(prefix="/dashboard", tags=["dashboard"])
 
 @router.get("", response_model=schemas.Dashboard)
 def get_dashboard(
+    request: Request,
     db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_db),
     current_user: dict = Depends(get_current_user),
 ):
     """
@@ -33,12 +58,39 @@ def get_dashboard(
         - Daily change percentages
         - Allocation percentages
 
+        Values, costs and P&L are in the user's base currency; prices stay in
+        each holding's currency.
+
+        Responds within ``settings.dashboard_deadline_seconds`` of upstream time:
+        quotes (and FX rates) not fetched by then use the last known value, and
+        the holding is marked ``stale`` with the ``as_of`` time of its price.
+
+        Encoded as JSON by default, or as columnar JSON / MessagePack depending on
+        the Accept header (see ``app.serialization``).
+
+        Holdings are read from a replica when one is up to date (see
+        ``app.replicas``); FX rates and last known prices are written to the primary.
+
     Raises:
         HTTPException 404: If no holdings found
+        HTTPException 503: If no holding has a fresh or last known price
     """
+    deadline = time.monotonic() + settings.dashboard_deadline_seconds
+
     # Fetch all holdings for user
     user_id = UUID(current_user["sub"])
-    holdings = db.query(models.Holding).filter(models.Holding.user_id == user_id).all()
+    # Only the columns the metrics need; served from ix_holdings_user_symbol on Postgres
+    holdings = (
+        read_db.query(
+            models.Holding.symbol,
+            models.Holding.currency,
+            models.Holding.shares,
+            models.Holding.avg_cost,
+        )
+        .filter(models.Holding.user_id == user_id)
+        .order_by(models.Holding.symbol)
+        .all()
+    )
 
     if not holdings:
         raise HTTPException(
@@ -51,86 +103,282 @@ def get_dashboard(
 
     # Fetch current prices for all symbols
     logger.info(f"Fetching prices for {len(symbols)} symbols: {symbols}")
-    price_data = get_multiple_prices(symbols)
-
-    # Calculate metrics for each holding
-    dashboard_holdings = []
-    total_value = Decimal(0)
-    total_cost = Decimal(0)
-
-    for holding in holdings:
-        stock_prices = price_data.get(holding.symbol)
-
-        # Skip holdings where price fetch failed
-        if stock_prices is None:
-            logger.warning(f"Skipping {holding.symbol} - price data unavailable")
-            continue
-
-        current_price = stock_prices["current_price"]
-        previous_close = stock_prices["previous_close"]
-        daily_change_pct = stock_prices["daily_change_pct"]
-
-        # Calculate holding metrics
-        market_value = holding.shares * current_price
-        cost_basis = holding.shares * holding.avg_cost
-        pnl = market_value - cost_basis
-
-        if cost_basis > 0:
-            pnl_pct = (pnl / cost_basis) * 100
-        else:
-            pnl_pct = Decimal(0)
-
-        # Accumulate totals
-        total_value += market_value
-        total_cost += cost_basis
-
-        dashboard_holdings.append(
-            schemas.DashboardHolding(
-                symbol=holding.symbol,
-                shares=holding.shares,
-                avg_cost=holding.avg_cost,
-                current_price=current_price,
-                previous_close=previous_close,
-                daily_change_pct=daily_change_pct,
-                market_value=market_value,
-                pnl=pnl,
-                pnl_pct=pnl_pct,
-                allocation_pct=Decimal(0),  # Will calculate after total_value is known
-            )
+    price_data = with_last_known(
+        read_db, symbols, get_multiple_prices(symbols, timeout=deadline - time.monotonic())
+    )
+
+    # One cached lookup per distinct currency; none when everything is in the base currency
+    base_currency = (
+        read_db.query(models.User.base_currency).filter(models.User.id == user_id).scalar() or "USD"
+    )
+    currencies = {holding.currency for holding in holdings}
+    fx_rates = None
+    if currencies != {base_currency}:
+        usd_rates = get_usd_rates(
+            db, currencies | {base_currency}, timeout=deadline - time.monotonic()
+        )
+        fx_rates = conversion_rates(usd_rates, base_currency)
+
+    with span("compute"):
+        dashboard = build_dashboard(
+            holdings, price_data, fx_rates=fx_rates, base_currency=base_currency
         )
 
+    # Keep the last known prices current, including fetches that finished after a deadline
+    if flush_snapshots(db):
+        db.commit()
+
     # Handle case where all price fetches failed
-    if not dashboard_holdings:
+    if dashboard is None:
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Unable to fetch stock prices for any holdings",
         )
 
-    # Calculate portfolio totals
-    total_pnl = total_value - total_cost
+    logger.info(
+        f"Dashboard calculated: {len(dashboard.holdings)} holdings, "
+        f"total_value={dashboard.total_value} {base_currency}, total_pnl={dashboard.total_pnl} "
+        f"({dashboard.total_pnl_pct:.2f}%)"
+    )
 
-    if total_cost > 0:
-        total_pnl_pct = (total_pnl / total_cost) * 100
-    else:
-        total_pnl_pct = Decimal(0)
+    return render(request, dashboard)
 
-    # Calculate allocation percentages
-    for holding_data in dashboard_holdings:
-        if total_value > 0:
-            holding_data.allocation_pct = (holding_data.market_value / total_value) * 100
-        else:
-            holding_data.allocation_pct = Decimal(0)
 
-    logger.info(
-        f"Dashboard calculated: {len(dashboard_holdings)} holdings, "
-        f"total_value=${total_value}, total_pnl=${total_pnl} ({total_pnl_pct:.2f}%)"
+@router.get("/heatmap", response_model=schemas.HeatmapLayout)
+def get_dashboard_heatmap(
+    width: int = Query(default=1000, ge=100, le=4000),
+    height: int = Query(default=600, ge=100, le=4000),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Get a ready-to-draw heatmap (squarified treemap) of the current holdings.
+
+    Rectangle size is market value and ``bucket`` (-3..3) is the daily change color.
+    The layout is cached per user until a holding or an input quote changes.
+
+    Args:
+        width: Layout area width
+        height: Layout area height
+
+    Returns:
+        Columnar layout with one array per field
+
+    Raises:
+        HTTPException 404: If no holdings found
+    """
+    user_id = UUID(current_user["sub"])
+    layout = get_user_heatmap(db, user_id, width, height)
+
+    if layout is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No holdings found for user",
+        )
+
+    return layout
+
+
+@router.get("/history", response_model=schemas.PortfolioHistory)
+def get_dashboard_history(
+    start: date | None = None,
+    end: date | None = None,
+    db: Session = Depends(get_read_db),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Get portfolio value over time from precomputed daily rollups.
+
+    Args:
+        start: First date (defaults to one year before ``end``)
+        end: Last date (defaults to today)
+
+    Returns:
+        Daily portfolio values in the base currency, oldest first
+
+    Raises:
+        HTTPException 400: If start is after end
+    """
+    user_id = UUID(current_user["sub"])
+    end = end or date.today()
+    start = start or end - timedelta(days=365)
+
+    if start > end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start must be on or before end",
+        )
+
+    rows = get_daily_values(db, user_id, start, end)
+    base_currency = (
+        db.query(models.User.base_currency).filter(models.User.id == user_id).scalar() or "USD"
+    )
+
+    return schemas.PortfolioHistory(
+        start=start,
+        end=end,
+        base_currency=base_currency,
+        points=[
+            schemas.PortfolioValuePoint(
+                date=row.date,
+                total_value=row.total_value,
+                total_cost=row.total_cost,
+                total_pnl=row.total_value - row.total_cost,
+            )
+            for row in rows
+        ],
     )
 
-    return schemas.Dashboard(
-        total_value=total_value,
-        total_cost=total_cost,
-        total_pnl=total_pnl,
-        total_pnl_pct=total_pnl_pct,
-        last_updated=datetime.now(),
-        holdings=dashboard_holdings,
+
+@router.get("/analytics", response_model=schemas.PortfolioAnalytics)
+def get_dashboard_analytics(
+    benchmark: str = Query(default=settings.analytics_benchmark_symbol),
+    lookback_days: int = Query(default=settings.analytics_lookback_days, ge=30, le=3650),
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Get risk and performance analytics for the current holdings.
+
+    Computed with NumPy over stored daily closes and cached per user per day.
+
+    Args:
+        benchmark: Symbol used for beta; closes are stored for the default benchmark
+            and held symbols only
+        lookback_days: Calendar days of history to use
+
+    Returns:
+        Volatility, beta, Sharpe ratio, max drawdown and correlation matrix
+
+    Raises:
+        HTTPException 404: If no holdings found
+        HTTPException 503: If there is not enough price history
+    """
+    user_id = UUID(current_user["sub"])
+
+    try:
+        result = get_portfolio_analytics(db, user_id, benchmark, lookback_days)
+    except InsufficientHistoryError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e)) from e
+
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No holdings found for user",
+        )
+
+    return result
+
+
+def _targets_schema(targets: list[models.TargetAllocation]) -> schemas.TargetAllocations:
+    return schemas.TargetAllocations(
+        targets=[
+            schemas.TargetAllocation(symbol=t.symbol, weight_pct=t.weight_pct) for t in targets
+        ],
+        cash_pct=Decimal(100) - sum((t.weight_pct for t in targets), Decimal(0)),
     )
+
+
+@router.get("/targets", response_model=schemas.TargetAllocations)
+def get_target_allocations(
+    db: Session = Depends(get_read_db),
+    current_user: dict = Depends(get_current_user),
+):
+    """Get the current user's target allocations; the rest of 100% is held as cash."""
+    return _targets_schema(get_targets(db, UUID(current_user["sub"])))
+
+
+@router.put("/targets", response_model=schemas.TargetAllocations)
+def put_target_allocations(
+    targets_data: schemas.TargetAllocationsUpdate,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Replace the current user's target allocations.
+
+    Weights are percentages of holdings plus cash and must add up to at most 100;
+    the rest is held as cash. Held symbols without a target are sold by a rebalance.
+    """
+    user_id = UUID(current_user["sub"])
+    ensure_user_exists(db, user_id, current_user.get("email"))
+    replace_targets(db, user_id, targets_data.targets)
+    db.commit()
+    return _targets_schema(get_targets(db, user_id))
+
+
+@router.post("/rebalance", response_model=schemas.Rebalance)
+def rebalance(
+    rebalance_data: schemas.RebalanceRequest,
+    db: Session = Depends(get_read_db),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Compute the trades that bring the current holdings to the target allocations.
+
+    Trades are the fewest that reach the targets: positions within
+    ``tolerance_pct`` of target are left alone, buys are paid for by ``cash`` and
+    the proceeds of sells, and with ``whole_shares`` only whole shares are traded
+    (except to close a position). Nothing is executed.
+
+    Prices are read from the quote cache (or are the last known ones, or the last
+    stored close, marked ``stale``); nothing is fetched, so the response does not
+    wait on the upstream.
+
+    Raises:
+        HTTPException 404: If the user has neither holdings nor targets
+        HTTPException 409: If a holding has no price to value it at
+    """
+    try:
+        result = build_rebalance(db, UUID(current_user["sub"]), rebalance_data)
+    except UnpricedHoldingsError as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f"No price available yet for held symbols: {', '.join(e.symbols)}",
+        ) from e
+
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No holdings or target allocations found for user",
+        )
+
+    return result
+
+
+@router.post("/simulate", response_model=schemas.Simulation)
+def simulate(
+    simulation_data: schemas.SimulationRequest,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Project the current holdings with Monte Carlo paths and stress scenarios.
+
+    Daily log returns are drawn with the mean and covariance of stored daily closes
+    over ``lookback_days``; value percentiles are reported about monthly up to
+    ``horizon_days``. Each scenario shocks the named symbols by a percentage (e.g. a
+    sector ETF by -20) and moves the other positions by their historical co-move.
+    Results are cached per holdings and request. Only stored closes are used, as
+    backfilled daily for held symbols and ``settings.price_history_extra_symbols``.
+
+    Raises:
+        HTTPException 404: If no holdings found
+        HTTPException 422: If a scenario shocks a symbol without price history, or
+            paths x horizon days x positions exceed ``settings.simulation_max_draws``
+        HTTPException 503: If there is not enough price history
+    """
+    try:
+        result = get_simulation(db, UUID(current_user["sub"]), simulation_data)
+    except (ScenarioSymbolError, SimulationTooLargeError) as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e)) from e
+    except InsufficientHistoryError as e:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail=str(e)) from e
+
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No holdings found for user",
+        )
+
+    return result
@@ -1,22 +1,53 @@
 """Holdings CRUD API endpoints."""
 
 import logging
+from datetime import date
+from decimal import Decimal
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import tuple_
 from sqlalchemy.orm import Session
 
 from app import models, schemas
 from app.database import get_db
 from app.dependencies.auth import get_current_user
+from app.pagination import decode_cursor, encode_cursor
+from app.replicas import get_read_db
+from app.serialization import render
+from app.services.ledger_service import record_transaction
 from app.services.stock_service import StockNotFoundError, get_stock_price
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/holdings", tags=["holdings"])
 
+# Fields selectable with GET /holdings?fields=
+HOLDING_FIELDS = tuple(schemas.Holding.model_fields)
 
-def _ensure_user_exists(db: Session, user_id: UUID, email: str | None = None) -> None:
+# Response header carrying the cursor of the next page
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def lookup_stock_metadata(symbol: str) -> tuple[str, str]:
+    """Fetch a stock's display name and currency, translating lookup failures to HTTP errors."""
+    try:
+        stock_data = get_stock_price(symbol)
+        return str(stock_data["name"]), str(stock_data.get("currency", "USD"))
+    except StockNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Invalid stock symbol: {symbol}",
+        ) from e
+    except Exception as e:
+        logger.error(f"Failed to fetch stock data: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to fetch stock information",
+        ) from e
+
+
+def ensure_user_exists(db: Session, user_id: UUID, email: str | None = None) -> None:
     """Create user record if it doesn't exist yet."""
     user = db.query(models.User).filter(models.User.id == user_id).first()
     if not user:
@@ -27,19 +58,88 @@ def _ensure_user_exists(db: Session, user_id: UUID, email: str | None = None) ->
 
 @router.get("", response_model=list[schemas.Holding])
 def list_holdings(
+    request: Request,
+    symbol: str | None = Query(default=None, description="Only symbols starting with this"),
+    fields: str | None = Query(default=None, description="Comma-separated fields to return"),
+    limit: int | None = Query(default=None, ge=1, le=1000),
+    cursor: str | None = Query(default=None, description="X-Next-Cursor of the previous page"),
     db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_db),
     current_user: dict = Depends(get_current_user),
 ):
     """
-    Get all holdings for the current user.
+    Get holdings for the current user, ordered by symbol.
+
+    Filtering, projection and pagination all run in SQL: ``symbol`` is a prefix
+    filter, ``fields`` selects only the named columns, and ``limit``/``cursor`` page
+    through results with a keyset on (symbol, id). When more rows remain, the cursor
+    of the next page is returned in the ``X-Next-Cursor`` header. Without ``limit``
+    all matching holdings are returned.
+
+    Holdings are read from a replica when one is up to date (see ``app.replicas``).
 
     Returns:
-        List of holdings with details
+        List of holdings (or of the selected fields), encoded per the Accept header
+        (JSON, columnar JSON or MessagePack)
+
+    Raises:
+        HTTPException 400: If a field is unknown or the cursor is invalid
     """
     user_id = UUID(current_user["sub"])
-    _ensure_user_exists(db, user_id, current_user.get("email"))
-    holdings = db.query(models.Holding).filter(models.Holding.user_id == user_id).all()
-    return holdings
+
+    selected = HOLDING_FIELDS
+    if fields:
+        selected = tuple(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+        unknown = [f for f in selected if f not in HOLDING_FIELDS]
+        if unknown or not selected:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}; "
+                f"choose from {', '.join(HOLDING_FIELDS)}",
+            )
+
+    # The keyset columns are always selected so the next cursor can be built
+    columns = tuple(dict.fromkeys((*selected, "symbol", "id")))
+    query = (
+        read_db.query(*(getattr(models.Holding, c) for c in columns))
+        .filter(models.Holding.user_id == user_id)
+        .order_by(models.Holding.symbol, models.Holding.id)
+    )
+    if symbol:
+        query = query.filter(models.Holding.symbol.startswith(symbol.upper(), autoescape=True))
+    if cursor:
+        after_symbol, after_id = decode_cursor(cursor, 2)
+        try:
+            after_uuid = UUID(after_id)
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+            ) from e
+        query = query.filter(
+            tuple_(models.Holding.symbol, models.Holding.id) > tuple_(after_symbol, after_uuid)
+        )
+    if limit:
+        # One extra row tells whether there is a next page
+        query = query.limit(limit + 1)
+
+    rows = query.all()
+    if not rows:
+        # A user with holdings already exists; only new users need the primary
+        ensure_user_exists(db, user_id, current_user.get("email"))
+    next_cursor = None
+    if limit and len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].symbol, rows[-1].id)
+
+    if fields:
+        content: list = [{f: getattr(row, f) for f in selected} for row in rows]
+    else:
+        content = [schemas.Holding.model_validate(row) for row in rows]
+
+    response = render(request, content)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return response
 
 
 @router.post("", response_model=schemas.Holding, status_code=status.HTTP_201_CREATED)
@@ -49,7 +149,7 @@ def create_or_update_holding(
     current_user: dict = Depends(get_current_user),
 ):
     """
-    Create a new holding or update existing one with weighted average.
+    Record a purchase, creating a new holding or updating the existing one with weighted average.
 
     If a holding with the same symbol exists, it will calculate weighted average:
     - new_shares = existing_shares + incoming_shares
@@ -66,79 +166,49 @@ def create_or_update_holding(
         HTTPException 500: If stock API fails
     """
     user_id = UUID(current_user["sub"])
-    _ensure_user_exists(db, user_id, current_user.get("email"))
-
-    # Fetch stock name from yfinance
-    try:
-        stock_data = get_stock_price(holding_data.symbol.upper())
-        stock_name = stock_data["name"]
-    except StockNotFoundError as e:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Invalid stock symbol: {holding_data.symbol}",
-        ) from e
-    except Exception as e:
-        logger.error(f"Failed to fetch stock data: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to fetch stock information",
-        ) from e
+    ensure_user_exists(db, user_id, current_user.get("email"))
 
-    # Check if holding already exists for this user and symbol
     existing_holding = (
-        db.query(models.Holding)
+        db.query(models.Holding.shares, models.Holding.avg_cost)
         .filter(
             models.Holding.user_id == user_id,
             models.Holding.symbol == holding_data.symbol.upper(),
         )
         .first()
     )
+    old_shares = existing_holding.shares if existing_holding else None
+    old_avg_cost = existing_holding.avg_cost if existing_holding else None
 
-    if existing_holding:
-        # Calculate weighted average
-        old_shares = existing_holding.shares
-        old_avg_cost = existing_holding.avg_cost
-        new_shares_input = holding_data.shares
-        new_avg_cost_input = holding_data.avg_cost
-
-        # New total shares
-        total_shares = old_shares + new_shares_input
-
-        # Weighted average cost
-        weighted_avg_cost = (
-            (old_shares * old_avg_cost) + (new_shares_input * new_avg_cost_input)
-        ) / total_shares
-
-        # Update existing holding
-        existing_holding.shares = total_shares
-        existing_holding.avg_cost = weighted_avg_cost
+    # Record the purchase in the ledger; the holding is updated with the weighted average
+    try:
+        _, holding = record_transaction(
+            db,
+            user_id,
+            schemas.TransactionCreate(
+                symbol=holding_data.symbol,
+                type="buy",
+                trade_date=date.today(),
+                shares=holding_data.shares,
+                price=holding_data.avg_cost,
+            ),
+            metadata_lookup=lookup_stock_metadata,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
 
-        db.commit()
-        db.refresh(existing_holding)
+    db.commit()
+    assert holding is not None  # a buy of a positive number of shares keeps the holding
+    db.refresh(holding)
 
+    if existing_holding:
         logger.info(
-            f"Updated holding {holding_data.symbol}: {old_shares} + {new_shares_input} = {total_shares} shares, "
-            f"avg_cost ${old_avg_cost} -> ${weighted_avg_cost}"
+            f"Updated holding {holding_data.symbol}: {old_shares} + {holding_data.shares} = {holding.shares} shares, "
+            f"avg_cost ${old_avg_cost} -> ${holding.avg_cost}"
         )
-
-        return existing_holding
     else:
-        # Create new holding
-        new_holding = models.Holding(
-            user_id=user_id,
-            symbol=holding_data.symbol.upper(),
-            name=stock_name,
-            shares=holding_data.shares,
-            avg_cost=holding_data.avg_cost,
-        )
-
-        db.add(new_holding)
-        db.commit()
-        db.refresh(new_holding)
-
         logger.info(f"Created new holding: {holding_data.symbol} - {holding_data.shares} shares")
 
-        return new_holding
+    return holding
 
 
 @router.put("/{holding_id}", response_model=schemas.Holding)
@@ -177,13 +247,21 @@ def update_holding(
             detail=f"Holding with id {holding_id} not found",
         )
 
-    # Update only provided fields
-    if holding_update.shares is not None:
-        holding.shares = holding_update.shares
-
-    if holding_update.avg_cost is not None:
-        holding.avg_cost = holding_update.avg_cost
-
+    # Record the correction in the ledger; only provided fields change
+    record_transaction(
+        db,
+        user_id,
+        schemas.TransactionCreate(
+            symbol=holding.symbol,
+            type="adjustment",
+            trade_date=date.today(),
+            shares=holding_update.shares if holding_update.shares is not None else holding.shares,
+            price=(
+                holding_update.avg_cost if holding_update.avg_cost is not None else holding.avg_cost
+            ),
+        ),
+        metadata_lookup=lambda symbol: (str(holding.name), str(holding.currency)),
+    )
     db.commit()
     db.refresh(holding)
 
@@ -203,6 +281,9 @@ def delete_holding(
     """
     Delete a holding.
 
+    The position is closed with an adjustment to zero shares, so the ledger keeps its
+    history and past daily values are unaffected.
+
     Args:
         holding_id: Holding UUID
 
@@ -225,9 +306,21 @@ def delete_holding(
             detail=f"Holding with id {holding_id} not found",
         )
 
-    db.delete(holding)
+    symbol = holding.symbol
+    record_transaction(
+        db,
+        user_id,
+        schemas.TransactionCreate(
+            symbol=symbol,
+            type="adjustment",
+            trade_date=date.today(),
+            shares=Decimal(0),
+            price=holding.avg_cost,
+        ),
+        metadata_lookup=lambda symbol: (str(holding.name), str(holding.currency)),
+    )
     db.commit()
 
-    logger.info(f"Deleted holding {holding_id}: {holding.symbol}")
+    logger.info(f"Deleted holding {holding_id}: {symbol}")
 
     return None
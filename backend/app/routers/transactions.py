@@ -0,0 +1,129 @@
+"""Transaction ledger API endpoints."""
+
+import logging
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.database import get_db
+from app.dependencies.auth import get_current_user
+from app.routers.holdings import ensure_user_exists, lookup_stock_metadata
+from app.services.ledger_service import record_transaction
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/transactions", tags=["transactions"])
+
+
+@router.get("", response_model=list[schemas.Transaction])
+def list_transactions(
+    symbol: str | None = None,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Get ledger entries for the current user, oldest first.
+
+    Args:
+        symbol: Only return entries for this symbol
+
+    Returns:
+        List of transactions
+    """
+    user_id = UUID(current_user["sub"])
+    query = db.query(models.Transaction).filter(models.Transaction.user_id == user_id)
+    if symbol:
+        query = query.filter(models.Transaction.symbol == symbol.upper())
+    return query.order_by(
+        models.Transaction.trade_date, models.Transaction.created_at, models.Transaction.id
+    ).all()
+
+
+@router.post("", response_model=schemas.Transaction, status_code=status.HTTP_201_CREATED)
+def create_transaction(
+    txn_data: schemas.TransactionCreate,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Record a transaction and update the matching holding incrementally.
+
+    Args:
+        txn_data: Transaction (symbol, type, trade_date and type-specific fields)
+
+    Returns:
+        Recorded transaction
+
+    Raises:
+        HTTPException 400: If the symbol is invalid or the transaction is not valid
+            for the current position (e.g. selling more shares than held)
+    """
+    user_id = UUID(current_user["sub"])
+    ensure_user_exists(db, user_id, current_user.get("email"))
+
+    try:
+        txn, holding = record_transaction(
+            db, user_id, txn_data, metadata_lookup=lookup_stock_metadata
+        )
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+
+    db.commit()
+    db.refresh(txn)
+
+    if holding is None:
+        logger.info(f"Recorded {txn.type} {txn.symbol} on {txn.trade_date}: position closed")
+    else:
+        logger.info(
+            f"Recorded {txn.type} {txn.symbol} on {txn.trade_date}: "
+            f"position now {holding.shares} @ {holding.avg_cost}"
+        )
+
+    return txn
+
+
+@router.post("/import", response_model=schemas.TransactionImportResult)
+def import_transactions(
+    transactions: list[schemas.TransactionCreate],
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Import a batch of transactions in one commit.
+
+    Entries are applied in trade date order, so a chronological history is applied
+    incrementally without replaying the ledger. The import is all-or-nothing.
+
+    Returns:
+        Number of transactions imported and holdings touched
+
+    Raises:
+        HTTPException 400: If any symbol or transaction is invalid
+    """
+    user_id = UUID(current_user["sub"])
+    ensure_user_exists(db, user_id, current_user.get("email"))
+
+    symbols: set[str] = set()
+    try:
+        for txn_data in sorted(transactions, key=lambda t: t.trade_date):
+            txn, _ = record_transaction(
+                db, user_id, txn_data, metadata_lookup=lookup_stock_metadata
+            )
+            symbols.add(txn.symbol)
+            # Make the holding visible to the next entry's lookup
+            db.flush()
+    except HTTPException:
+        db.rollback()
+        raise
+    except ValueError as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+
+    db.commit()
+
+    logger.info(f"Imported {len(transactions)} transactions across {len(symbols)} symbols")
+
+    return schemas.TransactionImportResult(imported=len(transactions), symbols=sorted(symbols))
@@ -0,0 +1,69 @@
+"""Current user profile API endpoints."""
+
+import logging
+from datetime import date
+from uuid import UUID
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.database import get_db
+from app.dependencies.auth import get_current_user
+from app.routers.holdings import ensure_user_exists
+from app.services.history_service import invalidate_daily_values
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/users", tags=["users"])
+
+
+def _get_user(db: Session, current_user: dict) -> models.User:
+    user_id = UUID(current_user["sub"])
+    ensure_user_exists(db, user_id, current_user.get("email"))
+    return db.query(models.User).filter(models.User.id == user_id).one()
+
+
+@router.get("/me", response_model=schemas.User)
+def get_me(
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Get the current user's profile.
+
+    Returns:
+        User, including the base currency dashboard values are reported in
+    """
+    return _get_user(db, current_user)
+
+
+@router.patch("/me", response_model=schemas.User)
+def update_me(
+    user_update: schemas.UserUpdate,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Update the current user's profile.
+
+    Changing the base currency drops the stored portfolio history, which the next
+    rollup recomputes in the new currency.
+
+    Args:
+        user_update: New base currency (ISO 4217 code)
+
+    Returns:
+        Updated user
+    """
+    user = _get_user(db, current_user)
+    base_currency = user_update.base_currency.upper()
+    if base_currency != user.base_currency:
+        invalidate_daily_values(db, user.id, date.min)
+    user.base_currency = base_currency
+    db.commit()
+    db.refresh(user)
+
+    logger.info(f"User {user.id} base currency set to {user.base_currency}")
+
+    return user
@@ -0,0 +1,300 @@
+"""Watchlist API endpoints."""
+
+import logging
+from datetime import UTC, datetime
+from typing import Any
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.config import settings
+from app.database import get_db
+from app.dependencies.auth import get_current_user
+from app.routers.holdings import ensure_user_exists
+from app.serialization import render
+from app.services.stock_service import get_multiple_prices
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(prefix="/watchlists", tags=["watchlists"])
+
+
+def _get_watchlist(db: Session, watchlist_id: UUID, user_id: UUID) -> models.Watchlist:
+    watchlist = (
+        db.query(models.Watchlist)
+        .filter(models.Watchlist.id == watchlist_id, models.Watchlist.user_id == user_id)
+        .first()
+    )
+    if not watchlist:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Watchlist with id {watchlist_id} not found",
+        )
+    return watchlist
+
+
+def _symbols_by_watchlist(db: Session, watchlist_ids: list[Any]) -> dict[Any, list[str]]:
+    """Sorted symbols of each watchlist, read with one query."""
+    symbols: dict[Any, list[str]] = {watchlist_id: [] for watchlist_id in watchlist_ids}
+    rows = (
+        db.query(models.WatchlistItem.watchlist_id, models.WatchlistItem.symbol)
+        .filter(models.WatchlistItem.watchlist_id.in_(watchlist_ids))
+        .order_by(models.WatchlistItem.symbol)
+    )
+    for row in rows:
+        symbols[row.watchlist_id].append(row.symbol)
+    return symbols
+
+
+def _symbols(db: Session, watchlist: models.Watchlist) -> list[str]:
+    return _symbols_by_watchlist(db, [watchlist.id])[watchlist.id]
+
+
+def _to_schema(watchlist: models.Watchlist, symbols: list[str]) -> schemas.Watchlist:
+    return schemas.Watchlist(
+        id=watchlist.id,
+        name=watchlist.name,
+        symbols=symbols,
+        created_at=watchlist.created_at,
+        updated_at=watchlist.updated_at,
+    )
+
+
+def _add_symbols(
+    db: Session, watchlist: models.Watchlist, existing: list[str], symbols: list[str]
+) -> list[str]:
+    """
+    Add symbols not yet on the watchlist. Caller commits.
+
+    Returns:
+        Symbols that were added, in request order
+
+    Raises:
+        HTTPException 400: If the watchlist would exceed ``settings.watchlist_max_symbols``
+    """
+    added = [
+        symbol
+        for symbol in dict.fromkeys(s.strip().upper() for s in symbols)
+        if symbol and symbol not in existing
+    ]
+    if len(existing) + len(added) > settings.watchlist_max_symbols:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"A watchlist can hold at most {settings.watchlist_max_symbols} symbols",
+        )
+    db.add_all(models.WatchlistItem(watchlist_id=watchlist.id, symbol=s) for s in added)
+    return added
+
+
+@router.get("", response_model=list[schemas.Watchlist])
+def list_watchlists(
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    """Get the current user's watchlists with their symbols, oldest first."""
+    user_id = UUID(current_user["sub"])
+    watchlists = (
+        db.query(models.Watchlist)
+        .filter(models.Watchlist.user_id == user_id)
+        .order_by(models.Watchlist.created_at, models.Watchlist.name)
+        .all()
+    )
+    symbols = _symbols_by_watchlist(db, [watchlist.id for watchlist in watchlists])
+    return [_to_schema(watchlist, symbols[watchlist.id]) for watchlist in watchlists]
+
+
+@router.post("", response_model=schemas.Watchlist, status_code=status.HTTP_201_CREATED)
+def create_watchlist(
+    watchlist_data: schemas.WatchlistCreate,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Create a watchlist, optionally with initial symbols.
+
+    Symbols are not looked up when added; ones without a quote are reported as
+    unavailable by ``GET /watchlists/{id}/quotes``.
+
+    Raises:
+        HTTPException 400: If there are more symbols than a watchlist can hold
+    """
+    user_id = UUID(current_user["sub"])
+    ensure_user_exists(db, user_id, current_user.get("email"))
+
+    watchlist = models.Watchlist(user_id=user_id, name=watchlist_data.name)
+    db.add(watchlist)
+    db.flush()
+    _add_symbols(db, watchlist, [], watchlist_data.symbols)
+    db.commit()
+    db.refresh(watchlist)
+
+    logger.info(f"Created watchlist {watchlist.id} for user {user_id}")
+
+    return _to_schema(watchlist, _symbols(db, watchlist))
+
+
+@router.get("/{watchlist_id}", response_model=schemas.Watchlist)
+def get_watchlist(
+    watchlist_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Get one watchlist with its symbols.
+
+    Raises:
+        HTTPException 404: If watchlist not found
+    """
+    watchlist = _get_watchlist(db, watchlist_id, UUID(current_user["sub"]))
+    return _to_schema(watchlist, _symbols(db, watchlist))
+
+
+@router.patch("/{watchlist_id}", response_model=schemas.Watchlist)
+def rename_watchlist(
+    watchlist_id: UUID,
+    watchlist_update: schemas.WatchlistUpdate,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Rename a watchlist.
+
+    Raises:
+        HTTPException 404: If watchlist not found
+    """
+    watchlist = _get_watchlist(db, watchlist_id, UUID(current_user["sub"]))
+    watchlist.name = watchlist_update.name
+    db.commit()
+    db.refresh(watchlist)
+    return _to_schema(watchlist, _symbols(db, watchlist))
+
+
+@router.delete("/{watchlist_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_watchlist(
+    watchlist_id: UUID,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Delete a watchlist and its symbols.
+
+    Raises:
+        HTTPException 404: If watchlist not found
+    """
+    watchlist = _get_watchlist(db, watchlist_id, UUID(current_user["sub"]))
+    db.query(models.WatchlistItem).filter(models.WatchlistItem.watchlist_id == watchlist.id).delete(
+        synchronize_session=False
+    )
+    db.delete(watchlist)
+    db.commit()
+
+
+@router.post("/{watchlist_id}/symbols", response_model=schemas.Watchlist)
+def add_watchlist_symbols(
+    watchlist_id: UUID,
+    symbols_data: schemas.WatchlistSymbols,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Add symbols to a watchlist; symbols already on it are ignored.
+
+    Raises:
+        HTTPException 404: If watchlist not found
+        HTTPException 400: If the watchlist would hold too many symbols
+    """
+    watchlist = _get_watchlist(db, watchlist_id, UUID(current_user["sub"]))
+    existing = _symbols(db, watchlist)
+    if _add_symbols(db, watchlist, existing, symbols_data.symbols):
+        watchlist.updated_at = datetime.now(UTC)
+    db.commit()
+    db.refresh(watchlist)
+    return _to_schema(watchlist, _symbols(db, watchlist))
+
+
+@router.delete("/{watchlist_id}/symbols/{symbol}", status_code=status.HTTP_204_NO_CONTENT)
+def remove_watchlist_symbol(
+    watchlist_id: UUID,
+    symbol: str,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Remove a symbol from a watchlist.
+
+    Raises:
+        HTTPException 404: If watchlist not found or the symbol is not on it
+    """
+    watchlist = _get_watchlist(db, watchlist_id, UUID(current_user["sub"]))
+    deleted = (
+        db.query(models.WatchlistItem)
+        .filter(
+            models.WatchlistItem.watchlist_id == watchlist.id,
+            models.WatchlistItem.symbol == symbol.upper(),
+        )
+        .delete(synchronize_session=False)
+    )
+    if not deleted:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"{symbol.upper()} is not on watchlist {watchlist_id}",
+        )
+    watchlist.updated_at = datetime.now(UTC)
+    db.commit()
+
+
+@router.get("/{watchlist_id}/quotes", response_model=schemas.WatchlistQuotes)
+def get_watchlist_quotes(
+    watchlist_id: UUID,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: dict = Depends(get_current_user),
+):
+    """
+    Get current quotes for every symbol on a watchlist.
+
+    Quotes come from the same cached, batched path as the dashboard: cached
+    symbols are served from the quote cache and the rest are fetched with one
+    upstream call.
+
+    Returns:
+        Quotes sorted by symbol, plus the symbols no quote could be fetched for.
+        Encoded according to the Accept header (see ``app.serialization``).
+
+    Raises:
+        HTTPException 404: If watchlist not found
+    """
+    watchlist = _get_watchlist(db, watchlist_id, UUID(current_user["sub"]))
+    symbols = _symbols(db, watchlist)
+
+    price_data = get_multiple_prices(symbols) if symbols else {}
+
+    quotes = []
+    unavailable = []
+    for symbol in symbols:
+        quote = price_data.get(symbol)
+        if quote is None:
+            unavailable.append(symbol)
+            continue
+        quotes.append(
+            schemas.WatchlistQuote(
+                symbol=symbol,
+                name=quote["name"],
+                currency=quote.get("currency", "USD"),
+                current_price=quote["current_price"],
+                previous_close=quote["previous_close"],
+                daily_change_pct=quote["daily_change_pct"],
+            )
+        )
+
+    return render(
+        request,
+        schemas.WatchlistQuotes(
+            watchlist_id=watchlist.id,
+            last_updated=datetime.now(UTC),
+            quotes=quotes,
+            unavailable=unavailable,
+        ),
+    )
@@ -1,8 +1,9 @@
-from datetime import datetime
+from datetime import date, datetime
 from decimal import Decimal
+from typing import Literal
 from uuid import UUID
 
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field, model_validator
 
 
 # User schemas
@@ -14,8 +15,13 @@ class UserCreate(UserBase):
     pass
 
 
+class UserUpdate(BaseModel):
+    base_currency: str = Field(pattern=r"^[A-Za-z]{3}$")
+
+
 class User(UserBase):
     id: UUID
+    base_currency: str
     created_at: datetime
     updated_at: datetime
 
@@ -31,18 +37,20 @@ class HoldingBase(BaseModel):
 
 
 class HoldingCreate(HoldingBase):
-    pass
+    shares: Decimal = Field(gt=0)
+    avg_cost: Decimal = Field(ge=0)
 
 
 class HoldingUpdate(BaseModel):
-    shares: Decimal | None = None
-    avg_cost: Decimal | None = None
+    shares: Decimal | None = Field(default=None, gt=0)  # delete the holding to close it
+    avg_cost: Decimal | None = Field(default=None, ge=0)
 
 
 class Holding(HoldingBase):
     id: UUID
     user_id: UUID
     name: str
+    currency: str
     created_at: datetime
     updated_at: datetime
 
@@ -50,9 +58,58 @@ class Holding(HoldingBase):
         from_attributes = True
 
 
+# Transaction schemas
+TransactionType = Literal["buy", "sell", "dividend", "split", "adjustment"]
+
+
+class TransactionCreate(BaseModel):
+    symbol: str
+    type: TransactionType
+    trade_date: date
+    shares: Decimal | None = None
+    price: Decimal | None = None
+    ratio: Decimal | None = None
+
+    @model_validator(mode="after")
+    def check_fields_for_type(self) -> "TransactionCreate":
+        if self.type in ("buy", "sell", "adjustment"):
+            if self.shares is None or self.price is None:
+                raise ValueError(f"{self.type} requires shares and price")
+            if self.shares < 0 or self.price < 0:
+                raise ValueError("shares and price must not be negative")
+        elif self.type == "dividend":
+            if self.price is None:
+                raise ValueError("dividend requires price (amount per share)")
+        elif self.type == "split":
+            if self.ratio is None or self.ratio <= 0:
+                raise ValueError("split requires a positive ratio")
+        return self
+
+
+class Transaction(BaseModel):
+    id: UUID
+    user_id: UUID
+    symbol: str
+    type: TransactionType
+    trade_date: date
+    shares: Decimal | None
+    price: Decimal | None
+    ratio: Decimal | None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class TransactionImportResult(BaseModel):
+    imported: int
+    symbols: list[str]
+
+
 # Dashboard schemas
 class DashboardHolding(BaseModel):
     symbol: str
+    currency: str = "USD"  # of avg_cost, current_price and previous_close
     shares: Decimal
     avg_cost: Decimal
     current_price: Decimal
@@ -62,6 +119,8 @@ class DashboardHolding(BaseModel):
     pnl: Decimal
     pnl_pct: Decimal
     allocation_pct: Decimal
+    as_of: datetime | None = None  # when current_price was fetched
+    stale: bool = False  # last known price; no fresh quote was available
 
 
 class Dashboard(BaseModel):
@@ -69,5 +128,331 @@ class Dashboard(BaseModel):
     total_cost: Decimal
     total_pnl: Decimal
     total_pnl_pct: Decimal
+    base_currency: str = "USD"  # of values, costs and P&L (holdings' and totals)
     last_updated: datetime
+    stale: bool = False  # True if any holding is priced with a last known price
     holdings: list[DashboardHolding]
+
+
+class HeatmapLayout(BaseModel):
+    """Treemap rectangles as parallel arrays; index i describes one position."""
+
+    as_of: datetime
+    width: int
+    height: int
+    symbols: list[str]
+    x: list[float]
+    y: list[float]
+    w: list[float]
+    h: list[float]
+    bucket: list[int]
+    change_pct: list[float]
+    value: list[float]
+
+
+# Portfolio history schemas
+class PortfolioValuePoint(BaseModel):
+    date: date
+    total_value: Decimal
+    total_cost: Decimal
+    total_pnl: Decimal
+
+
+class PortfolioHistory(BaseModel):
+    start: date
+    end: date
+    base_currency: str = "USD"  # of every value
+    points: list[PortfolioValuePoint]
+
+
+# Analytics schemas
+class PortfolioAnalytics(BaseModel):
+    as_of: date
+    benchmark: str
+    lookback_days: int
+    observations: int
+    volatility: float
+    annual_return: float
+    beta: float | None
+    sharpe_ratio: float | None
+    max_drawdown: float
+    symbols: list[str]
+    weights: list[float]
+    correlation: list[list[float | None]]
+
+
+# Rebalancing schemas
+class TargetAllocation(BaseModel):
+    symbol: str
+    weight_pct: Decimal = Field(gt=0, le=100)
+
+
+class TargetAllocationsUpdate(BaseModel):
+    targets: list[TargetAllocation]
+
+    @model_validator(mode="after")
+    def check_targets(self) -> "TargetAllocationsUpdate":
+        for target in self.targets:
+            target.symbol = target.symbol.strip().upper()
+        symbols = [target.symbol for target in self.targets]
+        if not all(symbols) or len(set(symbols)) != len(symbols):
+            raise ValueError("target symbols must be non-empty and unique")
+        if sum(target.weight_pct for target in self.targets) > 100:
+            raise ValueError("target weights must not add up to more than 100%")
+        return self
+
+
+class TargetAllocations(BaseModel):
+    targets: list[TargetAllocation]
+    cash_pct: Decimal  # the rest of 100%, held as cash
+
+
+class RebalanceRequest(BaseModel):
+    cash: Decimal = Field(default=Decimal(0), ge=0)  # uninvested cash, in the base currency
+    whole_shares: bool = True
+    allow_sells: bool = True
+    tolerance_pct: Decimal = Field(default=Decimal(0), ge=0, le=100)  # drift left untraded
+
+
+class RebalanceTrade(BaseModel):
+    symbol: str
+    action: Literal["buy", "sell"]
+    shares: Decimal
+    price: Decimal  # in currency
+    currency: str = "USD"
+    value: Decimal  # in the base currency
+
+
+class RebalancePosition(BaseModel):
+    symbol: str
+    shares: Decimal
+    shares_after: Decimal
+    current_pct: Decimal
+    target_pct: Decimal
+    after_pct: Decimal
+
+
+class Rebalance(BaseModel):
+    base_currency: str = "USD"  # of values and cash
+    total_value: Decimal  # holdings plus cash
+    cash: Decimal
+    cash_after: Decimal
+    trades: list[RebalanceTrade]
+    positions: list[RebalancePosition]
+    unpriced: list[str]  # target symbols without a cached or last known price, left out
+    stale: bool = False  # True if any price is a last known one
+
+
+# Simulation schemas
+class SimulationScenario(BaseModel):
+    name: str = Field(min_length=1, max_length=100)
+    shocks: dict[str, Decimal]  # percent move per symbol, e.g. {"XLK": -20}
+
+    @model_validator(mode="after")
+    def check_shocks(self) -> "SimulationScenario":
+        shocks = {symbol.strip().upper(): pct for symbol, pct in self.shocks.items()}
+        if not shocks or not all(shocks) or len(shocks) != len(self.shocks):
+            raise ValueError("scenario shocks must name at least one symbol, each once")
+        if any(pct <= -100 for pct in shocks.values()):
+            raise ValueError("shocks must be greater than -100%")
+        self.shocks = shocks
+        return self
+
+
+class SimulationRequest(BaseModel):
+    paths: int = Field(default=10_000, ge=100, le=100_000)
+    horizon_days: int = Field(default=252, ge=1, le=2520)  # trading days
+    lookback_days: int = Field(default=365, ge=30, le=3650)  # calendar days of history
+    seed: int = Field(default=0, ge=0)  # the same seed gives the same paths
+    scenarios: list[SimulationScenario] = Field(default_factory=list, max_length=20)
+
+
+class SimulationBand(BaseModel):
+    day: int  # trading days ahead
+    mean: float
+    p5: float
+    p25: float
+    p50: float
+    p75: float
+    p95: float
+
+
+class ScenarioResult(BaseModel):
+    name: str
+    value: float  # portfolio value right after the shock
+    change_pct: float
+    position_changes_pct: dict[str, float]  # implied move per position
+
+
+class Simulation(BaseModel):
+    as_of: date
+    base_currency: str = "USD"  # of every value
+    lookback_days: int
+    observations: int
+    paths: int
+    horizon_days: int
+    seed: int
+    symbols: list[str]
+    excluded: list[str]  # held symbols without history or an FX rate, left out
+    current_value: float
+    expected_value: float  # at the horizon
+    value_at_risk_95: float  # loss at the horizon exceeded on 5% of paths
+    expected_shortfall_95: float  # mean loss on those paths
+    probability_of_loss: float
+    bands: list[SimulationBand]
+    scenarios: list[ScenarioResult]
+
+
+# Admin: symbol popularity schemas
+class SymbolPopularity(BaseModel):
+    symbol: str
+    holders: int
+    total_shares: Decimal
+    updated_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+# Alert schemas
+AlertType = Literal["price_above", "price_below", "daily_change", "pnl_above", "pnl_below"]
+
+
+class AlertCreate(BaseModel):
+    symbol: str
+    type: AlertType
+    threshold: Decimal  # price for price alerts, percent for daily change and P&L alerts
+
+    @model_validator(mode="after")
+    def check_threshold_for_type(self) -> "AlertCreate":
+        if self.type in ("price_above", "price_below", "daily_change") and self.threshold <= 0:
+            raise ValueError(f"{self.type} requires a positive threshold")
+        return self
+
+
+class Alert(BaseModel):
+    id: UUID
+    symbol: str
+    type: AlertType
+    threshold: Decimal
+    active: bool
+    triggered_at: datetime | None
+    created_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class AlertEvent(BaseModel):
+    id: UUID
+    alert_id: UUID
+    symbol: str
+    type: AlertType
+    threshold: Decimal
+    value: Decimal
+    fired_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+# Admin: corporate action schemas
+CorporateActionType = Literal["split", "dividend"]
+
+
+class CorporateActionCreate(BaseModel):
+    symbol: str
+    type: CorporateActionType
+    ex_date: date
+    ratio: Decimal | None = None
+    amount: Decimal | None = None
+
+    @model_validator(mode="after")
+    def check_fields_for_type(self) -> "CorporateActionCreate":
+        if self.type == "split":
+            if self.ratio is None or self.ratio <= 0:
+                raise ValueError("split requires a positive ratio")
+        elif self.amount is None or self.amount < 0:
+            raise ValueError("dividend requires a non-negative amount per share")
+        return self
+
+
+class CorporateAction(BaseModel):
+    id: UUID
+    symbol: str
+    type: CorporateActionType
+    ex_date: date
+    ratio: Decimal | None
+    amount: Decimal | None
+    status: Literal["pending", "applied"]
+    holdings_affected: int | None
+    created_at: datetime
+    applied_at: datetime | None
+
+    class Config:
+        from_attributes = True
+
+
+# Watchlist schemas
+class WatchlistCreate(BaseModel):
+    name: str = Field(min_length=1, max_length=100)
+    symbols: list[str] = []
+
+
+class WatchlistUpdate(BaseModel):
+    name: str = Field(min_length=1, max_length=100)
+
+
+class WatchlistSymbols(BaseModel):
+    symbols: list[str] = Field(min_length=1)
+
+
+class Watchlist(BaseModel):
+    id: UUID
+    name: str
+    symbols: list[str]
+    created_at: datetime
+    updated_at: datetime
+
+
+class WatchlistQuote(BaseModel):
+    symbol: str
+    name: str
+    currency: str = "USD"  # of current_price and previous_close
+    current_price: Decimal
+    previous_close: Decimal
+    daily_change_pct: Decimal
+
+
+class WatchlistQuotes(BaseModel):
+    watchlist_id: UUID
+    last_updated: datetime
+    quotes: list[WatchlistQuote]
+    unavailable: list[str]  # symbols without a quote (unknown, or the upstream failed)
+
+
+# Admin: request profiling schemas
+class ProfileSpan(BaseModel):
+    count: int
+    total_ms: float
+
+
+class ProfileStack(BaseModel):
+    stack: str
+    count: int
+
+
+class RequestProfileSummary(BaseModel):
+    id: str
+    method: str
+    path: str
+    route: str | None
+    status: int | None
+    started_at: datetime
+    duration_ms: float
+    spans: dict[str, ProfileSpan]
+    samples: int
+
+
+class RequestProfile(RequestProfileSummary):
+    stacks: list[ProfileStack]
@@ -0,0 +1,166 @@
+"""Content negotiation and fast encoders for large API payloads.
+
+Supported media types:
+    application/json                       Default. Same shape as the response models,
+                                           Decimals as strings, encoded with orjson.
+    application/vnd.foliofy.columnar+json  Lists of objects become one array per field
+                                           (parallel arrays); numbers are JSON numbers.
+    application/msgpack                    Columnar shape encoded as MessagePack.
+"""
+
+from collections.abc import Sequence
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+
+import msgpack
+import orjson
+from fastapi import HTTPException, Request, Response, status
+from pydantic import BaseModel
+
+from app.profiling import span
+
+MEDIA_JSON = "application/json"
+MEDIA_COLUMNAR = "application/vnd.foliofy.columnar+json"
+MEDIA_MSGPACK = "application/msgpack"
+
+_ALIASES = {
+    "application/x-msgpack": MEDIA_MSGPACK,
+    "application/*": MEDIA_JSON,
+    "*/*": MEDIA_JSON,
+}
+_SUPPORTED = (MEDIA_JSON, MEDIA_COLUMNAR, MEDIA_MSGPACK)
+
+
+def negotiate(accept: str | None) -> str:
+    """
+    Pick the response media type from an Accept header.
+
+    Returns:
+        One of the supported media types; JSON when the header is missing
+
+    Raises:
+        HTTPException 406: If no acceptable media type is supported
+    """
+    if not accept:
+        return MEDIA_JSON
+
+    candidates: list[tuple[float, int, str]] = []
+    for position, part in enumerate(accept.split(",")):
+        media_type, *params = (p.strip() for p in part.split(";"))
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        media_type = _ALIASES.get(media_type.lower(), media_type.lower())
+        if media_type in _SUPPORTED and quality > 0:
+            candidates.append((-quality, position, media_type))
+
+    if not candidates:
+        raise HTTPException(
+            status_code=status.HTTP_406_NOT_ACCEPTABLE,
+            detail=f"Supported media types: {', '.join(_SUPPORTED)}",
+        )
+
+    return min(candidates)[2]
+
+
+def _default_json(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def _default_columnar(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, datetime | date):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    raise TypeError(f"Type is not serializable: {type(value).__name__}")
+
+
+def to_columnar(rows: Sequence[dict[str, Any]]) -> dict[str, list[Any]]:
+    """Turn a list of objects into one list per field (parallel arrays)."""
+    if not rows:
+        return {}
+    return {key: [row[key] for row in rows] for key in rows[0]}
+
+
+def _dump(content: BaseModel | Sequence[BaseModel] | Sequence[dict[str, Any]]) -> Any:
+    if isinstance(content, BaseModel):
+        return content.model_dump()
+    return [item.model_dump() if isinstance(item, BaseModel) else item for item in content]
+
+
+def _plain_column(values: list[Any], msgpack_types: bool) -> list[Any]:
+    """
+    Convert a column to natively encodable values in one pass (no per-item callback).
+
+    orjson encodes datetimes and UUIDs natively; MessagePack needs them as strings.
+    """
+    sample = next((v for v in values if v is not None), None)
+    if isinstance(sample, Decimal):
+        return [None if v is None else float(v) for v in values]
+    if not msgpack_types:
+        return values
+    if isinstance(sample, datetime | date):
+        return [None if v is None else v.isoformat() for v in values]
+    if isinstance(sample, UUID):
+        return [None if v is None else str(v) for v in values]
+    return values
+
+
+def _columnar_shape(data: Any, msgpack_types: bool) -> Any:
+    """Columnarize a top-level list, or every list-of-objects field of an object."""
+    if isinstance(data, list):
+        return {
+            key: _plain_column(column, msgpack_types) for key, column in to_columnar(data).items()
+        }
+    return {
+        key: (
+            _columnar_shape(value, msgpack_types)
+            if isinstance(value, list) and value and isinstance(value[0], dict)
+            else value
+        )
+        for key, value in data.items()
+    }
+
+
+def encode(data: Any, media_type: str) -> bytes:
+    """Encode already-dumped Python data for the given media type."""
+    if media_type == MEDIA_JSON:
+        return orjson.dumps(data, default=_default_json, option=orjson.OPT_UTC_Z)
+    if media_type == MEDIA_COLUMNAR:
+        return orjson.dumps(_columnar_shape(data, False), default=_default_columnar)
+    packed: bytes = msgpack.packb(_columnar_shape(data, True), default=_default_columnar)
+    return packed
+
+
+def render(
+    request: Request, content: BaseModel | Sequence[BaseModel] | Sequence[dict[str, Any]]
+) -> Response:
+    """
+    Encode a response in the media type negotiated from the request's Accept header.
+
+    Args:
+        request: Incoming request
+        content: Response model, or list of models / plain dicts
+
+    Returns:
+        Encoded response with ``Vary: Accept`` set
+    """
+    media_type = negotiate(request.headers.get("accept"))
+    with span("serialize"):
+        body = encode(_dump(content), media_type)
+    return Response(
+        content=body,
+        media_type=media_type,
+        headers={"Vary": "Accept"},
+    )
@@ -0,0 +1,108 @@
+"""Production server: gunicorn managing uvicorn workers.
+
+The app is imported once in the gunicorn master (``preload_app``) and forked into
+``settings.server_workers`` workers, so workers start fast and share the imported
+code copy-on-write. Anything that must not cross a fork is handled per worker:
+
+- the SQLAlchemy pools (primary and replicas) are reset in ``post_fork`` so workers
+  never share a socket;
+- clients and cache listeners are set up by the app lifespan, which runs in each
+  worker.
+
+The quote refresher runs in one worker only: the one holding the job lock (see
+``app.leader``). If it exits, another worker takes over within
+``settings.background_jobs_election_seconds``. The lock is held in Postgres, so
+this also holds with several servers on one database. Quote caches are per
+worker, so the refresher warms only its own; the others read the last known
+prices and FX rates it stores. Alerts are evaluated in every worker, on the
+quotes that worker fetches.
+
+Sync routes run on each worker's AnyIO threadpool, sized by
+``settings.threadpool_size`` to match the DB pool (see ``app.main``).
+
+On SIGTERM workers stop accepting connections, finish in-flight requests for up
+to ``settings.server_graceful_timeout_seconds`` and then run the lifespan
+shutdown, which stops the background threads and releases the job lock.
+
+With more than one worker, Prometheus metrics are written to
+``PROMETHEUS_MULTIPROC_DIR`` (a fresh temporary directory unless set) and
+aggregated by ``/metrics`` (see ``app.metrics``).
+
+Usage (from backend/):
+    python -m app.server
+    SERVER_WORKERS=4 SERVER_BIND=0.0.0.0:8000 python -m app.server
+"""
+
+import importlib
+import logging
+import os
+import tempfile
+from typing import Any
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def worker_count() -> int:
+    """Configured number of workers; ``server_workers = 0`` means one per CPU."""
+    return settings.server_workers or os.cpu_count() or 1
+
+
+def post_fork(server: Any, worker: Any) -> None:
+    """Drop DB connections inherited from the master without closing them for it."""
+    from app.database import engine, replica_engines
+
+    for inherited in (engine, *replica_engines):
+        inherited.dispose(close=False)
+
+
+def child_exit(server: Any, worker: Any) -> None:
+    """Drop an exited worker's live gauge samples."""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def options() -> dict[str, Any]:
+    """gunicorn settings derived from ``settings``."""
+    return {
+        "bind": settings.server_bind,
+        "workers": worker_count(),
+        "worker_class": "uvicorn.workers.UvicornWorker",
+        "preload_app": True,
+        "graceful_timeout": settings.server_graceful_timeout_seconds,
+        "keepalive": settings.server_keepalive_seconds,
+        "post_fork": post_fork,
+        "child_exit": child_exit,
+    }
+
+
+def main() -> None:
+    from gunicorn.app.base import BaseApplication
+
+    config = options()
+    if config["workers"] > 1 and "PROMETHEUS_MULTIPROC_DIR" not in os.environ:
+        # Must be set before prometheus_client is imported with the app
+        os.environ["PROMETHEUS_MULTIPROC_DIR"] = tempfile.mkdtemp(prefix="prometheus-")
+
+    class Server(BaseApplication):
+        def load_config(self) -> None:
+            for key, value in config.items():
+                self.cfg.set(key, value)
+
+        def load(self) -> Any:
+            module_name, _, attribute = settings.server_app.partition(":")
+            return getattr(importlib.import_module(module_name), attribute)
+
+    logger.info(
+        f"Starting {config['workers']} workers on {config['bind']} "
+        f"with {settings.threadpool_size} threads each"
+    )
+    Server().run()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    main()
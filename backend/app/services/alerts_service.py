@@ -0,0 +1,441 @@
+"""Price alerts evaluated on quote updates.
+
+Active alerts are held in an in-process ``AlertIndex``: per symbol, one sorted
+list of trigger prices that fire when the price rises to them, one for prices
+that fire when it falls to them, and one of daily change thresholds. Every quote
+stored in the quote cache is evaluated with a bisection per list, so an update
+only touches the alerts that fire, however many alerts a symbol has.
+Position P&L alerts are indexed by the price at which the P&L crosses the
+threshold, which depends on the holding's average cost and is updated with it.
+
+Alerts fire once. Firings are removed from the index immediately and put on
+``delivery_queue``; ``AlertDispatcher`` drains it in batches, records an
+``alert_events`` row per firing and deactivates the alerts.
+
+The index is per process, and every server worker evaluates the quotes it
+fetches against its own. It is loaded at startup, kept current by the alert
+endpoints and holding changes made in the same process (once they are
+committed), and reloaded every ``settings.alert_index_reload_seconds`` by the
+dispatcher to pick up changes made elsewhere (other workers, batch jobs); until
+then, such changes are only evaluated by the worker that made them. Nothing is
+indexed unless ``settings.alerts_enabled`` is set.
+
+Each worker runs its own dispatcher. Delivery deactivates alerts with a
+conditional UPDATE, so when several workers fire the same alert, only one
+records it.
+"""
+
+import logging
+import queue
+import threading
+import time
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import event, insert, update
+from sqlalchemy.orm import Session
+
+from app import models
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+ALERT_TYPES = ("price_above", "price_below", "daily_change", "pnl_above", "pnl_below")
+PNL_TYPES = ("pnl_above", "pnl_below")
+
+# Session.info key of position changes applied to the index on commit
+_PENDING_POSITIONS = "alert_positions"
+
+# Tie-breakers that sort before / after any alert id at the same key
+_LOWEST = ""
+_HIGHEST = "\uffff"
+
+
+@dataclass(frozen=True)
+class AlertFiring:
+    alert_id: UUID
+    user_id: UUID
+    symbol: str
+    type: str
+    threshold: Decimal
+    value: Decimal  # price, or daily change percent, that fired the alert
+    fired_at: datetime
+
+
+@dataclass(frozen=True)
+class _IndexedAlert:
+    alert_id: UUID
+    user_id: UUID
+    symbol: str
+    type: str
+    threshold: Decimal
+    side: str  # "rise", "fall" or "change"
+    key: Decimal  # trigger price, or absolute change percent
+
+
+class _SymbolAlerts:
+    __slots__ = ("rise", "fall", "change")
+
+    def __init__(self) -> None:
+        # Sorted (key, alert id) pairs
+        self.rise: list[tuple[Decimal, str]] = []
+        self.fall: list[tuple[Decimal, str]] = []
+        self.change: list[tuple[Decimal, str]] = []
+
+
+def _trigger(
+    alert_type: str, threshold: Decimal, avg_cost: Decimal | None
+) -> tuple[str, Decimal] | None:
+    """Side and index key of an alert, or None if it cannot fire (P&L without a position)."""
+    if alert_type == "price_above":
+        return "rise", threshold
+    if alert_type == "price_below":
+        return "fall", threshold
+    if alert_type == "daily_change":
+        return "change", abs(threshold)
+    if not avg_cost or avg_cost <= 0:
+        return None
+    # P&L % = (price / avg_cost - 1) * 100, so the threshold is crossed at one price
+    price = avg_cost * (1 + threshold / 100)
+    return ("rise" if alert_type == "pnl_above" else "fall"), price
+
+
+class AlertIndex:
+    """Thread-safe per-symbol index of active alerts by trigger."""
+
+    def __init__(self) -> None:
+        self._symbols: dict[str, _SymbolAlerts] = {}
+        self._alerts: dict[UUID, _IndexedAlert] = {}
+        # P&L alerts per position, indexed or not: (user, symbol) -> {id: (type, threshold)}
+        self._pnl: dict[tuple[UUID, str], dict[UUID, tuple[str, Decimal]]] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._alerts)
+
+    def _insert(self, alert: _IndexedAlert) -> None:
+        symbol_alerts = self._symbols.setdefault(alert.symbol, _SymbolAlerts())
+        insort(getattr(symbol_alerts, alert.side), (alert.key, str(alert.alert_id)))
+        self._alerts[alert.alert_id] = alert
+
+    def _discard(self, alert_id: UUID) -> _IndexedAlert | None:
+        alert = self._alerts.pop(alert_id, None)
+        if alert is not None:
+            entries = getattr(self._symbols[alert.symbol], alert.side)
+            entries.pop(bisect_left(entries, (alert.key, str(alert_id))))
+        return alert
+
+    def _unregister_pnl(self, alert_id: UUID, user_id: UUID, symbol: str) -> None:
+        position = self._pnl.get((user_id, symbol))
+        if position is not None:
+            position.pop(alert_id, None)
+            if not position:
+                del self._pnl[(user_id, symbol)]
+
+    def add(
+        self,
+        alert_id: UUID,
+        user_id: UUID,
+        symbol: str,
+        alert_type: str,
+        threshold: Decimal,
+        avg_cost: Decimal | None = None,
+    ) -> bool:
+        """
+        Index an active alert (replacing any previous entry for the same id).
+
+        Args:
+            avg_cost: Average cost of the user's position; required for P&L alerts
+
+        Returns:
+            False if the alert cannot fire and was not indexed
+        """
+        trigger = _trigger(alert_type, threshold, avg_cost)
+        with self._lock:
+            self._discard(alert_id)
+            if alert_type in PNL_TYPES:
+                self._pnl.setdefault((user_id, symbol), {})[alert_id] = (alert_type, threshold)
+            if trigger is None:
+                return False
+            side, key = trigger
+            self._insert(_IndexedAlert(alert_id, user_id, symbol, alert_type, threshold, side, key))
+        return True
+
+    def remove(self, alert_id: UUID, user_id: UUID, symbol: str) -> None:
+        with self._lock:
+            self._discard(alert_id)
+            self._unregister_pnl(alert_id, user_id, symbol)
+
+    def update_position(self, user_id: UUID, symbol: str, avg_cost: Decimal | None) -> None:
+        """
+        Re-key a user's P&L alerts on a symbol after their position changed.
+
+        Args:
+            avg_cost: New average cost, or None if the position was closed
+        """
+        with self._lock:
+            for alert_id, (alert_type, threshold) in self._pnl.get((user_id, symbol), {}).items():
+                self._discard(alert_id)
+                trigger = _trigger(alert_type, threshold, avg_cost)
+                if trigger is not None:
+                    side, key = trigger
+                    self._insert(
+                        _IndexedAlert(alert_id, user_id, symbol, alert_type, threshold, side, key)
+                    )
+
+    def evaluate(self, symbol: str, quote: dict[str, Any]) -> list[AlertFiring]:
+        """
+        Remove and return the alerts that fire for a new quote.
+
+        Price (and P&L) alerts fire when the price is at or beyond their trigger;
+        daily change alerts when the absolute daily change reaches their threshold.
+        """
+        price = quote["current_price"]
+        change = abs(quote["daily_change_pct"])
+        with self._lock:
+            symbol_alerts = self._symbols.get(symbol)
+            if symbol_alerts is None:
+                return []
+
+            # Each list is cut at one bisection point; everything past it fires
+            end = bisect_right(symbol_alerts.rise, (price, _HIGHEST))
+            fired = [(entry, price) for entry in symbol_alerts.rise[:end]]
+            del symbol_alerts.rise[:end]
+
+            start = bisect_left(symbol_alerts.fall, (price, _LOWEST))
+            fired += [(entry, price) for entry in symbol_alerts.fall[start:]]
+            del symbol_alerts.fall[start:]
+
+            end = bisect_right(symbol_alerts.change, (change, _HIGHEST))
+            fired += [(entry, quote["daily_change_pct"]) for entry in symbol_alerts.change[:end]]
+            del symbol_alerts.change[:end]
+
+            now = datetime.now(UTC)
+            firings = []
+            for (_, alert_id), value in fired:
+                alert = self._alerts.pop(UUID(alert_id))
+                self._unregister_pnl(alert.alert_id, alert.user_id, symbol)
+                firings.append(
+                    AlertFiring(
+                        alert_id=alert.alert_id,
+                        user_id=alert.user_id,
+                        symbol=symbol,
+                        type=alert.type,
+                        threshold=alert.threshold,
+                        value=value,
+                        fired_at=now,
+                    )
+                )
+        return firings
+
+    def load(self, db: Session) -> int:
+        """Replace the index with all active alerts. Returns the number indexed."""
+        rows = (
+            db.query(
+                models.Alert.id,
+                models.Alert.user_id,
+                models.Alert.symbol,
+                models.Alert.type,
+                models.Alert.threshold,
+                models.Holding.avg_cost,
+            )
+            .outerjoin(
+                models.Holding,
+                (models.Holding.user_id == models.Alert.user_id)
+                & (models.Holding.symbol == models.Alert.symbol),
+            )
+            .filter(models.Alert.active.is_(True))
+            .all()
+        )
+        self.clear()
+        indexed = sum(
+            self.add(row.id, row.user_id, row.symbol, row.type, row.threshold, row.avg_cost)
+            for row in rows
+        )
+        logger.info(f"Indexed {indexed} of {len(rows)} active alerts")
+        return indexed
+
+    def clear(self) -> None:
+        with self._lock:
+            self._symbols.clear()
+            self._alerts.clear()
+            self._pnl.clear()
+
+
+alert_index = AlertIndex()
+
+delivery_queue: queue.Queue[AlertFiring] = queue.Queue()
+
+
+def update_position_on_commit(
+    db: Session, user_id: UUID, symbol: str, avg_cost: Decimal | None
+) -> None:
+    """
+    Re-key a user's P&L alerts on a symbol once ``db`` commits the position change.
+
+    Nothing changes if the session rolls back instead, or if alerts are disabled.
+
+    Args:
+        avg_cost: New average cost, or None if the position was closed
+    """
+    if settings.alerts_enabled:
+        db.info.setdefault(_PENDING_POSITIONS, {})[(user_id, symbol)] = avg_cost
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_pending_positions(session: Session) -> None:
+    for (user_id, symbol), avg_cost in session.info.pop(_PENDING_POSITIONS, {}).items():
+        alert_index.update_position(user_id, symbol, avg_cost)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_pending_positions(session: Session) -> None:
+    session.info.pop(_PENDING_POSITIONS, None)
+
+
+def on_quote(symbol: str, quote: dict[str, Any]) -> None:
+    """Quote cache listener: evaluate a symbol's alerts and queue the firings."""
+    for firing in alert_index.evaluate(symbol, quote):
+        delivery_queue.put(firing)
+
+
+class AlertDispatcher:
+    """
+    Drains ``delivery_queue`` into ``alert_events`` and deactivates fired alerts.
+
+    Also reloads ``alert_index`` from the database every ``reload_seconds``.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        batch_size: int,
+        reload_seconds: float,
+        source: queue.Queue[AlertFiring] = delivery_queue,
+        index: AlertIndex = alert_index,
+    ):
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.reload_seconds = reload_seconds
+        self.source = source
+        self.index = index
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def deliver(self, firings: list[AlertFiring]) -> None:
+        """
+        Record a batch of firings in one transaction.
+
+        Alerts are deactivated first, only while still active; the rows that UPDATE
+        returns are the firings this call delivers. A concurrent delivery of the same
+        alert waits on the row lock and then finds it inactive, so each alert gets
+        one event.
+        """
+        db = self.session_factory()
+        try:
+            # Alerts deleted (or already delivered) since they fired are dropped
+            deactivated = {
+                row.id
+                for row in db.execute(
+                    update(models.Alert)
+                    .where(
+                        models.Alert.id.in_([f.alert_id for f in firings]),
+                        models.Alert.active.is_(True),
+                    )
+                    .values(active=False, triggered_at=firings[0].fired_at)
+                    .returning(models.Alert.id)
+                    .execution_options(synchronize_session=False)
+                )
+            }
+            # An alert that fired more than once in the batch is recorded once
+            firings = list(
+                {f.alert_id: f for f in reversed(firings) if f.alert_id in deactivated}.values()
+            )
+            if not firings:
+                return
+            db.execute(
+                insert(models.AlertEvent),
+                [
+                    {
+                        "alert_id": f.alert_id,
+                        "user_id": f.user_id,
+                        "symbol": f.symbol,
+                        "type": f.type,
+                        "threshold": f.threshold,
+                        "value": f.value,
+                        "fired_at": f.fired_at,
+                    }
+                    for f in firings
+                ],
+            )
+            db.commit()
+        finally:
+            db.close()
+        logger.info(f"Delivered {len(firings)} alert firings")
+
+    def drain(self, timeout: float = 0.0) -> int:
+        """
+        Deliver up to ``batch_size`` queued firings.
+
+        Args:
+            timeout: Seconds to wait for the first firing
+
+        Returns:
+            Number of firings delivered
+        """
+        try:
+            firings = [self.source.get(timeout=timeout) if timeout else self.source.get_nowait()]
+        except queue.Empty:
+            return 0
+        while len(firings) < self.batch_size:
+            try:
+                firings.append(self.source.get_nowait())
+            except queue.Empty:
+                break
+        try:
+            self.deliver(firings)
+        except Exception:
+            # Put the batch back so the next drain retries it
+            for firing in firings:
+                self.source.put(firing)
+            raise
+        return len(firings)
+
+    def reload(self) -> int:
+        db = self.session_factory()
+        try:
+            return self.index.load(db)
+        finally:
+            db.close()
+
+    def _run(self) -> None:
+        next_reload = time.monotonic() + self.reload_seconds
+        while not self._stop.is_set():
+            try:
+                self.drain(timeout=1.0)
+                if time.monotonic() >= next_reload:
+                    self.reload()
+                    next_reload = time.monotonic() + self.reload_seconds
+            except Exception as e:
+                logger.exception(f"Alert delivery failed: {e}")
+                self._stop.wait(1.0)
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="alert-dispatcher", daemon=True)
+        self._thread.start()
+        logger.info("Alert dispatcher started")
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        # Deliver what is already queued before shutting down
+        while self.drain():
+            pass
@@ -0,0 +1,246 @@
+"""Risk and performance analytics computed with NumPy over stored daily history.
+
+All per-day math runs on (days x positions) float arrays built once from
+``price_history``; nothing iterates per row in Python, so the cost stays flat for
+portfolios with hundreds of positions. Results are cached per user per day.
+"""
+
+import hashlib
+import logging
+from dataclasses import dataclass
+from datetime import date, timedelta
+from typing import Any
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app import models
+from app.config import settings
+from app.profiling import span
+from app.services.cache import TTLCache
+from app.services.fx_service import cached_usd_rates
+
+logger = logging.getLogger(__name__)
+
+TRADING_DAYS_PER_YEAR = 252
+
+_analytics_cache: TTLCache[dict[str, Any]] = TTLCache(maxsize=10_000, ttl=24 * 60 * 60)
+
+
+class InsufficientHistoryError(Exception):
+    """Raised when there is not enough stored price history to compute analytics."""
+
+    pass
+
+
+@dataclass
+class PriceMatrix:
+    """Daily closes aligned on a shared date axis; missing days are carried forward."""
+
+    dates: list[date]
+    symbols: list[str]
+    closes: np.ndarray  # shape (len(dates), len(symbols)), NaN before first close
+
+
+def load_price_matrix(db: Session, symbols: list[str], start: date, end: date) -> PriceMatrix:
+    """
+    Load stored closes into a dense (days x symbols) matrix.
+
+    Days on which any symbol traded form the date axis; a symbol without a close on
+    one of those days carries its previous close forward.
+    """
+    rows = (
+        db.query(models.PriceHistory.symbol, models.PriceHistory.date, models.PriceHistory.close)
+        .filter(
+            models.PriceHistory.symbol.in_(symbols),
+            models.PriceHistory.date >= start,
+            models.PriceHistory.date <= end,
+        )
+        .all()
+    )
+
+    dates = sorted({row.date for row in rows})
+    date_index = {d: i for i, d in enumerate(dates)}
+    symbol_index = {s: j for j, s in enumerate(symbols)}
+
+    closes = np.full((len(dates), len(symbols)), np.nan)
+    if rows:
+        row_idx = np.fromiter((date_index[r.date] for r in rows), dtype=np.intp, count=len(rows))
+        col_idx = np.fromiter(
+            (symbol_index[r.symbol] for r in rows), dtype=np.intp, count=len(rows)
+        )
+        closes[row_idx, col_idx] = np.fromiter((float(r.close) for r in rows), dtype=float)
+
+    return PriceMatrix(dates=dates, symbols=symbols, closes=_forward_fill(closes))
+
+
+def _forward_fill(values: np.ndarray) -> np.ndarray:
+    """Carry the last non-NaN value down each column."""
+    if values.size == 0:
+        return values
+    rows = np.arange(values.shape[0])[:, None]
+    last_valid = np.where(np.isnan(values), 0, rows)
+    np.maximum.accumulate(last_valid, axis=0, out=last_valid)
+    filled = values[last_valid, np.arange(values.shape[1])]
+    return np.asarray(filled)
+
+
+def max_drawdown(returns: np.ndarray) -> float:
+    """Largest peak-to-trough decline of the compounded return series, as a fraction."""
+    if returns.size == 0:
+        return 0.0
+    wealth = np.cumprod(1 + returns)
+    peaks = np.maximum.accumulate(np.concatenate(([1.0], wealth)))[1:]
+    return float(np.max(1 - wealth / peaks))
+
+
+def compute_analytics(
+    weights: np.ndarray,
+    returns: np.ndarray,
+    benchmark_returns: np.ndarray,
+    risk_free_rate: float = 0.0,
+) -> dict[str, Any]:
+    """
+    Compute portfolio risk metrics from daily simple returns.
+
+    Args:
+        weights: Portfolio weights per position, shape (n,), summing to 1
+        returns: Daily returns, shape (days, n)
+        benchmark_returns: Benchmark daily returns, shape (days,)
+        risk_free_rate: Annual risk-free rate used for the Sharpe ratio
+
+    Returns:
+        Dictionary with annualized volatility, beta, Sharpe ratio, max drawdown and
+        the position correlation matrix
+    """
+    portfolio_returns = returns @ weights
+
+    daily_std = float(np.std(portfolio_returns, ddof=1))
+    volatility = daily_std * np.sqrt(TRADING_DAYS_PER_YEAR)
+    annual_return = float(np.mean(portfolio_returns)) * TRADING_DAYS_PER_YEAR
+    sharpe = (annual_return - risk_free_rate) / volatility if volatility > 0 else None
+
+    benchmark_var = float(np.var(benchmark_returns, ddof=1))
+    if benchmark_var > 0:
+        beta = float(np.cov(portfolio_returns, benchmark_returns, ddof=1)[0, 1]) / benchmark_var
+    else:
+        beta = None
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        correlation = np.atleast_2d(np.corrcoef(returns, rowvar=False))
+
+    return {
+        "volatility": float(volatility),
+        "annual_return": annual_return,
+        "beta": beta,
+        "sharpe_ratio": sharpe,
+        "max_drawdown": max_drawdown(portfolio_returns),
+        "correlation": [
+            [None if np.isnan(v) else round(float(v), 6) for v in row] for row in correlation
+        ],
+    }
+
+
+def holdings_fingerprint(holdings: list[Any]) -> str:
+    """Digest of each holding's symbol and shares, changing whenever the holdings do."""
+    digest = hashlib.sha1(usedforsecurity=False)
+    for holding in sorted(holdings, key=lambda h: h.symbol):
+        digest.update(f"{holding.symbol}:{holding.shares};".encode())
+    return digest.hexdigest()
+
+
+def get_portfolio_analytics(
+    db: Session,
+    user_id: UUID,
+    benchmark: str,
+    lookback_days: int,
+    as_of: date | None = None,
+) -> dict[str, Any] | None:
+    """
+    Compute (or return cached) analytics for a user's current holdings.
+
+    Weights come from the latest stored close converted to USD at the cached or
+    stored FX rate, so the request never waits on a live quote. Closes are only
+    read: the daily rollup job backfills them for held symbols and the default
+    benchmark.
+
+    Returns:
+        Analytics dictionary, or None if the user has no holdings
+
+    Raises:
+        InsufficientHistoryError: If fewer than two aligned return observations exist
+    """
+    as_of = as_of or date.today()
+    benchmark = benchmark.upper()
+
+    holdings = (
+        db.query(models.Holding.symbol, models.Holding.shares, models.Holding.currency)
+        .filter(models.Holding.user_id == user_id, models.Holding.shares > 0)
+        .all()
+    )
+    if not holdings:
+        return None
+
+    cache_key = (user_id, as_of, benchmark, lookback_days, holdings_fingerprint(holdings))
+    cached = _analytics_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    start = as_of - timedelta(days=lookback_days)
+    symbols = sorted({h.symbol for h in holdings})
+
+    # The benchmark may also be held; it gets its own column either way
+    matrix = load_price_matrix(db, sorted({*symbols, benchmark}), start, as_of)
+    column = {s: j for j, s in enumerate(matrix.symbols)}
+    closes = matrix.closes[:, [*(column[s] for s in symbols), column[benchmark]]]
+
+    # Drop positions with no stored history at all or no FX rate; weights are
+    # renormalized below
+    held = {h.symbol: h for h in holdings}
+    usd_rates = cached_usd_rates(db, {h.currency for h in holdings})
+    has_data = ~np.all(np.isnan(closes[:, : len(symbols)]), axis=0) & np.array(
+        [held[s].currency in usd_rates for s in symbols]
+    )
+    if closes.shape[0] < 3 or not has_data.any() or np.all(np.isnan(closes[:, -1])):
+        raise InsufficientHistoryError("Not enough price history to compute analytics")
+
+    position_symbols = [s for s, ok in zip(symbols, has_data, strict=True) if ok]
+    columns = [*np.flatnonzero(has_data), len(symbols)]
+    closes = closes[:, columns]
+
+    # Keep only days on which every remaining series has a price
+    closes = closes[~np.isnan(closes).any(axis=1)]
+    if closes.shape[0] < 3:
+        raise InsufficientHistoryError("Not enough overlapping price history")
+
+    returns = closes[1:] / closes[:-1] - 1
+    position_returns = returns[:, :-1]
+    benchmark_returns = returns[:, -1]
+
+    market_values = closes[-1, :-1] * np.array(
+        [float(held[s].shares) * float(usd_rates[held[s].currency]) for s in position_symbols]
+    )
+    weights = market_values / market_values.sum()
+
+    with span("compute"):
+        result = compute_analytics(
+            weights, position_returns, benchmark_returns, settings.analytics_risk_free_rate
+        )
+    result.update(
+        {
+            "as_of": as_of,
+            "benchmark": benchmark,
+            "lookback_days": lookback_days,
+            "observations": int(returns.shape[0]),
+            "symbols": position_symbols,
+            "weights": [round(float(w), 6) for w in weights],
+        }
+    )
+
+    _analytics_cache.set(cache_key, result)
+    logger.info(
+        f"Computed analytics for {len(position_symbols)} positions over "
+        f"{returns.shape[0]} days vs {benchmark}"
+    )
+    return result
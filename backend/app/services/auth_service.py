@@ -1,22 +1,42 @@
 import base64
 import hashlib
 import hmac
+import time
+from typing import Any
 
-import boto3
-import requests  # type: ignore[import-untyped]
 from botocore.exceptions import ClientError
 from jose import JWTError, jwt
 
 from app.config import settings
+from app.metrics import JWT_VERIFY_DURATION
 
 
 class AuthService:
     def __init__(self):
-        self.client = boto3.client("cognito-idp", region_name=settings.aws_region)
+        self._client: Any = None
         self.user_pool_id = settings.cognito_user_pool_id
         self.client_id = settings.cognito_client_id
         self._jwks = None
 
+    def create_client(self) -> None:
+        """
+        Create the Cognito client if it does not exist yet.
+
+        Called from the app lifespan; importing boto3 and building the client is
+        kept out of module import so the app (and tests) start quickly.
+        """
+        if self._client is None:
+            import boto3
+
+            self._client = boto3.client("cognito-idp", region_name=settings.aws_region)
+
+    @property
+    def client(self) -> Any:
+        """Cognito client, created on first use outside the app (e.g. scripts)."""
+        if self._client is None:
+            self.create_client()
+        return self._client
+
     def _get_secret_hash(self, username: str) -> str:
         """
         Generate hash for Cognito Client Secret.
@@ -142,6 +162,8 @@ class AuthService:
     def _get_jwks(self) -> dict:
         """Get Cognito public keys (JWKS)"""
         if self._jwks is None:
+            import requests  # type: ignore[import-untyped]
+
             keys_url = f"https://cognito-idp.{settings.aws_region}.amazonaws.com/{self.user_pool_id}/.well-known/jwks.json"
             response = requests.get(keys_url)
             response.raise_for_status()
@@ -150,6 +172,16 @@ class AuthService:
 
     def verify_token(self, token: str) -> dict:
         """Verify JWT token and return payload"""
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            payload = self._verify_token(token)
+            outcome = "ok"
+            return payload
+        finally:
+            JWT_VERIFY_DURATION.labels(outcome).observe(time.perf_counter() - start)
+
+    def _verify_token(self, token: str) -> dict:
         try:
             # Get kid from JWT header
             headers = jwt.get_unverified_header(token)
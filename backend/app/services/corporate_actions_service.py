@@ -0,0 +1,201 @@
+"""Corporate actions (stock splits and cash dividends).
+
+Actions are stored in ``corporate_actions`` and applied by a batch job
+(``app.jobs.corporate_actions``). Each action is applied to all of its holders
+with set-based statements: one UPDATE of ``holdings`` for a split, one multi-row
+INSERT of the matching ledger entries, and one UPDATE of ``symbol_popularity``.
+The action is marked applied in the same commit, so an interrupted run leaves no
+partial action behind and re-running the job never applies an action twice.
+Holders whose ledger already has the entry (e.g. recorded by hand) are skipped.
+
+An action takes effect at the start of its ex-date (see ``ledger_service``), so it
+applies to the position held before that date. Holders with ledger entries on or
+after the ex-date need the action placed inside their history rather than on top
+of the current position; those few are recorded through ``record_transaction``,
+which replays that symbol.
+"""
+
+import logging
+import uuid
+from datetime import UTC, date, datetime, timedelta
+from typing import Any
+
+from sqlalchemy import ColumnElement, delete, exists, func, insert, select, update
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.services.alerts_service import update_position_on_commit
+from app.services.ledger_service import position_on, record_transaction
+
+logger = logging.getLogger(__name__)
+
+
+def _ledger_has(*criteria: ColumnElement[bool]) -> Any:
+    """Correlated EXISTS over the holder's ledger entries for the action's symbol."""
+    txn = models.Transaction
+    return exists().where(
+        txn.user_id == models.Holding.user_id, txn.symbol == models.Holding.symbol, *criteria
+    )
+
+
+def _ledger_entry(
+    action: models.CorporateAction, user_id: Any, shares: Any, now: datetime
+) -> dict[str, Any]:
+    return {
+        "id": uuid.uuid4(),
+        "user_id": user_id,
+        "symbol": action.symbol,
+        "type": action.type,
+        "trade_date": action.ex_date,
+        "shares": shares if action.type == "dividend" else None,
+        "price": action.amount,
+        "ratio": action.ratio,
+        "created_at": now,
+    }
+
+
+def apply_corporate_action(db: Session, action: models.CorporateAction) -> int:
+    """
+    Apply one action to every affected holding and mark it applied. Commits.
+
+    Returns:
+        Number of holdings the action was applied to
+    """
+    if action.status == "applied":
+        return int(action.holdings_affected or 0)
+
+    holding = models.Holding
+    txn = models.Transaction
+    already_recorded = _ledger_has(txn.type == action.type, txn.trade_date == action.ex_date)
+    # Entries on the ex-date itself sort after the action
+    has_later_entries = _ledger_has(txn.trade_date >= action.ex_date)
+    current = (
+        holding.symbol == action.symbol,
+        holding.shares > 0,
+        ~already_recorded,
+        ~has_later_entries,
+    )
+    now = datetime.now(UTC)
+
+    # Holders whose position is the one on the ex-date; rows are locked until commit
+    holders = db.execute(
+        select(holding.user_id, holding.shares, holding.avg_cost).where(*current).with_for_update()
+    ).all()
+    if holders:
+        if action.type == "split":
+            db.execute(
+                update(holding)
+                .where(*current)
+                .values(
+                    shares=holding.shares * action.ratio,
+                    avg_cost=holding.avg_cost / action.ratio,
+                    updated_at=now,
+                )
+                .execution_options(synchronize_session=False)
+            )
+            # P&L alerts trigger relative to the average cost, which the split divides
+            for holder in holders:
+                update_position_on_commit(
+                    db, holder.user_id, action.symbol, holder.avg_cost / action.ratio
+                )
+            # Stored daily values after the ex-date used the pre-split position
+            db.execute(
+                delete(models.PortfolioDailyValue)
+                .where(
+                    models.PortfolioDailyValue.date >= action.ex_date,
+                    models.PortfolioDailyValue.user_id.in_(
+                        select(holding.user_id).where(holding.symbol == action.symbol)
+                    ),
+                )
+                .execution_options(synchronize_session=False)
+            )
+        db.execute(
+            insert(txn), [_ledger_entry(action, row.user_id, row.shares, now) for row in holders]
+        )
+
+    # Rare: histories that continue past the ex-date are replayed one by one
+    late = db.execute(
+        select(holding.user_id).where(
+            holding.symbol == action.symbol, ~already_recorded, has_later_entries
+        )
+    ).all()
+    replayed = 0
+    for row in late:
+        shares, _ = position_on(db, row.user_id, action.symbol, action.ex_date - timedelta(days=1))
+        if shares <= 0:
+            continue
+        record_transaction(
+            db,
+            row.user_id,
+            schemas.TransactionCreate(
+                symbol=action.symbol,
+                type="split" if action.type == "split" else "dividend",
+                trade_date=action.ex_date,
+                shares=shares if action.type == "dividend" else None,
+                price=action.amount,
+                ratio=action.ratio,
+            ),
+            metadata_lookup=lambda symbol: (symbol, "USD"),  # holding exists
+        )
+        replayed += 1
+
+    # Splits change total shares; recompute the symbol's row in one statement
+    if action.type == "split":
+        popularity = models.SymbolPopularity
+        db.execute(
+            update(popularity)
+            .where(popularity.symbol == action.symbol)
+            .values(
+                total_shares=select(func.coalesce(func.sum(holding.shares), 0))
+                .where(holding.symbol == action.symbol, holding.shares > 0)
+                .scalar_subquery(),
+                updated_at=now,
+            )
+        )
+
+    action.status = "applied"
+    action.holdings_affected = len(holders) + replayed
+    action.applied_at = now
+    db.commit()
+
+    logger.info(
+        f"Applied {action.type} {action.symbol} ex {action.ex_date} to "
+        f"{action.holdings_affected} holdings ({replayed} replayed)"
+    )
+    return int(action.holdings_affected)
+
+
+def apply_pending_actions(db: Session, as_of: date, symbol: str | None = None) -> int:
+    """
+    Apply every pending action with an ex-date on or before ``as_of``, oldest first.
+
+    Each action commits on its own, so progress survives an interrupted run and
+    the job can simply be re-run.
+
+    Args:
+        as_of: Last ex-date to apply
+        symbol: Limit the run to one symbol
+
+    Returns:
+        Number of actions applied
+    """
+    query = db.query(models.CorporateAction).filter(
+        models.CorporateAction.status == "pending",
+        models.CorporateAction.ex_date <= as_of,
+    )
+    if symbol:
+        query = query.filter(models.CorporateAction.symbol == symbol.upper())
+    actions = query.order_by(
+        models.CorporateAction.ex_date, models.CorporateAction.symbol, models.CorporateAction.type
+    ).all()
+
+    for i, action in enumerate(actions, start=1):
+        try:
+            apply_corporate_action(db, action)
+        except Exception:
+            db.rollback()
+            logger.exception(f"Failed on {action.type} {action.symbol} ({i}/{len(actions)})")
+            raise
+        logger.info(f"Corporate actions progress: {i}/{len(actions)}")
+
+    return len(actions)
@@ -0,0 +1,124 @@
+"""Portfolio dashboard metrics."""
+
+import logging
+from collections.abc import Iterable, Mapping
+from datetime import datetime
+from decimal import Decimal
+from typing import Any
+
+from app import schemas
+
+logger = logging.getLogger(__name__)
+
+
+def build_dashboard(
+    holdings: Iterable[Any],
+    price_data: Mapping[str, dict[str, Any] | None],
+    last_updated: datetime | None = None,
+    fx_rates: Mapping[str, Decimal] | None = None,
+    base_currency: str = "USD",
+) -> schemas.Dashboard | None:
+    """
+    Compute per-holding and portfolio metrics from current prices.
+
+    Prices and average costs stay in each holding's currency; market value, cost
+    basis and P&L are converted to ``base_currency`` at the current rate in the
+    same pass, so totals and allocations are in the base currency.
+
+    Args:
+        holdings: Rows with ``symbol``, ``shares`` and ``avg_cost`` (and ``currency``
+            when ``fx_rates`` is given)
+        price_data: Quote per symbol (None if the fetch failed); optional ``as_of``
+            and ``stale`` keys are passed through to the holding
+        last_updated: Timestamp to report; defaults to now
+        fx_rates: Multiplier into the base currency per currency; None if every
+            holding is already in the base currency
+        base_currency: Currency of the reported values
+
+    Returns:
+        Dashboard, or None if no holding has a price
+    """
+    # Calculate metrics for each holding
+    dashboard_holdings = []
+    total_value = Decimal(0)
+    total_cost = Decimal(0)
+
+    for holding in holdings:
+        stock_prices = price_data.get(holding.symbol)
+
+        # Skip holdings where price fetch failed
+        if stock_prices is None:
+            logger.warning(f"Skipping {holding.symbol} - price data unavailable")
+            continue
+
+        currency = base_currency if fx_rates is None else holding.currency
+        rate = Decimal(1) if fx_rates is None else fx_rates.get(currency)
+        # Skip holdings that cannot be converted rather than mixing currencies
+        if rate is None:
+            logger.warning(f"Skipping {holding.symbol} - no {currency} rate")
+            continue
+
+        current_price = stock_prices["current_price"]
+        previous_close = stock_prices["previous_close"]
+        daily_change_pct = stock_prices["daily_change_pct"]
+
+        # Calculate holding metrics (in the base currency)
+        market_value = holding.shares * current_price * rate
+        cost_basis = holding.shares * holding.avg_cost * rate
+        pnl = market_value - cost_basis
+
+        if cost_basis > 0:
+            pnl_pct = (pnl / cost_basis) * 100
+        else:
+            pnl_pct = Decimal(0)
+
+        # Accumulate totals
+        total_value += market_value
+        total_cost += cost_basis
+
+        dashboard_holdings.append(
+            schemas.DashboardHolding(
+                symbol=holding.symbol,
+                currency=currency,
+                shares=holding.shares,
+                avg_cost=holding.avg_cost,
+                current_price=current_price,
+                previous_close=previous_close,
+                daily_change_pct=daily_change_pct,
+                market_value=market_value,
+                pnl=pnl,
+                pnl_pct=pnl_pct,
+                allocation_pct=Decimal(0),  # Will calculate after total_value is known
+                as_of=stock_prices.get("as_of"),
+                stale=stock_prices.get("stale", False),
+            )
+        )
+
+    if not dashboard_holdings:
+        return None
+
+    # Calculate portfolio totals
+    total_pnl = total_value - total_cost
+
+    if total_cost > 0:
+        total_pnl_pct = (total_pnl / total_cost) * 100
+    else:
+        total_pnl_pct = Decimal(0)
+
+    # Calculate allocation percentages
+    for holding_data in dashboard_holdings:
+        if total_value > 0:
+            holding_data.allocation_pct = (holding_data.market_value / total_value) * 100
+        else:
+            holding_data.allocation_pct = Decimal(0)
+
+    return schemas.Dashboard(
+        total_value=total_value,
+        total_cost=total_cost,
+        total_pnl=total_pnl,
+        total_pnl_pct=total_pnl_pct,
+        base_currency=base_currency,
+        last_updated=last_updated or datetime.now(),
+        stale=any(holding_data.stale for holding_data in dashboard_holdings),
+        holdings=dashboard_holdings,
+    )
@@ -0,0 +1,211 @@
+"""Currency conversion for multi-currency portfolios.
+
+Rates are stored as the USD value of one unit of each currency (``fx_rates``) and
+kept in an in-process cache. The quote refresher refreshes every currency seen in
+its quote batch with one upstream call; request paths read the cache and fetch
+only currencies it is missing, again in one batched call, falling back to the
+last stored rate if the upstream fails (or, given a timeout, is too slow). Nothing
+is fetched per holding.
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import UTC, datetime
+from decimal import Decimal
+
+from sqlalchemy.orm import Session
+
+from app import models
+from app.config import settings
+from app.services.stock_service import StockAPIError, fetch_fx_rates
+
+logger = logging.getLogger(__name__)
+
+USD = "USD"
+
+
+class FxRateCache:
+    """Thread-safe map of currency to its latest USD rate."""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._rates: dict[str, tuple[Decimal, float]] = {}  # currency -> (rate, expires_at)
+        self._lock = threading.Lock()
+
+    def get_fresh(self, currencies: Iterable[str]) -> tuple[dict[str, Decimal], list[str]]:
+        """
+        Split currencies into cached unexpired rates and currencies that need fetching.
+
+        Returns:
+            (hits mapping currency to USD rate, list of missing or expired currencies)
+        """
+        now = time.monotonic()
+        hits: dict[str, Decimal] = {}
+        misses: list[str] = []
+        with self._lock:
+            for currency in currencies:
+                entry = self._rates.get(currency)
+                if entry is not None and entry[1] > now:
+                    hits[currency] = entry[0]
+                else:
+                    misses.append(currency)
+        return hits, misses
+
+    def due_for_refresh(self, currencies: Iterable[str], within_seconds: float) -> list[str]:
+        """Currencies that are uncached or expire within ``within_seconds``, sorted."""
+        deadline = time.monotonic() + within_seconds
+        with self._lock:
+            return sorted(
+                currency
+                for currency in set(currencies)
+                if (entry := self._rates.get(currency)) is None or entry[1] <= deadline
+            )
+
+    def currencies(self) -> list[str]:
+        with self._lock:
+            return list(self._rates)
+
+    def put_many(self, rates: dict[str, Decimal], ttl_seconds: float | None = None) -> None:
+        expires_at = time.monotonic() + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        with self._lock:
+            for currency, rate in rates.items():
+                self._rates[currency] = (rate, expires_at)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._rates.clear()
+
+
+fx_cache = FxRateCache(ttl_seconds=settings.fx_rate_ttl_seconds)
+
+# Fetches waited on with a timeout; identical pending fetches are shared
+_fetch_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="fx-fetch")
+_inflight: dict[tuple[str, ...], Future] = {}
+_inflight_lock = threading.Lock()
+
+
+def _save_rates(db: Session, rates: dict[str, Decimal]) -> None:
+    now = datetime.now(UTC)
+    for currency, rate in rates.items():
+        db.merge(models.FxRate(currency=currency, usd_rate=rate, updated_at=now))
+
+
+def refresh_fx_rates(db: Session, currencies: Iterable[str]) -> dict[str, Decimal]:
+    """
+    Fetch rates for the given currencies in one call, cache and store them. Caller commits.
+
+    Returns:
+        Fetched USD rate per currency (currencies the upstream has no rate for are omitted)
+
+    Raises:
+        StockAPIError: If API request fails
+    """
+    wanted = sorted({c for c in currencies if c != USD})
+    if not wanted:
+        return {}
+
+    rates = _fetch_and_cache(wanted)
+    _save_rates(db, rates)
+    return rates
+
+
+def _fetch_and_cache(currencies: list[str]) -> dict[str, Decimal]:
+    rates = fetch_fx_rates(currencies)
+    fx_cache.put_many(rates)
+    return rates
+
+
+def _fetch_in_background(currencies: list[str]) -> Future:
+    key = tuple(sorted(set(currencies)))
+    with _inflight_lock:
+        future = _inflight.get(key)
+        if future is not None:
+            return future
+        future = _inflight[key] = _fetch_pool.submit(_fetch_and_cache, list(key))
+
+    def done(finished: Future) -> None:
+        with _inflight_lock:
+            if _inflight.get(key) is finished:
+                del _inflight[key]
+
+    # Outside the lock: runs immediately if the fetch has already finished
+    future.add_done_callback(done)
+    return future
+
+
+def get_usd_rates(
+    db: Session, currencies: Iterable[str], timeout: float | None = None
+) -> dict[str, Decimal]:
+    """
+    USD rate per currency, served from cache with a single batched fetch for misses.
+
+    Rates that cannot be fetched fall back to the stored rate, which is cached for
+    ``settings.fx_fallback_ttl_seconds`` so an upstream outage costs one attempt per
+    interval rather than one per request; currencies with neither are omitted.
+
+    Args:
+        timeout: Seconds to wait for the fetch before falling back to stored rates
+            (a late fetch still fills the cache). None waits for it to finish.
+    """
+    hits, misses = fx_cache.get_fresh({c for c in currencies if c != USD})
+    rates = {USD: Decimal(1), **hits}
+    if not misses:
+        return rates
+
+    try:
+        if timeout is None:
+            fetched = refresh_fx_rates(db, misses)
+        else:
+            fetched = _fetch_in_background(misses).result(timeout=max(timeout, 0.0))
+            _save_rates(db, fetched)
+        db.commit()
+    except (StockAPIError, TimeoutError) as e:
+        logger.warning(f"Failed to fetch FX rates for {misses}: {e!r}")
+        db.rollback()
+        fetched = {}
+    rates.update(fetched)
+
+    stale = [c for c in misses if c not in fetched]
+    if stale:
+        stored = db.query(
+            models.FxRate.currency, models.FxRate.usd_rate, models.FxRate.updated_at
+        ).filter(models.FxRate.currency.in_(stale))
+        fallback = {}
+        for row in stored:
+            logger.warning(f"Using stored {row.currency} rate from {row.updated_at}")
+            fallback[row.currency] = row.usd_rate
+        fx_cache.put_many(fallback, ttl_seconds=settings.fx_fallback_ttl_seconds)
+        rates.update(fallback)
+    return rates
+
+
+def cached_usd_rates(db: Session, currencies: Iterable[str]) -> dict[str, Decimal]:
+    """
+    USD rate per currency from the cache, falling back to the stored rate; never fetches.
+
+    Currencies with neither are omitted.
+    """
+    hits, misses = fx_cache.get_fresh({c for c in currencies if c != USD})
+    rates = {USD: Decimal(1), **hits}
+    if misses:
+        stored = db.query(models.FxRate.currency, models.FxRate.usd_rate).filter(
+            models.FxRate.currency.in_(misses)
+        )
+        rates.update({row.currency: row.usd_rate for row in stored})
+    return rates
+
+
+def conversion_rates(usd_rates: dict[str, Decimal], base_currency: str) -> dict[str, Decimal]:
+    """
+    Multiplier converting an amount in each currency to ``base_currency``.
+
+    Currencies without a rate are omitted; returns an empty dict if the base
+    currency itself has no rate.
+    """
+    base = usd_rates.get(base_currency)
+    if not base:
+        return {}
+    return {currency: rate / base for currency, rate in usd_rates.items()}
@@ -0,0 +1,202 @@
+"""Server-side heatmap (treemap) layout.
+
+The squarified layout is computed once per quote refresh and cached per user, so
+clients only draw the returned rectangles. The payload is columnar: one array per
+field, indexed by position.
+"""
+
+import hashlib
+import logging
+from bisect import bisect_right
+from datetime import UTC, datetime
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy.orm import Session
+
+from app import models
+from app.config import settings
+from app.profiling import span
+from app.services.cache import TTLCache
+from app.services.fx_service import cached_usd_rates, conversion_rates
+from app.services.price_snapshot_service import flush_snapshots, with_last_known
+from app.services.quote_cache import quote_cache
+from app.services.stock_service import get_multiple_prices
+
+logger = logging.getLogger(__name__)
+
+# Daily change (%) boundaries between color buckets -3..3; bucket 0 is roughly flat
+COLOR_BUCKET_EDGES = (-4.0, -2.0, -0.5, 0.5, 2.0, 4.0)
+
+_layout_cache: TTLCache[dict[str, Any]] = TTLCache(maxsize=10_000, ttl=60 * 60)
+
+Rect = tuple[float, float, float, float]
+
+
+def color_bucket(daily_change_pct: float) -> int:
+    """Map a daily change percentage to a color bucket from -3 (worst) to 3 (best)."""
+    return bisect_right(COLOR_BUCKET_EDGES, daily_change_pct) - 3
+
+
+def _worst_ratio(row: list[float], side: float) -> float:
+    total = sum(row)
+    return max(max(row) * side * side / (total * total), (total * total) / (side * side * min(row)))
+
+
+def squarify(values: list[float], x: float, y: float, width: float, height: float) -> list[Rect]:
+    """
+    Squarified treemap layout (Bruls, Huizing & van Wijk).
+
+    Args:
+        values: Positive sizes, sorted in descending order
+        x, y, width, height: Bounding box to fill
+
+    Returns:
+        One (x, y, width, height) rectangle per value, in input order
+    """
+    if not values:
+        return []
+
+    scale = width * height / sum(values)
+    areas = [v * scale for v in values]
+    rects: list[Rect] = []
+
+    i = 0
+    while i < len(areas):
+        side = min(width, height)
+        row = [areas[i]]
+        i += 1
+        while i < len(areas) and _worst_ratio([*row, areas[i]], side) <= _worst_ratio(row, side):
+            row.append(areas[i])
+            i += 1
+
+        row_area = sum(row)
+        if width >= height:
+            # Lay the row out as a column along the left edge
+            thickness = row_area / height
+            offset = y
+            for area in row:
+                rects.append((x, offset, thickness, area / thickness))
+                offset += area / thickness
+            x += thickness
+            width = max(width - thickness, 0.0)
+        else:
+            # Lay the row out along the top edge
+            thickness = row_area / width
+            offset = x
+            for area in row:
+                rects.append((offset, y, area / thickness, thickness))
+                offset += area / thickness
+            y += thickness
+            height = max(height - thickness, 0.0)
+
+    return rects
+
+
+def build_heatmap(
+    positions: list[tuple[str, Decimal, Decimal]], width: int, height: int
+) -> dict[str, Any]:
+    """
+    Lay out positions as a treemap sized by market value.
+
+    Args:
+        positions: (symbol, market_value, daily_change_pct) per position
+        width, height: Size of the layout area
+
+    Returns:
+        Columnar layout: parallel arrays of symbols, rectangles, buckets and values
+    """
+    ordered = sorted(positions, key=lambda p: p[1], reverse=True)
+    sizes = [max(float(value), 1.0) for _, value, _ in ordered]
+    rects = squarify(sizes, 0.0, 0.0, float(width), float(height))
+
+    return {
+        "width": width,
+        "height": height,
+        "symbols": [symbol for symbol, _, _ in ordered],
+        "x": [round(r[0], 2) for r in rects],
+        "y": [round(r[1], 2) for r in rects],
+        "w": [round(r[2], 2) for r in rects],
+        "h": [round(r[3], 2) for r in rects],
+        "bucket": [color_bucket(float(change)) for _, _, change in ordered],
+        "change_pct": [round(float(change), 2) for _, _, change in ordered],
+        "value": [round(float(value), 2) for _, value, _ in ordered],
+    }
+
+
+def get_user_heatmap(db: Session, user_id: UUID, width: int, height: int) -> dict[str, Any] | None:
+    """
+    Return the heatmap layout for a user's holdings.
+
+    Quotes not fetched within ``settings.dashboard_deadline_seconds`` use the last
+    known price, as on the dashboard. Tile sizes are market values in the user's
+    base currency, converted with the cached or stored FX rate; holdings without a
+    rate are left out. The layout is cached until one of the user's holdings, input
+    quotes or FX rates changes.
+
+    Returns:
+        Layout dictionary, or None if the user has no holdings
+    """
+    holdings = (
+        db.query(models.Holding.symbol, models.Holding.currency, models.Holding.shares)
+        .filter(models.Holding.user_id == user_id)
+        .order_by(models.Holding.symbol)
+        .all()
+    )
+    if not holdings:
+        return None
+
+    symbols = [h.symbol for h in holdings]
+    price_data = with_last_known(
+        db, symbols, get_multiple_prices(symbols, timeout=settings.dashboard_deadline_seconds)
+    )
+
+    base_currency = (
+        db.query(models.User.base_currency).filter(models.User.id == user_id).scalar() or "USD"
+    )
+    currencies = {holding.currency for holding in holdings}
+    fx_rates = None
+    if currencies != {base_currency}:
+        fx_rates = conversion_rates(
+            cached_usd_rates(db, currencies | {base_currency}), base_currency
+        )
+
+    digest = hashlib.sha1(usedforsecurity=False)
+    for holding in holdings:
+        digest.update(f"{holding.symbol}:{holding.shares};".encode())
+    for currency, multiplier in sorted((fx_rates or {}).items()):
+        digest.update(f"{currency}={multiplier};".encode())
+    cache_key = (user_id, width, height, digest.hexdigest(), quote_cache.versions(symbols))
+
+    cached = _layout_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    positions = []
+    as_of = []
+    for holding in holdings:
+        prices = price_data.get(holding.symbol)
+        if prices is None:
+            continue
+        rate = Decimal(1) if fx_rates is None else fx_rates.get(holding.currency)
+        # Leave out holdings that cannot be converted rather than mixing currencies
+        if rate is None:
+            logger.warning(
+                f"Leaving {holding.symbol} out of the heatmap - no {holding.currency} rate"
+            )
+            continue
+        value = holding.shares * prices["current_price"] * rate
+        positions.append((holding.symbol, value, prices["daily_change_pct"]))
+        as_of.append(prices["as_of"])
+
+    with span("compute"):
+        layout = build_heatmap(positions, width, height)
+    layout["as_of"] = min(as_of) if as_of else datetime.now(UTC)
+
+    _layout_cache.set(cache_key, layout)
+    # Keep the last known prices current, including fetches that finished after the deadline
+    if flush_snapshots(db):
+        db.commit()
+    logger.info(f"Computed heatmap layout for {len(positions)} positions ({width}x{height})")
+    return layout
@@ -0,0 +1,399 @@
+"""Portfolio value history maintained by incremental daily rollups.
+
+The rollup job only computes days after the last stored row for each user, so a run
+costs O(new days x positions) instead of O(all days x positions). Ledger entries call
+``invalidate_daily_values`` to drop rows from their trade date onward; those days are
+recomputed on the next run.
+
+Positions on each day come from replaying the user's ledger, so backdated entries and
+closed positions are valued as they were held. The ledger is only replayed when it has
+entries on or after the first day to compute; otherwise the current holdings are the
+position on every such day. Holdings without ledger entries are valued from their
+creation date.
+
+Values are in the user's base currency, converted at the current cached or stored
+FX rate (no rate history is kept); positions in a currency without a rate are left
+out rather than mixed in.
+"""
+
+import logging
+from bisect import bisect_right
+from dataclasses import dataclass, field
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+
+from app import models
+from app.config import settings
+from app.services.fx_service import cached_usd_rates, conversion_rates
+from app.services.partition_service import ensure_partitions
+from app.services.stock_service import get_daily_closes
+
+logger = logging.getLogger(__name__)
+
+# Calendar days of closes loaded before the first computed day, so that day can carry
+# forward the last close across weekends and holidays.
+PRICE_LOOKBACK_DAYS = 10
+
+
+@dataclass
+class _RollupPlan:
+    user_id: UUID
+    holdings: list[Any]  # valued from their creation date unless in ``timelines``
+    start: date
+    base_currency: str = "USD"
+    timelines: dict[str, Any] = field(default_factory=dict)  # PositionTimeline per symbol
+
+    def symbols(self, through: date) -> list[str]:
+        """Symbols with shares held on some day from ``start`` to ``through``."""
+        held = {h.symbol for h in self.holdings if h.symbol not in self.timelines}
+        for symbol, timeline in self.timelines.items():
+            shares, _ = timeline.on(self.start)
+            if shares > 0 or any(
+                s > 0
+                for d, s in zip(timeline.dates, timeline.shares, strict=True)
+                if self.start < d <= through
+            ):
+                held.add(symbol)
+        return sorted(held)
+
+
+def invalidate_daily_values(db: Session, user_id: UUID, from_date: date) -> int:
+    """
+    Delete precomputed values from ``from_date`` onward so the next rollup recomputes them.
+
+    The caller is responsible for committing, normally together with the holding change.
+
+    Returns:
+        Number of rows deleted
+    """
+    deleted: int = (
+        db.query(models.PortfolioDailyValue)
+        .filter(
+            models.PortfolioDailyValue.user_id == user_id,
+            models.PortfolioDailyValue.date >= from_date,
+        )
+        .delete(synchronize_session=False)
+    )
+    return deleted
+
+
+def ensure_price_history(db: Session, symbols: list[str], start: date, end: date) -> int:
+    """
+    Store the daily closes needed to value days from ``start`` to ``end``.
+
+    What has been requested from the provider is tracked per symbol in
+    ``price_history_coverage``. Symbols never requested from ``PRICE_LOOKBACK_DAYS``
+    before ``start`` (so the first day can carry a close forward) are fetched from
+    there; others only after the last close received. A symbol whose history starts
+    later is not requested again, and closes compacted from intraday quotes neither
+    count as fetched nor survive: the provider's closes replace them. All symbols
+    share one batched upstream call.
+
+    Returns:
+        Number of rows inserted
+    """
+    if not symbols or start > end:
+        return 0
+
+    window_start = start - timedelta(days=PRICE_LOOKBACK_DAYS)
+    coverage = {
+        row.symbol: row
+        for row in db.query(models.PriceHistoryCoverage).filter(
+            models.PriceHistoryCoverage.symbol.in_(symbols)
+        )
+    }
+
+    fetch_from: dict[str, date] = {}
+    for symbol in symbols:
+        covered = coverage.get(symbol)
+        if covered is None or window_start < covered.fetched_from:
+            need_from = window_start
+        else:
+            need_from = covered.fetched_through + timedelta(days=1)
+        if need_from <= end:
+            fetch_from[symbol] = need_from
+
+    if not fetch_from:
+        return 0
+
+    first = min(fetch_from.values())
+    closes = get_daily_closes(sorted(fetch_from), first, end)
+    ensure_partitions(db, "price_history", first, end)
+
+    # Bounded on date so only the months fetched are scanned
+    stored = set(
+        db.query(models.PriceHistory.symbol, models.PriceHistory.date).filter(
+            models.PriceHistory.symbol.in_(fetch_from),
+            models.PriceHistory.date >= first,
+            models.PriceHistory.date <= end,
+        )
+    )
+
+    inserted = 0
+    replaced = []
+    for symbol, by_date in closes.items():
+        if not by_date:
+            continue
+        covered = coverage.get(symbol)
+        for day, close in by_date.items():
+            if covered is not None and covered.fetched_from <= day <= covered.fetched_through:
+                continue
+            if (symbol, day) in stored:
+                replaced.append({"symbol": symbol, "date": day, "close": close})
+            else:
+                db.add(models.PriceHistory(symbol=symbol, date=day, close=close))
+                inserted += 1
+
+        if covered is None:
+            db.add(
+                models.PriceHistoryCoverage(
+                    symbol=symbol, fetched_from=fetch_from[symbol], fetched_through=max(by_date)
+                )
+            )
+        else:
+            covered.fetched_from = min(covered.fetched_from, fetch_from[symbol])
+            covered.fetched_through = max(covered.fetched_through, max(by_date))
+
+    if replaced:
+        db.execute(update(models.PriceHistory), replaced)
+    db.commit()
+    logger.info(
+        f"Stored {inserted} daily closes and replaced {len(replaced)} compacted ones "
+        f"for {len(fetch_from)} symbols"
+    )
+    return inserted
+
+
+def backfill_price_history(db: Session, through: date | None = None) -> int:
+    """
+    Store closes of every held symbol, the analytics benchmark and
+    ``settings.price_history_extra_symbols`` over the history window.
+
+    Run by the daily rollup job so requests only read stored closes; after the first
+    run only new days are fetched, in one batched call.
+
+    Args:
+        through: Last day to store (defaults to yesterday, the last completed day)
+
+    Returns:
+        Number of rows inserted
+    """
+    through = through or date.today() - timedelta(days=1)
+    symbols = {row[0] for row in db.query(models.Holding.symbol).distinct().all()}
+    if not symbols:
+        return 0
+    symbols.add(settings.analytics_benchmark_symbol.upper())
+    symbols.update(
+        s.strip().upper() for s in settings.price_history_extra_symbols.split(",") if s.strip()
+    )
+    start = through - timedelta(days=settings.price_history_days)
+    return ensure_price_history(db, sorted(symbols), start, through)
+
+
+def _plan_rollup(db: Session, user_id: UUID, through: date) -> _RollupPlan | None:
+    # Imported here: the ledger service invalidates rows through this module
+    from app.services.ledger_service import position_timelines
+
+    holdings = (
+        db.query(
+            models.Holding.symbol,
+            models.Holding.shares,
+            models.Holding.avg_cost,
+            models.Holding.currency,
+            models.Holding.created_at,
+        )
+        .filter(models.Holding.user_id == user_id)
+        .all()
+    )
+    first_trade, last_trade = (
+        db.query(func.min(models.Transaction.trade_date), func.max(models.Transaction.trade_date))
+        .filter(models.Transaction.user_id == user_id)
+        .one()
+    )
+    if not holdings and first_trade is None:
+        return None
+
+    last = (
+        db.query(func.max(models.PortfolioDailyValue.date))
+        .filter(models.PortfolioDailyValue.user_id == user_id)
+        .scalar()
+    )
+    if last:
+        start = last + timedelta(days=1)
+    else:
+        start = min(
+            [h.created_at.date() for h in holdings] + ([first_trade] if first_trade else [])
+        )
+    if start > through:
+        return None
+
+    base_currency = (
+        db.query(models.User.base_currency).filter(models.User.id == user_id).scalar() or "USD"
+    )
+    plan = _RollupPlan(user_id=user_id, holdings=holdings, start=start, base_currency=base_currency)
+    if last_trade is not None and last_trade >= start:
+        plan.timelines = position_timelines(db, user_id)
+    elif not holdings:
+        # Every position was closed before ``start``
+        return None
+    return plan
+
+
+def _load_closes(
+    db: Session, symbols: list[str], start: date, end: date
+) -> dict[str, tuple[list[date], list[Decimal]]]:
+    series: dict[str, tuple[list[date], list[Decimal]]] = {}
+    rows = (
+        db.query(models.PriceHistory.symbol, models.PriceHistory.date, models.PriceHistory.close)
+        .filter(
+            models.PriceHistory.symbol.in_(symbols),
+            models.PriceHistory.date >= start,
+            models.PriceHistory.date <= end,
+        )
+        .order_by(models.PriceHistory.symbol, models.PriceHistory.date)
+    )
+    for symbol, day, close in rows:
+        dates, closes = series.setdefault(symbol, ([], []))
+        dates.append(day)
+        closes.append(close)
+    return series
+
+
+def _compute_rollup(db: Session, plan: _RollupPlan, through: date) -> int:
+    symbols = plan.symbols(through)
+    prices = _load_closes(db, symbols, plan.start - timedelta(days=PRICE_LOOKBACK_DAYS), through)
+
+    # Only days with at least one traded price get a row
+    days = sorted({d for dates, _ in prices.values() for d in dates if plan.start <= d <= through})
+    if days:
+        ensure_partitions(db, "portfolio_daily_values", days[0], days[-1])
+
+    holdings = {h.symbol: h for h in plan.holdings}
+    # Closed positions have no holding; their quote currency is in the last snapshot
+    currencies = {h.symbol: h.currency for h in plan.holdings}
+    closed = [s for s in symbols if s not in currencies]
+    if closed:
+        snapshots = db.query(models.PriceSnapshot.symbol, models.PriceSnapshot.currency).filter(
+            models.PriceSnapshot.symbol.in_(closed)
+        )
+        currencies.update({row.symbol: row.currency for row in snapshots})
+    fx_rates = conversion_rates(
+        cached_usd_rates(db, {*currencies.values(), plan.base_currency}), plan.base_currency
+    )
+    unconverted = [s for s in symbols if currencies.get(s) not in fx_rates]
+    if unconverted:
+        logger.warning(f"Rollup for {plan.user_id} skips {unconverted}: no FX rate")
+
+    written = 0
+    for day in days:
+        total_value = Decimal(0)
+        total_cost = Decimal(0)
+        active = False
+
+        for symbol in symbols:
+            timeline = plan.timelines.get(symbol)
+            if timeline is not None:
+                shares, avg_cost = timeline.on(day)
+            else:
+                holding = holdings[symbol]
+                if holding.created_at.date() > day:
+                    continue
+                shares, avg_cost = holding.shares, holding.avg_cost
+            rate = fx_rates.get(currencies.get(symbol, ""))
+            if shares == 0 or symbol not in prices or rate is None:
+                continue
+            dates, closes = prices[symbol]
+            idx = bisect_right(dates, day) - 1
+            if idx < 0:
+                continue
+            total_value += shares * closes[idx] * rate
+            total_cost += shares * avg_cost * rate
+            active = True
+
+        if not active:
+            continue
+
+        db.add(
+            models.PortfolioDailyValue(
+                user_id=plan.user_id,
+                date=day,
+                total_value=total_value,
+                total_cost=total_cost,
+            )
+        )
+        written += 1
+
+    db.commit()
+    return written
+
+
+def rollup_user(db: Session, user_id: UUID, through: date | None = None) -> int:
+    """
+    Compute daily values for one user for every day not yet stored.
+
+    Args:
+        user_id: User UUID
+        through: Last day to compute (defaults to yesterday, the last completed day)
+
+    Returns:
+        Number of daily rows written
+    """
+    through = through or date.today() - timedelta(days=1)
+    plan = _plan_rollup(db, user_id, through)
+    if plan is None:
+        return 0
+
+    ensure_price_history(db, plan.symbols(through), plan.start, through)
+    return _compute_rollup(db, plan, through)
+
+
+def rollup_all(db: Session, through: date | None = None) -> int:
+    """
+    Run the incremental rollup for every user with holdings or ledger entries.
+
+    Missing closes for all users are fetched up front in a single batched call.
+
+    Returns:
+        Total number of daily rows written
+    """
+    through = through or date.today() - timedelta(days=1)
+    user_ids = [
+        row[0]
+        for row in db.query(models.Holding.user_id)
+        .union(db.query(models.Transaction.user_id))
+        .all()
+    ]
+
+    plans = [plan for uid in user_ids if (plan := _plan_rollup(db, uid, through)) is not None]
+    if not plans:
+        logger.info("Daily rollup: nothing to compute")
+        return 0
+
+    symbols = sorted({s for plan in plans for s in plan.symbols(through)})
+    earliest = min(plan.start for plan in plans)
+    ensure_price_history(db, symbols, earliest, through)
+
+    written = sum(_compute_rollup(db, plan, through) for plan in plans)
+    logger.info(f"Daily rollup: wrote {written} rows for {len(plans)} users through {through}")
+    return written
+
+
+def get_daily_values(
+    db: Session, user_id: UUID, start: date, end: date
+) -> list[models.PortfolioDailyValue]:
+    """Read precomputed daily values for a user, ordered by date."""
+    return (
+        db.query(models.PortfolioDailyValue)
+        .filter(
+            models.PortfolioDailyValue.user_id == user_id,
+            models.PortfolioDailyValue.date >= start,
+            models.PortfolioDailyValue.date <= end,
+        )
+        .order_by(models.PortfolioDailyValue.date)
+        .all()
+    )
@@ -0,0 +1,353 @@
+"""Transaction ledger and holdings materialization.
+
+The ``transactions`` table is the source of truth. ``holdings`` is a materialized view
+of it that is updated incrementally as each transaction is recorded, so importing a
+long history never requires rebuilding positions from the full ledger. A transaction
+dated before the latest one already recorded for its symbol is the exception: cost
+basis is path-dependent, so that one symbol is replayed. ``rebuild_holdings`` replays
+the whole ledger in a single streaming pass for repair.
+
+Splits and dividends take effect at the start of their (ex-)date: they apply to the
+position held before it, so they sort before every other entry on the same date and
+a buy on the ex-date is never split.
+
+A position that falls to zero shares has no holding; its entries stay in the ledger,
+which ``position_timelines`` replays to value past days.
+"""
+
+import logging
+from bisect import bisect_right
+from collections.abc import Callable, Iterable
+from dataclasses import dataclass, field
+from datetime import UTC, date, datetime
+from decimal import Decimal
+from itertools import groupby
+from typing import Any
+from uuid import UUID
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.services.alerts_service import update_position_on_commit
+from app.services.history_service import invalidate_daily_values
+from app.services.popularity_service import (
+    record_position_change,
+    refresh_symbol_popularity,
+)
+
+logger = logging.getLogger(__name__)
+
+# Entry types applied at the start of their trade date, before other same-day entries
+START_OF_DAY_TYPES = ("split", "dividend")
+
+_LEDGER_ORDER = (
+    models.Transaction.trade_date,
+    case((models.Transaction.type.in_(START_OF_DAY_TYPES), 0), else_=1),
+    models.Transaction.created_at,
+    models.Transaction.id,
+)
+
+
+def _ledger_key(txn: Any) -> tuple[date, bool]:
+    """Position of an entry in the ledger, up to the order in which it was recorded."""
+    return txn.trade_date, txn.type not in START_OF_DAY_TYPES
+
+
+def _required(value: Decimal | None, field: str) -> Decimal:
+    if value is None:
+        raise ValueError(f"Transaction is missing {field}")
+    return value
+
+
+def apply_transaction(
+    shares: Decimal,
+    avg_cost: Decimal,
+    txn_type: str,
+    txn_shares: Decimal | None,
+    price: Decimal | None,
+    ratio: Decimal | None,
+) -> tuple[Decimal, Decimal]:
+    """
+    Apply one ledger entry to a position.
+
+    Args:
+        shares: Current shares
+        avg_cost: Current average cost per share
+        txn_type: buy, sell, dividend, split or adjustment
+        txn_shares: Shares bought/sold, or target shares for an adjustment
+        price: Trade price, dividend per share, or target average cost for an adjustment
+        ratio: New shares per old share for a split
+
+    Returns:
+        New (shares, avg_cost)
+
+    Raises:
+        ValueError: If a sell exceeds the shares held
+    """
+    if txn_type == "buy":
+        bought = _required(txn_shares, "shares")
+        total_shares = shares + bought
+        if total_shares == 0:
+            return total_shares, avg_cost
+        weighted_avg_cost = (
+            (shares * avg_cost) + (bought * _required(price, "price"))
+        ) / total_shares
+        return total_shares, weighted_avg_cost
+
+    if txn_type == "sell":
+        sold = _required(txn_shares, "shares")
+        if sold > shares:
+            raise ValueError(f"Cannot sell {sold} shares; only {shares} held")
+        return shares - sold, avg_cost
+
+    if txn_type == "split":
+        split_ratio = _required(ratio, "ratio")
+        return shares * split_ratio, avg_cost / split_ratio
+
+    if txn_type == "adjustment":
+        return _required(txn_shares, "shares"), _required(price, "price")
+
+    # Dividends are recorded for income reporting and do not change the position
+    return shares, avg_cost
+
+
+def _replay(transactions: Iterable[Any]) -> tuple[Decimal, Decimal]:
+    shares = Decimal(0)
+    avg_cost = Decimal(0)
+    for txn in transactions:
+        shares, avg_cost = apply_transaction(
+            shares, avg_cost, txn.type, txn.shares, txn.price, txn.ratio
+        )
+    return shares, avg_cost
+
+
+def position_on(db: Session, user_id: UUID, symbol: str, on_date: date) -> tuple[Decimal, Decimal]:
+    """Replay a user's ledger for one symbol up to and including ``on_date``."""
+    transactions = (
+        db.query(models.Transaction)
+        .filter(
+            models.Transaction.user_id == user_id,
+            models.Transaction.symbol == symbol,
+            models.Transaction.trade_date <= on_date,
+        )
+        .order_by(*_LEDGER_ORDER)
+        .all()
+    )
+    return _replay(transactions)
+
+
+@dataclass
+class PositionTimeline:
+    """A symbol's position at the end of each trade date in a user's ledger."""
+
+    dates: list[date] = field(default_factory=list)
+    shares: list[Decimal] = field(default_factory=list)
+    avg_costs: list[Decimal] = field(default_factory=list)
+
+    def on(self, day: date) -> tuple[Decimal, Decimal]:
+        """(shares, avg_cost) held at the end of ``day``; zero shares before the first entry."""
+        idx = bisect_right(self.dates, day) - 1
+        if idx < 0:
+            return Decimal(0), Decimal(0)
+        return self.shares[idx], self.avg_costs[idx]
+
+
+def position_timelines(db: Session, user_id: UUID) -> dict[str, PositionTimeline]:
+    """Replay a user's whole ledger into the position per symbol after each trade date."""
+    rows = (
+        db.query(
+            models.Transaction.symbol,
+            models.Transaction.type,
+            models.Transaction.trade_date,
+            models.Transaction.shares,
+            models.Transaction.price,
+            models.Transaction.ratio,
+        )
+        .filter(models.Transaction.user_id == user_id)
+        .order_by(models.Transaction.symbol, *_LEDGER_ORDER)
+    )
+
+    timelines: dict[str, PositionTimeline] = {}
+    for symbol, transactions in groupby(rows, key=lambda t: t.symbol):
+        timeline = timelines[symbol] = PositionTimeline()
+        shares = Decimal(0)
+        avg_cost = Decimal(0)
+        for txn in transactions:
+            shares, avg_cost = apply_transaction(
+                shares, avg_cost, txn.type, txn.shares, txn.price, txn.ratio
+            )
+            # Several entries on one day: keep the end-of-day position
+            if timeline.dates and timeline.dates[-1] == txn.trade_date:
+                timeline.shares[-1] = shares
+                timeline.avg_costs[-1] = avg_cost
+            else:
+                timeline.dates.append(txn.trade_date)
+                timeline.shares.append(shares)
+                timeline.avg_costs.append(avg_cost)
+    return timelines
+
+
+def _get_holding(db: Session, user_id: UUID, symbol: str) -> models.Holding | None:
+    return (
+        db.query(models.Holding)
+        .filter(models.Holding.user_id == user_id, models.Holding.symbol == symbol)
+        .first()
+    )
+
+
+def record_transaction(
+    db: Session,
+    user_id: UUID,
+    txn_data: schemas.TransactionCreate,
+    metadata_lookup: Callable[[str], tuple[str, str]],
+) -> tuple[models.Transaction, models.Holding | None]:
+    """
+    Append a transaction to the ledger and update the materialized holding.
+
+    A position left with zero shares has its holding deleted. The caller is
+    responsible for committing.
+
+    Args:
+        user_id: Owner of the transaction
+        txn_data: Transaction to record
+        metadata_lookup: Returns the display name and quote currency of a symbol; only
+            called when a new holding is created
+
+    Returns:
+        The recorded transaction and the updated holding (None if the position is closed)
+
+    Raises:
+        ValueError: If the transaction is not valid for the current position
+    """
+    symbol = txn_data.symbol.upper()
+    holding = _get_holding(db, user_id, symbol)
+    latest_trade_date = (
+        db.query(func.max(models.Transaction.trade_date))
+        .filter(models.Transaction.user_id == user_id, models.Transaction.symbol == symbol)
+        .scalar()
+    )
+
+    txn = models.Transaction(
+        user_id=user_id,
+        symbol=symbol,
+        type=txn_data.type,
+        trade_date=txn_data.trade_date,
+        shares=txn_data.shares,
+        price=txn_data.price,
+        ratio=txn_data.ratio,
+        created_at=datetime.now(UTC),
+    )
+
+    # Appending needs the entry to sort after every existing one; a split or dividend
+    # dated on the latest date goes before that date's other entries
+    if latest_trade_date is None or _ledger_key(txn) > (latest_trade_date, False):
+        # Fast path: apply on top of the current position
+        shares = holding.shares if holding else Decimal(0)
+        avg_cost = holding.avg_cost if holding else Decimal(0)
+        shares, avg_cost = apply_transaction(
+            shares, avg_cost, txn.type, txn.shares, txn.price, txn.ratio
+        )
+    else:
+        # Backdated entry: replay only this symbol's ledger with the entry in place
+        existing = (
+            db.query(models.Transaction)
+            .filter(models.Transaction.user_id == user_id, models.Transaction.symbol == symbol)
+            .order_by(*_LEDGER_ORDER)
+            .all()
+        )
+        idx = bisect_right([_ledger_key(t) for t in existing], _ledger_key(txn))
+        ordered = [*existing[:idx], txn, *existing[idx:]]
+        shares, avg_cost = _replay(ordered)
+        logger.info(f"Replayed {len(ordered)} transactions for backdated {symbol} entry")
+
+    db.add(txn)
+    record_position_change(db, symbol, holding.shares if holding else None, shares)
+
+    if shares == 0:
+        if holding is not None:
+            db.delete(holding)
+            holding = None
+    elif holding is None:
+        name, currency = metadata_lookup(symbol)
+        holding = models.Holding(
+            user_id=user_id,
+            symbol=symbol,
+            name=name,
+            currency=currency,
+            shares=shares,
+            avg_cost=avg_cost,
+        )
+        db.add(holding)
+    else:
+        holding.shares = shares
+        holding.avg_cost = avg_cost
+
+    invalidate_daily_values(db, user_id, txn.trade_date)
+    update_position_on_commit(db, user_id, symbol, avg_cost if shares > 0 else None)
+
+    return txn, holding
+
+
+def rebuild_holdings(
+    db: Session,
+    metadata_lookup: Callable[[str], tuple[str, str]],
+    user_id: UUID | None = None,
+    batch_size: int = 1000,
+) -> int:
+    """
+    Rebuild holdings by replaying the ledger in one streaming pass.
+
+    Transactions are read in (user, symbol, date) order with ``yield_per`` so only one
+    batch is held in memory regardless of ledger size. Holdings that have no ledger
+    entries are left untouched; positions that replay to zero shares have none.
+
+    Args:
+        metadata_lookup: Returns the display name and quote currency of a symbol; only
+            called when a missing holding is recreated
+        user_id: Limit the rebuild to one user (defaults to all users)
+        batch_size: Rows fetched per round trip
+
+    Returns:
+        Number of holdings written or deleted
+    """
+    query = db.query(models.Transaction)
+    if user_id is not None:
+        query = query.filter(models.Transaction.user_id == user_id)
+    query = query.order_by(models.Transaction.user_id, models.Transaction.symbol, *_LEDGER_ORDER)
+
+    written = 0
+    stream = query.execution_options(stream_results=True).yield_per(batch_size)
+    for (owner_id, symbol), transactions in groupby(stream, key=lambda t: (t.user_id, t.symbol)):
+        shares, avg_cost = _replay(transactions)
+
+        holding = _get_holding(db, owner_id, symbol)
+        if shares == 0:
+            if holding is None:
+                continue
+            db.delete(holding)
+        elif holding is None:
+            name, currency = metadata_lookup(symbol)
+            db.add(
+                models.Holding(
+                    user_id=owner_id,
+                    symbol=symbol,
+                    name=name,
+                    currency=currency,
+                    shares=shares,
+                    avg_cost=avg_cost,
+                )
+            )
+        else:
+            holding.shares = shares
+            holding.avg_cost = avg_cost
+
+        written += 1
+        if written % batch_size == 0:
+            db.flush()
+
+    # Positions may have changed arbitrarily; recompute popularity rather than diffing
+    refresh_symbol_popularity(db)
+    db.commit()
+    logger.info(f"Rebuilt {written} holdings from ledger")
+    return written
@@ -0,0 +1,259 @@
+"""US equity market calendar (NYSE).
+
+Sessions run 9:30-16:00 New York time on weekdays that are not exchange holidays,
+closing at 13:00 on early-close days (July 3, the day after Thanksgiving and
+Christmas Eve). Holidays follow the exchange's rules (weekend holidays observed on
+the Friday before or Monday after, except New Year's Day on a Saturday) plus
+``SPECIAL_CLOSURES``.
+
+Each year's sessions are computed once, on first use, into lookup tables: a map of
+day to session and the sorted session closes, so finding the current or next
+session is a bisect rather than a walk over days.
+
+Quote policy built on it:
+
+- while a session is open, quotes are cached for ``settings.quote_cache_ttl_seconds``,
+  and never past the close plus ``settings.market_close_settle_seconds`` (the time
+  closing prices take to settle);
+- a quote fetched after that is final for the day and cached until the next open,
+  so nights, weekends and holidays cost no upstream calls once a symbol is cached.
+
+Only US listings follow the calendar; foreign listings (``VOD.L``), FX pairs and
+crypto keep the plain TTL.
+"""
+
+import bisect
+import re
+import threading
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, time, timedelta
+from zoneinfo import ZoneInfo
+
+from app.config import settings
+
+EXCHANGE_TZ = ZoneInfo("America/New_York")
+REGULAR_OPEN = time(9, 30)
+REGULAR_CLOSE = time(16, 0)
+EARLY_CLOSE = time(13, 0)
+
+# Unscheduled closures outside the holiday rules
+SPECIAL_CLOSURES = {
+    date(2012, 10, 29): "Hurricane Sandy",
+    date(2012, 10, 30): "Hurricane Sandy",
+    date(2018, 12, 5): "National Day of Mourning for George H. W. Bush",
+    date(2025, 1, 9): "National Day of Mourning for Jimmy Carter",
+}
+
+# US listings: 1-5 letters with an optional share class (BRK-B), or an index (^GSPC)
+_US_SYMBOL = re.compile(r"\^?[A-Z]{1,5}(-[A-Z])?")
+
+MONDAY, THURSDAY, FRIDAY, SATURDAY, SUNDAY = 0, 3, 4, 5, 6
+
+
+@dataclass(frozen=True)
+class MarketSession:
+    day: date
+    open: datetime  # UTC
+    close: datetime  # UTC
+    early_close: bool = False
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """The ``n``-th ``weekday`` of the month (``n = -1``: the last one)."""
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _easter(year: int) -> date:
+    """Western Easter Sunday (anonymous Gregorian algorithm)."""
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    m = (32 + 2 * e + 2 * i - h - k) % 7
+    n = (a + 11 * h + 22 * m) // 451
+    month, day = divmod(h + m - 7 * n + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _observed(day: date) -> date:
+    """Weekend holidays close the exchange on the Friday before or the Monday after."""
+    if day.weekday() == SATURDAY:
+        return day - timedelta(days=1)
+    if day.weekday() == SUNDAY:
+        return day + timedelta(days=1)
+    return day
+
+
+def holidays(year: int) -> dict[date, str]:
+    """Weekdays the exchange is closed in ``year``, with the holiday's name."""
+    days = {
+        _nth_weekday(year, 1, MONDAY, 3): "Martin Luther King Jr. Day",
+        _nth_weekday(year, 2, MONDAY, 3): "Washington's Birthday",
+        _easter(year) - timedelta(days=2): "Good Friday",
+        _nth_weekday(year, 5, MONDAY, -1): "Memorial Day",
+        _observed(date(year, 7, 4)): "Independence Day",
+        _nth_weekday(year, 9, MONDAY, 1): "Labor Day",
+        _nth_weekday(year, 11, THURSDAY, 4): "Thanksgiving Day",
+        _observed(date(year, 12, 25)): "Christmas Day",
+    }
+    # New Year's Day on a Saturday is not observed (the Friday ends the year)
+    if date(year, 1, 1).weekday() != SATURDAY:
+        days[_observed(date(year, 1, 1))] = "New Year's Day"
+    if year >= 2022:
+        days[_observed(date(year, 6, 19))] = "Juneteenth"
+    days.update({day: name for day, name in SPECIAL_CLOSURES.items() if day.year == year})
+    return days
+
+
+def early_closes(year: int) -> set[date]:
+    """Sessions in ``year`` that close at 13:00."""
+    days = {_nth_weekday(year, 11, THURSDAY, 4) + timedelta(days=1)}
+    # Only when a weekday; on a Friday they are the observed holiday instead
+    for day in (date(year, 7, 3), date(year, 12, 24)):
+        if day.weekday() < FRIDAY:
+            days.add(day)
+    return days
+
+
+@dataclass(frozen=True)
+class _YearTable:
+    sessions: dict[date, MarketSession]
+    closes: list[datetime]  # session closes in order
+    days: list[date]  # session days, aligned with ``closes``
+
+
+def _utc(day: date, at: time) -> datetime:
+    return datetime.combine(day, at, tzinfo=EXCHANGE_TZ).astimezone(UTC)
+
+
+class MarketCalendar:
+    """Trading sessions, with per-year lookup tables built on first use."""
+
+    def __init__(self, settle_seconds: float):
+        self.settle = timedelta(seconds=settle_seconds)
+        self._years: dict[int, _YearTable] = {}
+        self._lock = threading.Lock()
+
+    def _table(self, year: int) -> _YearTable:
+        table = self._years.get(year)
+        if table is not None:
+            return table
+        closed = holidays(year)
+        early = early_closes(year)
+        sessions = {}
+        day = date(year, 1, 1)
+        while day.year == year:
+            if day.weekday() < SATURDAY and day not in closed:
+                close = EARLY_CLOSE if day in early else REGULAR_CLOSE
+                sessions[day] = MarketSession(
+                    day, _utc(day, REGULAR_OPEN), _utc(day, close), day in early
+                )
+            day += timedelta(days=1)
+        table = _YearTable(
+            sessions=sessions,
+            closes=[session.close for session in sessions.values()],
+            days=list(sessions),
+        )
+        with self._lock:
+            return self._years.setdefault(year, table)
+
+    def session(self, day: date) -> MarketSession | None:
+        """The session on ``day`` (None on weekends and holidays)."""
+        return self._table(day.year).sessions.get(day)
+
+    def next_session(self, at: datetime) -> MarketSession:
+        """The session in progress at ``at``, or else the next one to open."""
+        year = at.astimezone(EXCHANGE_TZ).year
+        while True:
+            table = self._table(year)
+            index = bisect.bisect_right(table.closes, at)
+            if index < len(table.days):
+                return table.sessions[table.days[index]]
+            year += 1
+
+    def previous_session(self, at: datetime) -> MarketSession:
+        """The last session closed at or before ``at``."""
+        year = at.astimezone(EXCHANGE_TZ).year
+        while True:
+            table = self._table(year)
+            index = bisect.bisect_right(table.closes, at)
+            if index > 0:
+                return table.sessions[table.days[index - 1]]
+            year -= 1
+
+    def trading_day(self, at: datetime) -> date:
+        """The session a price seen at ``at`` belongs to: the one in progress, or else the last."""
+        upcoming = self.next_session(at)
+        if upcoming.open <= at:
+            return upcoming.day
+        return self.previous_session(at).day
+
+    def is_open(self, at: datetime) -> bool:
+        return self.next_session(at).open <= at
+
+    def is_final(self, fetched_at: datetime, at: datetime) -> bool:
+        """Whether a quote fetched at ``fetched_at`` is still the final price at ``at``."""
+        settled = self.previous_session(at).close + self.settle
+        return fetched_at >= settled and not self.is_open(at)
+
+    def quote_ttl(self, fetched_at: datetime, default: float) -> float:
+        """
+        Seconds a quote fetched at ``fetched_at`` stays current.
+
+        Args:
+            fetched_at: When the quote was fetched
+            default: TTL while prices can change
+
+        Returns:
+            ``default``, cut short when closing prices settle so the final price is
+            fetched then; for a final quote, the time until the next open
+        """
+        settled = self.previous_session(fetched_at).close + self.settle
+        if fetched_at < settled:
+            return min(default, (settled - fetched_at).total_seconds())
+        upcoming = self.next_session(fetched_at)
+        if upcoming.open <= fetched_at:
+            settles = upcoming.close + self.settle
+            return min(default, (settles - fetched_at).total_seconds())
+        return (upcoming.open - fetched_at).total_seconds()
+
+
+market_calendar = MarketCalendar(settings.market_close_settle_seconds)
+
+
+def follows_calendar(symbol: str) -> bool:
+    """Whether ``symbol`` is a US listing whose quotes follow the market calendar."""
+    return settings.market_calendar_enabled and _US_SYMBOL.fullmatch(symbol) is not None
+
+
+def quote_ttl_seconds(symbol: str, fetched_at: datetime, default: float) -> float:
+    """Cache TTL for a quote of ``symbol`` fetched at ``fetched_at`` (see ``quote_ttl``)."""
+    if not follows_calendar(symbol):
+        return default
+    return market_calendar.quote_ttl(fetched_at, default)
+
+
+def is_quote_final(symbol: str, fetched_at: datetime, at: datetime) -> bool:
+    """Whether a quote of ``symbol`` fetched at ``fetched_at`` is final for the day at ``at``."""
+    return follows_calendar(symbol) and market_calendar.is_final(fetched_at, at)
+
+
+def trading_day(symbol: str, at: datetime) -> date:
+    """
+    Day whose close a price of ``symbol`` seen at ``at`` stands for.
+
+    US listings use the session in progress, or else the last one closed, so prices
+    seen at night, on weekends and on holidays count for the previous session. Other
+    listings (whose holidays are not known) use the UTC day, with weekends counting
+    for the Friday before.
+    """
+    if follows_calendar(symbol):
+        return market_calendar.trading_day(at)
+    day = at.astimezone(UTC).date()
+    return day - timedelta(days=max(0, day.weekday() - FRIDAY))
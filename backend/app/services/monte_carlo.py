@@ -0,0 +1,148 @@
+"""Monte Carlo path generation for portfolio projections.
+
+Daily log returns are drawn from a multivariate normal with the mean and
+covariance estimated from stored history (correlated through the Cholesky factor
+of the covariance), so each position's value follows a geometric Brownian motion.
+
+Paths are generated in chunks of ``settings.simulation_chunk_paths``, each from its
+own seed spawned from the run's seed. A chunk is independent of where it runs, so
+large runs split across a process pool give exactly the results of a serial run.
+Within a chunk, whole (paths x days x positions) blocks are drawn and accumulated
+at once, bounded to ``BLOCK_SIZE`` draws.
+
+This module only imports NumPy: pool workers are spawned fresh (forking a
+threaded server is unsafe) and import nothing else from the app.
+"""
+
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Normal draws per block (8 bytes each)
+BLOCK_SIZE = 2_000_000
+
+_pool: ProcessPoolExecutor | None = None
+_pool_lock = threading.Lock()
+
+
+def cholesky(covariance: np.ndarray) -> np.ndarray:
+    """
+    Lower Cholesky factor of a covariance matrix.
+
+    Sample covariances of collinear series (e.g. a stock and a fund holding it
+    over a short window) are only positive semi-definite; a small ridge is added
+    until the factorization succeeds.
+    """
+    size = covariance.shape[0]
+    ridge = 0.0
+    scale = float(np.trace(covariance)) / size if size else 0.0
+    for _ in range(10):
+        try:
+            return np.linalg.cholesky(covariance + ridge * np.eye(size))
+        except np.linalg.LinAlgError:
+            ridge = max(ridge * 10, scale * 1e-10, 1e-16)
+    raise np.linalg.LinAlgError("Covariance matrix is not positive semi-definite")
+
+
+def simulate_chunk(
+    values: np.ndarray,
+    mean: np.ndarray,
+    factor: np.ndarray,
+    checkpoints: np.ndarray,
+    paths: int,
+    seed: np.random.SeedSequence,
+) -> np.ndarray:
+    """
+    Simulate portfolio values at the checkpoint days for ``paths`` paths.
+
+    Args:
+        values: Current value per position, shape (n,)
+        mean: Mean daily log return per position, shape (n,)
+        factor: Lower Cholesky factor of the daily log return covariance, shape (n, n)
+        checkpoints: Increasing days (>= 1) to record, the last being the horizon
+        paths: Number of paths
+        seed: Seed of this chunk
+
+    Returns:
+        Portfolio value per path and checkpoint, shape (paths, len(checkpoints))
+    """
+    rng = np.random.default_rng(seed)
+    horizon = int(checkpoints[-1])
+    size = values.shape[0]
+    block = max(1, BLOCK_SIZE // (horizon * size))
+    out = np.empty((paths, checkpoints.shape[0]))
+    for start in range(0, paths, block):
+        count = min(block, paths - start)
+        draws = rng.standard_normal((count, horizon, size))
+        log_returns = draws @ factor.T
+        log_returns += mean
+        cumulative = np.cumsum(log_returns, axis=1)[:, checkpoints - 1, :]
+        out[start : start + count] = np.exp(cumulative) @ values
+    return out
+
+
+def _get_pool(workers: int) -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            logger.info(f"Started simulation process pool with {workers} workers")
+        return _pool
+
+
+def shutdown_pool() -> None:
+    """Stop the worker processes, if any were started."""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
+
+
+def simulate(
+    values: np.ndarray,
+    mean: np.ndarray,
+    covariance: np.ndarray,
+    checkpoints: np.ndarray,
+    paths: int,
+    seed: int,
+    chunk_paths: int,
+    workers: int = 0,
+) -> np.ndarray:
+    """
+    Simulate portfolio values at the checkpoint days, in chunks.
+
+    Args:
+        values: Current value per position, shape (n,)
+        mean: Mean daily log return per position, shape (n,)
+        covariance: Daily log return covariance, shape (n, n)
+        checkpoints: Increasing days (>= 1) to record, the last being the horizon
+        paths: Number of paths
+        seed: Seed of the run; the same seed and chunk size give the same paths
+        chunk_paths: Paths per chunk
+        workers: Processes to split the chunks across; 0 or 1 runs them in this thread
+
+    Returns:
+        Portfolio value per path and checkpoint, shape (paths, len(checkpoints))
+    """
+    factor = cholesky(covariance)
+    sizes = [min(chunk_paths, paths - start) for start in range(0, paths, chunk_paths)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    args = [
+        (values, mean, factor, checkpoints, size, chunk_seed)
+        for size, chunk_seed in zip(sizes, seeds, strict=True)
+    ]
+
+    if workers > 1 and len(sizes) > 1:
+        pool = _get_pool(workers)
+        chunks = list(pool.map(simulate_chunk, *zip(*args, strict=True)))
+    else:
+        chunks = [simulate_chunk(*chunk_args) for chunk_args in args]
+    return np.concatenate(chunks)
@@ -0,0 +1,151 @@
+"""Monthly range partitions for the time-series tables.
+
+On Postgres ``price_history`` and ``portfolio_daily_values`` (by ``date``) and
+``intraday_prices`` (by ``fetched_at``) are partitioned by month, one partition
+per month named ``<table>_pYYYYMM``. Queries bounded on the partition column only
+scan the months in range, and expired data is removed by dropping whole months.
+
+Partitions must exist before rows are inserted. Writers call ``ensure_partitions``
+for the range they are about to insert, including ``flush_snapshots`` for rows
+written with the current time, so inserts never depend on the retention job having
+run (it also creates partitions ``settings.partition_months_ahead`` months ahead).
+Partitions seen to exist are remembered per process, so the check costs a catalog
+query only when a month is not yet known.
+
+On other databases (SQLite in tests) the tables are plain: ``ensure_partitions``
+does nothing and ``drop_partitions_before`` drops nothing, leaving expired rows to
+an ordinary delete.
+"""
+
+import logging
+from collections.abc import Iterator
+from datetime import date
+
+from sqlalchemy import DateTime, text
+from sqlalchemy.orm import Session
+
+from app.database import Base
+
+logger = logging.getLogger(__name__)
+
+# Partitioned table -> partition column
+PARTITIONED_TABLES = {
+    "price_history": "date",
+    "portfolio_daily_values": "date",
+    "intraday_prices": "fetched_at",
+}
+
+
+# (table, month) of partitions seen in the catalog. Only months before the retention
+# cutoff are ever dropped, and nothing is inserted there after that.
+_known_partitions: set[tuple[str, date]] = set()
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def months(start: date, end: date) -> Iterator[date]:
+    """First day of every month from ``start``'s month through ``end``'s month."""
+    month = month_start(start)
+    while month <= end:
+        yield month
+        month = next_month(month)
+
+
+def partition_name(table: str, month: date) -> str:
+    return f"{table}_p{month:%Y%m}"
+
+
+def _bound(table: str, month: date) -> str:
+    column = Base.metadata.tables[table].c[PARTITIONED_TABLES[table]]
+    # Timestamp partitions split at UTC midnight, whatever the session time zone
+    return f"'{month} 00:00:00+00'" if isinstance(column.type, DateTime) else f"'{month}'"
+
+
+def _is_postgres(db: Session) -> bool:
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def existing_partitions(db: Session, table: str) -> dict[date, str]:
+    """Month -> partition name for the partitions of ``table`` (empty if not partitioned)."""
+    if not _is_postgres(db):
+        return {}
+    rows = db.execute(
+        text(
+            "SELECT child.relname FROM pg_inherits "
+            "JOIN pg_class parent ON parent.oid = pg_inherits.inhparent "
+            "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+            "WHERE parent.relname = :table"
+        ),
+        {"table": table},
+    )
+    prefix = f"{table}_p"
+    partitions = {}
+    for (name,) in rows:
+        suffix = name.removeprefix(prefix)
+        if name.startswith(prefix) and len(suffix) == 6 and suffix.isdigit():
+            partitions[date(int(suffix[:4]), int(suffix[4:]), 1)] = name
+    return partitions
+
+
+def ensure_partitions(db: Session, table: str, start: date, end: date) -> int:
+    """
+    Create the missing monthly partitions of ``table`` covering ``start`` to ``end``.
+
+    The DDL runs in the caller's transaction, so the caller commits (normally with
+    the rows the partitions are for).
+
+    Returns:
+        Number of partitions created
+    """
+    if not _is_postgres(db) or start > end:
+        return 0
+    wanted = list(months(start, end))
+    if all((table, month) in _known_partitions for month in wanted):
+        return 0
+
+    existing = existing_partitions(db, table)
+    # Partitions created below are only remembered once seen committed
+    _known_partitions.update((table, month) for month in existing)
+    created = 0
+    for month in wanted:
+        if month in existing:
+            continue
+        name = partition_name(table, month)
+        db.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {table} "
+                f"FOR VALUES FROM ({_bound(table, month)}) TO ({_bound(table, next_month(month))})"
+            )
+        )
+        created += 1
+    if created:
+        logger.info(f"Created {created} partitions of {table} for {start} to {end}")
+    return created
+
+
+def drop_partitions_before(db: Session, table: str, before: date) -> list[str]:
+    """
+    Drop the partitions of ``table`` holding only rows from before ``before``. Caller commits.
+
+    Rows before ``before`` in the month containing it are left for the caller to
+    delete; on databases without partitions that is every expired row.
+
+    Returns:
+        Names of the dropped partitions
+    """
+    dropped = []
+    for month, name in sorted(existing_partitions(db, table).items()):
+        if next_month(month) > before:
+            break
+        db.execute(text(f"DROP TABLE {name}"))
+        _known_partitions.discard((table, month))
+        dropped.append(name)
+    if dropped:
+        logger.info(f"Dropped {len(dropped)} partitions of {table} before {before}: {dropped}")
+    return dropped
@@ -0,0 +1,113 @@
+"""Cross-user symbol popularity.
+
+``symbol_popularity`` holds, per symbol, the number of users holding it and the
+total shares held. It is updated by delta on every holding change (one upsert per
+change), so readers such as the quote refresher never scan ``holdings``.
+``refresh_symbol_popularity`` recomputes it from scratch for repair.
+"""
+
+import logging
+from datetime import UTC, datetime
+from decimal import Decimal
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app import models
+
+logger = logging.getLogger(__name__)
+
+
+def _held(shares: Decimal | None) -> int:
+    return 1 if shares is not None and shares > 0 else 0
+
+
+def record_position_change(
+    db: Session, symbol: str, old_shares: Decimal | None, new_shares: Decimal | None
+) -> None:
+    """
+    Apply one holding change to the symbol's popularity. Caller commits.
+
+    Args:
+        symbol: Symbol of the changed holding
+        old_shares: Shares before the change (None if the holding is new)
+        new_shares: Shares after the change (None if the holding was deleted)
+    """
+    holders_delta = _held(new_shares) - _held(old_shares)
+    shares_delta = (new_shares or Decimal(0)) - (old_shares or Decimal(0))
+    if holders_delta == 0 and shares_delta == 0:
+        return
+
+    table = models.SymbolPopularity.__table__
+    values = {
+        "symbol": symbol,
+        "holders": holders_delta,
+        "total_shares": shares_delta,
+        "updated_at": datetime.now(UTC),
+    }
+
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        # Atomic increment; concurrent changes to the same symbol cannot lose updates
+        upsert = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(table)
+        stmt = upsert.values(**values).on_conflict_do_update(
+            index_elements=[table.c.symbol],
+            set_={
+                "holders": table.c.holders + upsert.excluded.holders,
+                "total_shares": table.c.total_shares + upsert.excluded.total_shares,
+                "updated_at": upsert.excluded.updated_at,
+            },
+        )
+        db.execute(stmt)
+        return
+
+    row = db.get(models.SymbolPopularity, symbol, with_for_update=True)
+    if row is None:
+        db.add(models.SymbolPopularity(**values))
+    else:
+        row.holders += holders_delta
+        row.total_shares += shares_delta
+
+
+def refresh_symbol_popularity(db: Session) -> int:
+    """
+    Recompute the whole table from ``holdings`` in one statement. Caller commits.
+
+    Returns:
+        Number of symbols with at least one holder
+    """
+    holding = models.Holding
+    aggregate = (
+        select(
+            holding.symbol,
+            func.count().label("holders"),
+            func.sum(holding.shares).label("total_shares"),
+            func.now().label("updated_at"),
+        )
+        .where(holding.shares > 0)
+        .group_by(holding.symbol)
+    )
+    table = models.SymbolPopularity.__table__
+    db.execute(delete(table))
+    db.execute(
+        insert(table).from_select(["symbol", "holders", "total_shares", "updated_at"], aggregate)
+    )
+    count: int = db.query(func.count()).select_from(table).scalar()
+    logger.info(f"Recomputed popularity for {count} symbols")
+    return count
+
+
+def get_popular_symbols(db: Session, limit: int) -> list[models.SymbolPopularity]:
+    """Most widely held symbols first (ties broken by total shares, then symbol)."""
+    return (
+        db.query(models.SymbolPopularity)
+        .filter(models.SymbolPopularity.holders > 0)
+        .order_by(
+            models.SymbolPopularity.holders.desc(),
+            models.SymbolPopularity.total_shares.desc(),
+            models.SymbolPopularity.symbol,
+        )
+        .limit(limit)
+        .all()
+    )
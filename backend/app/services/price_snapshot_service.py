@@ -0,0 +1,152 @@
+"""Last known prices, for serving the dashboard while the quote provider is down.
+
+Every quote stored in the quote cache is buffered here (``record_quote`` is a quote
+cache listener) and written to ``price_snapshots`` in one upsert by
+``flush_snapshots``, which the quote refresher and the dashboard call after fetching.
+When no fresh quote is available, ``with_last_known`` falls back to the expired
+cache entry and then to the stored snapshot, marking the quote stale with the time
+it was fetched.
+
+Each flush also appends the quotes to ``intraday_prices``, the intraday series that
+the retention job later compacts into daily closes (see ``retention_service``).
+"""
+
+import logging
+import threading
+from collections.abc import Mapping
+from datetime import UTC, datetime
+from decimal import Decimal
+from typing import Any
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app import models
+from app.metrics import STALE_QUOTES_SERVED
+from app.services.partition_service import ensure_partitions
+from app.services.quote_cache import quote_cache
+
+logger = logging.getLogger(__name__)
+
+# symbol -> (quote, fetched_at) stored since the last flush
+_pending: dict[str, tuple[dict[str, Any], datetime]] = {}
+_pending_lock = threading.Lock()
+
+
+def record_quote(symbol: str, quote: dict[str, Any]) -> None:
+    """Quote cache listener: keep the quote for the next ``flush_snapshots``."""
+    with _pending_lock:
+        _pending[symbol] = (quote, datetime.now(UTC))
+
+
+def flush_snapshots(db: Session) -> int:
+    """
+    Write quotes recorded since the last flush to ``price_snapshots`` and ``intraday_prices``.
+
+    Caller commits.
+
+    Returns:
+        Number of snapshots written
+    """
+    with _pending_lock:
+        pending = dict(_pending)
+        _pending.clear()
+    if not pending:
+        return 0
+
+    rows = [
+        {
+            "symbol": symbol,
+            "name": quote.get("name") or symbol,
+            "currency": quote.get("currency", "USD"),
+            "current_price": quote["current_price"],
+            "previous_close": quote["previous_close"],
+            "fetched_at": fetched_at,
+        }
+        for symbol, (quote, fetched_at) in pending.items()
+    ]
+
+    intraday = [
+        {"symbol": row["symbol"], "fetched_at": row["fetched_at"], "price": row["current_price"]}
+        for row in rows
+    ]
+
+    days = [row["fetched_at"].astimezone(UTC).date() for row in intraday]
+    ensure_partitions(db, "intraday_prices", min(days), max(days))
+
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+        table = models.PriceSnapshot.__table__
+        upsert = insert(table)
+        db.execute(
+            upsert.values(rows).on_conflict_do_update(
+                index_elements=[table.c.symbol],
+                set_={column: upsert.excluded[column] for column in rows[0] if column != "symbol"},
+                # Another worker may already have written a newer quote
+                where=table.c.fetched_at < upsert.excluded.fetched_at,
+            )
+        )
+        db.execute(insert(models.IntradayPrice.__table__).values(intraday).on_conflict_do_nothing())
+    else:
+        for row in rows:
+            db.merge(models.PriceSnapshot(**row))
+        db.add_all(models.IntradayPrice(**row) for row in intraday)
+    return len(rows)
+
+
+def _stale(quote: Mapping[str, Any], as_of: datetime) -> dict[str, Any]:
+    return {**quote, "as_of": as_of, "stale": True}
+
+
+def with_last_known(
+    db: Session, symbols: list[str], price_data: Mapping[str, dict[str, Any] | None]
+) -> dict[str, dict[str, Any] | None]:
+    """
+    Add ``as_of`` and ``stale`` to each quote, filling missing quotes with the last known one.
+
+    Args:
+        symbols: Symbols to return quotes for
+        price_data: Fresh quote per symbol (None if it could not be fetched in time)
+
+    Returns:
+        Quote per symbol with ``as_of`` (when it was fetched) and ``stale`` (True for
+        a last known quote), or None if the symbol has never been quoted
+    """
+    results: dict[str, dict[str, Any] | None] = {}
+    missing = []
+    for symbol in symbols:
+        quote = price_data.get(symbol)
+        entry = quote_cache.get(symbol)
+        if quote is not None:
+            as_of = entry.fetched_at if entry is not None else datetime.now(UTC)
+            results[symbol] = {**quote, "as_of": as_of, "stale": False}
+        elif entry is not None:
+            STALE_QUOTES_SERVED.labels("cache").inc()
+            results[symbol] = _stale(entry.quote, entry.fetched_at)
+        else:
+            missing.append(symbol)
+
+    if missing:
+        snapshots = db.query(models.PriceSnapshot).filter(models.PriceSnapshot.symbol.in_(missing))
+        for snapshot in snapshots:
+            previous_close = snapshot.previous_close
+            change = snapshot.current_price - previous_close
+            STALE_QUOTES_SERVED.labels("snapshot").inc()
+            results[str(snapshot.symbol)] = _stale(
+                {
+                    "current_price": snapshot.current_price,
+                    "previous_close": previous_close,
+                    "daily_change_pct": (
+                        change / previous_close * 100 if previous_close else Decimal(0)
+                    ),
+                    "name": snapshot.name,
+                    "currency": snapshot.currency,
+                },
+                snapshot.fetched_at,
+            )
+
+    stale = [s for s, quote in results.items() if quote is not None and quote["stale"]]
+    if stale:
+        logger.warning(f"Serving last known prices for {len(stale)} symbols: {stale}")
+    return {symbol: results.get(symbol) for symbol in symbols}
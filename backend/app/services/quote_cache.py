@@ -0,0 +1,116 @@
+"""In-process cache of latest stock quotes.
+
+Entries stay readable after they expire so callers can still inspect the last known
+quote; ``get_fresh`` only returns unexpired entries. Every stored quote gets a new
+version number, which lets derived results (e.g. heatmap layouts) be cached until one
+of their input quotes is refreshed. Listeners registered with ``add_listener`` are
+called with every stored quote (e.g. to evaluate price alerts).
+"""
+
+import logging
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import UTC, datetime
+from itertools import count
+from typing import Any
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+QuoteListener = Callable[[str, dict[str, Any]], None]
+
+
+@dataclass(frozen=True)
+class CachedQuote:
+    quote: dict[str, Any]
+    fetched_at: datetime
+    expires_at: float  # time.monotonic() deadline
+    version: int
+
+
+class QuoteCache:
+    """Thread-safe map of symbol to the most recently fetched quote."""
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._entries: dict[str, CachedQuote] = {}
+        self._versions = count(1)
+        self._listeners: list[QuoteListener] = []
+        self._lock = threading.Lock()
+
+    def add_listener(self, listener: QuoteListener) -> None:
+        """Call ``listener(symbol, quote)`` after every ``put``."""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def remove_listener(self, listener: QuoteListener) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def get_fresh(self, symbols: list[str]) -> tuple[dict[str, dict[str, Any]], list[str]]:
+        """
+        Split symbols into cached unexpired quotes and symbols that need fetching.
+
+        Returns:
+            (hits mapping symbol to quote, list of missing or expired symbols)
+        """
+        now = time.monotonic()
+        hits: dict[str, dict[str, Any]] = {}
+        misses: list[str] = []
+        with self._lock:
+            for symbol in symbols:
+                entry = self._entries.get(symbol)
+                if entry is not None and entry.expires_at > now:
+                    hits[symbol] = entry.quote
+                else:
+                    misses.append(symbol)
+        return hits, misses
+
+    def get(self, symbol: str) -> CachedQuote | None:
+        """Return the last stored quote for a symbol, even if it has expired."""
+        with self._lock:
+            return self._entries.get(symbol)
+
+    def put(self, symbol: str, quote: dict[str, Any], ttl_seconds: float | None = None) -> None:
+        """Store a freshly fetched quote under a new version."""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._entries[symbol] = CachedQuote(
+                quote=quote,
+                fetched_at=datetime.now(UTC),
+                expires_at=time.monotonic() + ttl,
+                version=next(self._versions),
+            )
+        for listener in self._listeners:
+            try:
+                listener(symbol, quote)
+            except Exception as e:
+                # A failing listener must not break quote fetching
+                logger.exception(f"Quote listener failed for {symbol}: {e}")
+
+    def due_for_refresh(self, symbols: list[str], within_seconds: float) -> list[str]:
+        """Symbols (in the given order) that are uncached or expire within ``within_seconds``."""
+        deadline = time.monotonic() + within_seconds
+        with self._lock:
+            return [
+                symbol
+                for symbol in symbols
+                if (entry := self._entries.get(symbol)) is None or entry.expires_at <= deadline
+            ]
+
+    def versions(self, symbols: list[str]) -> tuple[int, ...]:
+        """Current version per symbol (0 if never cached), in the given order."""
+        with self._lock:
+            return tuple(
+                entry.version if (entry := self._entries.get(symbol)) else 0 for symbol in symbols
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+quote_cache = QuoteCache(ttl_seconds=settings.quote_cache_ttl_seconds)
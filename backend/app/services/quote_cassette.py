@@ -0,0 +1,342 @@
+"""Record and replay quote provider responses.
+
+``RecordingProvider`` wraps a ``QuoteProvider`` and appends every call, with its
+result (or ``StockNotFoundError`` / ``StockAPIError``) and how long it took, to a
+cassette file. ``ReplayProvider`` serves a cassette offline with the recorded
+latencies, optionally scaled, so dashboard and load runs see the same upstream
+data and timing as the recorded session.
+
+Responses are recorded at the ``QuoteProvider`` boundary, after the provider has
+turned yfinance history frames and ticker info into quotes, closes and FX rates.
+That is everything the app consumes, and it is much smaller than the frames.
+
+Cassette format (MessagePack, Decimals and dates as extension types)::
+
+    MAGIC
+    record*    [key, latency seconds, outcome, payload] per call
+    index      {key: [[offset, length], ...]} in call order
+    footer     index offset (8 bytes, big endian) + MAGIC
+
+The replay provider memory-maps the file and only decodes the records it serves.
+A cassette whose recording was not closed has no index; it is rebuilt by scanning
+the records.
+
+Replay matching: the n-th call with a key gets the n-th recording of that key
+(the last one repeats). ``get_quotes`` and ``get_stock_price`` calls that were
+not recorded with the same arguments are assembled from the recordings of each
+symbol, so replay does not depend on cache timing batching symbols the same way.
+
+``get_daily_closes`` windows are computed back from the current day, so they are
+keyed, and their closes stored, in days before the day of the call. A replay on a
+later day then matches the same window back from its own day and gets the closes
+moved forward with it.
+
+Enable with ``QUOTE_CASSETTE_RECORD=path`` or ``QUOTE_CASSETTE_REPLAY=path`` (see
+``app.main``). Record with a single worker; each recording writes its own file.
+"""
+
+import logging
+import mmap
+import struct
+import threading
+import time
+from collections.abc import Callable
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from pathlib import Path
+from typing import Any
+
+import msgpack
+
+from app.services.stock_service import QuoteProvider, StockAPIError, StockNotFoundError
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"FQCASS02"
+_FOOTER = struct.Struct(">Q")
+
+_EXT_DECIMAL = 1
+_EXT_DATE = 2
+_EXT_DATETIME = 3
+
+_ERRORS: dict[str, type[Exception]] = {
+    "not_found": StockNotFoundError,
+    "api_error": StockAPIError,
+}
+
+
+def _encode(value: Any) -> msgpack.ExtType:
+    if isinstance(value, Decimal):
+        return msgpack.ExtType(_EXT_DECIMAL, str(value).encode())
+    if isinstance(value, datetime):
+        return msgpack.ExtType(_EXT_DATETIME, value.isoformat().encode())
+    if isinstance(value, date):
+        return msgpack.ExtType(_EXT_DATE, value.isoformat().encode())
+    raise TypeError(f"Cannot record {type(value).__name__}")
+
+
+def _decode(code: int, data: bytes) -> Any:
+    if code == _EXT_DECIMAL:
+        return Decimal(data.decode())
+    if code == _EXT_DATE:
+        return date.fromisoformat(data.decode())
+    if code == _EXT_DATETIME:
+        return datetime.fromisoformat(data.decode())
+    return msgpack.ExtType(code, data)
+
+
+def _unpack(data: bytes) -> Any:
+    # Daily closes are keyed by date
+    return msgpack.unpackb(data, ext_hook=_decode, strict_map_key=False)
+
+
+def call_key(method: str, *args: Any) -> str:
+    """Cassette key of a provider call; symbol lists are order-insensitive."""
+    parts = [method]
+    for arg in args:
+        if isinstance(arg, list):
+            parts.append(",".join(sorted(arg)))
+        else:
+            parts.append(str(arg))
+    return "|".join(parts)
+
+
+def _today() -> date:
+    return date.today()
+
+
+def history_key(symbols: list[str], start: date, end: date, today: date) -> str:
+    """Cassette key of a ``get_daily_closes`` call, with dates as days before ``today``."""
+    return call_key("get_daily_closes", symbols, (today - start).days, (today - end).days)
+
+
+def symbol_key(symbol: str) -> str:
+    """Index key of the recordings holding a quote for ``symbol``."""
+    return f"symbol|{symbol}"
+
+
+class RecordingProvider:
+    """Passes calls through to ``provider`` and appends each response to a cassette."""
+
+    def __init__(self, provider: QuoteProvider, path: str | Path):
+        self.provider = provider
+        self.path = Path(path)
+        self._file = self.path.open("wb")
+        self._file.write(MAGIC)
+        self._index: dict[str, list[list[int]]] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def _write(self, keys: list[str], latency: float, outcome: str, payload: Any) -> None:
+        record = msgpack.packb([keys[0], latency, outcome, payload], default=_encode)
+        with self._lock:
+            if self._file.closed:
+                return
+            offset = self._file.tell()
+            self._file.write(record)
+            for key in keys:
+                self._index.setdefault(key, []).append([offset, len(record)])
+            self.calls += 1
+
+    def _record(
+        self,
+        keys: list[str],
+        call: Callable[[], Any],
+        to_payload: Callable[[Any], Any] | None = None,
+    ) -> Any:
+        start = time.perf_counter()
+        try:
+            result = call()
+        except StockNotFoundError as e:
+            self._write(keys, time.perf_counter() - start, "not_found", str(e))
+            raise
+        except StockAPIError as e:
+            self._write(keys, time.perf_counter() - start, "api_error", str(e))
+            raise
+        payload = to_payload(result) if to_payload is not None else result
+        self._write(keys, time.perf_counter() - start, "ok", payload)
+        return result
+
+    def get_stock_price(self, symbol: str) -> dict[str, Any]:
+        keys = [call_key("get_stock_price", symbol), symbol_key(symbol)]
+        result: dict[str, Any] = self._record(keys, lambda: self.provider.get_stock_price(symbol))
+        return result
+
+    def get_quotes(self, symbols: list[str]) -> dict[str, dict[str, Any] | None]:
+        keys = [call_key("get_quotes", symbols), *(symbol_key(s) for s in symbols)]
+        result: dict[str, dict[str, Any] | None] = self._record(
+            keys, lambda: self.provider.get_quotes(symbols)
+        )
+        return result
+
+    def get_daily_closes(
+        self, symbols: list[str], start: date, end: date
+    ) -> dict[str, dict[date, Decimal]]:
+        today = _today()
+        result: dict[str, dict[date, Decimal]] = self._record(
+            [history_key(symbols, start, end, today)],
+            lambda: self.provider.get_daily_closes(symbols, start, end),
+            lambda closes: {
+                symbol: {(today - day).days: close for day, close in by_date.items()}
+                for symbol, by_date in closes.items()
+            },
+        )
+        return result
+
+    def get_fx_rates(self, currencies: list[str]) -> dict[str, Decimal]:
+        keys = [call_key("get_fx_rates", currencies)]
+        result: dict[str, Decimal] = self._record(
+            keys, lambda: self.provider.get_fx_rates(currencies)
+        )
+        return result
+
+    def close(self) -> None:
+        """Write the index and footer; later calls are passed through unrecorded."""
+        with self._lock:
+            if self._file.closed:
+                return
+            index_offset = self._file.tell()
+            self._file.write(msgpack.packb(self._index))
+            self._file.write(_FOOTER.pack(index_offset) + MAGIC)
+            self._file.close()
+        logger.info(f"Recorded {self.calls} provider calls to {self.path}")
+
+
+class ReplayProvider:
+    """Serves a cassette, sleeping ``latency_scale`` times each recorded latency."""
+
+    def __init__(self, path: str | Path, latency_scale: float = 1.0):
+        self.path = Path(path)
+        self.latency_scale = latency_scale
+        with self.path.open("rb") as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._data[: len(MAGIC)] != MAGIC:
+            raise ValueError(f"{self.path} is not a quote cassette")
+        self._index = self._read_index()
+        self._plays: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self.misses = 0
+
+    def _read_index(self) -> dict[str, list[list[int]]]:
+        tail = len(MAGIC) + _FOOTER.size
+        if len(self._data) >= 2 * len(MAGIC) + _FOOTER.size and self._data[-len(MAGIC) :] == MAGIC:
+            (index_offset,) = _FOOTER.unpack(self._data[-tail : -len(MAGIC)])
+            index: dict[str, list[list[int]]] = msgpack.unpackb(self._data[index_offset:-tail])
+            return index
+
+        logger.warning(f"{self.path} was not closed; rebuilding its index")
+        index = {}
+        unpacker = msgpack.Unpacker(ext_hook=_decode, strict_map_key=False)
+        unpacker.feed(self._data[len(MAGIC) :])
+        offset = len(MAGIC)
+        for key, _, _, payload in unpacker:
+            end = len(MAGIC) + unpacker.tell()
+            keys = [key]
+            if key.startswith("get_stock_price|"):
+                keys.append(symbol_key(key.split("|", 1)[1]))
+            elif key.startswith("get_quotes|") and isinstance(payload, dict):
+                keys.extend(symbol_key(symbol) for symbol in payload)
+            for k in keys:
+                index.setdefault(k, []).append([offset, end - offset])
+            offset = end
+        return index
+
+    def symbols(self) -> list[str]:
+        """Symbols with at least one recorded quote."""
+        prefix = symbol_key("")
+        return sorted(key.removeprefix(prefix) for key in self._index if key.startswith(prefix))
+
+    def _next(self, key: str) -> tuple[str, float, str, Any] | None:
+        """The next recording of ``key`` (the last one repeats), or None if never recorded."""
+        refs = self._index.get(key)
+        if not refs:
+            return None
+        with self._lock:
+            play = self._plays.get(key, 0)
+            self._plays[key] = play + 1
+        offset, length = refs[min(play, len(refs) - 1)]
+        record_key, latency, outcome, payload = _unpack(self._data[offset : offset + length])
+        return record_key, latency, outcome, payload
+
+    def _sleep(self, latency: float) -> None:
+        if self.latency_scale > 0 and latency > 0:
+            time.sleep(latency * self.latency_scale)
+
+    def _replay(self, key: str) -> Any:
+        record = self._next(key)
+        if record is None:
+            with self._lock:
+                self.misses += 1
+            raise StockAPIError(f"No recorded response for {key}")
+        _, latency, outcome, payload = record
+        self._sleep(latency)
+        if outcome != "ok":
+            raise _ERRORS[outcome](payload)
+        return payload
+
+    def _symbol_quote(self, symbol: str) -> tuple[float, str, Any]:
+        """(latency, outcome, quote or error message) of the next recording of ``symbol``."""
+        record = self._next(symbol_key(symbol))
+        if record is None:
+            with self._lock:
+                self.misses += 1
+            return 0.0, "not_found", f"No recorded quote for {symbol}"
+        key, latency, outcome, payload = record
+        if key.startswith("get_quotes|") and outcome == "ok":
+            quote = payload.get(symbol)
+            return latency, "ok" if quote else "not_found", quote
+        return latency, outcome, payload
+
+    def get_stock_price(self, symbol: str) -> dict[str, Any]:
+        key = call_key("get_stock_price", symbol)
+        if key in self._index:
+            result: dict[str, Any] = self._replay(key)
+            return result
+        latency, outcome, payload = self._symbol_quote(symbol)
+        self._sleep(latency)
+        if outcome == "ok":
+            return dict(payload)
+        if outcome == "not_found":
+            raise StockNotFoundError(f"Stock symbol '{symbol}' not found")
+        raise _ERRORS[outcome](payload)
+
+    def get_quotes(self, symbols: list[str]) -> dict[str, dict[str, Any] | None]:
+        key = call_key("get_quotes", symbols)
+        if key in self._index:
+            result: dict[str, dict[str, Any] | None] = self._replay(key)
+            return {symbol: result.get(symbol) for symbol in symbols}
+
+        # Assembled from per-symbol recordings; one upstream call takes the slowest latency
+        quotes: dict[str, dict[str, Any] | None] = {}
+        slowest = 0.0
+        failure = None
+        for symbol in symbols:
+            latency, outcome, payload = self._symbol_quote(symbol)
+            slowest = max(slowest, latency)
+            quotes[symbol] = payload if outcome == "ok" else None
+            if outcome == "api_error":
+                failure = payload
+        self._sleep(slowest)
+        if failure is not None:
+            # A recorded batch failure fails the whole call, as the download did
+            raise StockAPIError(failure)
+        return quotes
+
+    def get_daily_closes(
+        self, symbols: list[str], start: date, end: date
+    ) -> dict[str, dict[date, Decimal]]:
+        today = _today()
+        recorded: dict[str, dict[int, Decimal]] = self._replay(
+            history_key(symbols, start, end, today)
+        )
+        return {
+            symbol: {today - timedelta(days=days): close for days, close in by_days.items()}
+            for symbol, by_days in recorded.items()
+        }
+
+    def get_fx_rates(self, currencies: list[str]) -> dict[str, Decimal]:
+        result: dict[str, Decimal] = self._replay(call_key("get_fx_rates", currencies))
+        return result
+
+    def close(self) -> None:
+        self._data.close()
@@ -0,0 +1,104 @@
+"""Background quote refresher.
+
+Keeps the stored last known prices and FX rates fresh for the most widely held
+symbols. It runs in one process (see ``app.leader``) and warms only that
+process's quote cache; other workers serve these symbols from the stored prices
+when a live quote misses the dashboard deadline. Each cycle reads the top
+symbols from ``symbol_popularity`` (no scan of ``holdings``) and refreshes, most
+popular first, those whose cached quote is missing or about to expire. FX rates for the currencies of those quotes,
+and cached rates about to expire, are then refreshed with one batched call, and
+the refreshed quotes are stored as last known prices.
+
+Quotes that are final for the day (see ``market_calendar``) are not refreshed
+ahead of the next open: until the open they could only return the same close, so
+off-hours cycles make no quote calls for cached symbols.
+"""
+
+import logging
+import threading
+from collections.abc import Callable
+from datetime import UTC, datetime
+
+from sqlalchemy.orm import Session
+
+from app.services.fx_service import fx_cache, refresh_fx_rates
+from app.services.market_calendar import is_quote_final
+from app.services.popularity_service import get_popular_symbols
+from app.services.price_snapshot_service import flush_snapshots
+from app.services.quote_cache import quote_cache
+from app.services.stock_service import refresh_quotes
+
+logger = logging.getLogger(__name__)
+
+
+class QuoteRefresher:
+    def __init__(
+        self,
+        session_factory: Callable[[], Session],
+        interval_seconds: float,
+        batch_size: int,
+        refresh_ahead_seconds: float,
+    ):
+        self.session_factory = session_factory
+        self.interval_seconds = interval_seconds
+        self.batch_size = batch_size
+        self.refresh_ahead_seconds = refresh_ahead_seconds
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def plan(self, db: Session) -> list[str]:
+        """Symbols to refresh this cycle, most popular first."""
+        popular = [row.symbol for row in get_popular_symbols(db, self.batch_size)]
+        due = quote_cache.due_for_refresh(popular, self.refresh_ahead_seconds)
+        now = datetime.now(UTC)
+        return [
+            symbol
+            for symbol in due
+            if (entry := quote_cache.get(symbol)) is None
+            or not is_quote_final(symbol, entry.fetched_at, now)
+        ]
+
+    def run_once(self) -> int:
+        """
+        Run one refresh cycle.
+
+        Returns:
+            Number of symbols refreshed
+        """
+        db = self.session_factory()
+        try:
+            due = self.plan(db)
+            quotes = refresh_quotes(due) if due else {}
+            if due:
+                logger.info(f"Refreshed {len(due)} quotes")
+
+            seen = {quote["currency"] for quote in quotes.values() if quote and "currency" in quote}
+            currencies = fx_cache.due_for_refresh(
+                seen | set(fx_cache.currencies()), self.refresh_ahead_seconds
+            )
+            written = refresh_fx_rates(db, currencies)
+            if flush_snapshots(db) or written:
+                db.commit()
+        finally:
+            db.close()
+        return len(due)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                logger.exception(f"Quote refresh cycle failed: {e}")
+            self._stop.wait(self.interval_seconds)
+
+    def start(self) -> None:
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="quote-refresher", daemon=True)
+        self._thread.start()
+        logger.info(f"Quote refresher started (every {self.interval_seconds}s)")
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
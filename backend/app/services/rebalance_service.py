@@ -0,0 +1,296 @@
+"""Portfolio rebalancing to stored target allocations.
+
+Targets are weights (percent of holdings plus cash) per symbol; the rest of 100%
+is held as cash, and held symbols without a target have a target of 0. The
+trades are computed with NumPy over one array per field (shares, prices in the
+base currency, target weights), so the cost stays flat for portfolios with
+hundreds of positions.
+
+Prices come only from the quote cache, falling back to the last known price and
+then to the last stored daily close; FX rates only from the FX cache and stored
+rates. Nothing is fetched, so a rebalance never waits on the upstream. A holding
+that still cannot be valued fails the rebalance rather than being left out of
+the total the targets are weights of.
+"""
+
+import logging
+from decimal import Decimal
+from typing import Any
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy import and_, func
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.profiling import span
+from app.services.fx_service import cached_usd_rates, conversion_rates
+from app.services.price_snapshot_service import with_last_known
+from app.services.quote_cache import quote_cache
+
+logger = logging.getLogger(__name__)
+
+# Decimal places of fractional share trades
+SHARE_DECIMALS = 4
+
+
+class UnpricedHoldingsError(Exception):
+    """Raised when held symbols have no price (or FX rate) to value them at."""
+
+    def __init__(self, symbols: list[str]):
+        super().__init__(f"No price to value holdings: {symbols}")
+        self.symbols = symbols
+
+
+def rebalance_trades(
+    shares: np.ndarray,
+    prices: np.ndarray,
+    weights: np.ndarray,
+    cash: float,
+    whole_shares: bool = True,
+    allow_sells: bool = True,
+    tolerance: float = 0.0,
+) -> np.ndarray:
+    """
+    Compute the share change per position that brings it closest to its target.
+
+    Only positions whose weight is more than ``tolerance`` off target are traded.
+    Trades never spend more than the cash on hand plus the proceeds of sells.
+
+    With whole shares, buys and partial sells are rounded toward the current
+    position (so the target is not overshot), closing a position sells every
+    share, and cash left over beyond the cash target buys single shares of the
+    most underweight positions while that brings them closer to target.
+
+    Args:
+        shares: Held shares per position, shape (n,)
+        prices: Price per share in the base currency, shape (n,), all positive
+        weights: Target weight per position as a fraction, shape (n,), summing to <= 1
+        cash: Uninvested cash in the base currency
+        whole_shares: Trade whole shares only (except when closing a position)
+        allow_sells: Allow sells; otherwise only cash is invested
+        tolerance: Weight drift (fraction) left untraded
+
+    Returns:
+        Shares to buy (positive) or sell (negative) per position, shape (n,)
+    """
+    total = float(shares @ prices) + cash
+    if shares.size == 0 or total <= 0:
+        return np.zeros_like(shares)
+
+    current = shares * prices / total
+    outside = np.abs(current - weights) > tolerance
+    deltas = np.where(outside, weights * total / prices - shares, 0.0)
+
+    if not allow_sells:
+        deltas = np.maximum(deltas, 0.0)
+        cost = float(deltas @ prices)
+        if cost > cash:
+            deltas *= cash / cost
+
+    if not whole_shares:
+        scale = 10**SHARE_DECIMALS
+        trades: np.ndarray = np.trunc(deltas * scale) / scale
+        return trades
+
+    trades = np.trunc(deltas)
+    exits = (weights == 0) & (deltas < 0)
+    trades[exits] = -shares[exits]
+
+    # Sells rounded toward the position raise less cash than the buys were sized for:
+    # take one share off the buys furthest over target until the cash covers the rest
+    eps = 1e-9 * total
+    cash_after = cash - float(trades @ prices)
+    while cash_after < -eps and (trades > 0).any():
+        buys = np.flatnonzero(trades > 0)
+        excess = (shares[buys] + trades[buys]) * prices[buys] - weights[buys] * total
+        order = buys[np.argsort(-excess, kind="stable")]
+        count = int(np.searchsorted(np.cumsum(prices[order]), -cash_after - eps)) + 1
+        reduced = order[:count]
+        trades[reduced] -= 1
+        cash_after += float(prices[reduced].sum())
+
+    # Spend what is left above the cash target on single shares, most underweight first,
+    # where the share leaves the position closer to target
+    spendable = cash_after - max(total * (1 - float(weights.sum())), 0.0)
+    while True:
+        gap = weights * total - (shares + trades) * prices
+        candidates = np.flatnonzero(outside & (prices <= spendable + eps) & (gap >= prices / 2))
+        if candidates.size == 0:
+            break
+        order = candidates[np.argsort(-gap[candidates], kind="stable")]
+        # As many as the cash covers in that order, and at least the first
+        count = int(np.searchsorted(np.cumsum(prices[order]), spendable + eps, side="right"))
+        bought = order[: max(count, 1)]
+        trades[bought] += 1
+        spendable -= float(prices[bought].sum())
+
+    return trades
+
+
+def _decimal(value: float, places: int) -> Decimal:
+    return Decimal(str(round(float(value), places)))
+
+
+def _last_closes(db: Session, symbols: list[str]) -> dict[str, Decimal]:
+    """Latest stored daily close per symbol, for symbols with any."""
+    if not symbols:
+        return {}
+    latest = (
+        db.query(models.PriceHistory.symbol, func.max(models.PriceHistory.date).label("date"))
+        .filter(models.PriceHistory.symbol.in_(symbols))
+        .group_by(models.PriceHistory.symbol)
+        .subquery()
+    )
+    rows = db.query(models.PriceHistory.symbol, models.PriceHistory.close).join(
+        latest,
+        and_(
+            models.PriceHistory.symbol == latest.c.symbol,
+            models.PriceHistory.date == latest.c.date,
+        ),
+    )
+    return dict(rows.tuples().all())
+
+
+def get_targets(db: Session, user_id: UUID) -> list[models.TargetAllocation]:
+    """A user's target allocations, ordered by symbol."""
+    return (
+        db.query(models.TargetAllocation)
+        .filter(models.TargetAllocation.user_id == user_id)
+        .order_by(models.TargetAllocation.symbol)
+        .all()
+    )
+
+
+def replace_targets(db: Session, user_id: UUID, targets: list[schemas.TargetAllocation]) -> None:
+    """Replace a user's target allocations. Caller commits."""
+    db.query(models.TargetAllocation).filter(models.TargetAllocation.user_id == user_id).delete(
+        synchronize_session=False
+    )
+    db.add_all(
+        models.TargetAllocation(user_id=user_id, symbol=t.symbol, weight_pct=t.weight_pct)
+        for t in targets
+    )
+
+
+def build_rebalance(
+    db: Session, user_id: UUID, request: schemas.RebalanceRequest
+) -> schemas.Rebalance | None:
+    """
+    Compute the trades that rebalance a user's holdings to their target allocations.
+
+    Args:
+        db: Session to read holdings, targets and last known prices from
+        user_id: User to rebalance
+        request: Cash and trading constraints
+
+    Returns:
+        Trades and the resulting positions, or None if the user has neither
+        holdings nor targets
+
+    Raises:
+        UnpricedHoldingsError: If a held symbol has no price, or none in a currency
+            with an FX rate
+    """
+    holdings = (
+        db.query(models.Holding.symbol, models.Holding.currency, models.Holding.shares)
+        .filter(models.Holding.user_id == user_id)
+        .all()
+    )
+    targets: dict[str, Decimal] = {t.symbol: t.weight_pct for t in get_targets(db, user_id)}
+    if not holdings and not targets:
+        return None
+
+    held = {h.symbol: h for h in holdings}
+    symbols = sorted(held.keys() | targets.keys())
+    hits, _ = quote_cache.get_fresh(symbols)
+    price_data = with_last_known(db, symbols, hits)
+    # Holdings never quoted are valued at their last stored close, marked stale
+    closes = _last_closes(db, [s for s in held if price_data[s] is None])
+    for symbol, close in closes.items():
+        price_data[symbol] = {"current_price": close, "stale": True}
+
+    base_currency = (
+        db.query(models.User.base_currency).filter(models.User.id == user_id).scalar() or "USD"
+    )
+    currencies: dict[str, str] = {}
+    for symbol in symbols:
+        quote = price_data[symbol]
+        if symbol in held:
+            currencies[symbol] = held[symbol].currency
+        elif quote is not None:
+            currencies[symbol] = quote.get("currency", "USD")
+    fx_rates = conversion_rates(
+        cached_usd_rates(db, {*currencies.values(), base_currency}), base_currency
+    )
+
+    # Target symbols without a price, or whose currency cannot be converted, are left
+    # out; holdings must all be valued, as the targets are weights of their total
+    quotes: dict[str, dict[str, Any]] = {
+        s: q for s in symbols if (q := price_data[s]) is not None and currencies[s] in fx_rates
+    }
+    unvalued = [s for s in held if s not in quotes]
+    if unvalued:
+        raise UnpricedHoldingsError(sorted(unvalued))
+    priced = list(quotes)
+    unpriced = [s for s in symbols if s not in quotes]
+
+    local_prices = np.array([float(q["current_price"]) for q in quotes.values()])
+    rates = np.array([float(fx_rates[currencies[s]]) for s in priced])
+    prices = local_prices * rates
+    shares = np.array([float(held[s].shares) if s in held else 0.0 for s in priced])
+    weights = np.array([float(targets.get(s, 0)) / 100 for s in priced])
+    cash = float(request.cash)
+
+    with span("compute"):
+        valid = prices > 0
+        trades = np.zeros_like(shares)
+        trades[valid] = rebalance_trades(
+            shares[valid],
+            prices[valid],
+            weights[valid],
+            cash,
+            whole_shares=request.whole_shares,
+            allow_sells=request.allow_sells,
+            tolerance=float(request.tolerance_pct) / 100,
+        )
+        total = float(shares @ prices) + cash
+        after = shares + trades
+        cash_after = cash - float(trades @ prices)
+        scale = 100 / total if total > 0 else 0.0
+
+    result = schemas.Rebalance(
+        base_currency=base_currency,
+        total_value=_decimal(total, 2),
+        cash=request.cash,
+        cash_after=_decimal(cash_after, 2),
+        trades=[
+            schemas.RebalanceTrade(
+                symbol=priced[i],
+                action="buy" if trades[i] > 0 else "sell",
+                shares=_decimal(abs(trades[i]), SHARE_DECIMALS),
+                price=quotes[priced[i]]["current_price"],
+                currency=currencies[priced[i]],
+                value=_decimal(abs(trades[i]) * prices[i], 2),
+            )
+            for i in np.flatnonzero(trades)
+        ],
+        positions=[
+            schemas.RebalancePosition(
+                symbol=symbol,
+                shares=_decimal(shares[i], SHARE_DECIMALS),
+                shares_after=_decimal(after[i], SHARE_DECIMALS),
+                current_pct=_decimal(shares[i] * prices[i] * scale, 2),
+                target_pct=_decimal(weights[i] * 100, 2),
+                after_pct=_decimal(after[i] * prices[i] * scale, 2),
+            )
+            for i, symbol in enumerate(priced)
+        ],
+        unpriced=unpriced,
+        stale=any(q["stale"] for q in quotes.values()),
+    )
+    logger.info(
+        f"Rebalance for {len(priced)} positions: {len(result.trades)} trades, "
+        f"{len(unpriced)} unpriced"
+    )
+    return result
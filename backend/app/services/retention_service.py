@@ -0,0 +1,133 @@
+"""Retention for the time-series tables.
+
+Intraday quotes (``intraday_prices``) are kept for ``settings.intraday_retention_days``.
+Older days are compacted to one row per symbol and trading day (see
+``market_calendar.trading_day``: quotes seen at night, on weekends and on holidays
+count for the previous session), the day's last quote, stored as the close in
+``price_history`` unless a close is already stored there. Closes from the provider
+take precedence: a compacted close is replaced when the provider's is fetched (see
+``history_service.ensure_price_history``). The compacted rows are then removed, by
+dropping whole monthly partitions on Postgres and deleting the rest.
+
+Daily tables (``price_history``, ``portfolio_daily_values``) are kept indefinitely;
+their monthly partitions keep date-bounded reads fast as they grow.
+"""
+
+import logging
+from dataclasses import dataclass
+from datetime import UTC, date, datetime, time, timedelta
+from decimal import Decimal
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app import models
+from app.services.market_calendar import trading_day
+from app.services.partition_service import (
+    PARTITIONED_TABLES,
+    drop_partitions_before,
+    ensure_partitions,
+    next_month,
+)
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RetentionResult:
+    partitions_created: int = 0
+    closes_written: int = 0
+    partitions_dropped: int = 0
+    rows_deleted: int = 0
+
+
+def _aware(moment: datetime) -> datetime:
+    # SQLite returns naive datetimes, already in UTC
+    return moment if moment.tzinfo else moment.replace(tzinfo=UTC)
+
+
+def daily_closes_from_intraday(db: Session, before: date) -> dict[tuple[str, date], Decimal]:
+    """Last intraday price per symbol and trading day, for quotes from before ``before``."""
+    cutoff = datetime.combine(before, time(), tzinfo=UTC)
+    rows = (
+        db.query(
+            models.IntradayPrice.symbol, models.IntradayPrice.fetched_at, models.IntradayPrice.price
+        )
+        .filter(models.IntradayPrice.fetched_at < cutoff)
+        .order_by(models.IntradayPrice.symbol, models.IntradayPrice.fetched_at)
+        .yield_per(10_000)
+    )
+    # Ordered by time, so the last row seen for a day is its close
+    return {
+        (symbol, trading_day(symbol, _aware(fetched_at))): price
+        for symbol, fetched_at, price in rows
+    }
+
+
+def compact_intraday(db: Session, before: date) -> tuple[int, int, int]:
+    """
+    Compact intraday quotes from before ``before`` into daily closes. Caller commits.
+
+    Returns:
+        (closes written to ``price_history``, partitions dropped, rows deleted)
+    """
+    closes = daily_closes_from_intraday(db, before)
+    written = 0
+    if closes:
+        days = [day for _, day in closes]
+        ensure_partitions(db, "price_history", min(days), max(days))
+        rows = [
+            {"symbol": symbol, "date": day, "close": close}
+            for (symbol, day), close in closes.items()
+        ]
+        dialect = db.get_bind().dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            result = db.execute(
+                insert(models.PriceHistory.__table__).values(rows).on_conflict_do_nothing()
+            )
+            written = result.rowcount
+        else:
+            for row in rows:
+                if db.get(models.PriceHistory, (row["symbol"], row["date"])) is None:
+                    db.add(models.PriceHistory(**row))
+                    written += 1
+
+    dropped = drop_partitions_before(db, "intraday_prices", before)
+    deleted: int = (
+        db.query(models.IntradayPrice)
+        .filter(models.IntradayPrice.fetched_at < datetime.combine(before, time(), tzinfo=UTC))
+        .delete(synchronize_session=False)
+    )
+    logger.info(
+        f"Compacted intraday quotes before {before}: {written} closes written, "
+        f"{len(dropped)} partitions dropped, {deleted} rows deleted"
+    )
+    return written, len(dropped), deleted
+
+
+def apply_retention(
+    db: Session, today: date, intraday_retention_days: int, months_ahead: int
+) -> RetentionResult:
+    """
+    Create upcoming partitions and compact expired intraday quotes, then commit.
+
+    Args:
+        today: Current date; intraday days before ``today - intraday_retention_days``
+            are compacted
+        intraday_retention_days: Days of intraday quotes to keep
+        months_ahead: Months of partitions to create after the current one
+    """
+    result = RetentionResult()
+    horizon = today
+    for _ in range(months_ahead):
+        horizon = next_month(horizon)
+    for table in PARTITIONED_TABLES:
+        result.partitions_created += ensure_partitions(db, table, today, horizon)
+
+    before = today - timedelta(days=intraday_retention_days)
+    result.closes_written, result.partitions_dropped, result.rows_deleted = compact_intraday(
+        db, before
+    )
+    db.commit()
+    return result
@@ -0,0 +1,252 @@
+"""Monte Carlo projections and stress scenarios over a user's holdings.
+
+Mean and covariance of daily log returns are estimated with NumPy from stored
+closes (as for analytics), and position values come from the latest stored close
+converted to the base currency, so a simulation never waits on a live quote or a
+history fetch: closes are only read, as backfilled by the daily rollup job.
+Paths are generated by ``app.services.monte_carlo``, on a process pool for large
+runs. Runs drawing more than ``settings.simulation_max_draws`` normals (paths x
+horizon days x positions) are refused.
+
+A scenario shocks named symbols (held ones, or e.g. a sector ETF standing in for
+the sector, backfilled when listed in ``settings.price_history_extra_symbols``)
+and moves every other position by its expected co-move: the regression of its
+daily returns on the shocked symbols' returns.
+
+Results are cached per holdings version and request, so repeated views are free.
+"""
+
+import json
+import logging
+import os
+from datetime import date, timedelta
+from uuid import UUID
+
+import numpy as np
+from sqlalchemy.orm import Session
+
+from app import models, schemas
+from app.config import settings
+from app.profiling import span
+from app.services.analytics_service import (
+    InsufficientHistoryError,
+    holdings_fingerprint,
+    load_price_matrix,
+)
+from app.services.cache import TTLCache
+from app.services.fx_service import cached_usd_rates, conversion_rates
+from app.services.monte_carlo import simulate
+
+logger = logging.getLogger(__name__)
+
+# Trading days between the reported value bands (about a month)
+BAND_DAYS = 21
+
+PERCENTILES = [5, 25, 50, 75, 95]
+
+_simulation_cache: TTLCache[schemas.Simulation] = TTLCache(maxsize=1_000, ttl=24 * 60 * 60)
+
+
+class ScenarioSymbolError(Exception):
+    """Raised when a scenario shocks a symbol without stored price history."""
+
+    pass
+
+
+class SimulationTooLargeError(Exception):
+    """Raised when a run would draw more than ``settings.simulation_max_draws`` normals."""
+
+    pass
+
+
+def checkpoint_days(horizon_days: int) -> np.ndarray:
+    """Days at which value bands are reported: every ``BAND_DAYS`` and the horizon."""
+    return np.array(sorted({*range(BAND_DAYS, horizon_days, BAND_DAYS), horizon_days}))
+
+
+def scenario_returns(
+    covariance: np.ndarray, shocked: np.ndarray, shock_returns: np.ndarray
+) -> np.ndarray:
+    """
+    Log return of every series implied by shocks to some of them.
+
+    Unshocked series move by their expectation given the shocks under a zero-mean
+    normal model, ``cov[:, S] @ inv(cov[S, S]) @ r_S``; the pseudo-inverse keeps
+    this defined when shocked series are collinear.
+
+    Args:
+        covariance: Daily log return covariance, shape (n, n)
+        shocked: Indices of the shocked series, shape (k,)
+        shock_returns: Log return of each shocked series, shape (k,)
+
+    Returns:
+        Log return per series, shape (n,), equal to the shocks on shocked series
+    """
+    betas = covariance[:, shocked] @ np.linalg.pinv(covariance[np.ix_(shocked, shocked)])
+    returns: np.ndarray = betas @ shock_returns
+    returns[shocked] = shock_returns
+    return returns
+
+
+def _cache_key(
+    user_id: UUID,
+    as_of: date,
+    base_currency: str,
+    fingerprint: str,
+    request: schemas.SimulationRequest,
+) -> tuple:
+    params = json.dumps(request.model_dump(mode="json"), sort_keys=True)
+    return (user_id, as_of, base_currency, fingerprint, params)
+
+
+def _workers(paths: int) -> int:
+    if paths < settings.simulation_parallel_min_paths:
+        return 0
+    return settings.simulation_workers or os.cpu_count() or 1
+
+
+def get_simulation(
+    db: Session,
+    user_id: UUID,
+    request: schemas.SimulationRequest,
+    as_of: date | None = None,
+) -> schemas.Simulation | None:
+    """
+    Simulate (or return cached) projections and scenarios for a user's holdings.
+
+    Closes and FX rates are only read: closes as stored by the rollup job's
+    backfill, FX rates from the cache or stored rates.
+
+    Returns:
+        Value bands, risk measures at the horizon and scenario outcomes, or None if
+        the user has no holdings
+
+    Raises:
+        InsufficientHistoryError: If fewer than two aligned return observations exist
+        ScenarioSymbolError: If a scenario shocks a symbol without price history
+        SimulationTooLargeError: If the run would exceed ``settings.simulation_max_draws``
+    """
+    as_of = as_of or date.today()
+
+    holdings = (
+        db.query(models.Holding.symbol, models.Holding.shares, models.Holding.currency)
+        .filter(models.Holding.user_id == user_id, models.Holding.shares > 0)
+        .all()
+    )
+    if not holdings:
+        return None
+    base_currency = (
+        db.query(models.User.base_currency).filter(models.User.id == user_id).scalar() or "USD"
+    )
+
+    cache_key = _cache_key(user_id, as_of, base_currency, holdings_fingerprint(holdings), request)
+    cached = _simulation_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    start = as_of - timedelta(days=request.lookback_days)
+    held = {h.symbol: h for h in holdings}
+    shocked_symbols = {s for scenario in request.scenarios for s in scenario.shocks}
+    symbols = sorted(held.keys() | shocked_symbols)
+
+    fx_rates = conversion_rates(
+        cached_usd_rates(db, {*(h.currency for h in holdings), base_currency}), base_currency
+    )
+    closes = load_price_matrix(db, symbols, start, as_of).closes
+
+    # Leave out held symbols without history or an FX rate; shocked ones need history
+    has_data = ~np.all(np.isnan(closes), axis=0)
+    missing = {s for s, ok in zip(symbols, has_data, strict=True) if not ok}
+    if shocked_symbols & missing:
+        raise ScenarioSymbolError(
+            f"No price history for scenario symbols: {sorted(shocked_symbols & missing)}"
+        )
+    excluded = [s for s in sorted(held) if s in missing or held[s].currency not in fx_rates]
+    symbols = [s for s in symbols if s not in missing]
+    positions = [s for s in symbols if s in held and s not in excluded]
+    if not positions:
+        raise InsufficientHistoryError("Not enough price history to simulate")
+    draws = request.paths * request.horizon_days * len(positions)
+    if draws > settings.simulation_max_draws:
+        raise SimulationTooLargeError(
+            f"{request.paths} paths over {request.horizon_days} days for {len(positions)} "
+            f"positions exceed {settings.simulation_max_draws} draws; use fewer paths or days"
+        )
+
+    # Keep only days on which every remaining series has a price
+    closes = closes[:, np.flatnonzero(has_data)]
+    closes = closes[~np.isnan(closes).any(axis=1)]
+    if closes.shape[0] < 3:
+        raise InsufficientHistoryError("Not enough overlapping price history")
+
+    log_returns = np.diff(np.log(closes), axis=0)
+    covariance = np.atleast_2d(np.cov(log_returns, rowvar=False, ddof=1))
+    held_idx = np.array([symbols.index(s) for s in positions])
+    values = closes[-1, held_idx] * np.array(
+        [float(held[s].shares) * float(fx_rates[held[s].currency]) for s in positions]
+    )
+    current_value = float(values.sum())
+    checkpoints = checkpoint_days(request.horizon_days)
+
+    with span("compute"):
+        paths = simulate(
+            values,
+            log_returns[:, held_idx].mean(axis=0),
+            covariance[np.ix_(held_idx, held_idx)],
+            checkpoints,
+            request.paths,
+            request.seed,
+            settings.simulation_chunk_paths,
+            workers=_workers(request.paths),
+        )
+        bands = np.percentile(paths, PERCENTILES, axis=0)
+        final = paths[:, -1]
+        cutoff = bands[0, -1]
+        scenarios = []
+        for scenario in request.scenarios:
+            shocked = np.array([symbols.index(s) for s in scenario.shocks])
+            shocks = np.log1p(np.array([float(pct) / 100 for pct in scenario.shocks.values()]))
+            changes = np.expm1(scenario_returns(covariance, shocked, shocks)[held_idx])
+            scenarios.append(
+                schemas.ScenarioResult(
+                    name=scenario.name,
+                    value=float(values @ (1 + changes)),
+                    change_pct=float(values @ changes) / current_value * 100,
+                    position_changes_pct={
+                        s: round(float(c) * 100, 4) for s, c in zip(positions, changes, strict=True)
+                    },
+                )
+            )
+
+    result = schemas.Simulation(
+        as_of=as_of,
+        base_currency=base_currency,
+        lookback_days=request.lookback_days,
+        observations=int(log_returns.shape[0]),
+        paths=request.paths,
+        horizon_days=request.horizon_days,
+        seed=request.seed,
+        symbols=positions,
+        excluded=excluded,
+        current_value=current_value,
+        expected_value=float(final.mean()),
+        value_at_risk_95=current_value - float(cutoff),
+        expected_shortfall_95=current_value - float(final[final <= cutoff].mean()),
+        probability_of_loss=float((final < current_value).mean()),
+        bands=[
+            schemas.SimulationBand(
+                day=int(day),
+                mean=float(paths[:, i].mean()),
+                **{f"p{p}": float(bands[k, i]) for k, p in enumerate(PERCENTILES)},
+            )
+            for i, day in enumerate(checkpoints)
+        ],
+        scenarios=scenarios,
+    )
+
+    _simulation_cache.set(cache_key, result)
+    logger.info(
+        f"Simulated {request.paths} paths over {request.horizon_days} days for "
+        f"{len(positions)} positions with {len(scenarios)} scenarios"
+    )
+    return result
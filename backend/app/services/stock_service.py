@@ -9,18 +9,54 @@ Note:
     - Finnhub API
 
     The implementation handles errors gracefully and can be easily swapped
-    with another API provider.
+    with another API provider: quotes are fetched through a ``QuoteProvider``
+    (``YFinanceProvider`` by default), replaceable with ``set_provider()``.
+
+    yfinance (and pandas with it) is imported on first use rather than with this
+    module, since it makes up most of the app's import time. ``stock_service.yf``
+    still resolves (importing it), so it can be patched as before.
 """
 
 import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import UTC, date, datetime, timedelta
 from decimal import Decimal
-from typing import Any
-
-import yfinance as yf
+from types import ModuleType
+from typing import Any, Protocol
+
+from app.config import settings
+from app.metrics import (
+    QUOTE_CACHE_REQUESTS,
+    QUOTE_FETCH_BATCH_SIZE,
+    QUOTE_FETCH_DURATION,
+    QUOTE_FETCH_ERRORS,
+)
+from app.profiling import span
+from app.services.market_calendar import quote_ttl_seconds
+from app.services.quote_cache import quote_cache
 
 logger = logging.getLogger(__name__)
 
 
+def _yfinance() -> ModuleType:
+    """The yfinance module, imported on first call."""
+    module: ModuleType | None = globals().get("yf")
+    if module is None:
+        import yfinance
+
+        module = globals()["yf"] = yfinance
+    return module
+
+
+def __getattr__(name: str) -> Any:
+    # Module attribute ``yf`` before the first fetch, e.g. for patch("...stock_service.yf.Ticker")
+    if name == "yf":
+        return _yfinance()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 class StockServiceError(Exception):
     """Base exception for stock service errors."""
 
@@ -39,9 +75,316 @@ class StockAPIError(StockServiceError):
     pass
 
 
+class QuoteProvider(Protocol):
+    """Upstream source of quotes and daily closes."""
+
+    def get_stock_price(self, symbol: str) -> dict[str, Any]: ...
+
+    def get_quotes(self, symbols: list[str]) -> dict[str, dict[str, Any] | None]: ...
+
+    def get_daily_closes(
+        self, symbols: list[str], start: date, end: date
+    ) -> dict[str, dict[date, Decimal]]: ...
+
+    def get_fx_rates(self, currencies: list[str]) -> dict[str, Decimal]: ...
+
+
+# Concurrent ``Ticker.info`` lookups for symbols without known metadata
+METADATA_WORKERS = 8
+
+# Quote currencies reported in minor units: currency code -> (major code, units per major)
+MINOR_CURRENCIES = {"GBp": ("GBP", 100), "GBX": ("GBP", 100), "ZAc": ("ZAR", 100)}
+
+
+def to_major_units(price_raw: Any, currency: str, places: int) -> tuple[Decimal, str]:
+    """
+    Decimal price and ISO code in the major currency of a raw upstream price.
+
+    London and Johannesburg listings are quoted in pence / cents. Prices are rounded
+    to ``places`` in the quote unit and then divided exactly, so a minor-unit price
+    keeps its precision (1012.5 GBp is 10.125 GBP).
+    """
+    price = Decimal(str(round(price_raw, places)))
+    if currency in MINOR_CURRENCIES:
+        currency, units = MINOR_CURRENCIES[currency]
+        price /= units
+    return price, currency.upper()
+
+
+def _build_quote(
+    current_price_raw: Any, previous_close_raw: Any, name: str, currency: str
+) -> dict[str, Any]:
+    """Quote dict from raw closes, converting minor-unit listings to their major currency."""
+    current_price, quote_currency = to_major_units(current_price_raw, currency, 2)
+    previous_close, _ = to_major_units(previous_close_raw, currency, 2)
+
+    # Calculate daily change percentage
+    if previous_close > 0:
+        daily_change_pct = ((current_price - previous_close) / previous_close) * 100
+    else:
+        daily_change_pct = Decimal(0)
+
+    return {
+        "current_price": current_price,
+        "previous_close": previous_close,
+        "daily_change_pct": daily_change_pct,
+        "name": name,
+        "currency": quote_currency,
+    }
+
+
+class YFinanceProvider:
+    """Quotes from Yahoo Finance via yfinance."""
+
+    def __init__(self) -> None:
+        # symbol -> (name, quote currency) from ``Ticker.info``, which batch downloads lack
+        self._metadata: dict[str, tuple[str, str]] = {}
+        # symbol -> time.monotonic() after which a failed metadata lookup is retried
+        self._metadata_retry_at: dict[str, float] = {}
+
+    def get_stock_price(self, symbol: str) -> dict[str, Any]:
+        """
+        Fetch current stock price and related data from yfinance.
+
+        Args:
+            symbol: Stock symbol (e.g., "AAPL", "GOOGL")
+
+        Returns:
+            Dictionary containing:
+                - current_price: Current stock price
+                - previous_close: Previous day's closing price
+                - daily_change_pct: Daily change percentage
+                - name: Company name
+                - currency: ISO code of the quote currency
+
+        Raises:
+            StockNotFoundError: If symbol is invalid or not found
+            StockAPIError: If API request fails
+        """
+        try:
+            ticker = _yfinance().Ticker(symbol)
+
+            # Use history() instead of info for more reliable data
+            # Get the last 5 sessions, so a long weekend still leaves two bars
+            hist = ticker.history(period="5d")
+
+            if hist.empty or len(hist) < 1:
+                logger.warning(f"Stock symbol not found or no data: {symbol}")
+                raise StockNotFoundError(f"Stock symbol '{symbol}' not found")
+
+            # Get current price (latest close) and previous close
+            current_price_raw = hist["Close"].iloc[-1]
+            previous_close_raw = hist["Close"].iloc[-2] if len(hist) >= 2 else None
+
+            # Try to get company name and currency from info (fallback to symbol, USD)
+            try:
+                info = ticker.info
+                name = info.get("longName") or info.get("shortName") or symbol
+                currency = info.get("currency") or "USD"
+                if previous_close_raw is None:
+                    # One bar (e.g. a new listing): the day's open is not a previous close
+                    previous_close_raw = info.get("regularMarketPreviousClose") or info.get(
+                        "previousClose"
+                    )
+            except Exception:
+                # If info fails, just use symbol as name
+                name = symbol
+                currency = "USD"
+            else:
+                self._metadata[symbol] = (name, currency)
+
+            if previous_close_raw is None:
+                # No earlier close anywhere: report no change
+                previous_close_raw = current_price_raw
+
+            quote = _build_quote(current_price_raw, previous_close_raw, name, currency)
+            logger.info(f"Fetched price for {symbol}: ${quote['current_price']}")
+            return quote
+
+        except (StockNotFoundError, StockAPIError):
+            # Re-raise our custom exceptions
+            raise
+        except Exception as e:
+            logger.exception(f"Unexpected error fetching stock data for {symbol}: {e}")
+            raise StockAPIError(f"Failed to fetch data for '{symbol}': {str(e)}") from e
+
+    def _fetch_metadata(self, symbol: str) -> tuple[str, str] | None:
+        """Name and quote currency of a symbol from ``Ticker.info``; None if the lookup fails."""
+        try:
+            info = _yfinance().Ticker(symbol).info
+        except Exception as e:
+            logger.warning(f"Failed to fetch metadata for {symbol}: {e}")
+            self._metadata_retry_at[symbol] = (
+                time.monotonic() + settings.quote_metadata_retry_seconds
+            )
+            return None
+        metadata = (
+            info.get("longName") or info.get("shortName") or symbol,
+            info.get("currency") or "USD",
+        )
+        self._metadata[symbol] = metadata
+        return metadata
+
+    def _get_metadata(self, symbols: list[str]) -> dict[str, tuple[str, str]]:
+        """
+        Name and quote currency per symbol, looking up unknown symbols concurrently.
+
+        Symbols whose lookup failed are not looked up again for
+        ``settings.quote_metadata_retry_seconds``.
+        """
+        now = time.monotonic()
+        unknown = [
+            symbol
+            for symbol in symbols
+            if symbol not in self._metadata and self._metadata_retry_at.get(symbol, 0.0) <= now
+        ]
+        if unknown:
+            with ThreadPoolExecutor(max_workers=min(len(unknown), METADATA_WORKERS)) as pool:
+                list(pool.map(self._fetch_metadata, unknown))
+        return {symbol: self._metadata[symbol] for symbol in symbols if symbol in self._metadata}
+
+    def get_quotes(self, symbols: list[str]) -> dict[str, dict[str, Any] | None]:
+        """
+        Fetch quotes for all symbols with one ``yf.download`` call.
+
+        Names and currencies are not part of the download; they come from earlier
+        lookups of the same symbol, or are fetched with ``Ticker.info``. That costs one
+        extra upstream call per symbol the process has not seen, made concurrently
+        (``METADATA_WORKERS``) and only once per symbol. A symbol whose metadata cannot
+        be fetched has no quote rather than one in an assumed currency, and its lookup
+        is retried after ``settings.quote_metadata_retry_seconds``.
+
+        Returns:
+            Dictionary mapping symbol to quote (None for symbols without data)
+
+        Raises:
+            StockAPIError: If API request fails
+        """
+        results: dict[str, dict[str, Any] | None] = {symbol: None for symbol in symbols}
+        try:
+            data = _yfinance().download(symbols, period="5d", auto_adjust=False, progress=False)
+        except Exception as e:
+            logger.exception(f"Unexpected error fetching quotes for {symbols}: {e}")
+            raise StockAPIError(f"Failed to fetch quotes: {str(e)}") from e
+
+        if data is None or data.empty:
+            return results
+
+        closes = data["Close"]
+        if closes.ndim == 1:
+            closes = closes.to_frame(symbols[0])
+
+        priced = {}
+        for symbol in symbols:
+            if symbol not in closes.columns:
+                continue
+            series = closes[symbol].dropna()
+            if not series.empty:
+                priced[symbol] = series
+
+        metadata = self._get_metadata(list(priced))
+        for symbol, series in priced.items():
+            if symbol not in metadata:
+                continue
+            # One bar (e.g. a new listing) has no previous close: report no change
+            previous_close_raw = series.iloc[-2] if len(series) >= 2 else series.iloc[-1]
+            name, currency = metadata[symbol]
+            results[symbol] = _build_quote(series.iloc[-1], previous_close_raw, name, currency)
+
+        return results
+
+    def get_daily_closes(
+        self, symbols: list[str], start: date, end: date
+    ) -> dict[str, dict[date, Decimal]]:
+        """
+        Fetch daily closes for all symbols with one ``yf.download`` call.
+
+        Closes are in the major currency, as quotes are; symbols whose quote currency
+        cannot be looked up (see ``get_quotes``) get no closes.
+        """
+        results: dict[str, dict[date, Decimal]] = {symbol: {} for symbol in symbols}
+        try:
+            data = _yfinance().download(
+                symbols,
+                start=start.isoformat(),
+                end=(end + timedelta(days=1)).isoformat(),
+                auto_adjust=False,
+                progress=False,
+            )
+        except Exception as e:
+            logger.exception(f"Unexpected error fetching daily closes for {symbols}: {e}")
+            raise StockAPIError(f"Failed to fetch daily closes: {str(e)}") from e
+
+        if data is None or data.empty:
+            return results
+
+        closes = data["Close"]
+        if closes.ndim == 1:
+            closes = closes.to_frame(symbols[0])
+
+        metadata = self._get_metadata([s for s in symbols if s in closes.columns])
+        for symbol, (_, currency) in metadata.items():
+            for timestamp, close in closes[symbol].dropna().items():
+                results[symbol][timestamp.date()], _ = to_major_units(close, currency, 4)
+
+        return results
+
+    def get_fx_rates(self, currencies: list[str]) -> dict[str, Decimal]:
+        """Fetch the latest USD rate of each currency with one ``yf.download`` call."""
+        pairs = {f"{currency}USD=X": currency for currency in currencies}
+        try:
+            data = _yfinance().download(list(pairs), period="5d", auto_adjust=False, progress=False)
+        except Exception as e:
+            logger.exception(f"Unexpected error fetching FX rates for {currencies}: {e}")
+            raise StockAPIError(f"Failed to fetch FX rates: {str(e)}") from e
+
+        if data is None or data.empty:
+            return {}
+
+        closes = data["Close"]
+        if closes.ndim == 1:
+            closes = closes.to_frame(next(iter(pairs)))
+
+        rates: dict[str, Decimal] = {}
+        for pair, currency in pairs.items():
+            if pair not in closes.columns:
+                continue
+            series = closes[pair].dropna()
+            if not series.empty:
+                rates[currency] = Decimal(str(round(series.iloc[-1], 8)))
+        return rates
+
+
+_provider: QuoteProvider = YFinanceProvider()
+
+
+def get_provider() -> QuoteProvider:
+    """Return the active quote provider."""
+    return _provider
+
+
+def set_provider(provider: QuoteProvider | None) -> QuoteProvider:
+    """
+    Replace the quote provider (e.g. with a fake for benchmarks).
+
+    Args:
+        provider: New provider, or None to restore the yfinance default
+
+    Returns:
+        The previously active provider
+    """
+    global _provider
+    previous = _provider
+    _provider = provider if provider is not None else YFinanceProvider()
+    return previous
+
+
 def get_stock_price(symbol: str) -> dict[str, Any]:
     """
-    Fetch current stock price and related data from yfinance.
+    Fetch current stock price and related data from the active provider.
+
+    A fresh quote in the quote cache is returned without a fetch (so a final
+    quote serves every lookup until the next open); fetched quotes are cached.
 
     Args:
         symbol: Stock symbol (e.g., "AAPL", "GOOGL")
@@ -52,82 +395,206 @@ def get_stock_price(symbol: str) -> dict[str, Any]:
             - previous_close: Previous day's closing price
             - daily_change_pct: Daily change percentage
             - name: Company name
+            - currency: ISO code of the quote currency
 
     Raises:
         StockNotFoundError: If symbol is invalid or not found
         StockAPIError: If API request fails
     """
-    try:
-        ticker = yf.Ticker(symbol)
-
-        # Use history() instead of info for more reliable data
-        # Get last 2 days of data
-        hist = ticker.history(period="2d")
+    hits, _ = quote_cache.get_fresh([symbol])
+    cached = hits.get(symbol)
+    # A quote carrying the symbol as name had none in info; try the lookup again
+    if cached is not None and cached.get("name") != symbol:
+        QUOTE_CACHE_REQUESTS.labels("hit").inc()
+        return cached
+    QUOTE_CACHE_REQUESTS.labels("miss").inc()
+
+    quote = _provider.get_stock_price(symbol)
+    ttl = quote_ttl_seconds(symbol, datetime.now(UTC), quote_cache.ttl_seconds)
+    quote_cache.put(symbol, quote, ttl_seconds=ttl)
+    return quote
+
+
+# Fetches that callers wait on with a timeout; a late fetch finishes here and still
+# fills the cache. Symbols already being fetched join the pending fetch.
+_fetch_pool = ThreadPoolExecutor(
+    max_workers=settings.quote_fetch_workers, thread_name_prefix="quote-fetch"
+)
+_inflight: dict[str, Future] = {}
+_inflight_lock = threading.Lock()
+
+
+def _fetch_in_background(symbols: list[str]) -> dict[str, Future]:
+    """Future of a ``refresh_quotes`` result per symbol."""
+    with _inflight_lock:
+        futures = {s: future for s in symbols if (future := _inflight.get(s)) is not None}
+        new = [s for s in symbols if s not in futures]
+        if not new:
+            return futures
+        future = _fetch_pool.submit(refresh_quotes, new)
+        for symbol in new:
+            _inflight[symbol] = futures[symbol] = future
+
+    def done(finished: Future) -> None:
+        with _inflight_lock:
+            for symbol in new:
+                if _inflight.get(symbol) is finished:
+                    del _inflight[symbol]
+
+    # Outside the lock: runs immediately if the fetch has already finished
+    future.add_done_callback(done)
+    return futures
+
+
+def get_multiple_prices(
+    symbols: list[str], timeout: float | None = None
+) -> dict[str, dict[str, Any] | None]:
+    """
+    Fetch prices for multiple stocks (batch operation).
 
-        if hist.empty or len(hist) < 1:
-            logger.warning(f"Stock symbol not found or no data: {symbol}")
-            raise StockNotFoundError(f"Stock symbol '{symbol}' not found")
+    Quotes younger than ``settings.quote_cache_ttl_seconds`` (or, once the market has
+    closed, until the next open; see ``market_calendar``) are served from the
+    in-process quote cache; only the remaining symbols are fetched.
 
-        # Get current price (latest close) and previous close
-        current_price_raw = hist["Close"].iloc[-1]
+    Args:
+        symbols: List of stock symbols
+        timeout: Seconds to wait for the fetch; symbols not fetched by then map to
+            None (the fetch continues in the background and fills the cache).
+            None waits for the fetch to finish.
 
-        if len(hist) >= 2:
-            previous_close_raw = hist["Close"].iloc[-2]
+    Returns:
+        Dictionary mapping symbol to price data (or None if fetch failed)
+    """
+    hits, misses = quote_cache.get_fresh(symbols)
+    QUOTE_CACHE_REQUESTS.labels("hit").inc(len(hits))
+    QUOTE_CACHE_REQUESTS.labels("miss").inc(len(misses))
+
+    results: dict[str, dict[str, Any] | None] = dict(hits)
+    if not misses:
+        return results
+    if timeout is None:
+        results.update(refresh_quotes(misses))
+        return results
+
+    futures = _fetch_in_background(misses)
+    done, _ = wait(set(futures.values()), timeout=max(timeout, 0.0))
+    late = []
+    for symbol, future in futures.items():
+        if future in done and future.exception() is None:
+            results[symbol] = future.result().get(symbol)
         else:
-            # If only 1 day available, use open price as previous close
-            previous_close_raw = hist["Open"].iloc[-1]
+            late.append(symbol)
+            results[symbol] = None
+    if late:
+        logger.warning(f"No quotes within {timeout:.2f}s for {len(late)} symbols")
+        QUOTE_FETCH_ERRORS.labels("quotes", "timeout").inc(len(late))
+    return results
+
+
+def refresh_quotes(symbols: list[str]) -> dict[str, dict[str, Any] | None]:
+    """
+    Fetch quotes from the provider regardless of cache state and store them in the cache.
+
+    All symbols are fetched with a single batched provider call (which may also look
+    up names and currencies of symbols the provider has not seen before).
+
+    Args:
+        symbols: List of stock symbols
 
-        # Convert to Decimal for precision
-        current_price = Decimal(str(round(current_price_raw, 2)))
-        previous_close = Decimal(str(round(previous_close_raw, 2)))
+    Returns:
+        Dictionary mapping symbol to price data (or None if fetch failed)
+    """
+    if not symbols:
+        return {}
 
-        # Calculate daily change percentage
-        if previous_close > 0:
-            daily_change_pct = ((current_price - previous_close) / previous_close) * 100
+    start = time.perf_counter()
+    try:
+        with span("quotes"):
+            results = _provider.get_quotes(symbols)
+    except StockAPIError as e:
+        logger.warning(f"Failed to fetch prices for {len(symbols)} symbols: {e}")
+        QUOTE_FETCH_ERRORS.labels("quotes", "api_error").inc(len(symbols))
+        results = {}
+    finally:
+        QUOTE_FETCH_DURATION.labels("quotes").observe(time.perf_counter() - start)
+        QUOTE_FETCH_BATCH_SIZE.labels("quotes").observe(len(symbols))
+
+    fetched_at = datetime.now(UTC)
+    for symbol in symbols:
+        quote = results.get(symbol)
+        if quote is None:
+            if symbol in results:
+                logger.warning(f"No price data for {symbol}")
+                QUOTE_FETCH_ERRORS.labels("quotes", "not_found").inc()
+            results[symbol] = None
         else:
-            daily_change_pct = Decimal(0)
+            ttl = quote_ttl_seconds(symbol, fetched_at, quote_cache.ttl_seconds)
+            quote_cache.put(symbol, quote, ttl_seconds=ttl)
 
-        # Try to get company name from info (fallback to symbol)
-        try:
-            info = ticker.info
-            name = info.get("longName") or info.get("shortName") or symbol
-        except Exception:
-            # If info fails, just use symbol as name
-            name = symbol
-
-        logger.info(f"Fetched price for {symbol}: ${current_price}")
-
-        return {
-            "current_price": current_price,
-            "previous_close": previous_close,
-            "daily_change_pct": daily_change_pct,
-            "name": name,
-        }
-
-    except (StockNotFoundError, StockAPIError):
-        # Re-raise our custom exceptions
-        raise
-    except Exception as e:
-        logger.exception(f"Unexpected error fetching stock data for {symbol}: {e}")
-        raise StockAPIError(f"Failed to fetch data for '{symbol}': {str(e)}") from e
+    return results
 
 
-def get_multiple_prices(symbols: list[str]) -> dict[str, dict[str, Any] | None]:
+def get_daily_closes(symbols: list[str], start: date, end: date) -> dict[str, dict[date, Decimal]]:
     """
-    Fetch prices for multiple stocks (batch operation).
+    Fetch daily closing prices for multiple stocks in a single batched request.
 
     Args:
         symbols: List of stock symbols
+        start: First date to fetch (inclusive)
+        end: Last date to fetch (inclusive)
 
     Returns:
-        Dictionary mapping symbol to price data (or None if fetch failed)
+        Dictionary mapping symbol to {date: close}. Symbols without data map to an empty dict.
+
+    Raises:
+        StockAPIError: If API request fails
     """
-    results: dict[str, dict[str, Any] | None] = {}
-    for symbol in symbols:
-        try:
-            results[symbol] = get_stock_price(symbol)
-        except (StockNotFoundError, StockAPIError) as e:
-            logger.warning(f"Failed to fetch price for {symbol}: {e}")
-            results[symbol] = None
+    if not symbols or start > end:
+        return {symbol: {} for symbol in symbols}
+
+    fetch_start = time.perf_counter()
+    try:
+        with span("quotes"):
+            results = _provider.get_daily_closes(symbols, start, end)
+    except StockAPIError:
+        QUOTE_FETCH_ERRORS.labels("daily_closes", "api_error").inc(len(symbols))
+        raise
+    finally:
+        QUOTE_FETCH_DURATION.labels("daily_closes").observe(time.perf_counter() - fetch_start)
+        QUOTE_FETCH_BATCH_SIZE.labels("daily_closes").observe(len(symbols))
+
+    logger.info(f"Fetched daily closes for {len(symbols)} symbols from {start} to {end}")
 
     return results
+
+
+def fetch_fx_rates(currencies: list[str]) -> dict[str, Decimal]:
+    """
+    Fetch the USD value of one unit of each currency in a single batched request.
+
+    Args:
+        currencies: ISO currency codes (USD itself need not be included)
+
+    Returns:
+        Dictionary mapping currency to USD rate. Currencies without data are omitted.
+
+    Raises:
+        StockAPIError: If API request fails
+    """
+    if not currencies:
+        return {}
+
+    fetch_start = time.perf_counter()
+    try:
+        with span("quotes"):
+            rates = _provider.get_fx_rates(currencies)
+    except StockAPIError:
+        QUOTE_FETCH_ERRORS.labels("fx_rates", "api_error").inc(len(currencies))
+        raise
+    finally:
+        QUOTE_FETCH_DURATION.labels("fx_rates").observe(time.perf_counter() - fetch_start)
+        QUOTE_FETCH_BATCH_SIZE.labels("fx_rates").observe(len(currencies))
+
+    logger.info(f"Fetched FX rates for {len(rates)} of {len(currencies)} currencies")
+
+    return rates
@@ -0,0 +1,176 @@
+"""Micro-benchmarks for pure computation hot paths (pytest-benchmark).
+
+Covers the dashboard metric loop, the weighted average cost update, rebalancing,
+Monte Carlo path chunks, Dashboard schema construction and serialization, and JWT
+verification, at 10, 1k and 100k holdings where size matters (simulation at 10 and
+100 positions).
+
+Usage (from backend/):
+    pytest benchmarks/bench_hot_paths.py --benchmark-only \\
+        --benchmark-storage=benchmarks/results --benchmark-autosave
+    pytest-benchmark --storage benchmarks/results compare   # trend across saved runs
+
+``--benchmark-json=out.json`` writes a single run's results to a file instead.
+"""
+
+import json
+import time
+from datetime import UTC, datetime
+from decimal import Decimal
+from types import SimpleNamespace
+from typing import Any
+
+import numpy as np
+import pytest
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi.encoders import jsonable_encoder
+from jose import jwk, jwt
+
+from app import schemas
+from app.config import settings
+from app.serialization import MEDIA_JSON, _dump, encode
+from app.services.auth_service import auth_service
+from app.services.dashboard_service import build_dashboard
+from app.services.ledger_service import apply_transaction
+from app.services.monte_carlo import cholesky, simulate_chunk
+from app.services.rebalance_service import rebalance_trades
+
+SIZES = [10, 1_000, 100_000]
+
+
+def make_positions(count: int) -> tuple[list[Any], dict[str, dict[str, Any]]]:
+    """Synthetic holdings (attribute access like ORM rows) and one quote per symbol."""
+    holdings = []
+    prices: dict[str, dict[str, Any]] = {}
+    for i in range(count):
+        symbol = f"S{i:06d}"
+        holdings.append(
+            SimpleNamespace(
+                symbol=symbol,
+                shares=Decimal(f"{1 + i % 500}.25"),
+                avg_cost=Decimal(f"{10 + i % 300}.50"),
+            )
+        )
+        prices[symbol] = {
+            "current_price": Decimal(f"{12 + i % 310}.10"),
+            "previous_close": Decimal(f"{12 + i % 305}.90"),
+            "daily_change_pct": Decimal("1.25"),
+            "name": symbol,
+        }
+    return holdings, prices
+
+
+@pytest.fixture(params=SIZES, ids=lambda n: f"{n}-holdings")
+def positions(request):
+    return make_positions(request.param)
+
+
+@pytest.fixture(params=SIZES, ids=lambda n: f"{n}-holdings")
+def dashboard(request) -> schemas.Dashboard:
+    holdings, prices = make_positions(request.param)
+    result = build_dashboard(holdings, prices, last_updated=datetime.now(UTC))
+    assert result is not None
+    return result
+
+
+def test_dashboard_metric_loop(benchmark, positions):
+    holdings, prices = positions
+    result = benchmark(build_dashboard, holdings, prices)
+    assert result is not None and len(result.holdings) == len(holdings)
+
+
+def test_weighted_average_cost(benchmark, positions):
+    """One buy per holding applied to an existing position (the POST /holdings path)."""
+    holdings, prices = positions
+    trades = [(h.shares, h.avg_cost, prices[h.symbol]["current_price"]) for h in holdings]
+
+    def apply_all() -> None:
+        for shares, avg_cost, price in trades:
+            apply_transaction(shares, avg_cost, "buy", Decimal(10), price, None)
+
+    benchmark(apply_all)
+
+
+def test_rebalance_trades(benchmark, positions):
+    """Whole-share rebalance of every position to equal weights, with some cash."""
+    holdings, prices = positions
+    shares = np.array([float(h.shares) for h in holdings])
+    price_array = np.array([float(prices[h.symbol]["current_price"]) for h in holdings])
+    weights = np.full(len(holdings), 1 / len(holdings))
+    trades = benchmark(rebalance_trades, shares, price_array, weights, 10_000.0)
+    assert trades @ price_array <= 10_000.0 + 1e-9 * (shares @ price_array)
+
+
+@pytest.mark.parametrize("count", [10, 100], ids=lambda n: f"{n}-positions")
+def test_simulate_chunk(benchmark, count):
+    """One 1,000-path chunk over a year of correlated daily returns."""
+    rng = np.random.default_rng(0)
+    loadings = rng.normal(0, 0.01, size=(count, 3))
+    covariance = loadings @ loadings.T + np.diag(np.full(count, 1e-4))
+    checkpoints = np.arange(21, 253, 21)
+    values = np.full(count, 1_000.0)
+    mean = np.full(count, 3e-4)
+    seed = np.random.SeedSequence(0)
+    paths = benchmark(simulate_chunk, values, mean, cholesky(covariance), checkpoints, 1_000, seed)
+    assert paths.shape == (1_000, len(checkpoints))
+
+
+def test_dashboard_schema_construction(benchmark, dashboard):
+    payload = dashboard.model_dump()
+    benchmark(schemas.Dashboard.model_validate, payload)
+
+
+def test_dashboard_serialize_fastapi_default(benchmark, dashboard):
+    """What FastAPI does with a response_model return value."""
+    benchmark(lambda: json.dumps(jsonable_encoder(dashboard)).encode())
+
+
+def test_dashboard_serialize_orjson(benchmark, dashboard):
+    benchmark(lambda: encode(_dump(dashboard), MEDIA_JSON))
+
+
+@pytest.fixture(scope="module")
+def signed_token():
+    """RS256 token and matching JWKS shaped like Cognito's."""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+    )
+    public_jwk = jwk.construct(public_pem, "RS256").to_dict()
+    public_jwk["kid"] = "bench-key"
+    # Cognito publishes two keys; the matching one is second
+    other_jwk = {**public_jwk, "kid": "other-key"}
+
+    issuer = (
+        f"https://cognito-idp.{settings.aws_region}.amazonaws.com/{settings.cognito_user_pool_id}"
+    )
+    now = int(time.time())
+    token = jwt.encode(
+        {
+            "sub": "a12336b9-edcc-43fc-b564-ca1fe6897ebc",
+            "email": "bench@example.com",
+            "aud": settings.cognito_client_id,
+            "iss": issuer,
+            "iat": now,
+            "exp": now + 3600,
+        },
+        private_pem.decode(),
+        algorithm="RS256",
+        headers={"kid": "bench-key"},
+    )
+
+    previous = auth_service._jwks
+    auth_service._jwks = {"keys": [other_jwk, public_jwk]}
+    yield token
+    auth_service._jwks = previous
+
+
+def test_verify_token(benchmark, signed_token):
+    payload = benchmark(auth_service.verify_token, signed_token)
+    assert payload["email"] == "bench@example.com"
@@ -0,0 +1,197 @@
+"""Query count and latency of the holdings access paths.
+
+Compares full ORM hydration (``db.query(Holding)``) with the column-only selects
+used by GET /dashboard and GET /holdings, and counts the SQL statements each
+endpoint issues per request. Runs against a temporary SQLite file by default;
+pass ``--database-url`` to measure Postgres (where the plan of the covering
+index is also reported).
+
+Usage (from backend/):
+    python -m benchmarks.bench_queries [--holdings 1000] [--repeat 50]
+    python -m benchmarks.bench_queries --database-url postgresql://... --json
+"""
+
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import time
+from collections.abc import Callable
+from functools import partial
+from typing import Any
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app import models
+from app.database import Base, get_db
+from app.dependencies.auth import get_current_user
+from app.main import app
+from app.services.quote_cache import quote_cache
+from app.services.stock_service import set_provider
+from benchmarks.fake_provider import FakeQuoteProvider
+from benchmarks.seed import seed_users
+
+
+class StatementCounter:
+    """Count statements executed on an engine."""
+
+    def __init__(self, engine: Engine):
+        self.count = 0
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args: Any) -> None:
+        self.count += 1
+
+
+def _time(fn: Callable[[], Any], repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def bench_selects(session_factory: sessionmaker, user_id: Any, repeat: int) -> list[dict]:
+    holding = models.Holding
+
+    def orm_rows() -> None:
+        with session_factory() as db:
+            rows = db.query(holding).filter(holding.user_id == user_id).all()
+            [(h.symbol, h.shares, h.avg_cost) for h in rows]
+
+    def dashboard_columns() -> None:
+        with session_factory() as db:
+            db.query(holding.symbol, holding.shares, holding.avg_cost).filter(
+                holding.user_id == user_id
+            ).order_by(holding.symbol).all()
+
+    def list_columns() -> None:
+        with session_factory() as db:
+            db.query(*holding.__table__.columns).filter(holding.user_id == user_id).order_by(
+                holding.symbol
+            ).all()
+
+    return [
+        {"query": name, "median_ms": round(_time(fn, repeat), 3)}
+        for name, fn in (
+            ("orm-hydration", orm_rows),
+            ("dashboard-columns", dashboard_columns),
+            ("list-columns", list_columns),
+        )
+    ]
+
+
+def bench_endpoints(
+    session_factory: sessionmaker, counter: StatementCounter, user_id: Any, repeat: int
+) -> list[dict]:
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_user] = lambda: {
+        "sub": str(user_id),
+        "email": "bench-0-0@example.com",
+    }
+    previous = set_provider(FakeQuoteProvider())
+    quote_cache.clear()
+
+    results = []
+    try:
+        client = TestClient(app)
+        client.get("/dashboard")  # warm the quote cache
+        for path in ("/dashboard", "/holdings"):
+            before = counter.count
+            client.get(path)
+            statements = counter.count - before
+            latency = _time(partial(client.get, path), repeat)
+            results.append(
+                {"endpoint": path, "statements": statements, "median_ms": round(latency, 3)}
+            )
+    finally:
+        app.dependency_overrides.clear()
+        set_provider(previous)
+        quote_cache.clear()
+    return results
+
+
+def explain(db: Session, user_id: Any) -> str:
+    rows = db.execute(
+        text(
+            "EXPLAIN SELECT symbol, shares, avg_cost FROM holdings "
+            "WHERE user_id = :user_id ORDER BY symbol"
+        ),
+        {"user_id": user_id},
+    ).all()
+    return "\n".join(row[0] for row in rows)
+
+
+def run(database_url: str | None, holdings: int, repeat: int) -> dict[str, Any]:
+    tmpdir = None
+    if database_url is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        database_url = f"sqlite:///{os.path.join(tmpdir.name, 'queries.db')}"
+
+    connect_args = {"check_same_thread": False} if database_url.startswith("sqlite") else {}
+    engine = create_engine(database_url, connect_args=connect_args)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    try:
+        with session_factory() as db:
+            (user_id,) = seed_users(db, users=1, holdings_per_user=holdings, universe=holdings)
+            if engine.dialect.name == "postgresql":
+                db.execute(text("ANALYZE holdings"))
+                plan = explain(db, user_id)
+            else:
+                plan = None
+
+        counter = StatementCounter(engine)
+        return {
+            "dialect": engine.dialect.name,
+            "holdings": holdings,
+            "selects": bench_selects(session_factory, user_id, repeat),
+            "endpoints": bench_endpoints(session_factory, counter, user_id, repeat),
+            "dashboard_plan": plan,
+        }
+    finally:
+        Base.metadata.drop_all(bind=engine)
+        engine.dispose()
+        if tmpdir is not None:
+            tmpdir.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--database-url", help="Default: a temporary SQLite file")
+    parser.add_argument("--holdings", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.database_url, args.holdings, args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{results['dialect']}, {results['holdings']} holdings, median of {args.repeat} runs")
+    for r in results["selects"]:
+        print(f"  {r['query']:<20} {r['median_ms']:>10} ms")
+    for r in results["endpoints"]:
+        print(f"  GET {r['endpoint']:<16} {r['median_ms']:>10} ms  {r['statements']} statements")
+    if results["dashboard_plan"]:
+        print("Dashboard query plan:")
+        print(results["dashboard_plan"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Compare dashboard/holdings encode time and payload size per media type.
+
+Usage (from backend/):
+    python -m benchmarks.bench_serialization [--positions 1000] [--repeat 50]
+"""
+
+import argparse
+import gzip
+import json
+import statistics
+import time
+import uuid
+from collections.abc import Callable
+from datetime import UTC, datetime
+from decimal import Decimal
+
+from fastapi.encoders import jsonable_encoder
+
+from app import schemas
+from app.serialization import MEDIA_COLUMNAR, MEDIA_JSON, MEDIA_MSGPACK, _dump, encode
+
+
+def make_dashboard(positions: int) -> schemas.Dashboard:
+    holdings = [
+        schemas.DashboardHolding(
+            symbol=f"SYM{i:05d}",
+            shares=Decimal("12.50"),
+            avg_cost=Decimal("101.25"),
+            current_price=Decimal("110.40"),
+            previous_close=Decimal("109.10"),
+            daily_change_pct=Decimal("1.191567369385884509624197984"),
+            market_value=Decimal("1380.0000"),
+            pnl=Decimal("114.3750"),
+            pnl_pct=Decimal("9.037037037037037037037037037"),
+            allocation_pct=Decimal("0.1000000000000000000000000000"),
+        )
+        for i in range(positions)
+    ]
+    return schemas.Dashboard(
+        total_value=Decimal("1380000.00"),
+        total_cost=Decimal("1265625.00"),
+        total_pnl=Decimal("114375.00"),
+        total_pnl_pct=Decimal("9.04"),
+        last_updated=datetime.now(UTC),
+        holdings=holdings,
+    )
+
+
+def make_holdings(positions: int) -> list[schemas.Holding]:
+    now = datetime.now(UTC)
+    user_id = uuid.uuid4()
+    return [
+        schemas.Holding(
+            id=uuid.uuid4(),
+            user_id=user_id,
+            symbol=f"SYM{i:05d}",
+            name=f"Synthetic Company {i}",
+            shares=Decimal("12.50"),
+            avg_cost=Decimal("101.25"),
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(positions)
+    ]
+
+
+def _time(fn: Callable[[], bytes], repeat: int) -> tuple[float, bytes]:
+    timings = []
+    payload = b""
+    for _ in range(repeat):
+        start = time.perf_counter()
+        payload = fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000, payload
+
+
+def run(positions: int, repeat: int) -> list[dict[str, object]]:
+    results = []
+    for name, content in (
+        ("dashboard", make_dashboard(positions)),
+        ("holdings", make_holdings(positions)),
+    ):
+        encoders: dict[str, Callable[[], bytes]] = {
+            # What FastAPI does for a response_model return value
+            "fastapi-default": lambda c=content: json.dumps(jsonable_encoder(c)).encode(),
+            MEDIA_JSON: lambda c=content: encode(_dump(c), MEDIA_JSON),
+            MEDIA_COLUMNAR: lambda c=content: encode(_dump(c), MEDIA_COLUMNAR),
+            MEDIA_MSGPACK: lambda c=content: encode(_dump(c), MEDIA_MSGPACK),
+        }
+        for media_type, fn in encoders.items():
+            encode_ms, payload = _time(fn, repeat)
+            results.append(
+                {
+                    "payload": name,
+                    "format": media_type,
+                    "encode_ms": round(encode_ms, 3),
+                    "bytes": len(payload),
+                    "gzip_bytes": len(gzip.compress(payload)),
+                }
+            )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--positions", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = run(args.positions, args.repeat)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{args.positions} positions, median of {args.repeat} runs")
+    print(f"{'payload':<10} {'format':<40} {'encode ms':>10} {'bytes':>10} {'gzip':>8}")
+    for r in results:
+        print(
+            f"{r['payload']:<10} {r['format']:<40} {r['encode_ms']:>10} "
+            f"{r['bytes']:>10} {r['gzip_bytes']:>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
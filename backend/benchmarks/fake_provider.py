@@ -0,0 +1,115 @@
+"""Deterministic in-process quote provider for benchmarks.
+
+Prices are derived from the symbol (and date, for daily closes), so every run
+sees the same data. Upstream behaviour is simulated with configurable latency,
+jitter and error injection:
+
+- symbols starting with ``INVALID`` have no data (``StockNotFoundError`` when
+  fetched alone);
+- a seeded ``error_rate`` fraction of upstream calls raise ``StockAPIError``
+  (for ``get_quotes`` that fails the whole batch, as a failed download would).
+
+Install with ``app.services.stock_service.set_provider(FakeQuoteProvider(...))``.
+"""
+
+import random
+import threading
+import time
+import zlib
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Any
+
+from app.services.stock_service import StockAPIError, StockNotFoundError
+
+
+def _unit(*parts: object) -> float:
+    """Stable pseudo-random value in [0, 1) for the given key."""
+    return zlib.crc32(":".join(map(str, parts)).encode()) / 2**32
+
+
+class FakeQuoteProvider:
+    def __init__(
+        self,
+        latency_ms: float = 0.0,
+        jitter_ms: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.calls = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _simulate_upstream(self) -> bool:
+        """Sleep for one upstream round trip; return True if this call should fail."""
+        with self._lock:
+            self.calls += 1
+            jitter = self._rng.uniform(-self.jitter_ms, self.jitter_ms)
+            fail = self._rng.random() < self.error_rate
+        delay = max(self.latency_ms + jitter, 0.0) / 1000
+        if delay:
+            time.sleep(delay)
+        return fail
+
+    @staticmethod
+    def base_price(symbol: str) -> Decimal:
+        return Decimal(str(round(10 + 490 * _unit(symbol), 2)))
+
+    def _quote(self, symbol: str) -> dict[str, Any]:
+        current_price = self.base_price(symbol)
+        change = Decimal(str(round(_unit(symbol, "change") * 0.1 - 0.05, 4)))
+        previous_close = (current_price / (1 + change)).quantize(Decimal("0.01"))
+        return {
+            "current_price": current_price,
+            "previous_close": previous_close,
+            "daily_change_pct": (current_price - previous_close) / previous_close * 100,
+            "name": f"{symbol} Synthetic Inc.",
+            "currency": "USD",
+        }
+
+    def get_stock_price(self, symbol: str) -> dict[str, Any]:
+        fail = self._simulate_upstream()
+        if symbol.startswith("INVALID"):
+            raise StockNotFoundError(f"Stock symbol '{symbol}' not found")
+        if fail:
+            raise StockAPIError(f"Injected upstream failure for '{symbol}'")
+        return self._quote(symbol)
+
+    def get_quotes(self, symbols: list[str]) -> dict[str, dict[str, Any] | None]:
+        if self._simulate_upstream():
+            raise StockAPIError(f"Injected upstream failure for {len(symbols)} quotes")
+        return {
+            symbol: None if symbol.startswith("INVALID") else self._quote(symbol)
+            for symbol in symbols
+        }
+
+    def get_daily_closes(
+        self, symbols: list[str], start: date, end: date
+    ) -> dict[str, dict[date, Decimal]]:
+        if self._simulate_upstream():
+            raise StockAPIError("Injected upstream failure for daily closes")
+
+        results: dict[str, dict[date, Decimal]] = {symbol: {} for symbol in symbols}
+        for symbol in symbols:
+            if symbol.startswith("INVALID"):
+                continue
+            base = float(self.base_price(symbol))
+            day = start
+            while day <= end:
+                if day.weekday() < 5:
+                    # Bounded deterministic wobble around the base price
+                    factor = 1 + (_unit(symbol, day.toordinal()) - 0.5) * 0.1
+                    results[symbol][day] = Decimal(str(round(base * factor, 4)))
+                day += timedelta(days=1)
+        return results
+
+    def get_fx_rates(self, currencies: list[str]) -> dict[str, Decimal]:
+        if self._simulate_upstream():
+            raise StockAPIError("Injected upstream failure for FX rates")
+        return {
+            currency: Decimal(str(round(0.005 + 1.5 * _unit("fx", currency), 6)))
+            for currency in currencies
+        }
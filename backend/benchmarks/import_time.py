@@ -0,0 +1,85 @@
+"""Import-time budget for the API (``python -X importtime``).
+
+Imports ``app.main`` in fresh interpreters and reports the cumulative import time
+of the app (the fastest of ``--runs``), plus the slowest modules it pulls in. Exits
+non-zero when:
+
+- the import time exceeds ``--budget-ms``, or
+- one of ``DEFERRED_MODULES`` is imported; those are loaded on first use
+  (yfinance and pandas by the quote provider, boto3 by the auth client in the
+  app lifespan, requests for the JWKS download).
+
+The module check does not depend on the machine; the time budget leaves room for
+slower CI runners.
+
+Usage (from backend/):
+    python -m benchmarks.import_time [--runs 5] [--budget-ms 1500] [--top 15]
+"""
+
+import argparse
+import subprocess
+import sys
+
+DEFERRED_MODULES = ("yfinance", "pandas", "boto3", "requests")
+
+
+def measure(module: str) -> dict[str, tuple[int, int]]:
+    """
+    Import ``module`` in a fresh interpreter.
+
+    Returns:
+        (self us, cumulative us) per imported module
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    timings: dict[str, tuple[int, int]] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line.removeprefix("import time:").split("|")
+        if not self_us.strip().isdigit():
+            continue  # header line
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--runs", type=int, default=5, help="Report the fastest run")
+    parser.add_argument("--budget-ms", type=float, default=1500.0)
+    parser.add_argument("--top", type=int, default=15, help="Slowest modules to list")
+    args = parser.parse_args()
+
+    runs = [measure(args.module) for _ in range(args.runs)]
+    fastest = min(runs, key=lambda timings: timings[args.module][1])
+    total_ms = fastest[args.module][1] / 1000
+
+    print(f"import {args.module}: {total_ms:.0f} ms (fastest of {args.runs} runs)")
+    print("Slowest modules (self ms):")
+    for name, (self_us, _) in sorted(fastest.items(), key=lambda item: -item[1][0])[: args.top]:
+        print(f"  {self_us / 1000:8.1f}  {name}")
+
+    failures = []
+    if total_ms > args.budget_ms:
+        failures.append(f"import time {total_ms:.0f} ms exceeds budget {args.budget_ms:.0f} ms")
+    loaded = [name for name in DEFERRED_MODULES if name in fastest]
+    if loaded:
+        failures.append(f"deferred modules imported eagerly: {', '.join(loaded)}")
+
+    if failures:
+        print("Import budget exceeded:", file=sys.stderr)
+        for failure in failures:
+            print(f"  {failure}", file=sys.stderr)
+        sys.exit(1)
+    print(f"Within budget ({args.budget_ms:.0f} ms, no deferred modules imported)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+"""In-process load driver for the API with a regression gate.
+
+Runs the real FastAPI app over an ASGI transport against a seeded database and
+the deterministic ``FakeQuoteProvider``, so results measure this service (DB,
+compute, serialization, threadpool) rather than Yahoo Finance or Cognito.
+Authentication is replaced by a header naming one of the seeded users.
+
+With ``--cassette`` quotes are replayed from a recording of real provider
+responses instead (see ``app.services.quote_cassette``), with the recorded
+latencies scaled by ``--latency-scale``.
+
+Reports p50/p95/p99 latency and requests/sec per scenario. With ``--baseline``
+it exits non-zero when a scenario's p95 grows, or its throughput drops, by more
+than ``--tolerance`` relative to the stored baseline.
+
+Baselines are machine-specific: record one on the machine that runs the gate.
+
+Usage (from backend/):
+    python -m benchmarks.load [--duration 5] [--concurrency 16] [--latency-ms 20]
+    python -m benchmarks.load --save-baseline benchmarks/baselines/load.json
+    python -m benchmarks.load --baseline benchmarks/baselines/load.json --tolerance 0.25
+    python -m benchmarks.load --cassette quotes.cassette [--latency-scale 1.0]
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any
+from uuid import UUID
+
+import httpx
+from fastapi import Request
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base, get_db
+from app.dependencies.auth import get_current_user
+from app.main import app
+from app.replicas import get_read_db
+from app.services.quote_cache import quote_cache
+from app.services.quote_cassette import ReplayProvider
+from app.services.stock_service import set_provider
+from benchmarks.fake_provider import FakeQuoteProvider
+from benchmarks.seed import seed_users, symbol_universe
+
+USER_HEADER = "X-Bench-User"
+
+# Arguments that define the workload; a baseline only applies to the same workload
+WORKLOAD_PARAMS = (
+    "users",
+    "holdings",
+    "universe",
+    "scenarios",
+    "concurrency",
+    "duration",
+    "latency_ms",
+    "jitter_ms",
+    "error_rate",
+    "no_quote_cache",
+    "seed",
+    "cassette",
+    "latency_scale",
+)
+
+# Scenario name -> function building (method, path, json body) for a user
+RequestFactory = Callable[[UUID, random.Random], tuple[str, str, Any]]
+
+
+def _import_body(universe: list[str]) -> RequestFactory:
+    def build(user_id: UUID, rng: random.Random) -> tuple[str, str, Any]:
+        trade_date = date.today() - timedelta(days=1)
+        body = [
+            {
+                "symbol": symbol,
+                "type": "buy",
+                "trade_date": trade_date.isoformat(),
+                "shares": "1",
+                "price": "100",
+            }
+            for symbol in rng.sample(universe, 20)
+        ]
+        return "POST", "/transactions/import", body
+
+    return build
+
+
+def build_scenarios(universe: list[str]) -> dict[str, RequestFactory]:
+    return {
+        "dashboard": lambda user_id, rng: ("GET", "/dashboard", None),
+        "holdings": lambda user_id, rng: ("GET", "/holdings", None),
+        "import": _import_body(universe),
+    }
+
+
+def percentile(sorted_values: list[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(pct / 100 * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict[str, float]:
+    ordered = sorted(latencies)
+    return {
+        "requests": len(ordered),
+        "errors": errors,
+        "rps": round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 2) if ordered else 0.0,
+        "p50_ms": round(percentile(ordered, 50) * 1000, 2),
+        "p95_ms": round(percentile(ordered, 95) * 1000, 2),
+        "p99_ms": round(percentile(ordered, 99) * 1000, 2),
+    }
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    factory: RequestFactory,
+    user_ids: list[UUID],
+    concurrency: int,
+    duration: float,
+    seed: int,
+) -> dict[str, float]:
+    """Drive one scenario with ``concurrency`` closed-loop workers for ``duration`` seconds."""
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+    users = itertools.cycle(user_ids)
+
+    async def worker(worker_id: int) -> None:
+        nonlocal errors
+        rng = random.Random(seed * 1000 + worker_id)
+        while time.perf_counter() < deadline:
+            user_id = next(users)
+            method, path, body = factory(user_id, rng)
+            start = time.perf_counter()
+            response = await client.request(
+                method, path, json=body, headers={USER_HEADER: str(user_id)}
+            )
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    return summarize(latencies, errors, time.perf_counter() - start)
+
+
+def install_overrides(database_url: str) -> Callable[[], None]:
+    """Point the app at the benchmark database and header-based auth."""
+    # SQLite serializes writers; wait for the lock instead of failing under concurrency
+    connect_args: dict[str, Any] = (
+        {"check_same_thread": False, "timeout": 30} if database_url.startswith("sqlite") else {}
+    )
+    engine = create_engine(database_url, connect_args=connect_args)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    def override_get_current_user(request: Request) -> dict:
+        user_id = request.headers[USER_HEADER]
+        return {"sub": user_id, "email": f"{user_id}@example.com", "email_verified": True}
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
+    app.dependency_overrides[get_current_user] = override_get_current_user
+
+    def restore() -> None:
+        app.dependency_overrides.clear()
+        engine.dispose()
+
+    return restore
+
+
+async def run(args: argparse.Namespace) -> dict[str, dict[str, float]]:
+    database_url = args.database_url
+    tmpdir = None
+    if database_url is None:
+        tmpdir = tempfile.TemporaryDirectory()
+        database_url = f"sqlite:///{os.path.join(tmpdir.name, 'load.db')}"
+
+    engine = create_engine(database_url)
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    provider: FakeQuoteProvider | ReplayProvider
+    if args.cassette:
+        provider = ReplayProvider(args.cassette, latency_scale=args.latency_scale)
+        # Hold the recorded symbols, so quotes come from the cassette
+        universe = provider.symbols()
+    else:
+        universe = symbol_universe(args.universe)
+        provider = FakeQuoteProvider(
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            error_rate=args.error_rate,
+            seed=args.seed,
+        )
+
+    with sessionmaker(bind=engine)() as db:
+        user_ids = seed_users(
+            db, args.users, args.holdings, args.universe, args.seed, symbols=universe
+        )
+    engine.dispose()
+
+    previous_provider = set_provider(provider)
+    previous_ttl = quote_cache.ttl_seconds
+    if args.no_quote_cache:
+        quote_cache.ttl_seconds = 0
+    quote_cache.clear()
+    restore = install_overrides(database_url)
+
+    scenarios = build_scenarios(universe)
+    selected = args.scenarios.split(",") if args.scenarios else list(scenarios)
+
+    results: dict[str, dict[str, float]] = {}
+    try:
+        # App errors become 500 responses (counted as errors) instead of aborting the run
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name in selected:
+                results[name] = await run_scenario(
+                    client,
+                    scenarios[name],
+                    user_ids,
+                    args.concurrency,
+                    args.duration,
+                    args.seed,
+                )
+    finally:
+        restore()
+        set_provider(previous_provider)
+        quote_cache.ttl_seconds = previous_ttl
+        quote_cache.clear()
+        if tmpdir is not None:
+            tmpdir.cleanup()
+
+    return results
+
+
+def compare(
+    results: dict[str, dict[str, float]], baseline: dict[str, dict[str, float]], tolerance: float
+) -> list[str]:
+    """Return one message per regression beyond ``tolerance`` (a fraction, e.g. 0.25)."""
+    failures = []
+    for name, base in baseline.items():
+        current = results.get(name)
+        if current is None:
+            continue
+        if base["p95_ms"] and current["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            failures.append(f"{name}: p95 {current['p95_ms']}ms vs baseline {base['p95_ms']}ms")
+        if base["rps"] and current["rps"] < base["rps"] * (1 - tolerance):
+            failures.append(f"{name}: {current['rps']} req/s vs baseline {base['rps']} req/s")
+        if current["errors"] > base["errors"] and current["errors"] > 0.01 * current["requests"]:
+            failures.append(f"{name}: {current['errors']} errors vs baseline {base['errors']}")
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--database-url", help="Default: a temporary SQLite file")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--holdings", type=int, default=50, help="Holdings per user")
+    parser.add_argument("--universe", type=int, default=500, help="Distinct symbols")
+    parser.add_argument("--scenarios", help="Comma-separated: dashboard,holdings,import")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds per scenario")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Fake upstream latency")
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--cassette", help="Replay recorded quotes instead of the fake provider")
+    parser.add_argument(
+        "--latency-scale", type=float, default=1.0, help="Multiplier for recorded latencies"
+    )
+    parser.add_argument("--no-quote-cache", action="store_true", help="Fetch every quote")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    parser.add_argument("--save-baseline", type=Path)
+    parser.add_argument("--baseline", type=Path, help="Fail on regressions against this file")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        upstream = (
+            f"replayed from {args.cassette} at {args.latency_scale}x recorded latency"
+            if args.cassette
+            else f"{args.latency_ms}±{args.jitter_ms}ms"
+        )
+        print(
+            f"{args.users} users x {args.holdings} holdings, concurrency {args.concurrency}, "
+            f"{args.duration}s per scenario, upstream {upstream}"
+        )
+        print(
+            f"{'scenario':<10} {'requests':>9} {'errors':>7} {'req/s':>9} "
+            f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+        )
+        for name, r in results.items():
+            print(
+                f"{name:<10} {r['requests']:>9} {r['errors']:>7} {r['rps']:>9} "
+                f"{r['p50_ms']:>9} {r['p95_ms']:>9} {r['p99_ms']:>9}"
+            )
+
+    params = {name: getattr(args, name) for name in WORKLOAD_PARAMS}
+
+    if args.save_baseline:
+        args.save_baseline.parent.mkdir(parents=True, exist_ok=True)
+        baseline = {"params": params, "scenarios": results}
+        args.save_baseline.write_text(json.dumps(baseline, indent=2) + "\n")
+        print(f"Saved baseline to {args.save_baseline}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text())
+        if baseline["params"] != params:
+            print(
+                f"Workload differs from baseline: {params} vs {baseline['params']}",
+                file=sys.stderr,
+            )
+            sys.exit(2)
+        failures = compare(results, baseline["scenarios"], args.tolerance)
+        if failures:
+            print("Regressions against baseline:", file=sys.stderr)
+            for failure in failures:
+                print(f"  {failure}", file=sys.stderr)
+            sys.exit(1)
+        print(f"No regressions beyond {args.tolerance:.0%} of baseline")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Seed synthetic users, holdings and matching ledger entries.
+
+Symbols are drawn from a fixed universe (``S0000``, ``S0001``, ...) with a seeded
+RNG, so the same arguments always produce the same portfolios.
+
+Usage (from backend/):
+    python -m benchmarks.seed --database-url sqlite:///./bench.db [--users 20] [--holdings 50]
+"""
+
+import argparse
+import random
+import uuid
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+
+from app import models
+from app.database import Base
+
+
+def symbol_universe(size: int) -> list[str]:
+    return [f"S{i:04d}" for i in range(size)]
+
+
+def seed_users(
+    db: Session,
+    users: int,
+    holdings_per_user: int,
+    universe: int = 500,
+    seed: int = 0,
+    symbols: list[str] | None = None,
+) -> list[uuid.UUID]:
+    """
+    Insert users with holdings and one ``adjustment`` ledger entry per holding.
+
+    Args:
+        symbols: Symbols to draw holdings from (default: a synthetic universe of
+            ``universe`` symbols), e.g. those recorded in a quote cassette
+
+    Returns:
+        IDs of the created users
+    """
+    rng = random.Random(seed)
+    symbols = symbols or symbol_universe(universe)
+    now = datetime.now(UTC)
+    trade_date = date.today() - timedelta(days=30)
+
+    user_ids: list[uuid.UUID] = []
+    user_rows = []
+    holding_rows = []
+    transaction_rows = []
+    for i in range(users):
+        user_id = uuid.UUID(int=rng.getrandbits(128))
+        user_ids.append(user_id)
+        user_rows.append({"id": user_id, "email": f"bench-{seed}-{i}@example.com"})
+
+        for symbol in rng.sample(symbols, min(holdings_per_user, len(symbols))):
+            shares = Decimal(rng.randint(1, 500))
+            avg_cost = Decimal(str(round(rng.uniform(10, 500), 2)))
+            holding_rows.append(
+                {
+                    "id": uuid.uuid4(),
+                    "user_id": user_id,
+                    "symbol": symbol,
+                    "name": f"{symbol} Synthetic Inc.",
+                    "shares": shares,
+                    "avg_cost": avg_cost,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+            )
+            transaction_rows.append(
+                {
+                    "id": uuid.uuid4(),
+                    "user_id": user_id,
+                    "symbol": symbol,
+                    "type": "adjustment",
+                    "trade_date": trade_date,
+                    "shares": shares,
+                    "price": avg_cost,
+                    "created_at": now,
+                }
+            )
+
+    db.execute(insert(models.User), user_rows)
+    if holding_rows:
+        db.execute(insert(models.Holding), holding_rows)
+        db.execute(insert(models.Transaction), transaction_rows)
+    db.commit()
+
+    return user_ids
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--database-url", required=True)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--holdings", type=int, default=50)
+    parser.add_argument("--universe", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    engine = create_engine(args.database_url)
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        user_ids = seed_users(db, args.users, args.holdings, args.universe, args.seed)
+
+    print(f"Seeded {len(user_ids)} users with {args.holdings} holdings each")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,28 @@
+"""The API configured for benchmarking under ``app.server``.
+
+Same wiring as ``benchmarks.load`` (benchmark database, header-based auth and the
+``FakeQuoteProvider``), but importable by path so each gunicorn worker gets it:
+
+    SERVER_APP=benchmarks.server_app:app BENCH_DATABASE_URL=sqlite:///./bench.db \\
+        python -m app.server
+
+Environment: ``BENCH_DATABASE_URL`` (required), ``BENCH_LATENCY_MS`` and
+``BENCH_JITTER_MS`` (fake upstream latency, default 20 and 5).
+"""
+
+import os
+
+from app.main import app
+from app.services.stock_service import set_provider
+from benchmarks.fake_provider import FakeQuoteProvider
+from benchmarks.load import install_overrides
+
+install_overrides(os.environ["BENCH_DATABASE_URL"])
+set_provider(
+    FakeQuoteProvider(
+        latency_ms=float(os.environ.get("BENCH_LATENCY_MS", "20")),
+        jitter_ms=float(os.environ.get("BENCH_JITTER_MS", "5")),
+    )
+)
+
+__all__ = ["app"]
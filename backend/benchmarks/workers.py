@@ -0,0 +1,142 @@
+"""Throughput of the production server (``app.server``) by worker count.
+
+Seeds a temporary database, then for each ``--workers`` value starts
+``python -m app.server`` with ``benchmarks.server_app`` (fake upstream, header
+auth), drives it over real HTTP with the closed-loop driver from
+``benchmarks.load``, and stops it with SIGTERM (the graceful shutdown path).
+
+Reports requests/sec and latency per worker count, and the speedup over the
+first count. Scaling is bounded by the CPUs available and, on SQLite, by its
+single writer; use ``--database-url`` with Postgres for representative numbers.
+
+Usage (from backend/):
+    python -m benchmarks.workers [--workers 1,2,4] [--scenario dashboard] [--duration 10]
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from uuid import UUID
+
+import httpx
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from benchmarks.load import build_scenarios, run_scenario
+from benchmarks.seed import seed_users, symbol_universe
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_ready(base_url: str, process: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Server exited with code {process.returncode}")
+        try:
+            if httpx.get(f"{base_url}/health", timeout=1).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server not ready after {timeout}s")
+
+
+def run_workers(
+    args: argparse.Namespace, workers: int, database_url: str, user_ids: list[UUID]
+) -> dict:
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    env = {
+        **os.environ,
+        "SERVER_APP": "benchmarks.server_app:app",
+        "SERVER_BIND": f"127.0.0.1:{port}",
+        "SERVER_WORKERS": str(workers),
+        "BENCH_DATABASE_URL": database_url,
+        "BENCH_LATENCY_MS": str(args.latency_ms),
+        "BENCH_JITTER_MS": str(args.jitter_ms),
+    }
+    process = subprocess.Popen(
+        [sys.executable, "-m", "app.server"], env=env, stdout=subprocess.DEVNULL
+    )
+    try:
+        _wait_ready(base_url, process)
+        factory = build_scenarios(symbol_universe(args.universe))[args.scenario]
+        limits = httpx.Limits(max_connections=args.concurrency)
+
+        async def drive() -> dict:
+            async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+                # Warm every worker's quote cache and connections before measuring
+                await run_scenario(client, factory, user_ids, args.concurrency, 2.0, args.seed)
+                return await run_scenario(
+                    client, factory, user_ids, args.concurrency, args.duration, args.seed
+                )
+
+        return asyncio.run(drive())
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=60)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--workers", default="1,2,4", help="Comma-separated worker counts")
+    parser.add_argument("--database-url", help="Default: a temporary SQLite file")
+    parser.add_argument("--scenario", default="dashboard", help="dashboard, holdings or import")
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--holdings", type=int, default=50, help="Holdings per user")
+    parser.add_argument("--universe", type=int, default=500, help="Distinct symbols")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per worker count")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Fake upstream latency")
+    parser.add_argument("--jitter-ms", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        database_url = args.database_url or f"sqlite:///{os.path.join(tmpdir, 'workers.db')}"
+        engine = create_engine(database_url)
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+        with sessionmaker(bind=engine)() as db:
+            user_ids = seed_users(db, args.users, args.holdings, args.universe, args.seed)
+        engine.dispose()
+
+        counts = [int(count) for count in args.workers.split(",")]
+        results = {count: run_workers(args, count, database_url, user_ids) for count in counts}
+
+    print(
+        f"{args.scenario}: {args.users} users x {args.holdings} holdings, "
+        f"concurrency {args.concurrency}, {args.duration}s per run, {os.cpu_count()} CPUs"
+    )
+    print(
+        f"{'workers':>7} {'requests':>9} {'errors':>7} {'req/s':>9} "
+        f"{'p50 ms':>9} {'p95 ms':>9} {'speedup':>8}"
+    )
+    base_rps = results[counts[0]]["rps"]
+    for count, r in results.items():
+        speedup = r["rps"] / base_rps if base_rps else 0.0
+        print(
+            f"{count:>7} {r['requests']:>9} {r['errors']:>7} {r['rps']:>9} "
+            f"{r['p50_ms']:>9} {r['p95_ms']:>9} {speedup:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
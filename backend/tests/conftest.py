@@ -1,5 +1,7 @@
 """Test fixtures and configuration."""
 
+from datetime import date, timedelta
+from decimal import Decimal
 from uuid import UUID
 
 import pytest
@@ -10,7 +12,10 @@ from sqlalchemy.orm import sessionmaker
 from app.database import Base, get_db
 from app.dependencies.auth import get_current_user
 from app.main import app
-from app.models import User
+from app.models import PriceHistory, User
+from app.replicas import get_read_db
+from app.services.fx_service import fx_cache
+from app.services.quote_cache import quote_cache
 
 # Use in-memory SQLite for tests
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
@@ -22,6 +27,37 @@ engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 
+def make_quote(price="100", previous_close=None, change=None, name="Test Inc.", currency="USD"):
+    """Quote as returned by the stock service; the change follows from the prices unless given."""
+    current_price = Decimal(price)
+    previous = Decimal(previous_close) if previous_close is not None else current_price
+    return {
+        "current_price": current_price,
+        "previous_close": previous,
+        "daily_change_pct": (
+            Decimal(change) if change is not None else (current_price - previous) / previous * 100
+        ),
+        "name": name,
+        "currency": currency,
+    }
+
+
+def seed_history(db, symbol, closes, start=date(2026, 1, 1)):
+    """Add one stored close per day from ``start``; the caller commits."""
+    for i, close in enumerate(closes):
+        db.add(PriceHistory(symbol=symbol, date=start + timedelta(days=i), close=Decimal(close)))
+
+
+@pytest.fixture(autouse=True)
+def clear_quote_cache():
+    """Start every test with empty quote and FX rate caches."""
+    quote_cache.clear()
+    fx_cache.clear()
+    yield
+    quote_cache.clear()
+    fx_cache.clear()
+
+
 @pytest.fixture(scope="function")
 def db():
     """Create a fresh database for each test."""
@@ -53,6 +89,7 @@ def client(db):
         }
 
     app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_read_db] = override_get_db
     app.dependency_overrides[get_current_user] = override_get_current_user
     with TestClient(app) as test_client:
         yield test_client
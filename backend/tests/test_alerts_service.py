@@ -0,0 +1,244 @@
+"""Tests for the price alerts engine."""
+
+import queue
+import uuid
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+
+from app import models
+from app.config import settings
+from app.services.alerts_service import (
+    AlertDispatcher,
+    AlertIndex,
+    alert_index,
+    delivery_queue,
+    on_quote,
+    update_position_on_commit,
+)
+from app.services.quote_cache import quote_cache
+from app.services.stock_service import get_provider
+from tests.conftest import make_quote
+
+USER = uuid.uuid4()
+
+
+@pytest.fixture
+def engine():
+    """Global index and queue wired to the quote cache, reset around each test."""
+    alert_index.clear()
+    while not delivery_queue.empty():
+        delivery_queue.get_nowait()
+    quote_cache.add_listener(on_quote)
+    with patch.object(settings, "alerts_enabled", True):
+        yield
+    quote_cache.remove_listener(on_quote)
+    alert_index.clear()
+
+
+def _fired(firings):
+    return sorted(f.threshold for f in firings)
+
+
+def test_price_alerts_fire_at_or_beyond_threshold():
+    """Test only alerts whose threshold was crossed fire, and only once."""
+    index = AlertIndex()
+    for threshold in ("100", "110", "120"):
+        index.add(uuid.uuid4(), USER, "AAPL", "price_above", Decimal(threshold))
+    for threshold in ("90", "80"):
+        index.add(uuid.uuid4(), USER, "AAPL", "price_below", Decimal(threshold))
+
+    assert _fired(index.evaluate("AAPL", make_quote("110"))) == [Decimal("100"), Decimal("110")]
+    assert index.evaluate("AAPL", make_quote("110")) == []
+    assert _fired(index.evaluate("AAPL", make_quote("85"))) == [Decimal("90")]
+    assert index.evaluate("MSFT", make_quote("1000")) == []
+    assert len(index) == 2
+
+
+def test_daily_change_alerts_use_absolute_change():
+    """Test daily change alerts fire on moves in either direction."""
+    index = AlertIndex()
+    index.add(uuid.uuid4(), USER, "AAPL", "daily_change", Decimal("3"))
+    index.add(uuid.uuid4(), USER, "AAPL", "daily_change", Decimal("5"))
+
+    (firing,) = index.evaluate("AAPL", make_quote("100", change="-4.2"))
+    assert firing.threshold == Decimal("3")
+    assert firing.value == Decimal("-4.2")
+
+
+def test_pnl_alerts_follow_position():
+    """Test P&L alerts trigger at the price implied by the average cost, re-keyed on change."""
+    index = AlertIndex()
+    alert_id = uuid.uuid4()
+    index.add(alert_id, USER, "AAPL", "pnl_above", Decimal("20"), avg_cost=Decimal("100"))
+
+    assert index.evaluate("AAPL", make_quote("119")) == []
+
+    # Average cost drops to 90: +20% is now 108
+    index.update_position(USER, "AAPL", Decimal("90"))
+    (firing,) = index.evaluate("AAPL", make_quote("110"))
+    assert firing.alert_id == alert_id
+
+    # Without a position the alert is tracked but cannot fire
+    other = uuid.uuid4()
+    assert not index.add(other, USER, "MSFT", "pnl_below", Decimal("-10"))
+    index.update_position(USER, "MSFT", Decimal("100"))
+    (firing,) = index.evaluate("MSFT", make_quote("89"))
+    assert firing.alert_id == other
+
+
+def test_remove_alert():
+    """Test removed alerts no longer fire."""
+    index = AlertIndex()
+    alert_id = uuid.uuid4()
+    index.add(alert_id, USER, "AAPL", "price_above", Decimal("100"))
+    index.remove(alert_id, USER, "AAPL")
+
+    assert index.evaluate("AAPL", make_quote("150")) == []
+
+
+def test_quote_cache_put_queues_firings(engine):
+    """Test storing a quote evaluates alerts and queues firings for delivery."""
+    alert_index.add(uuid.uuid4(), USER, "AAPL", "price_above", Decimal("100"))
+
+    quote_cache.put("AAPL", make_quote("99"))
+    assert delivery_queue.empty()
+
+    quote_cache.put("AAPL", make_quote("101"))
+    assert delivery_queue.get_nowait().value == Decimal("101")
+
+
+def test_alerts_api_and_delivery(client, test_user, db, engine):
+    """Test creating alerts, firing them on a quote refresh and reading delivered events."""
+    created = client.post(
+        "/alerts", json={"symbol": "aapl", "type": "price_above", "threshold": "150"}
+    )
+    assert created.status_code == 201
+    assert created.json()["symbol"] == "AAPL"
+
+    no_position = client.post(
+        "/alerts", json={"symbol": "AAPL", "type": "pnl_above", "threshold": "10"}
+    )
+    assert no_position.status_code == 400
+
+    with patch("app.routers.holdings.get_stock_price", return_value=make_quote("100")):
+        client.post("/holdings", json={"symbol": "AAPL", "shares": 10, "avg_cost": 100})
+    pnl = client.post("/alerts", json={"symbol": "AAPL", "type": "pnl_above", "threshold": "60"})
+    assert pnl.status_code == 201
+
+    with patch.object(get_provider(), "get_quotes", return_value={"AAPL": make_quote("155")}):
+        client.get("/dashboard")
+
+    dispatcher = AlertDispatcher(lambda: db, batch_size=100, reload_seconds=60)
+    assert dispatcher.drain() == 1
+
+    events = client.get("/alerts/events").json()
+    assert [e["alert_id"] for e in events] == [created.json()["id"]]
+    assert Decimal(str(events[0]["value"])) == Decimal("155")
+    assert [a["id"] for a in client.get("/alerts", params={"active": True}).json()] == [
+        pnl.json()["id"]
+    ]
+
+    assert client.delete(f"/alerts/{created.json()['id']}").status_code == 204
+    assert client.get("/alerts/events").json() == []
+
+
+def test_dispatcher_drops_deleted_alerts(db, test_user):
+    """Test firings of alerts deleted before delivery are not recorded."""
+    index = AlertIndex()
+    source: queue.Queue = queue.Queue()
+    alert = models.Alert(
+        user_id=test_user.id, symbol="AAPL", type="price_above", threshold=Decimal("1")
+    )
+    db.add(alert)
+    db.commit()
+    alert_id = alert.id
+    index.add(alert_id, test_user.id, "AAPL", "price_above", Decimal("1"))
+    index.add(uuid.uuid4(), test_user.id, "AAPL", "price_above", Decimal("1"))  # not stored
+    for firing in index.evaluate("AAPL", make_quote("2")):
+        source.put(firing)
+
+    dispatcher = AlertDispatcher(lambda: db, batch_size=10, reload_seconds=60, source=source)
+    assert dispatcher.drain() == 2
+
+    assert db.query(models.AlertEvent).count() == 1
+    stored = db.get(models.Alert, alert_id)
+    assert stored.active is False
+    assert stored.triggered_at is not None
+
+
+def test_concurrent_deliveries_record_once(db, test_user):
+    """Test a firing delivered by two dispatchers (e.g. two workers) is recorded once."""
+    alert = models.Alert(
+        user_id=test_user.id, symbol="AAPL", type="price_above", threshold=Decimal("1")
+    )
+    db.add(alert)
+    db.commit()
+    index = AlertIndex()
+    index.add(alert.id, test_user.id, "AAPL", "price_above", Decimal("1"))
+    firings = index.evaluate("AAPL", make_quote("2")) + index.evaluate("AAPL", make_quote("3"))
+
+    for _ in range(2):
+        AlertDispatcher(lambda: db, batch_size=10, reload_seconds=60).deliver(firings)
+
+    (event,) = db.query(models.AlertEvent).all()
+    assert event.value == Decimal("2")
+
+
+def test_position_changes_apply_on_commit(db, engine):
+    """Test P&L alerts are re-keyed only once the position change is committed."""
+    alert_id = uuid.uuid4()
+    alert_index.add(alert_id, USER, "AAPL", "pnl_below", Decimal("-10"))
+
+    update_position_on_commit(db, USER, "AAPL", Decimal("100"))
+    db.rollback()
+    assert alert_index.evaluate("AAPL", make_quote("89")) == []
+
+    update_position_on_commit(db, USER, "AAPL", Decimal("100"))
+    db.commit()
+    (firing,) = alert_index.evaluate("AAPL", make_quote("89"))
+    assert firing.alert_id == alert_id
+
+
+def test_alerts_disabled_are_not_indexed(client, test_user):
+    """Test alerts are stored but not evaluated when alerts are disabled."""
+    created = client.post(
+        "/alerts", json={"symbol": "AAPL", "type": "price_above", "threshold": "150"}
+    )
+    assert created.status_code == 201
+
+    assert alert_index.evaluate("AAPL", make_quote("155")) == []
+
+
+def test_load_indexes_active_alerts(db, test_user):
+    """Test the index is rebuilt from active alerts with position average costs."""
+    db.add(
+        models.Holding(
+            user_id=test_user.id,
+            symbol="AAPL",
+            name="Apple Inc.",
+            shares=Decimal("1"),
+            avg_cost=Decimal("100"),
+        )
+    )
+    db.add_all(
+        [
+            models.Alert(
+                user_id=test_user.id, symbol="AAPL", type="pnl_below", threshold=Decimal("-10")
+            ),
+            models.Alert(
+                user_id=test_user.id,
+                symbol="AAPL",
+                type="price_above",
+                threshold=Decimal("200"),
+                active=False,
+            ),
+        ]
+    )
+    db.commit()
+
+    index = AlertIndex()
+    assert index.load(db) == 1
+    (firing,) = index.evaluate("AAPL", make_quote("90"))
+    assert firing.type == "pnl_below"
@@ -0,0 +1,124 @@
+"""Tests for portfolio analytics."""
+
+from datetime import date
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from app.models import Holding
+from app.services import analytics_service
+from app.services.analytics_service import (
+    _forward_fill,
+    compute_analytics,
+    load_price_matrix,
+    max_drawdown,
+)
+from tests.conftest import TEST_USER_ID, seed_history
+
+
+@pytest.fixture(autouse=True)
+def clear_analytics_cache():
+    analytics_service._analytics_cache.clear()
+    yield
+    analytics_service._analytics_cache.clear()
+
+
+def test_forward_fill():
+    """Test missing closes carry the previous close forward."""
+    values = np.array([[np.nan, 1.0], [2.0, np.nan], [np.nan, np.nan], [4.0, 5.0]])
+    filled = _forward_fill(values)
+    assert np.isnan(filled[0, 0])
+    assert filled[:, 0].tolist()[1:] == [2.0, 2.0, 4.0]
+    assert filled[:, 1].tolist() == [1.0, 1.0, 1.0, 5.0]
+
+
+def test_max_drawdown():
+    """Test drawdown is measured from the running peak."""
+    returns = np.array([0.10, -0.50, 0.20, 0.50])
+    assert max_drawdown(returns) == pytest.approx(0.5)
+
+
+def test_compute_analytics_matches_benchmark():
+    """Test a portfolio identical to the benchmark has beta 1 and correlated positions."""
+    rng = np.random.default_rng(0)
+    benchmark = rng.normal(0.001, 0.01, size=250)
+    returns = np.column_stack([benchmark, benchmark])
+
+    result = compute_analytics(np.array([0.5, 0.5]), returns, benchmark)
+
+    assert result["beta"] == pytest.approx(1.0)
+    assert result["volatility"] == pytest.approx(np.std(benchmark, ddof=1) * np.sqrt(252))
+    assert result["correlation"] == [[1.0, 1.0], [1.0, 1.0]]
+    assert result["sharpe_ratio"] is not None
+
+
+def test_analytics_endpoint(client, test_user, db):
+    """Test analytics are computed from stored history and cached."""
+    db.add(Holding(user_id=TEST_USER_ID, symbol="AAPL", name="Apple", shares=10, avg_cost=1))
+    db.add(Holding(user_id=TEST_USER_ID, symbol="MSFT", name="Microsoft", shares=5, avg_cost=1))
+    seed_history(db, "AAPL", ["100", "102", "101", "105", "104"])
+    seed_history(db, "MSFT", ["200", "198", "202", "204", "210"])
+    seed_history(db, "SPY", ["400", "404", "402", "410", "412"])
+    db.commit()
+
+    with (
+        patch(
+            "app.services.analytics_service.load_price_matrix", wraps=load_price_matrix
+        ) as mock_load,
+        patch("app.services.analytics_service.date") as mock_date,
+    ):
+        mock_date.today.return_value = date(2026, 1, 5)
+        response = client.get("/dashboard/analytics?lookback_days=30")
+        client.get("/dashboard/analytics?lookback_days=30")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["benchmark"] == "SPY"
+    assert data["observations"] == 4
+    assert data["symbols"] == ["AAPL", "MSFT"]
+    # AAPL 10 * 104 = 1040, MSFT 5 * 210 = 1050
+    assert data["weights"] == pytest.approx([1040 / 2090, 1050 / 2090], abs=1e-6)
+    assert len(data["correlation"]) == 2
+    assert data["max_drawdown"] >= 0
+    # Second request is served from the per-day cache
+    mock_load.assert_called_once()
+
+
+def test_analytics_with_benchmark_held(client, test_user, db):
+    """Test holding the benchmark keeps separate position and benchmark columns."""
+    db.add(Holding(user_id=TEST_USER_ID, symbol="AAPL", name="Apple", shares=10, avg_cost=1))
+    db.add(Holding(user_id=TEST_USER_ID, symbol="SPY", name="SPDR S&P 500", shares=1, avg_cost=1))
+    seed_history(db, "AAPL", ["100", "102", "101", "105", "104"])
+    seed_history(db, "SPY", ["400", "404", "402", "410", "412"])
+    db.commit()
+
+    with patch("app.services.analytics_service.date") as mock_date:
+        mock_date.today.return_value = date(2026, 1, 5)
+        response = client.get("/dashboard/analytics?lookback_days=30")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["symbols"] == ["AAPL", "SPY"]
+    # AAPL 10 * 104 = 1040, SPY 1 * 412
+    assert data["weights"] == pytest.approx([1040 / 1452, 412 / 1452], abs=1e-6)
+    assert data["correlation"][1][1] == pytest.approx(1.0)
+
+
+def test_analytics_insufficient_history(client, test_user, db):
+    """Test analytics without stored history returns 503."""
+    db.add(Holding(user_id=TEST_USER_ID, symbol="AAPL", name="Apple", shares=10, avg_cost=1))
+    db.commit()
+
+    with patch("app.services.history_service.get_daily_closes") as mock_closes:
+        response = client.get("/dashboard/analytics")
+
+    mock_closes.assert_not_called()
+
+    assert response.status_code == 503
+
+
+def test_analytics_no_holdings(client, test_user):
+    """Test analytics without holdings returns 404."""
+    response = client.get("/dashboard/analytics")
+    assert response.status_code == 404
@@ -0,0 +1,220 @@
+"""Tests for corporate actions processing."""
+
+import uuid
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+
+from app import models, schemas
+from app.config import settings
+from app.services.alerts_service import alert_index
+from app.services.corporate_actions_service import apply_corporate_action, apply_pending_actions
+from app.services.ledger_service import rebuild_holdings, record_transaction
+
+EX_DATE = date(2026, 6, 1)
+
+
+def _buy(db, user_id, symbol, shares, price, trade_date=date(2026, 1, 5)):
+    record_transaction(
+        db,
+        user_id,
+        schemas.TransactionCreate(
+            symbol=symbol, type="buy", trade_date=trade_date, shares=shares, price=price
+        ),
+        metadata_lookup=lambda s: (s, "USD"),
+    )
+    db.commit()
+
+
+def _user(db):
+    user = models.User(id=uuid.uuid4(), email=f"{uuid.uuid4()}@example.com")
+    db.add(user)
+    db.commit()
+    return user.id
+
+
+def _action(db, **kwargs):
+    action = models.CorporateAction(symbol="NVDA", ex_date=EX_DATE, status="pending", **kwargs)
+    db.add(action)
+    db.commit()
+    return action
+
+
+def _holding(db, user_id, symbol="NVDA"):
+    db.expire_all()
+    return db.query(models.Holding).filter_by(user_id=user_id, symbol=symbol).one()
+
+
+def _ledger(db, user_id, txn_type):
+    return db.query(models.Transaction).filter_by(user_id=user_id, type=txn_type).all()
+
+
+def test_split_applies_to_all_holders(db):
+    """Test a split updates every holding, the ledger and popularity, and is idempotent."""
+    users = [_user(db) for _ in range(3)]
+    for user_id in users:
+        _buy(db, user_id, "NVDA", Decimal("10"), Decimal("800"))
+    _buy(db, users[0], "AAPL", Decimal("5"), Decimal("150"))
+    action = _action(db, type="split", ratio=Decimal("4"))
+
+    assert apply_pending_actions(db, as_of=EX_DATE) == 1
+
+    for user_id in users:
+        holding = _holding(db, user_id)
+        assert holding.shares == Decimal("40")
+        assert holding.avg_cost == Decimal("200")
+        assert len(_ledger(db, user_id, "split")) == 1
+    assert _holding(db, users[0], "AAPL").shares == Decimal("5")
+    assert db.get(models.SymbolPopularity, "NVDA").total_shares == Decimal("120")
+    assert action.status == "applied"
+    assert action.holdings_affected == 3
+    assert action.applied_at is not None
+
+    # Re-running applies nothing twice
+    assert apply_pending_actions(db, as_of=EX_DATE) == 0
+    assert apply_corporate_action(db, action) == 3
+    assert _holding(db, users[0]).shares == Decimal("40")
+
+
+def test_split_rekeys_pnl_alerts(db):
+    """Test P&L alerts follow the average cost a split divides, once it is committed."""
+    user_id = _user(db)
+    _buy(db, user_id, "NVDA", Decimal("10"), Decimal("800"))
+    _action(db, type="split", ratio=Decimal("4"))
+    alert_index.clear()
+    alert_index.add(
+        uuid.uuid4(), user_id, "NVDA", "pnl_above", Decimal("20"), avg_cost=Decimal("800")
+    )
+    quote = {"current_price": Decimal("241"), "daily_change_pct": Decimal("0")}
+
+    try:
+        assert alert_index.evaluate("NVDA", quote) == []
+        with patch.object(settings, "alerts_enabled", True):
+            apply_pending_actions(db, as_of=EX_DATE)
+
+        # +20% on the post-split average cost of 200 is 240
+        (firing,) = alert_index.evaluate("NVDA", quote)
+        assert firing.user_id == user_id
+    finally:
+        alert_index.clear()
+
+
+def test_split_skips_holders_who_recorded_it(db):
+    """Test holders with the split already in their ledger are left alone."""
+    manual, automatic = _user(db), _user(db)
+    _buy(db, manual, "NVDA", Decimal("10"), Decimal("800"))
+    _buy(db, automatic, "NVDA", Decimal("10"), Decimal("800"))
+    record_transaction(
+        db,
+        manual,
+        schemas.TransactionCreate(
+            symbol="NVDA", type="split", trade_date=EX_DATE, ratio=Decimal("4")
+        ),
+        metadata_lookup=lambda s: (s, "USD"),
+    )
+    db.commit()
+    action = _action(db, type="split", ratio=Decimal("4"))
+
+    apply_corporate_action(db, action)
+
+    assert _holding(db, manual).shares == Decimal("40")
+    assert _holding(db, automatic).shares == Decimal("40")
+    assert len(_ledger(db, manual, "split")) == 1
+    assert action.holdings_affected == 1
+
+
+def test_split_replays_history_after_ex_date(db):
+    """Test a holder who traded after the ex-date gets the split placed in their history."""
+    user_id = _user(db)
+    _buy(db, user_id, "NVDA", Decimal("10"), Decimal("800"))
+    # Bought at the post-split price after the ex-date
+    _buy(db, user_id, "NVDA", Decimal("10"), Decimal("200"), trade_date=date(2026, 6, 3))
+    action = _action(db, type="split", ratio=Decimal("4"))
+
+    apply_corporate_action(db, action)
+
+    holding = _holding(db, user_id)
+    assert holding.shares == Decimal("50")
+    assert holding.avg_cost == Decimal("200")
+    assert action.holdings_affected == 1
+
+
+def test_split_comes_before_buys_on_the_ex_date(db):
+    """Test a buy on the ex-date, at the post-split price, is not split again."""
+    user_id = _user(db)
+    _buy(db, user_id, "NVDA", Decimal("10"), Decimal("800"))
+    _buy(db, user_id, "NVDA", Decimal("10"), Decimal("200"), trade_date=EX_DATE)
+    action = _action(db, type="split", ratio=Decimal("4"))
+
+    apply_corporate_action(db, action)
+
+    holding = _holding(db, user_id)
+    assert holding.shares == Decimal("50")
+    assert holding.avg_cost == Decimal("200")
+
+    # Rebuilding from the ledger keeps the split before the same-day buy
+    rebuild_holdings(db, lambda s: (s, "USD"), user_id=user_id)
+    assert _holding(db, user_id).shares == Decimal("50")
+
+
+def test_dividend_records_ledger_entries(db):
+    """Test a dividend is recorded per holder without changing positions."""
+    holder, seller = _user(db), _user(db)
+    _buy(db, holder, "NVDA", Decimal("10"), Decimal("800"))
+    _buy(db, seller, "NVDA", Decimal("10"), Decimal("800"))
+    record_transaction(
+        db,
+        seller,
+        schemas.TransactionCreate(
+            symbol="NVDA",
+            type="sell",
+            trade_date=date(2026, 3, 1),
+            shares=Decimal("10"),
+            price=Decimal("900"),
+        ),
+        metadata_lookup=lambda s: (s, "USD"),
+    )
+    db.commit()
+    action = _action(db, type="dividend", amount=Decimal("0.04"))
+
+    apply_corporate_action(db, action)
+
+    (dividend,) = _ledger(db, holder, "dividend")
+    assert dividend.shares == Decimal("10")
+    assert dividend.price == Decimal("0.04")
+    assert _ledger(db, seller, "dividend") == []
+    assert _holding(db, holder).shares == Decimal("10")
+    assert action.holdings_affected == 1
+
+
+def test_future_actions_are_not_applied(db):
+    """Test actions with an ex-date after as_of stay pending."""
+    user_id = _user(db)
+    _buy(db, user_id, "NVDA", Decimal("10"), Decimal("800"))
+    action = _action(db, type="split", ratio=Decimal("4"))
+
+    assert apply_pending_actions(db, as_of=date(2026, 5, 31)) == 0
+    assert action.status == "pending"
+    assert _holding(db, user_id).shares == Decimal("10")
+
+
+def test_admin_corporate_actions(client, test_user):
+    """Test admins can record and list corporate actions."""
+    body = {"symbol": "nvda", "type": "split", "ex_date": "2026-06-01", "ratio": "4"}
+    assert client.post("/admin/corporate-actions", json=body).status_code == 403
+
+    with patch("app.dependencies.admin.settings.admin_emails", "test@example.com"):
+        created = client.post("/admin/corporate-actions", json=body)
+        duplicate = client.post("/admin/corporate-actions", json=body)
+        invalid = client.post(
+            "/admin/corporate-actions",
+            json={"symbol": "NVDA", "type": "dividend", "ex_date": "2026-06-01"},
+        )
+        listed = client.get("/admin/corporate-actions", params={"status": "pending"})
+
+    assert created.status_code == 201
+    assert created.json()["symbol"] == "NVDA"
+    assert created.json()["status"] == "pending"
+    assert duplicate.status_code == 409
+    assert invalid.status_code == 422
+    assert [a["id"] for a in listed.json()] == [created.json()["id"]]
@@ -15,7 +15,7 @@ def test_dashboard_with_holdings(client, test_user):
     """Test dashboard with holdings."""
 
     # Mock stock prices
-    def mock_get_multiple_prices(symbols):
+    def mock_get_multiple_prices(symbols, timeout=None):
         prices = {
             "AAPL": {
                 "current_price": Decimal("180.00"),
@@ -94,7 +94,7 @@ def test_dashboard_with_holdings(client, test_user):
 def test_dashboard_price_fetch_failure(client, test_user):
     """Test dashboard when all price fetches fail."""
 
-    def mock_get_multiple_prices_fail(symbols):
+    def mock_get_multiple_prices_fail(symbols, timeout=None):
         return {symbol: None for symbol in symbols}
 
     # Create holding
@@ -120,7 +120,7 @@ def test_dashboard_price_fetch_failure(client, test_user):
 def test_dashboard_partial_price_fetch(client, test_user):
     """Test dashboard when some price fetches fail."""
 
-    def mock_get_multiple_prices_partial(symbols):
+    def mock_get_multiple_prices_partial(symbols, timeout=None):
         prices = {
             "AAPL": {
                 "current_price": Decimal("180.00"),
@@ -161,3 +161,34 @@ def test_dashboard_partial_price_fetch(client, test_user):
     data = response.json()
     assert len(data["holdings"]) == 1
     assert data["holdings"][0]["symbol"] == "AAPL"
+
+
+def test_dashboard_history(client, test_user, db):
+    """Test history endpoint returns precomputed daily values."""
+    from datetime import date
+
+    from app.models import PortfolioDailyValue
+
+    for day, value in [(date(2026, 1, 5), "1100"), (date(2026, 1, 6), "1200")]:
+        db.add(
+            PortfolioDailyValue(
+                user_id=test_user.id,
+                date=day,
+                total_value=Decimal(value),
+                total_cost=Decimal("1000"),
+            )
+        )
+    db.commit()
+
+    response = client.get("/dashboard/history?start=2026-01-01&end=2026-01-31")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [p["date"] for p in data["points"]] == ["2026-01-05", "2026-01-06"]
+    assert Decimal(str(data["points"][1]["total_pnl"])) == Decimal("200")
+
+
+def test_dashboard_history_invalid_range(client, test_user):
+    """Test history endpoint rejects start after end."""
+    response = client.get("/dashboard/history?start=2026-02-01&end=2026-01-01")
+    assert response.status_code == 400
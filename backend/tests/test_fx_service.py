@@ -0,0 +1,147 @@
+"""Tests for currency conversion and FX rate caching."""
+
+from decimal import Decimal
+from unittest.mock import patch
+
+from app import models
+from app.services.fx_service import conversion_rates, fx_cache, get_usd_rates
+from app.services.quote_refresher import QuoteRefresher
+from app.services.stock_service import StockAPIError, get_provider
+from tests.conftest import make_quote
+
+
+def test_get_usd_rates_fetches_misses_in_one_batch(db):
+    """Test uncached currencies are fetched together once, then served from cache."""
+    rates = {"EUR": Decimal("1.10"), "JPY": Decimal("0.0070")}
+    with patch("app.services.fx_service.fetch_fx_rates", return_value=rates) as mock_fetch:
+        first = get_usd_rates(db, ["EUR", "JPY", "USD", "EUR"])
+        second = get_usd_rates(db, ["JPY", "EUR"])
+
+    mock_fetch.assert_called_once_with(["EUR", "JPY"])
+    assert first == {"USD": Decimal(1), **rates}
+    assert second == {"USD": Decimal(1), **rates}
+    assert db.get(models.FxRate, "EUR").usd_rate == Decimal("1.10")
+
+
+def test_get_usd_rates_falls_back_to_stored_rate(db):
+    """Test the last stored rate is used when the upstream fails."""
+    db.add(models.FxRate(currency="EUR", usd_rate=Decimal("1.05")))
+    db.commit()
+
+    with patch(
+        "app.services.fx_service.fetch_fx_rates", side_effect=StockAPIError("down")
+    ) as mock_fetch:
+        rates = get_usd_rates(db, ["EUR", "GBP"])
+        # The fallback is cached briefly, so the outage is not retried per request
+        assert get_usd_rates(db, ["EUR"]) == rates
+
+    assert rates == {"USD": Decimal(1), "EUR": Decimal("1.05")}
+    mock_fetch.assert_called_once()
+
+
+def test_conversion_rates():
+    """Test multipliers are relative to the base currency."""
+    usd_rates = {"USD": Decimal(1), "EUR": Decimal("1.25"), "JPY": Decimal("0.01")}
+
+    assert conversion_rates(usd_rates, "USD") == usd_rates
+    assert conversion_rates(usd_rates, "EUR") == {
+        "USD": Decimal("0.8"),
+        "EUR": Decimal(1),
+        "JPY": Decimal("0.008"),
+    }
+    assert conversion_rates(usd_rates, "GBP") == {}
+
+
+def test_dashboard_converts_to_base_currency(client, test_user):
+    """Test values are converted per holding currency and totals are in the base currency."""
+    quotes = {"AAPL": make_quote("200"), "SAP": make_quote("100", currency="EUR")}
+    with patch("app.routers.holdings.get_stock_price", side_effect=lambda s: quotes[s]):
+        client.post("/holdings", json={"symbol": "AAPL", "shares": 1, "avg_cost": 100})
+        client.post("/holdings", json={"symbol": "SAP", "shares": 2, "avg_cost": 50})
+
+    assert client.patch("/users/me", json={"base_currency": "eur"}).status_code == 200
+
+    with (
+        patch(
+            "app.routers.dashboard.get_multiple_prices",
+            side_effect=lambda symbols, timeout=None: {s: quotes[s] for s in symbols},
+        ),
+        patch(
+            "app.services.fx_service.fetch_fx_rates", return_value={"EUR": Decimal("1.25")}
+        ) as mock_fetch,
+    ):
+        data = client.get("/dashboard").json()
+
+    mock_fetch.assert_called_once_with(["EUR"])
+    assert data["base_currency"] == "EUR"
+    holdings = {h["symbol"]: h for h in data["holdings"]}
+    assert holdings["SAP"]["currency"] == "EUR"
+    assert Decimal(str(holdings["SAP"]["market_value"])) == Decimal("200")
+    # 200 USD at 1.25 USD per EUR
+    assert Decimal(str(holdings["AAPL"]["market_value"])) == Decimal("160")
+    assert Decimal(str(holdings["AAPL"]["current_price"])) == Decimal("200")
+    assert Decimal(str(data["total_value"])) == Decimal("360")
+    assert Decimal(str(data["total_cost"])) == Decimal("180")
+
+
+def test_dashboard_skips_holdings_without_rate(client, test_user):
+    """Test a holding whose currency has no rate is left out instead of mixed in."""
+    quotes = {"AAPL": make_quote("200"), "SAP": make_quote("100", currency="EUR")}
+    with patch("app.routers.holdings.get_stock_price", side_effect=lambda s: quotes[s]):
+        client.post("/holdings", json={"symbol": "AAPL", "shares": 1, "avg_cost": 100})
+        client.post("/holdings", json={"symbol": "SAP", "shares": 2, "avg_cost": 50})
+
+    with (
+        patch(
+            "app.routers.dashboard.get_multiple_prices",
+            side_effect=lambda symbols, timeout=None: {s: quotes[s] for s in symbols},
+        ),
+        patch("app.services.fx_service.fetch_fx_rates", return_value={}),
+    ):
+        data = client.get("/dashboard").json()
+
+    assert [h["symbol"] for h in data["holdings"]] == ["AAPL"]
+    assert Decimal(str(data["total_value"])) == Decimal("200")
+
+
+def test_refresher_refreshes_fx_for_quote_currencies(db):
+    """Test one refresher cycle fetches FX rates for the currencies of refreshed quotes."""
+    db.add_all(
+        [
+            models.SymbolPopularity(symbol="SAP", holders=2, total_shares=Decimal("5")),
+            models.SymbolPopularity(symbol="SONY", holders=1, total_shares=Decimal("5")),
+        ]
+    )
+    db.commit()
+    quotes = {
+        "SAP": make_quote("100", currency="EUR"),
+        "SONY": make_quote("3000", currency="JPY"),
+    }
+
+    refresher = QuoteRefresher(
+        session_factory=lambda: db, interval_seconds=60, batch_size=10, refresh_ahead_seconds=10
+    )
+    with (
+        patch.object(
+            get_provider(), "get_quotes", side_effect=lambda symbols: {s: quotes[s] for s in symbols}
+        ),
+        patch(
+            "app.services.fx_service.fetch_fx_rates",
+            return_value={"EUR": Decimal("1.1"), "JPY": Decimal("0.007")},
+        ) as mock_fetch,
+    ):
+        refresher.run_once()
+
+    mock_fetch.assert_called_once_with(["EUR", "JPY"])
+    assert fx_cache.get_fresh(["EUR", "JPY"])[1] == []
+
+
+def test_users_me(client, test_user):
+    """Test reading and updating the base currency."""
+    assert client.get("/users/me").json()["base_currency"] == "USD"
+
+    response = client.patch("/users/me", json={"base_currency": "jpy"})
+    assert response.status_code == 200
+    assert response.json()["base_currency"] == "JPY"
+
+    assert client.patch("/users/me", json={"base_currency": "YEN1"}).status_code == 422
@@ -0,0 +1,115 @@
+"""Tests for the server-side heatmap layout."""
+
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+
+from app.models import FxRate, Holding
+from app.services import heatmap_service
+from app.services.heatmap_service import color_bucket, squarify
+from app.services.quote_cache import quote_cache
+from tests.conftest import TEST_USER_ID, make_quote
+
+
+@pytest.fixture(autouse=True)
+def clear_layout_cache():
+    heatmap_service._layout_cache.clear()
+    yield
+    heatmap_service._layout_cache.clear()
+
+
+def test_squarify_fills_area():
+    """Test rectangles tile the bounding box with areas proportional to values."""
+    values = [60.0, 30.0, 20.0, 10.0, 5.0, 1.0]
+    rects = squarify(values, 0, 0, 400, 300)
+
+    assert len(rects) == len(values)
+    total_area = sum(w * h for _, _, w, h in rects)
+    assert total_area == pytest.approx(400 * 300)
+    for value, (x, y, w, h) in zip(values, rects, strict=True):
+        assert w * h == pytest.approx(400 * 300 * value / sum(values))
+        assert 0 <= x and x + w <= 400 + 1e-6
+        assert 0 <= y and y + h <= 300 + 1e-6
+
+
+def test_squarify_keeps_aspect_ratios_reasonable():
+    """Test equal values on a square produce near-square tiles."""
+    rects = squarify([1.0] * 4, 0, 0, 100, 100)
+    for _, _, w, h in rects:
+        assert max(w / h, h / w) <= 2
+
+
+def test_color_bucket():
+    """Test daily change maps to buckets -3..3."""
+    assert color_bucket(-10) == -3
+    assert color_bucket(-1) == -1
+    assert color_bucket(0) == 0
+    assert color_bucket(0.5) == 1
+    assert color_bucket(3) == 2
+    assert color_bucket(12) == 3
+
+
+def test_heatmap_endpoint_cached_per_quote_refresh(client, test_user, db):
+    """Test the layout is reused until an input quote is refreshed."""
+    db.add(Holding(user_id=TEST_USER_ID, symbol="AAPL", name="Apple", shares=10, avg_cost=1))
+    db.add(Holding(user_id=TEST_USER_ID, symbol="MSFT", name="Microsoft", shares=1, avg_cost=1))
+    db.commit()
+
+    quote_cache.put("AAPL", make_quote("100", change="2.5"))
+    quote_cache.put("MSFT", make_quote("300", change="-5"))
+
+    with patch(
+        "app.services.heatmap_service.build_heatmap", wraps=heatmap_service.build_heatmap
+    ) as mock_build:
+        response = client.get("/dashboard/heatmap?width=400&height=300")
+        client.get("/dashboard/heatmap?width=400&height=300")
+        assert mock_build.call_count == 1
+
+        quote_cache.put("MSFT", make_quote("310", change="-4"))
+        client.get("/dashboard/heatmap?width=400&height=300")
+        assert mock_build.call_count == 2
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["symbols"] == ["AAPL", "MSFT"]
+    assert data["bucket"] == [2, -3]
+    assert data["value"] == [1000.0, 300.0]
+    assert data["w"][0] * data["h"][0] == pytest.approx(400 * 300 * 1000 / 1300, rel=1e-3)
+
+
+def test_heatmap_converts_to_base_currency(client, test_user, db):
+    """Test tiles are sized by base currency value; holdings without a rate are left out."""
+    db.add(Holding(user_id=TEST_USER_ID, symbol="AAPL", name="Apple", shares=10, avg_cost=1))
+    db.add(
+        Holding(
+            user_id=TEST_USER_ID, symbol="SAP", name="SAP", currency="EUR", shares=10, avg_cost=1
+        )
+    )
+    db.add(
+        Holding(
+            user_id=TEST_USER_ID,
+            symbol="7203.T",
+            name="Toyota",
+            currency="JPY",
+            shares=1,
+            avg_cost=1,
+        )
+    )
+    db.add(FxRate(currency="EUR", usd_rate=Decimal("1.2")))
+    db.commit()
+
+    quote_cache.put("AAPL", make_quote("100", change="1"))
+    quote_cache.put("SAP", make_quote("100", change="1"))
+    quote_cache.put("7203.T", make_quote("3000", change="1"))
+
+    data = client.get("/dashboard/heatmap?width=400&height=300").json()
+
+    assert data["symbols"] == ["SAP", "AAPL"]
+    assert data["value"] == [1200.0, 1000.0]
+
+
+def test_heatmap_no_holdings(client, test_user):
+    """Test heatmap without holdings returns 404."""
+    response = client.get("/dashboard/heatmap")
+    assert response.status_code == 404
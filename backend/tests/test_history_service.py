@@ -0,0 +1,259 @@
+"""Tests for portfolio history rollups."""
+
+from datetime import date, datetime
+from decimal import Decimal
+from unittest.mock import patch
+
+from app import schemas
+from app.models import (
+    FxRate,
+    Holding,
+    PortfolioDailyValue,
+    PriceHistory,
+    PriceHistoryCoverage,
+    PriceSnapshot,
+)
+from app.services.history_service import (
+    backfill_price_history,
+    ensure_price_history,
+    invalidate_daily_values,
+    rollup_all,
+    rollup_user,
+)
+from app.services.ledger_service import record_transaction
+from tests.conftest import TEST_USER_ID
+
+
+def _add_holding(db, symbol, shares, avg_cost, created_at=datetime(2026, 1, 5, 10, 0)):
+    holding = Holding(
+        user_id=TEST_USER_ID,
+        symbol=symbol,
+        name=symbol,
+        shares=Decimal(shares),
+        avg_cost=Decimal(avg_cost),
+        created_at=created_at,
+    )
+    db.add(holding)
+    db.commit()
+    return holding
+
+
+def _closes(prices):
+    def fake_get_daily_closes(symbols, start, end):
+        return {
+            symbol: {d: c for d, c in prices.get(symbol, {}).items() if start <= d <= end}
+            for symbol in symbols
+        }
+
+    return fake_get_daily_closes
+
+
+PRICES = {
+    "AAPL": {
+        date(2026, 1, 2): Decimal("100"),
+        date(2026, 1, 5): Decimal("110"),
+        date(2026, 1, 6): Decimal("120"),
+        date(2026, 1, 7): Decimal("130"),
+    },
+    "MSFT": {
+        date(2026, 1, 5): Decimal("200"),
+        date(2026, 1, 7): Decimal("210"),
+    },
+}
+
+
+def test_rollup_user_computes_daily_values(db, test_user):
+    """Test values are computed from the holding creation date, carrying prices forward."""
+    _add_holding(db, "AAPL", "10", "100")
+    _add_holding(db, "MSFT", "2", "150")
+
+    with patch("app.services.history_service.get_daily_closes", side_effect=_closes(PRICES)):
+        written = rollup_user(db, TEST_USER_ID, through=date(2026, 1, 7))
+
+    assert written == 3
+    rows = db.query(PortfolioDailyValue).order_by(PortfolioDailyValue.date).all()
+    assert [r.date for r in rows] == [date(2026, 1, 5), date(2026, 1, 6), date(2026, 1, 7)]
+    # Jan 6: AAPL 10 * 120 + MSFT 2 * 200 (carried forward)
+    assert rows[1].total_value == Decimal("1600")
+    assert rows[1].total_cost == Decimal("1300")
+
+
+def test_rollup_is_incremental(db, test_user):
+    """Test a second run only fetches and computes new days."""
+    _add_holding(db, "AAPL", "10", "100")
+
+    with patch(
+        "app.services.history_service.get_daily_closes", side_effect=_closes(PRICES)
+    ) as mock_closes:
+        assert rollup_user(db, TEST_USER_ID, through=date(2026, 1, 6)) == 2
+        assert rollup_user(db, TEST_USER_ID, through=date(2026, 1, 7)) == 1
+        assert rollup_user(db, TEST_USER_ID, through=date(2026, 1, 7)) == 0
+
+    assert mock_closes.call_count == 2
+    # Second fetch starts after the last stored close
+    assert mock_closes.call_args_list[1].args[1] == date(2026, 1, 7)
+    assert db.query(PriceHistory).count() == 4
+
+
+def test_invalidate_recomputes_from_affected_date(db, test_user):
+    """Test editing a holding only recomputes days on or after the edit."""
+    holding = _add_holding(db, "AAPL", "10", "100")
+
+    with patch("app.services.history_service.get_daily_closes", side_effect=_closes(PRICES)):
+        rollup_user(db, TEST_USER_ID, through=date(2026, 1, 7))
+
+        holding.shares = Decimal("20")
+        deleted = invalidate_daily_values(db, TEST_USER_ID, date(2026, 1, 6))
+        db.commit()
+        assert deleted == 2
+
+        assert rollup_user(db, TEST_USER_ID, through=date(2026, 1, 7)) == 2
+
+    values = {r.date: r.total_value for r in db.query(PortfolioDailyValue).all()}
+    assert values[date(2026, 1, 5)] == Decimal("1100")
+    assert values[date(2026, 1, 6)] == Decimal("2400")
+    assert values[date(2026, 1, 7)] == Decimal("2600")
+
+
+def _record(db, **txn):
+    record_transaction(
+        db,
+        TEST_USER_ID,
+        schemas.TransactionCreate(symbol="AAPL", **txn),
+        metadata_lookup=lambda symbol: (symbol, "USD"),
+    )
+    db.commit()
+
+
+def test_rollup_replays_ledger(db, test_user):
+    """Test backdated entries and closed positions are valued as they were held."""
+    _record(db, type="buy", trade_date=date(2026, 1, 5), shares=10, price=100)
+
+    with patch("app.services.history_service.get_daily_closes", side_effect=_closes(PRICES)):
+        assert rollup_user(db, TEST_USER_ID, through=date(2026, 1, 7)) == 3
+
+        # Backdated before every stored row, then the position is closed
+        _record(db, type="buy", trade_date=date(2026, 1, 2), shares=10, price=90)
+        _record(db, type="sell", trade_date=date(2026, 1, 7), shares=20, price=130)
+        assert db.query(Holding).count() == 0
+        # The closed position's currency comes from its last snapshot
+        db.add(
+            PriceSnapshot(
+                symbol="AAPL",
+                name="Apple Inc.",
+                currency="USD",
+                current_price=Decimal("130"),
+                previous_close=Decimal("120"),
+                fetched_at=datetime(2026, 1, 7, 21, 0),
+            )
+        )
+        db.commit()
+
+        assert rollup_all(db, through=date(2026, 1, 7)) == 3
+
+    rows = db.query(PortfolioDailyValue).order_by(PortfolioDailyValue.date).all()
+    assert [r.date for r in rows] == [date(2026, 1, 2), date(2026, 1, 5), date(2026, 1, 6)]
+    assert [r.total_value for r in rows] == [Decimal("1000"), Decimal("2200"), Decimal("2400")]
+    assert rows[1].total_cost == Decimal("1900")
+
+
+def test_rollup_converts_to_base_currency(db, test_user):
+    """Test positions are valued in the base currency and ones without a rate are left out."""
+    _add_holding(db, "AAPL", "10", "100")
+    _add_holding(db, "MSFT", "2", "150")
+    db.query(Holding).filter(Holding.symbol == "AAPL").update({"currency": "EUR"})
+    db.query(Holding).filter(Holding.symbol == "MSFT").update({"currency": "CHF"})
+    db.add(FxRate(currency="EUR", usd_rate=Decimal("1.1")))
+    db.commit()
+
+    with patch("app.services.history_service.get_daily_closes", side_effect=_closes(PRICES)):
+        rollup_user(db, TEST_USER_ID, through=date(2026, 1, 6))
+
+    rows = db.query(PortfolioDailyValue).order_by(PortfolioDailyValue.date).all()
+    # Jan 6: AAPL 10 * 120 EUR; MSFT has no CHF rate
+    assert rows[-1].total_value == Decimal("1320")
+    assert rows[-1].total_cost == Decimal("1100")
+
+
+def test_rollup_all_batches_price_fetch(db, test_user):
+    """Test all users share one batched price fetch."""
+    _add_holding(db, "AAPL", "10", "100")
+    _add_holding(db, "MSFT", "1", "200")
+
+    with patch(
+        "app.services.history_service.get_daily_closes", side_effect=_closes(PRICES)
+    ) as mock_closes:
+        assert rollup_all(db, through=date(2026, 1, 7)) == 3
+
+    mock_closes.assert_called_once()
+    assert mock_closes.call_args.args[0] == ["AAPL", "MSFT"]
+
+
+def test_ensure_price_history_skips_stored_range(db):
+    """Test closes already fetched are not requested again."""
+    db.add(PriceHistory(symbol="AAPL", date=date(2026, 1, 5), close=Decimal("110")))
+    db.add(
+        PriceHistoryCoverage(
+            symbol="AAPL", fetched_from=date(2025, 12, 1), fetched_through=date(2026, 1, 5)
+        )
+    )
+    db.commit()
+
+    with patch(
+        "app.services.history_service.get_daily_closes", side_effect=_closes(PRICES)
+    ) as mock_closes:
+        inserted = ensure_price_history(db, ["AAPL"], date(2026, 1, 6), date(2026, 1, 6))
+
+    assert inserted == 1
+    assert mock_closes.call_args.args[1] == date(2026, 1, 6)
+    assert db.get(PriceHistoryCoverage, "AAPL").fetched_through == date(2026, 1, 6)
+
+
+def test_ensure_price_history_replaces_compacted_closes(db):
+    """Test closes compacted from intraday quotes neither hide a gap nor outrank the provider."""
+    db.add(PriceHistory(symbol="AAPL", date=date(2026, 1, 6), close=Decimal("119")))
+    db.commit()
+
+    with patch(
+        "app.services.history_service.get_daily_closes", side_effect=_closes(PRICES)
+    ) as mock_closes:
+        inserted = ensure_price_history(db, ["AAPL"], date(2026, 1, 5), date(2026, 1, 7))
+
+    assert mock_closes.call_args.args[1] < date(2026, 1, 5)
+    assert inserted == 3
+    closes = {row.date: row.close for row in db.query(PriceHistory)}
+    assert closes == PRICES["AAPL"]
+
+
+def test_ensure_price_history_does_not_refetch_before_first_close(db):
+    """Test a symbol whose history starts after the window is only fetched for new days."""
+    with patch(
+        "app.services.history_service.get_daily_closes", side_effect=_closes(PRICES)
+    ) as mock_closes:
+        ensure_price_history(db, ["MSFT"], date(2025, 12, 1), date(2026, 1, 7))
+        ensure_price_history(db, ["MSFT"], date(2025, 12, 1), date(2026, 1, 8))
+
+    assert mock_closes.call_args.args[1:] == (date(2026, 1, 8), date(2026, 1, 8))
+
+
+def test_backfill_price_history_covers_holdings_and_benchmark(db, test_user):
+    """Test the rollup job stores closes of held symbols, the benchmark and extra symbols."""
+    _add_holding(db, "AAPL", "10", "100")
+
+    with (
+        patch("app.services.history_service.get_daily_closes", return_value={}) as mock_closes,
+        patch("app.services.history_service.settings.price_history_days", 30),
+    ):
+        backfill_price_history(db, through=date(2026, 1, 31))
+
+    symbols, start, end = mock_closes.call_args.args
+    assert symbols == ["AAPL", "SPY"]
+
+    with (
+        patch("app.services.history_service.get_daily_closes", return_value={}) as mock_closes,
+        patch("app.services.history_service.settings.price_history_extra_symbols", "xlk, XLF"),
+    ):
+        backfill_price_history(db, through=date(2026, 1, 31))
+    assert mock_closes.call_args.args[0] == ["AAPL", "SPY", "XLF", "XLK"]
+    assert end == date(2026, 1, 31)
+    assert start < date(2026, 1, 1)
@@ -190,3 +190,71 @@ def test_delete_holding_not_found(client, test_user):
 
     assert response.status_code == 404
     assert "not found" in response.json()["detail"]
+
+
+def _create_symbols(client, symbols):
+    mock_stock_data = {
+        "current_price": Decimal("100.00"),
+        "previous_close": Decimal("99.00"),
+        "daily_change_pct": Decimal("1.01"),
+        "name": "Test Inc.",
+    }
+    with patch("app.routers.holdings.get_stock_price", return_value=mock_stock_data):
+        for symbol in symbols:
+            response = client.post(
+                "/holdings", json={"symbol": symbol, "shares": 1, "avg_cost": 10.00}
+            )
+            assert response.status_code == 201
+
+
+def test_list_holdings_keyset_pagination(client, test_user):
+    """Test paging through holdings with the next-page cursor header."""
+    _create_symbols(client, ["MSFT", "AAPL", "GOOGL", "AMZN", "TSLA"])
+
+    seen = []
+    cursor = None
+    pages = 0
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/holdings", params=params)
+        assert response.status_code == 200
+        seen.extend(h["symbol"] for h in response.json())
+        pages += 1
+        cursor = response.headers.get("x-next-cursor")
+        if cursor is None:
+            break
+
+    assert seen == ["AAPL", "AMZN", "GOOGL", "MSFT", "TSLA"]
+    assert pages == 3
+
+
+def test_list_holdings_symbol_prefix_and_fields(client, test_user):
+    """Test prefix filtering and field projection."""
+    _create_symbols(client, ["AAPL", "AMZN", "MSFT", "A_B"])
+
+    response = client.get("/holdings", params={"symbol": "a", "fields": "symbol,shares"})
+
+    assert response.status_code == 200
+    assert response.json() == [
+        {"symbol": "AAPL", "shares": "1.00"},
+        {"symbol": "AMZN", "shares": "1.00"},
+        {"symbol": "A_B", "shares": "1.00"},
+    ]
+
+    # "_" is matched literally, not as a LIKE wildcard
+    response = client.get("/holdings", params={"symbol": "A_", "fields": "symbol"})
+    assert response.json() == [{"symbol": "A_B"}]
+
+
+def test_list_holdings_unknown_field(client, test_user):
+    """Test unknown fields are rejected."""
+    response = client.get("/holdings", params={"fields": "symbol,password"})
+
+    assert response.status_code == 400
+    assert "password" in response.json()["detail"]
+
+
+def test_list_holdings_invalid_cursor(client, test_user):
+    """Test malformed cursors are rejected."""
+    response = client.get("/holdings", params={"limit": 2, "cursor": "not-a-cursor"})
+    assert response.status_code == 400
@@ -0,0 +1,147 @@
+"""Tests for the market calendar and the quote policy built on it."""
+
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from app import models
+from app.services.market_calendar import (
+    MarketCalendar,
+    early_closes,
+    holidays,
+    market_calendar,
+    quote_ttl_seconds,
+    trading_day,
+)
+from app.services.quote_cache import quote_cache
+from app.services.quote_refresher import QuoteRefresher
+from app.services.stock_service import get_provider, refresh_quotes
+from tests.conftest import make_quote
+
+calendar = MarketCalendar(settle_seconds=900)
+
+
+def _utc(*args: int) -> datetime:
+    return datetime(*args, tzinfo=UTC)
+
+
+def test_holidays_and_early_closes():
+    """Test holiday rules, weekend observance and early closes."""
+    assert sorted(holidays(2026)) == [
+        date(2026, 1, 1),
+        date(2026, 1, 19),
+        date(2026, 2, 16),
+        date(2026, 4, 3),  # Good Friday
+        date(2026, 5, 25),
+        date(2026, 6, 19),
+        date(2026, 7, 3),  # July 4 is a Saturday
+        date(2026, 9, 7),
+        date(2026, 11, 26),
+        date(2026, 12, 25),
+    ]
+    # Saturday New Year's Day is not observed; Sunday Juneteenth is on Monday
+    assert date(2021, 12, 31) not in holidays(2021)
+    assert date(2022, 6, 20) in holidays(2022)
+    assert date(2025, 1, 9) in holidays(2025)
+
+    # No July 3 early close when it is the observed holiday
+    assert early_closes(2026) == {date(2026, 11, 27), date(2026, 12, 24)}
+    assert date(2025, 7, 3) in early_closes(2025)
+
+
+def test_sessions():
+    """Test session times in UTC across daylight saving time and early closes."""
+    assert calendar.session(date(2026, 10, 17)) is None  # Saturday
+    assert calendar.session(date(2026, 11, 26)) is None  # Thanksgiving
+
+    summer = calendar.session(date(2026, 10, 16))
+    assert (summer.open, summer.close) == (_utc(2026, 10, 16, 13, 30), _utc(2026, 10, 16, 20))
+    winter = calendar.session(date(2026, 11, 27))
+    assert (winter.open, winter.close) == (_utc(2026, 11, 27, 14, 30), _utc(2026, 11, 27, 18))
+    assert winter.early_close
+
+    # Friday evening: the next session is Monday's, the previous one Friday's
+    assert calendar.next_session(_utc(2026, 10, 17, 2)).day == date(2026, 10, 19)
+    assert calendar.previous_session(_utc(2026, 10, 17, 2)).day == date(2026, 10, 16)
+    # Across the year end
+    assert calendar.next_session(_utc(2026, 12, 31, 22)).day == date(2027, 1, 4)
+    assert calendar.previous_session(_utc(2027, 1, 4, 10)).day == date(2026, 12, 31)
+
+    assert calendar.is_open(_utc(2026, 10, 19, 15))
+    assert not calendar.is_open(_utc(2026, 10, 19, 12))
+
+
+def test_quote_ttl():
+    """Test quotes expire with the default TTL while prices move, else at the next open."""
+    # In session, and cut short when the close settles
+    assert calendar.quote_ttl(_utc(2026, 10, 19, 15), 60) == 60
+    assert calendar.quote_ttl(_utc(2026, 10, 19, 20, 14, 30), 60) == 30
+    # Friday after the close settles: final until Monday's open
+    ttl = calendar.quote_ttl(_utc(2026, 10, 16, 21), 60)
+    assert ttl == timedelta(days=2, hours=16, minutes=30).total_seconds()
+    # Before the open after Thanksgiving
+    assert calendar.quote_ttl(_utc(2026, 11, 27, 14), 60) == 1800
+
+
+def test_is_final():
+    """Test a quote is final once fetched after the settled close, until the next open."""
+    fetched = _utc(2026, 10, 16, 20, 20)
+    assert calendar.is_final(fetched, _utc(2026, 10, 18, 12))
+    assert not calendar.is_final(fetched, _utc(2026, 10, 19, 14))  # market open again
+    # Fetched before the close settled
+    assert not calendar.is_final(_utc(2026, 10, 16, 20, 5), _utc(2026, 10, 18, 12))
+
+
+def test_quote_ttl_only_for_us_listings():
+    """Test foreign listings, FX pairs and crypto keep the default TTL."""
+    saturday = _utc(2026, 10, 17, 12)
+    assert quote_ttl_seconds("AAPL", saturday, 60) > 60
+    assert quote_ttl_seconds("BRK-B", saturday, 60) > 60
+    for symbol in ("VOD.L", "EURUSD=X", "BTC-USD"):
+        assert quote_ttl_seconds(symbol, saturday, 60) == 60
+
+    with patch("app.services.market_calendar.settings.market_calendar_enabled", False):
+        assert quote_ttl_seconds("AAPL", saturday, 60) == 60
+
+
+def test_trading_day():
+    """Test prices seen outside a session count for the previous one."""
+    assert trading_day("AAPL", _utc(2026, 10, 16, 15)) == date(2026, 10, 16)
+    # Friday evening in New York is Saturday in UTC
+    assert trading_day("AAPL", _utc(2026, 10, 17, 2)) == date(2026, 10, 16)
+    assert trading_day("AAPL", _utc(2026, 10, 19, 12)) == date(2026, 10, 16)  # before the open
+    assert trading_day("AAPL", _utc(2026, 11, 26, 18)) == date(2026, 11, 25)  # Thanksgiving
+    # Without a calendar, weekends count for Friday
+    assert trading_day("VOD.L", _utc(2026, 10, 18, 12)) == date(2026, 10, 16)
+    assert trading_day("VOD.L", _utc(2026, 11, 26, 18)) == date(2026, 11, 26)
+
+
+def test_refresh_quotes_caches_until_next_open():
+    """Test fetched quotes are cached with the calendar's TTL."""
+    with (
+        patch.object(market_calendar, "quote_ttl", return_value=3600.0),
+        patch.object(get_provider(), "get_quotes", return_value={"AAPL": make_quote("180")}),
+    ):
+        refresh_quotes(["AAPL"])
+
+    assert quote_cache.due_for_refresh(["AAPL"], 3000) == []
+
+
+def test_refresher_skips_final_quotes(db):
+    """Test the refresher does not refresh final quotes ahead of the open."""
+    db.add_all(
+        [
+            models.SymbolPopularity(symbol="AAPL", holders=2, total_shares=Decimal("5")),
+            models.SymbolPopularity(symbol="MSFT", holders=1, total_shares=Decimal("5")),
+        ]
+    )
+    db.commit()
+    quote_cache.put("AAPL", make_quote("180"), ttl_seconds=5)
+
+    refresher = QuoteRefresher(
+        session_factory=lambda: db, interval_seconds=60, batch_size=10, refresh_ahead_seconds=10
+    )
+    with patch.object(market_calendar, "is_final", return_value=True):
+        assert refresher.plan(db) == ["MSFT"]
+    with patch.object(market_calendar, "is_final", return_value=False):
+        assert refresher.plan(db) == ["AAPL", "MSFT"]
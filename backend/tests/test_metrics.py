@@ -0,0 +1,85 @@
+"""Tests for Prometheus metrics."""
+
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+from prometheus_client import REGISTRY
+
+from app.services.auth_service import auth_service
+from app.services.stock_service import get_multiple_prices, get_provider
+
+MOCK_STOCK_DATA = {
+    "current_price": Decimal("180.00"),
+    "previous_close": Decimal("175.00"),
+    "daily_change_pct": Decimal("2.86"),
+    "name": "Apple Inc.",
+}
+
+
+def _sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+
+def test_metrics_endpoint(client):
+    """Test the scrape endpoint returns the Prometheus text format."""
+    client.get("/health")
+
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "http_request_duration_seconds_bucket" in response.text
+
+
+def test_request_latency_uses_route_template(client, test_user):
+    """Test path parameters do not leak into route labels."""
+    labels = {"method": "DELETE", "route": "/holdings/{holding_id}", "status": "404"}
+    before = _sample("http_request_duration_seconds_count", **labels)
+
+    client.delete("/holdings/00000000-0000-0000-0000-000000000000")
+
+    assert _sample("http_request_duration_seconds_count", **labels) == before + 1
+
+
+def test_unmatched_route_label(client):
+    """Test unknown paths share a single route label."""
+    labels = {"method": "GET", "route": "unmatched", "status": "404"}
+    before = _sample("http_request_duration_seconds_count", **labels)
+
+    client.get("/no-such-path/123")
+
+    assert _sample("http_request_duration_seconds_count", **labels) == before + 1
+
+
+def test_quote_cache_and_fetch_metrics():
+    """Test cache hits/misses and fetch errors are counted."""
+    hits = _sample("quote_cache_requests_total", result="hit")
+    misses = _sample("quote_cache_requests_total", result="miss")
+    not_found = _sample("quote_fetch_errors_total", operation="quotes", reason="not_found")
+    batches = _sample("quote_fetch_duration_seconds_count", operation="quotes")
+
+    def fake_quotes(symbols):
+        return {s: None if s == "INVALID" else MOCK_STOCK_DATA for s in symbols}
+
+    with patch.object(get_provider(), "get_quotes", side_effect=fake_quotes):
+        get_multiple_prices(["AAPL", "INVALID"])
+        get_multiple_prices(["AAPL"])
+
+    assert _sample("quote_cache_requests_total", result="hit") == hits + 1
+    assert _sample("quote_cache_requests_total", result="miss") == misses + 2
+    assert (
+        _sample("quote_fetch_errors_total", operation="quotes", reason="not_found") == not_found + 1
+    )
+    # The fully cached second call does not count as an upstream batch
+    assert _sample("quote_fetch_duration_seconds_count", operation="quotes") == batches + 1
+
+
+def test_jwt_verify_duration_records_outcome():
+    """Test failed verifications are timed under the error outcome."""
+    before = _sample("jwt_verify_duration_seconds_count", outcome="error")
+
+    with pytest.raises(ValueError):
+        auth_service.verify_token("not-a-jwt")
+
+    assert _sample("jwt_verify_duration_seconds_count", outcome="error") == before + 1
@@ -0,0 +1,126 @@
+"""Tests for symbol popularity and the quote refresher."""
+
+from decimal import Decimal
+from unittest.mock import patch
+
+from app import models
+from app.services.popularity_service import (
+    get_popular_symbols,
+    record_position_change,
+    refresh_symbol_popularity,
+)
+from app.services.quote_cache import quote_cache
+from app.services.quote_refresher import QuoteRefresher
+from app.services.stock_service import get_provider
+from tests.conftest import make_quote
+
+
+def _popularity(db):
+    db.expire_all()
+    return {
+        row.symbol: (row.holders, row.total_shares)
+        for row in db.query(models.SymbolPopularity).all()
+    }
+
+
+def test_popularity_follows_holding_changes(client, test_user, db):
+    """Test create, add-to and delete of holdings update holders and total shares."""
+    with patch("app.routers.holdings.get_stock_price", return_value=make_quote()):
+        client.post("/holdings", json={"symbol": "AAPL", "shares": 10, "avg_cost": 150})
+        client.post("/holdings", json={"symbol": "AAPL", "shares": 5, "avg_cost": 160})
+        response = client.post("/holdings", json={"symbol": "MSFT", "shares": 3, "avg_cost": 300})
+
+    assert _popularity(db) == {"AAPL": (1, Decimal("15")), "MSFT": (1, Decimal("3"))}
+
+    client.delete(f"/holdings/{response.json()['id']}")
+    assert _popularity(db)["MSFT"] == (0, Decimal("0"))
+
+
+def test_record_position_change_counts_holders_once(db):
+    """Test holders change only when a position opens or closes."""
+    record_position_change(db, "AAPL", None, Decimal("10"))
+    record_position_change(db, "AAPL", None, Decimal("4"))
+    record_position_change(db, "AAPL", Decimal("10"), Decimal("12"))
+    record_position_change(db, "AAPL", Decimal("4"), Decimal("0"))
+    db.commit()
+
+    assert _popularity(db) == {"AAPL": (1, Decimal("12"))}
+
+
+def test_refresh_matches_incremental(client, test_user, db):
+    """Test the full recompute agrees with the incrementally maintained rows."""
+    with patch("app.routers.holdings.get_stock_price", return_value=make_quote()):
+        client.post("/holdings", json={"symbol": "AAPL", "shares": 10, "avg_cost": 150})
+        client.post("/holdings", json={"symbol": "MSFT", "shares": 3, "avg_cost": 300})
+    incremental = _popularity(db)
+
+    assert refresh_symbol_popularity(db) == 2
+    db.commit()
+    assert _popularity(db) == incremental
+
+
+def test_get_popular_symbols_order(db):
+    """Test symbols are ordered by holders, then total shares, skipping unheld ones."""
+    db.add_all(
+        [
+            models.SymbolPopularity(symbol="AAPL", holders=2, total_shares=Decimal("5")),
+            models.SymbolPopularity(symbol="MSFT", holders=2, total_shares=Decimal("50")),
+            models.SymbolPopularity(symbol="NVDA", holders=3, total_shares=Decimal("1")),
+            models.SymbolPopularity(symbol="TSLA", holders=0, total_shares=Decimal("0")),
+        ]
+    )
+    db.commit()
+
+    assert [row.symbol for row in get_popular_symbols(db, 10)] == ["NVDA", "MSFT", "AAPL"]
+    assert [row.symbol for row in get_popular_symbols(db, 1)] == ["NVDA"]
+
+
+def test_due_for_refresh():
+    """Test uncached and soon-to-expire symbols are due, in the given order."""
+    quote_cache.put("AAPL", make_quote(), ttl_seconds=300)
+    quote_cache.put("MSFT", make_quote(), ttl_seconds=5)
+
+    assert quote_cache.due_for_refresh(["NVDA", "AAPL", "MSFT"], 10) == ["NVDA", "MSFT"]
+    assert quote_cache.due_for_refresh(["NVDA", "AAPL", "MSFT"], 0) == ["NVDA"]
+
+
+def test_refresher_refreshes_due_popular_symbols(db):
+    """Test one cycle fetches only popular symbols that are not freshly cached."""
+    db.add_all(
+        [
+            models.SymbolPopularity(symbol="AAPL", holders=2, total_shares=Decimal("5")),
+            models.SymbolPopularity(symbol="MSFT", holders=1, total_shares=Decimal("5")),
+            models.SymbolPopularity(symbol="NVDA", holders=1, total_shares=Decimal("1")),
+        ]
+    )
+    db.commit()
+    quote_cache.put("MSFT", make_quote(), ttl_seconds=300)
+
+    refresher = QuoteRefresher(
+        session_factory=lambda: db, interval_seconds=60, batch_size=2, refresh_ahead_seconds=10
+    )
+    with patch.object(
+        get_provider(), "get_quotes", side_effect=lambda symbols: {s: make_quote() for s in symbols}
+    ) as mock_get_quotes:
+        refreshed = refresher.run_once()
+
+    # NVDA is outside the batch; MSFT is cached
+    assert refreshed == 1
+    mock_get_quotes.assert_called_once_with(["AAPL"])
+    assert quote_cache.get("AAPL") is not None
+
+
+def test_admin_symbols(client, test_user, db):
+    """Test the admin endpoint lists popular symbols and requires admin."""
+    db.add(models.SymbolPopularity(symbol="AAPL", holders=1, total_shares=Decimal("10")))
+    db.commit()
+
+    assert client.get("/admin/symbols").status_code == 403
+
+    with patch("app.dependencies.admin.settings.admin_emails", "test@example.com"):
+        response = client.get("/admin/symbols")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [row["symbol"] for row in data] == ["AAPL"]
+    assert data[0]["holders"] == 1
@@ -0,0 +1,115 @@
+"""Tests for last known prices and the dashboard deadline."""
+
+import threading
+import time
+from decimal import Decimal
+from unittest.mock import patch
+
+from app import models
+from app.services.price_snapshot_service import flush_snapshots, record_quote, with_last_known
+from app.services.quote_cache import quote_cache
+from app.services.stock_service import StockAPIError, get_multiple_prices, get_provider
+from tests.conftest import make_quote
+
+
+def _add_holding(client):
+    with patch("app.routers.holdings.get_stock_price", return_value=make_quote("100")):
+        client.post("/holdings", json={"symbol": "AAPL", "shares": 10, "avg_cost": 100})
+
+
+def test_flush_snapshots_upserts_latest(db):
+    """Test buffered quotes are written once per symbol, keeping the latest."""
+    flush_snapshots(db)  # quotes buffered by earlier tests
+    record_quote("AAPL", make_quote("110", previous_close="100"))
+    record_quote("AAPL", make_quote("120", previous_close="100"))
+    assert flush_snapshots(db) == 1
+    db.commit()
+    record_quote("AAPL", make_quote("130", previous_close="100"))
+    assert flush_snapshots(db) == 1
+    db.commit()
+    assert flush_snapshots(db) == 0
+
+    snapshot = db.get(models.PriceSnapshot, "AAPL")
+    assert snapshot.current_price == Decimal("130")
+
+    quotes = with_last_known(db, ["AAPL", "MSFT"], {"AAPL": None, "MSFT": None})
+    assert quotes["AAPL"]["stale"] is True
+    assert quotes["AAPL"]["current_price"] == Decimal("130")
+    assert quotes["AAPL"]["daily_change_pct"] == Decimal("30")
+    assert quotes["MSFT"] is None
+
+
+def test_dashboard_serves_last_known_price_during_outage(client, test_user):
+    """Test holdings keep their last stored price, marked stale, when the provider fails."""
+    _add_holding(client)
+    with patch.object(get_provider(), "get_quotes", return_value={"AAPL": make_quote("150")}):
+        fresh = client.get("/dashboard").json()
+    assert fresh["stale"] is False
+    assert fresh["holdings"][0]["stale"] is False
+
+    # A restarted worker has no cached quotes; only the stored snapshot is left
+    quote_cache.clear()
+    with patch.object(get_provider(), "get_quotes", side_effect=StockAPIError("down")):
+        response = client.get("/dashboard")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["stale"] is True
+    holding = data["holdings"][0]
+    assert holding["stale"] is True
+    assert holding["as_of"] is not None
+    assert Decimal(str(holding["current_price"])) == Decimal("150")
+    assert Decimal(str(data["total_value"])) == Decimal("1500")
+
+
+def test_dashboard_responds_by_deadline(client, test_user):
+    """Test a hanging provider does not hold the response past the deadline."""
+    _add_holding(client)
+    quote_cache.put("AAPL", make_quote("140"), ttl_seconds=0)  # expired, but last known
+    release = threading.Event()
+
+    def hanging_quotes(symbols):
+        release.wait(5)
+        return {s: make_quote("160") for s in symbols}
+
+    with (
+        patch.object(get_provider(), "get_quotes", side_effect=hanging_quotes),
+        patch("app.routers.dashboard.settings.dashboard_deadline_seconds", 0.2),
+    ):
+        start = time.perf_counter()
+        response = client.get("/dashboard")
+        elapsed = time.perf_counter() - start
+
+        assert response.status_code == 200
+        assert elapsed < 2
+        holding = response.json()["holdings"][0]
+        assert holding["stale"] is True
+        assert Decimal(str(holding["current_price"])) == Decimal("140")
+
+        # The late fetch still completes in the background and warms the cache
+        release.set()
+        assert get_multiple_prices(["AAPL"], timeout=5)["AAPL"]["current_price"] == Decimal("160")
+
+
+def test_heatmap_responds_by_deadline(client, test_user):
+    """Test the heatmap uses the last known price for quotes not fetched by the deadline."""
+    _add_holding(client)
+    quote_cache.put("AAPL", make_quote("140"), ttl_seconds=0)  # expired, but last known
+    release = threading.Event()
+
+    def hanging_quotes(symbols):
+        release.wait(5)
+        return {s: make_quote("160") for s in symbols}
+
+    with (
+        patch.object(get_provider(), "get_quotes", side_effect=hanging_quotes),
+        patch("app.services.heatmap_service.settings.dashboard_deadline_seconds", 0.2),
+    ):
+        start = time.perf_counter()
+        response = client.get("/dashboard/heatmap")
+        elapsed = time.perf_counter() - start
+        release.set()
+
+    assert response.status_code == 200
+    assert elapsed < 2
+    assert response.json()["value"] == [1400.0]
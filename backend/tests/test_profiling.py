@@ -0,0 +1,146 @@
+"""Tests for opt-in request profiling."""
+
+import time
+from unittest.mock import patch
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from app.middleware.profiling import ProfilingMiddleware
+from app.profiling import (
+    ProfileBuffer,
+    RequestProfile,
+    install_query_timing,
+    profile_buffer,
+    span,
+    start_profile,
+    stop_profile,
+)
+
+
+def _profiled_app(buffer, sample_rate=0.0):
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware, buffer=buffer, sample_rate=sample_rate, interval_ms=1)
+
+    @app.get("/work/{item_id}")
+    def work(item_id: int):
+        with span("compute"):
+            time.sleep(0.02)
+        return {"item_id": item_id}
+
+    return app
+
+
+def test_span_is_noop_without_profile():
+    """Test spans outside a profiled request share the no-op context manager."""
+    assert span("compute") is span("db")
+
+
+def test_span_records_time_in_active_profile():
+    """Test spans accumulate count and time per name."""
+    profile = RequestProfile(method="GET", path="/")
+    token = start_profile(profile)
+    try:
+        with span("compute"):
+            pass
+        with span("compute"):
+            pass
+    finally:
+        stop_profile(token)
+
+    assert profile.to_dict()["spans"]["compute"]["count"] == 2
+    assert span("compute") is span("db")
+
+
+def test_query_timing_records_db_span(db):
+    """Test SQL statements count towards the db span of the active profile."""
+    install_query_timing()
+    profile = RequestProfile(method="GET", path="/")
+    token = start_profile(profile)
+    try:
+        db.execute(text("SELECT 1"))
+    finally:
+        stop_profile(token)
+
+    assert profile.to_dict()["spans"]["db"]["count"] == 1
+
+
+def test_middleware_profiles_requests_with_header():
+    """Test the trigger header produces a profile with spans and samples."""
+    buffer = ProfileBuffer(maxlen=10)
+    client = TestClient(_profiled_app(buffer))
+
+    response = client.get("/work/1", headers={"X-Profile": "1"})
+
+    assert response.status_code == 200
+    assert len(buffer) == 1
+    profile = buffer.list()[0].to_dict()
+    assert response.headers["x-profile-id"] == profile["id"]
+    assert profile["route"] == "/work/{item_id}"
+    assert profile["status"] == 200
+    assert profile["spans"]["compute"]["total_ms"] >= 20
+    assert profile["samples"] > 0
+    assert any("work" in s["stack"] for s in profile["stacks"])
+
+
+def test_middleware_skips_unflagged_requests():
+    """Test requests without the header are not profiled at a zero sample rate."""
+    buffer = ProfileBuffer(maxlen=10)
+    client = TestClient(_profiled_app(buffer))
+
+    client.get("/work/1")
+    client.get("/work/1", headers={"X-Profile": "0"})
+
+    assert len(buffer) == 0
+
+
+def test_middleware_sampling():
+    """Test a sample rate of 1 profiles every request."""
+    buffer = ProfileBuffer(maxlen=10)
+    client = TestClient(_profiled_app(buffer, sample_rate=1.0))
+
+    client.get("/work/1")
+    client.get("/work/2")
+
+    assert len(buffer) == 2
+
+
+def test_buffer_is_bounded():
+    """Test the ring buffer keeps only the newest profiles."""
+    buffer = ProfileBuffer(maxlen=2)
+    profiles = [RequestProfile(method="GET", path=f"/{i}") for i in range(3)]
+    for profile in profiles:
+        buffer.add(profile)
+
+    assert [p.path for p in buffer.list()] == ["/2", "/1"]
+    assert buffer.get(profiles[0].id) is None
+
+
+def test_admin_profiles_requires_admin(client):
+    """Test non-admin users cannot read profiles."""
+    response = client.get("/admin/profiles")
+    assert response.status_code == 403
+
+
+def test_admin_profiles(client):
+    """Test admins can list profiles and fetch one with stacks."""
+    profile = RequestProfile(method="GET", path="/dashboard")
+    profile.add_span("db", 1.5)
+    profile.add_sample("main.py:run;dashboard.py:get_dashboard")
+    profile_buffer.add(profile)
+
+    try:
+        with patch("app.dependencies.admin.settings.admin_emails", "Test@example.com"):
+            listed = client.get("/admin/profiles")
+            detail = client.get(f"/admin/profiles/{profile.id}")
+            missing = client.get("/admin/profiles/unknown")
+    finally:
+        profile_buffer.clear()
+
+    assert listed.status_code == 200
+    assert listed.json()[0]["id"] == profile.id
+    assert "stacks" not in listed.json()[0]
+    assert detail.json()["spans"]["db"] == {"count": 1, "total_ms": 1.5}
+    assert detail.json()["stacks"][0]["count"] == 1
+    assert missing.status_code == 404
@@ -0,0 +1,138 @@
+"""Tests for recording and replaying quote provider responses."""
+
+import time
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+
+from app.services.quote_cassette import RecordingProvider, ReplayProvider
+from app.services.stock_service import StockAPIError, StockNotFoundError
+from tests.conftest import make_quote
+
+
+class StubProvider:
+    """Upstream whose prices change on every call, like a live market."""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+
+    def _tick(self):
+        self.calls += 1
+        time.sleep(self.latency)
+        return str(100 + self.calls)
+
+    def get_stock_price(self, symbol):
+        price = self._tick()
+        if symbol == "INVALID":
+            raise StockNotFoundError(f"Stock symbol '{symbol}' not found")
+        return make_quote(price, previous_close="100", name=f"{symbol} Inc.")
+
+    def get_quotes(self, symbols):
+        price = self._tick()
+        return {
+            s: None if s == "INVALID" else make_quote(price, previous_close="100", name=f"{s} Inc.")
+            for s in symbols
+        }
+
+    def get_daily_closes(self, symbols, start, end):
+        self._tick()
+        return {s: {start: Decimal("99.5"), end: Decimal("101.25")} for s in symbols}
+
+    def get_fx_rates(self, currencies):
+        self._tick()
+        raise StockAPIError("FX download failed")
+
+
+def _record(path, provider):
+    recorder = RecordingProvider(provider, path)
+    results = {
+        "first": recorder.get_quotes(["AAPL", "MSFT", "INVALID"]),
+        "second": recorder.get_quotes(["AAPL", "MSFT", "INVALID"]),
+        "closes": recorder.get_daily_closes(["AAPL"], date(2026, 10, 1), date(2026, 10, 2)),
+    }
+    with pytest.raises(StockNotFoundError):
+        recorder.get_stock_price("INVALID")
+    with pytest.raises(StockAPIError):
+        recorder.get_fx_rates(["EUR"])
+    return recorder, results
+
+
+def test_replay_matches_recording(tmp_path):
+    """Test replayed calls return the recorded results, errors and call order."""
+    path = tmp_path / "quotes.cassette"
+    recorder, recorded = _record(path, StubProvider())
+    recorder.close()
+
+    replay = ReplayProvider(path, latency_scale=0)
+    symbols = ["MSFT", "INVALID", "AAPL"]
+    assert replay.get_quotes(symbols) == recorded["first"]
+    assert replay.get_quotes(symbols) == recorded["second"]
+    assert replay.get_quotes(symbols) == recorded["second"]  # the last recording repeats
+    closes = replay.get_daily_closes(["AAPL"], date(2026, 10, 1), date(2026, 10, 2))
+    assert closes == recorded["closes"]
+    with pytest.raises(StockNotFoundError):
+        replay.get_stock_price("INVALID")
+    with pytest.raises(StockAPIError, match="FX download failed"):
+        replay.get_fx_rates(["EUR"])
+    assert replay.symbols() == ["AAPL", "INVALID", "MSFT"]
+
+
+def test_history_replays_relative_to_the_day(tmp_path):
+    """Test a window recorded back from one day is matched, and moved, on a later day."""
+    path = tmp_path / "quotes.cassette"
+    with patch("app.services.quote_cassette._today", return_value=date(2026, 10, 2)):
+        recorder = RecordingProvider(StubProvider(), path)
+        recorder.get_daily_closes(["AAPL"], date(2026, 9, 2), date(2026, 10, 2))
+        recorder.close()
+
+    replay = ReplayProvider(path, latency_scale=0)
+    with patch("app.services.quote_cassette._today", return_value=date(2026, 10, 5)):
+        closes = replay.get_daily_closes(["AAPL"], date(2026, 9, 5), date(2026, 10, 5))
+        with pytest.raises(StockAPIError):
+            replay.get_daily_closes(["AAPL"], date(2026, 9, 2), date(2026, 10, 2))
+
+    assert closes == {
+        "AAPL": {date(2026, 9, 5): Decimal("99.5"), date(2026, 10, 5): Decimal("101.25")}
+    }
+
+
+def test_unrecorded_batches_assembled_per_symbol(tmp_path):
+    """Test quotes for a batch never recorded as such come from each symbol's recordings."""
+    path = tmp_path / "quotes.cassette"
+    recorder, recorded = _record(path, StubProvider())
+    recorder.close()
+
+    replay = ReplayProvider(path, latency_scale=0)
+    assert replay.get_quotes(["AAPL", "NVDA"]) == {"AAPL": recorded["first"]["AAPL"], "NVDA": None}
+    assert replay.get_stock_price("MSFT") == recorded["first"]["MSFT"]
+    assert replay.misses == 1
+
+
+def test_unclosed_cassette_is_readable(tmp_path):
+    """Test a recording that was never closed (e.g. a killed server) still replays."""
+    path = tmp_path / "quotes.cassette"
+    recorder, recorded = _record(path, StubProvider())
+    recorder._file.flush()
+
+    replay = ReplayProvider(path, latency_scale=0)
+    assert replay.get_quotes(["AAPL", "MSFT", "INVALID"]) == recorded["first"]
+    assert replay.get_quotes(["AAPL"]) == {"AAPL": recorded["first"]["AAPL"]}
+
+
+def test_replay_scales_recorded_latency(tmp_path):
+    """Test replay waits the recorded upstream time times the scale."""
+    path = tmp_path / "quotes.cassette"
+    recorder = RecordingProvider(StubProvider(latency=0.05), path)
+    recorder.get_quotes(["AAPL"])
+    recorder.close()
+
+    start = time.perf_counter()
+    ReplayProvider(path, latency_scale=2).get_quotes(["AAPL"])
+    assert time.perf_counter() - start >= 0.1
+
+    start = time.perf_counter()
+    ReplayProvider(path, latency_scale=0).get_quotes(["AAPL"])
+    assert time.perf_counter() - start < 0.05
@@ -0,0 +1,171 @@
+"""Tests for target allocations and rebalancing."""
+
+from datetime import date
+from decimal import Decimal
+from unittest.mock import patch
+
+import numpy as np
+
+from app.models import Holding, PriceHistory
+from app.services.quote_cache import quote_cache
+from app.services.rebalance_service import rebalance_trades
+from app.services.stock_service import get_provider
+from tests.conftest import TEST_USER_ID
+
+
+def test_rebalance_trades_fractional():
+    """Test fractional trades reach the targets exactly, funded by sells and cash."""
+    shares = np.array([10.0, 10.0])
+    prices = np.array([100.0, 50.0])
+    # Total 1500 + 500 cash = 2000: 50% / 50%
+    trades = rebalance_trades(shares, prices, np.array([0.5, 0.5]), 500.0, whole_shares=False)
+
+    assert trades.tolist() == [0.0, 10.0]
+
+
+def test_rebalance_trades_whole_shares_stay_within_cash():
+    """Test whole-share trades never overspend and invest leftovers closest to target."""
+    shares = np.array([0.0, 0.0, 0.0])
+    prices = np.array([300.0, 70.0, 45.0])
+    weights = np.array([0.5, 0.3, 0.2])
+    trades = rebalance_trades(shares, prices, weights, 1000.0)
+
+    # 500 -> 1 share (300); 300 -> 4 (280); 200 -> 4 (180). The 240 left buys nothing
+    # that would end closer to target than it is now.
+    assert trades.tolist() == [1.0, 4.0, 4.0]
+    assert trades @ prices <= 1000.0
+
+
+def test_rebalance_trades_invests_leftover_cash():
+    """Test cash left after rounding buys a share where that ends closer to target."""
+    shares = np.array([0.0, 0.0])
+    prices = np.array([60.0, 30.0])
+    # Targets 500 / 500: 8 shares (480) and 16 shares (480); 40 left buys one 30 share
+    trades = rebalance_trades(shares, prices, np.array([0.5, 0.5]), 1000.0)
+
+    assert trades.tolist() == [8.0, 17.0]
+
+
+def test_rebalance_trades_tolerance_and_exits():
+    """Test positions within tolerance are not traded and untargeted ones are closed."""
+    shares = np.array([10.0, 10.0, 2.5])
+    prices = np.array([49.0, 51.0, 40.0])
+    # ~44% / ~46% / ~9% against targets of 50% / 50% / 0%
+    trades = rebalance_trades(shares, prices, np.array([0.5, 0.5, 0.0]), 0.0, tolerance=0.05)
+
+    assert trades[2] == -2.5
+    assert trades[1] == 0.0
+    assert trades[0] == 1.0
+
+
+def test_rebalance_trades_without_sells():
+    """Test buy-only rebalancing spends only the cash on hand."""
+    shares = np.array([10.0, 0.0])
+    prices = np.array([100.0, 100.0])
+    trades = rebalance_trades(
+        shares, prices, np.array([0.5, 0.5]), 300.0, whole_shares=False, allow_sells=False
+    )
+
+    assert trades.tolist() == [0.0, 3.0]
+
+
+def _cache_quote(symbol: str, price: str) -> None:
+    quote_cache.put(
+        symbol,
+        {
+            "current_price": Decimal(price),
+            "previous_close": Decimal(price),
+            "daily_change_pct": Decimal("0"),
+            "name": symbol,
+            "currency": "USD",
+        },
+        ttl_seconds=300,
+    )
+
+
+def test_targets_endpoints(client, test_user):
+    """Test targets are replaced, normalized and validated."""
+    response = client.put(
+        "/dashboard/targets",
+        json={
+            "targets": [
+                {"symbol": " aapl ", "weight_pct": 60},
+                {"symbol": "MSFT", "weight_pct": 30},
+            ]
+        },
+    )
+    assert response.status_code == 200
+    assert client.get("/dashboard/targets").json() == {
+        "targets": [
+            {"symbol": "AAPL", "weight_pct": "60.0000"},
+            {"symbol": "MSFT", "weight_pct": "30.0000"},
+        ],
+        "cash_pct": "10.0000",
+    }
+
+    too_much = [{"symbol": "AAPL", "weight_pct": 60}, {"symbol": "MSFT", "weight_pct": 50}]
+    assert client.put("/dashboard/targets", json={"targets": too_much}).status_code == 422
+    duplicate = [{"symbol": "AAPL", "weight_pct": 10}, {"symbol": "aapl", "weight_pct": 10}]
+    assert client.put("/dashboard/targets", json={"targets": duplicate}).status_code == 422
+
+
+def test_rebalance_endpoint_uses_cached_quotes(client, test_user, db):
+    """Test rebalancing reads cached prices only and reports uncached symbols."""
+    db.add(Holding(user_id=TEST_USER_ID, symbol="AAPL", name="Apple", shares=10, avg_cost=1))
+    db.add(Holding(user_id=TEST_USER_ID, symbol="TSLA", name="Tesla", shares=3, avg_cost=1))
+    db.commit()
+    client.put(
+        "/dashboard/targets",
+        json={
+            "targets": [
+                {"symbol": "AAPL", "weight_pct": 50},
+                {"symbol": "MSFT", "weight_pct": 40},
+                {"symbol": "NVDA", "weight_pct": 10},
+            ]
+        },
+    )
+    _cache_quote("AAPL", "100")
+    _cache_quote("MSFT", "40")
+    _cache_quote("TSLA", "200")
+
+    with patch.object(get_provider(), "get_quotes") as mock_get_quotes:
+        response = client.post("/dashboard/rebalance", json={"cash": 400})
+
+    mock_get_quotes.assert_not_called()
+    assert response.status_code == 200
+    data = response.json()
+
+    # 1000 AAPL + 600 TSLA + 400 cash = 2000: AAPL stays, TSLA is sold, MSFT bought
+    assert data["total_value"] == "2000.0"
+    assert data["unpriced"] == ["NVDA"]
+    trades = {t["symbol"]: (t["action"], Decimal(t["shares"])) for t in data["trades"]}
+    assert trades == {"MSFT": ("buy", Decimal(20)), "TSLA": ("sell", Decimal(3))}
+    assert data["cash_after"] == "200.0"
+
+
+def test_rebalance_endpoint_values_every_holding(client, test_user, db):
+    """Test holdings without a quote use their last stored close, and fail without one."""
+    db.add(Holding(user_id=TEST_USER_ID, symbol="AAPL", name="Apple", shares=10, avg_cost=1))
+    db.add(Holding(user_id=TEST_USER_ID, symbol="IBM", name="IBM", shares=2, avg_cost=1))
+    db.add(PriceHistory(symbol="IBM", date=date(2026, 1, 5), close=Decimal("240")))
+    db.add(PriceHistory(symbol="IBM", date=date(2026, 1, 6), close=Decimal("250")))
+    db.commit()
+    _cache_quote("AAPL", "100")
+
+    response = client.post("/dashboard/rebalance", json={"cash": 0})
+    assert response.status_code == 200
+    data = response.json()
+    # 1000 AAPL + 500 IBM
+    assert data["total_value"] == "1500.0"
+    assert data["stale"] is True
+
+    db.add(Holding(user_id=TEST_USER_ID, symbol="NOPE", name="Nope", shares=1, avg_cost=1))
+    db.commit()
+    response = client.post("/dashboard/rebalance", json={"cash": 0})
+    assert response.status_code == 409
+    assert "NOPE" in response.json()["detail"]
+
+
+def test_rebalance_endpoint_not_found(client, test_user):
+    """Test rebalancing without holdings or targets returns 404."""
+    assert client.post("/dashboard/rebalance", json={}).status_code == 404
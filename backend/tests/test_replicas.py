@@ -0,0 +1,148 @@
+"""Tests for read replica routing."""
+
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from starlette.requests import Request
+
+from app import models
+from app.database import Base, get_db
+from app.main import app
+from app.replicas import ReplicaRouter, get_read_db, replica_router
+from tests.conftest import TEST_USER_ID
+
+USER = str(TEST_USER_ID)
+
+
+@pytest.fixture
+def databases(tmp_path):
+    """A primary and a replica, as two SQLite files; replication is copied by hand."""
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    for engine in (primary, replica):
+        Base.metadata.create_all(bind=engine)
+    yield primary, replica
+    primary.dispose()
+    replica.dispose()
+
+
+def _replicate_heartbeat(primary, replica, behind=timedelta(0)):
+    with Session(primary) as source, Session(replica) as target:
+        beat = source.get(models.ReplicaHeartbeat, 1)
+        target.merge(models.ReplicaHeartbeat(id=1, beat_at=beat.beat_at - behind))
+        target.commit()
+
+
+def test_replica_used_only_when_heartbeat_is_recent(databases):
+    """Test reads go to the primary until the replica's heartbeat is within the lag bound."""
+    primary, replica = databases
+    router = ReplicaRouter(primary, [replica], max_lag_seconds=5)
+    assert router.choose(USER) == ("primary", primary)
+
+    # No heartbeat replicated yet
+    router.measure(router.beat())
+    assert router.choose(USER)[0] == "primary"
+
+    beat = router.beat()
+    _replicate_heartbeat(primary, replica)
+    router.measure(beat)
+    assert router.choose(USER) == ("replica", replica)
+
+    beat = router.beat()
+    _replicate_heartbeat(primary, replica, behind=timedelta(seconds=30))
+    router.measure(beat)
+    assert router.choose(USER)[0] == "primary"
+
+
+def test_reads_after_write_wait_for_replica(databases):
+    """Test a user's reads stay on the primary until the replica has their last write."""
+    primary, replica = databases
+    router = ReplicaRouter(primary, [replica], max_lag_seconds=5)
+    beat = router.beat()
+    _replicate_heartbeat(primary, replica)
+    router.measure(beat)
+
+    router.record_write(USER)
+    assert router.choose(USER)[0] == "primary"
+    assert router.choose("someone-else")[0] == "replica"
+
+    # The next heartbeat, written after the commit, reaches the replica
+    beat = router.beat()
+    _replicate_heartbeat(primary, replica)
+    router.measure(beat)
+    assert router.choose(USER)[0] == "replica"
+
+
+def test_holdings_read_from_replica(client, test_user, databases):
+    """Test GET /holdings is served by the replica the router picks."""
+    primary, replica = databases
+    with Session(replica) as db:
+        db.add(models.User(id=TEST_USER_ID, email="test@example.com"))
+        db.add(
+            models.Holding(
+                user_id=TEST_USER_ID,
+                symbol="AAPL",
+                name="Apple Inc.",
+                shares=Decimal("1"),
+                avg_cost=Decimal("100"),
+            )
+        )
+        db.commit()
+
+    router = ReplicaRouter(primary, [replica], max_lag_seconds=5)
+    beat = router.beat()
+    _replicate_heartbeat(primary, replica)
+    router.measure(beat)
+
+    def override_get_read_db():
+        with Session(router.choose(USER)[1]) as db:
+            yield db
+
+    app.dependency_overrides[get_read_db] = override_get_read_db
+    assert [h["symbol"] for h in client.get("/holdings").json()] == ["AAPL"]
+
+    # After a write the primary, which has no holdings yet, serves the read
+    router.record_write(USER)
+    assert client.get("/holdings").json() == []
+
+
+@pytest.mark.parametrize(("method", "recorded"), [("GET", False), ("POST", True)])
+def test_only_changes_count_as_writes(method, recorded):
+    """Test commits pin a user to the primary only when the request changes data."""
+    request = Request({"type": "http", "method": method, "headers": []})
+    sessions = get_db(request)
+    db = next(sessions)
+    request.state.user_id = USER  # set later by get_current_user
+
+    with (
+        patch.object(replica_router, "replicas", [object()]),
+        patch.object(replica_router, "record_write") as mock_record,
+    ):
+        db.commit()
+    sessions.close()
+
+    assert mock_record.called is recorded
+    if recorded:
+        mock_record.assert_called_once_with(USER)
+
+
+def test_primary_reads_reuse_request_session():
+    """Test reads routed to the primary share the request's session and connection."""
+    primary_db = object()
+    user = {"sub": USER}
+
+    with patch.object(replica_router, "choose", return_value=("primary", None)):
+        assert next(get_read_db(primary_db, user)) is primary_db
+
+    replica = create_engine("sqlite://")
+    with patch.object(replica_router, "choose", return_value=("replica", replica)):
+        sessions = get_read_db(primary_db, user)
+        db = next(sessions)
+        assert db is not primary_db
+        assert db.get_bind() is replica
+        sessions.close()
+    replica.dispose()
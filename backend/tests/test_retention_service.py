@@ -0,0 +1,78 @@
+"""Tests for time-series partitions and intraday retention."""
+
+from datetime import UTC, date, datetime
+from decimal import Decimal
+
+from app import models
+from app.services.partition_service import ensure_partitions, months, partition_name
+from app.services.price_snapshot_service import flush_snapshots, record_quote
+from app.services.retention_service import apply_retention
+
+
+def _intraday(db, symbol, moment, price):
+    db.add(models.IntradayPrice(symbol=symbol, fetched_at=moment, price=Decimal(price)))
+
+
+def test_monthly_partition_ranges():
+    """Test partitions cover whole months, across year ends."""
+    assert list(months(date(2025, 11, 20), date(2026, 1, 3))) == [
+        date(2025, 11, 1),
+        date(2025, 12, 1),
+        date(2026, 1, 1),
+    ]
+    assert partition_name("price_history", date(2026, 1, 1)) == "price_history_p202601"
+
+
+def test_partitions_are_a_no_op_on_sqlite(db):
+    """Test plain tables need no partitions."""
+    assert ensure_partitions(db, "price_history", date(2020, 1, 1), date(2026, 1, 1)) == 0
+
+
+def test_flush_snapshots_appends_intraday_prices(db):
+    """Test each flushed quote is also kept in the intraday series."""
+    flush_snapshots(db)  # quotes buffered by earlier tests
+    db.query(models.IntradayPrice).delete()
+    quote = {"current_price": Decimal("101"), "previous_close": Decimal("100"), "currency": "USD"}
+    record_quote("AAPL", quote)
+    flush_snapshots(db)
+    record_quote("AAPL", {**quote, "current_price": Decimal("102")})
+    flush_snapshots(db)
+    db.commit()
+
+    prices = [row.price for row in db.query(models.IntradayPrice).order_by("fetched_at")]
+    assert prices == [Decimal("101"), Decimal("102")]
+
+
+def test_retention_compacts_expired_intraday_to_daily_closes(db):
+    """Test days past retention keep their last quote as the close, then are deleted."""
+    _intraday(db, "AAPL", datetime(2026, 10, 1, 14, 0, tzinfo=UTC), "100")
+    _intraday(db, "AAPL", datetime(2026, 10, 1, 19, 59, tzinfo=UTC), "105")
+    _intraday(db, "AAPL", datetime(2026, 10, 2, 15, 0, tzinfo=UTC), "106")
+    # Quotes after Friday's close and over the weekend count for Friday
+    _intraday(db, "AAPL", datetime(2026, 10, 3, 1, 0, tzinfo=UTC), "107")
+    _intraday(db, "AAPL", datetime(2026, 10, 4, 12, 0, tzinfo=UTC), "107")
+    _intraday(db, "MSFT", datetime(2026, 10, 1, 16, 0, tzinfo=UTC), "400")
+    _intraday(db, "AAPL", datetime(2026, 10, 9, 15, 0, tzinfo=UTC), "110")  # within retention
+    # A close from the provider is kept
+    db.add(models.PriceHistory(symbol="MSFT", date=date(2026, 10, 1), close=Decimal("401")))
+    db.commit()
+
+    result = apply_retention(db, date(2026, 10, 12), intraday_retention_days=7, months_ahead=3)
+
+    assert result.closes_written == 2
+    assert result.rows_deleted == 6
+    closes = {
+        (row.symbol, row.date): row.close
+        for row in db.query(models.PriceHistory).order_by("symbol", "date")
+    }
+    assert closes == {
+        ("AAPL", date(2026, 10, 1)): Decimal("105"),
+        ("AAPL", date(2026, 10, 2)): Decimal("107"),
+        ("MSFT", date(2026, 10, 1)): Decimal("401"),
+    }
+    remaining = db.query(models.IntradayPrice).all()
+    assert [(row.symbol, row.price) for row in remaining] == [("AAPL", Decimal("110"))]
+
+    # Nothing left to compact
+    again = apply_retention(db, date(2026, 10, 12), intraday_retention_days=7, months_ahead=3)
+    assert (again.closes_written, again.rows_deleted) == (0, 0)
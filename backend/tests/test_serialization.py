@@ -0,0 +1,101 @@
+"""Tests for response content negotiation."""
+
+from decimal import Decimal
+from unittest.mock import patch
+
+import msgpack
+import pytest
+from fastapi import HTTPException
+
+from app.serialization import MEDIA_COLUMNAR, MEDIA_JSON, MEDIA_MSGPACK, negotiate, to_columnar
+
+MOCK_STOCK_DATA = {
+    "current_price": Decimal("180.00"),
+    "previous_close": Decimal("175.00"),
+    "daily_change_pct": Decimal("2.86"),
+    "name": "Apple Inc.",
+}
+
+
+@pytest.mark.parametrize(
+    ("accept", "expected"),
+    [
+        (None, MEDIA_JSON),
+        ("*/*", MEDIA_JSON),
+        ("application/msgpack", MEDIA_MSGPACK),
+        ("application/x-msgpack", MEDIA_MSGPACK),
+        (f"{MEDIA_COLUMNAR}, application/json;q=0.5", MEDIA_COLUMNAR),
+        (f"application/json;q=0.5, {MEDIA_MSGPACK}", MEDIA_MSGPACK),
+        ("text/html, */*;q=0.1", MEDIA_JSON),
+    ],
+)
+def test_negotiate(accept, expected):
+    """Test media type selection honours order and q-values."""
+    assert negotiate(accept) == expected
+
+
+def test_negotiate_not_acceptable():
+    """Test unsupported media types are rejected."""
+    with pytest.raises(HTTPException) as exc_info:
+        negotiate("text/csv")
+    assert exc_info.value.status_code == 406
+
+
+def test_to_columnar():
+    """Test rows become parallel arrays."""
+    rows = [{"a": 1, "b": "x"}, {"a": 2, "b": "y"}]
+    assert to_columnar(rows) == {"a": [1, 2], "b": ["x", "y"]}
+
+
+def _create_holdings(client):
+    with patch("app.routers.holdings.get_stock_price", return_value=MOCK_STOCK_DATA):
+        client.post("/holdings", json={"symbol": "AAPL", "shares": 10, "avg_cost": 150.00})
+        client.post("/holdings", json={"symbol": "MSFT", "shares": 5, "avg_cost": 300.00})
+
+
+def test_holdings_default_json_unchanged(client, test_user):
+    """Test the default representation keeps Decimals as strings."""
+    _create_holdings(client)
+
+    response = client.get("/holdings")
+
+    assert response.headers["content-type"] == MEDIA_JSON
+    assert response.headers["vary"] == "Accept"
+    assert response.json()[0]["shares"] == "10.00"
+
+
+def test_holdings_columnar(client, test_user):
+    """Test the columnar representation of the holdings list."""
+    _create_holdings(client)
+
+    response = client.get("/holdings", headers={"Accept": MEDIA_COLUMNAR})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == MEDIA_COLUMNAR
+    data = response.json()
+    assert sorted(data["symbol"]) == ["AAPL", "MSFT"]
+    assert sorted(data["shares"]) == [5.0, 10.0]
+
+
+def test_dashboard_msgpack(client, test_user):
+    """Test the dashboard encoded as columnar MessagePack."""
+    _create_holdings(client)
+
+    with patch(
+        "app.routers.dashboard.get_multiple_prices",
+        return_value={"AAPL": MOCK_STOCK_DATA, "MSFT": MOCK_STOCK_DATA},
+    ):
+        response = client.get("/dashboard", headers={"Accept": MEDIA_MSGPACK})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == MEDIA_MSGPACK
+    data = msgpack.unpackb(response.content)
+    assert data["total_value"] == 2700.0
+    assert sorted(data["holdings"]["symbol"]) == ["AAPL", "MSFT"]
+    assert isinstance(data["last_updated"], str)
+
+
+def test_not_acceptable_media_type(client, test_user):
+    """Test an unsupported Accept header returns 406."""
+    response = client.get("/holdings", headers={"Accept": "text/csv"})
+    assert response.status_code == 406
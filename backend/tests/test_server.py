@@ -0,0 +1,114 @@
+"""Tests for the production server profile."""
+
+from unittest.mock import MagicMock, patch
+
+from anyio import to_thread
+from fastapi.testclient import TestClient
+
+from app import server
+from app.config import settings
+from app.leader import JobLeader
+from app.main import app
+
+
+def test_options_from_settings():
+    """Test worker count, preloading and graceful shutdown come from settings."""
+    with (
+        patch.object(settings, "server_workers", 3),
+        patch.object(settings, "server_bind", "127.0.0.1:9000"),
+        patch.object(settings, "server_graceful_timeout_seconds", 12.0),
+    ):
+        options = server.options()
+
+    assert options["workers"] == 3
+    assert options["bind"] == "127.0.0.1:9000"
+    assert options["preload_app"] is True
+    assert options["worker_class"] == "uvicorn.workers.UvicornWorker"
+    assert options["graceful_timeout"] == 12.0
+
+
+def test_post_fork_resets_every_pool():
+    """Test workers drop the primary's and replicas' inherited connections."""
+    primary, replica = MagicMock(), MagicMock()
+    with (
+        patch("app.database.engine", primary),
+        patch("app.database.replica_engines", [replica]),
+    ):
+        server.post_fork(None, None)
+
+    primary.dispose.assert_called_once_with(close=False)
+    replica.dispose.assert_called_once_with(close=False)
+
+
+def test_default_workers_per_cpu():
+    """Test ``server_workers = 0`` runs one worker per CPU."""
+    with (
+        patch.object(settings, "server_workers", 0),
+        patch("app.server.os.cpu_count", return_value=6),
+    ):
+        assert server.worker_count() == 6
+
+
+def test_threadpool_sized_to_db_pool():
+    """Test sync routes get one thread per DB connection unless overridden."""
+    with patch.object(settings, "server_threads", 0):
+        assert settings.threadpool_size == settings.db_pool_size + settings.db_max_overflow
+    with patch.object(settings, "server_threads", 8):
+        assert settings.threadpool_size == 8
+
+    # Applied to the running app by the lifespan
+    with patch.object(settings, "server_threads", 7), TestClient(app) as client:
+
+        async def limiter_tokens():
+            return to_thread.current_default_thread_limiter().total_tokens
+
+        assert client.portal.call(limiter_tokens) == 7
+
+
+def _leader(engine):
+    events = []
+    leader = JobLeader(
+        engine,
+        lock_id=1,
+        interval_seconds=60,
+        on_elected=lambda: events.append("elected"),
+        on_deposed=lambda: events.append("deposed"),
+    )
+    return leader, events
+
+
+def test_job_leader_takes_free_lock():
+    """Test jobs start only once the advisory lock is taken, and stop if it is lost."""
+    engine = MagicMock()
+    engine.dialect.name = "postgresql"
+    connection = engine.connect.return_value
+    connection.scalar.side_effect = [False, True]
+    leader, events = _leader(engine)
+
+    leader.run_once()  # held by another worker
+    assert events == []
+    connection.close.assert_called_once()
+
+    leader.run_once()
+    assert events == ["elected"]
+    leader.run_once()
+    assert events == ["elected"]
+
+    connection.execute.side_effect = OSError("connection reset")
+    leader.run_once()
+    assert events == ["elected", "deposed"]
+    assert not leader.leading
+    connection.invalidate.assert_called_once()
+
+
+def test_job_leader_without_advisory_locks():
+    """Test a single process on SQLite leads from startup and stops its jobs on shutdown."""
+    engine = MagicMock()
+    engine.dialect.name = "sqlite"
+    leader, events = _leader(engine)
+
+    leader.start()
+    assert events == ["elected"]
+    leader.stop()
+    assert events == ["elected", "deposed"]
+    engine.connect.assert_not_called()
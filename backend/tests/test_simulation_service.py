@@ -0,0 +1,148 @@
+"""Tests for Monte Carlo projections and stress scenarios."""
+
+from datetime import date
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from app.models import Holding
+from app.services import simulation_service
+from app.services.monte_carlo import shutdown_pool, simulate
+from app.services.simulation_service import checkpoint_days, scenario_returns
+from tests.conftest import TEST_USER_ID, seed_history
+
+
+@pytest.fixture(autouse=True)
+def clear_simulation_cache():
+    simulation_service._simulation_cache.clear()
+    yield
+    simulation_service._simulation_cache.clear()
+
+
+def _inputs():
+    values = np.array([1000.0, 500.0])
+    mean = np.array([0.0005, 0.0002])
+    covariance = np.array([[1e-4, 4e-5], [4e-5, 2e-4]])
+    return values, mean, covariance, checkpoint_days(30)
+
+
+def test_simulate_without_volatility_compounds_the_mean():
+    """Test zero covariance (factorized with a ridge) grows each position by its mean."""
+    values, mean, _, checkpoints = _inputs()
+    paths = simulate(values, mean, np.zeros((2, 2)), checkpoints, 50, seed=0, chunk_paths=20)
+
+    assert checkpoints.tolist() == [21, 30]
+    assert paths.shape == (50, 2)
+    expected = np.exp(np.outer(checkpoints, mean)) @ values
+    assert paths == pytest.approx(np.tile(expected, (50, 1)))
+
+
+def test_simulate_process_pool_matches_serial():
+    """Test chunks split across worker processes give the paths of a serial run."""
+    values, mean, covariance, checkpoints = _inputs()
+    serial = simulate(values, mean, covariance, checkpoints, 1000, seed=7, chunk_paths=300)
+    try:
+        pooled = simulate(
+            values, mean, covariance, checkpoints, 1000, seed=7, chunk_paths=300, workers=2
+        )
+    finally:
+        shutdown_pool()
+
+    assert np.array_equal(serial, pooled)
+    other = simulate(values, mean, covariance, checkpoints, 1000, seed=8, chunk_paths=300)
+    assert not np.array_equal(serial, other)
+
+
+def test_scenario_returns_follow_covariance():
+    """Test unshocked series move by their regression on the shocked ones."""
+    # B moves half as much as A; C is uncorrelated
+    covariance = np.array([[4e-4, 2e-4, 0.0], [2e-4, 2e-4, 0.0], [0.0, 0.0, 1e-4]])
+    shock = np.log(0.8)
+    returns = scenario_returns(covariance, np.array([0]), np.array([shock]))
+
+    assert returns == pytest.approx([shock, shock / 2, 0.0])
+
+
+def test_simulate_endpoint(client, test_user, db):
+    """Test projections and scenarios are computed from stored history and cached."""
+    db.add(Holding(user_id=TEST_USER_ID, symbol="AAPL", name="Apple", shares=10, avg_cost=1))
+    db.add(Holding(user_id=TEST_USER_ID, symbol="MSFT", name="Microsoft", shares=5, avg_cost=1))
+    seed_history(db, "AAPL", ["100", "102", "101", "105", "104", "107"])
+    seed_history(db, "MSFT", ["200", "198", "202", "204", "210", "208"])
+    # MSFT tracks XLK exactly
+    seed_history(db, "XLK", ["100", "99", "101", "102", "105", "104"])
+    db.commit()
+
+    body = {
+        "paths": 500,
+        "horizon_days": 42,
+        "lookback_days": 30,
+        "scenarios": [{"name": "Tech -20%", "shocks": {"xlk": -20}}],
+    }
+    with (
+        patch("app.services.history_service.get_daily_closes") as mock_closes,
+        patch("app.services.simulation_service.date") as mock_date,
+    ):
+        mock_date.today.return_value = date(2026, 1, 6)
+        response = client.post("/dashboard/simulate", json=body)
+        assert client.post("/dashboard/simulate", json=body).json() == response.json()
+
+    assert response.status_code == 200
+    mock_closes.assert_not_called()  # history is only read
+    data = response.json()
+    assert data["symbols"] == ["AAPL", "MSFT"]
+    assert data["observations"] == 5
+    # AAPL 10 * 107 + MSFT 5 * 208
+    assert data["current_value"] == pytest.approx(2110.0)
+    assert [band["day"] for band in data["bands"]] == [21, 42]
+    final = data["bands"][-1]
+    assert final["p5"] <= final["p25"] <= final["p50"] <= final["p75"] <= final["p95"]
+    assert data["expected_shortfall_95"] >= data["value_at_risk_95"]
+    assert 0 <= data["probability_of_loss"] <= 1
+
+    [scenario] = data["scenarios"]
+    assert scenario["name"] == "Tech -20%"
+    assert scenario["position_changes_pct"]["MSFT"] == pytest.approx(-20.0)
+    assert scenario["value"] == pytest.approx(2110.0 * (1 + scenario["change_pct"] / 100), rel=1e-9)
+
+
+def test_simulate_errors(client, test_user, db):
+    """Test missing holdings, unknown scenario symbols and short history are reported."""
+    assert client.post("/dashboard/simulate", json={}).status_code == 404
+
+    db.add(Holding(user_id=TEST_USER_ID, symbol="AAPL", name="Apple", shares=10, avg_cost=1))
+    seed_history(db, "AAPL", ["100", "102"])
+    db.commit()
+
+    with patch("app.services.simulation_service.date") as mock_date:
+        mock_date.today.return_value = date(2026, 1, 6)
+        scenario = {"name": "Crash", "shocks": {"NOPE": -30}}
+        response = client.post("/dashboard/simulate", json={"scenarios": [scenario]})
+        assert response.status_code == 422
+        assert "NOPE" in response.json()["detail"]
+        assert client.post("/dashboard/simulate", json={}).status_code == 503
+
+    invalid = {"name": "Wipeout", "shocks": {"AAPL": -100}}
+    response = client.post("/dashboard/simulate", json={"scenarios": [invalid]})
+    assert response.status_code == 422
+
+
+def test_simulate_refuses_oversized_runs(client, test_user, db):
+    """Test runs over the draw limit are refused before any path is generated."""
+    db.add(Holding(user_id=TEST_USER_ID, symbol="AAPL", name="Apple", shares=10, avg_cost=1))
+    seed_history(db, "AAPL", ["100", "102", "101", "105"])
+    db.commit()
+
+    with (
+        patch("app.services.simulation_service.date") as mock_date,
+        patch("app.services.simulation_service.settings.simulation_max_draws", 1_000_000),
+        patch("app.services.simulation_service.simulate") as mock_simulate,
+    ):
+        mock_date.today.return_value = date(2026, 1, 6)
+        body = {"paths": 10_000, "horizon_days": 252, "lookback_days": 30}
+        response = client.post("/dashboard/simulate", json=body)
+
+    assert response.status_code == 422
+    assert "fewer paths" in response.json()["detail"]
+    mock_simulate.assert_not_called()
@@ -1,15 +1,21 @@
 """Tests for stock service."""
 
+from datetime import date
 from decimal import Decimal
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, PropertyMock, patch
 
 import pytest
 
+from app.config import settings
+from app.services.quote_cache import quote_cache
 from app.services.stock_service import (
     StockAPIError,
     StockNotFoundError,
+    get_daily_closes,
     get_multiple_prices,
+    get_provider,
     get_stock_price,
+    set_provider,
 )
 
 
@@ -32,6 +38,28 @@ def test_get_stock_price_success():
     assert isinstance(result["daily_change_pct"], Decimal)
 
 
+def test_get_stock_price_minor_currency_units():
+    """Test quotes in pence are converted to pounds and report the major currency."""
+    import pandas as pd
+
+    mock_ticker = MagicMock()
+    mock_ticker.history.return_value = pd.DataFrame({"Close": [2450.0, 2500.0]})
+    mock_ticker.info = {"longName": "Shell plc", "currency": "GBp"}
+
+    with patch("app.services.stock_service.yf.Ticker", return_value=mock_ticker):
+        result = get_stock_price("SHEL.L")
+
+    assert result["currency"] == "GBP"
+    assert result["current_price"] == Decimal("25.00")
+    assert result["previous_close"] == Decimal("24.50")
+
+    # Rounded in pence, then converted: a half penny is kept
+    mock_ticker.history.return_value = pd.DataFrame({"Close": [2450.0, 2512.5]})
+    quote_cache.clear()
+    with patch("app.services.stock_service.yf.Ticker", return_value=mock_ticker):
+        assert get_stock_price("SHEL.L")["current_price"] == Decimal("25.125")
+
+
 def test_get_stock_price_empty_history():
     """Test stock price fetch with empty history (invalid symbol)."""
     mock_ticker = MagicMock()
@@ -69,59 +97,268 @@ def test_get_stock_price_fallback_name():
     assert result["name"] == "AAPL"  # Fallback to symbol
 
 
-def test_get_multiple_prices_success():
-    """Test fetching multiple stock prices."""
+@pytest.fixture(autouse=True)
+def fresh_provider():
+    """Use a provider without metadata from earlier tests."""
+    previous = set_provider(None)
+    yield
+    set_provider(previous)
+
+
+def _ticker(info):
+    ticker = MagicMock()
+    ticker.info = info
+    return ticker
+
+
+def _download_frame(closes, opens=None):
+    """Frame shaped like a multi-symbol ``yf.download`` result."""
     import pandas as pd
 
-    mock_ticker = MagicMock()
-    mock_hist = pd.DataFrame({"Close": [175.25, 180.50]})
-    mock_ticker.history.return_value = mock_hist
-    mock_ticker.info = {"longName": "Test Stock"}
+    opens = opens or closes
+    index = pd.to_datetime(["2026-01-05", "2026-01-06"][-len(next(iter(closes.values()))) :])
+    columns = pd.MultiIndex.from_product([["Close", "Open"], list(closes)])
+    rows = [
+        [closes[s][i] for s in closes] + [opens[s][i] for s in opens] for i in range(len(index))
+    ]
+    return pd.DataFrame(rows, index=index, columns=columns)
 
-    with patch("app.services.stock_service.yf.Ticker", return_value=mock_ticker):
+
+def test_get_multiple_prices_success():
+    """Test fetching multiple stock prices with one download call."""
+    frame = _download_frame({"AAPL": [175.25, 180.50], "GOOGL": [140.0, 141.4]})
+
+    with (
+        patch("app.services.stock_service.yf.download", return_value=frame) as mock_download,
+        patch("app.services.stock_service.yf.Ticker", return_value=_ticker({})),
+    ):
         result = get_multiple_prices(["AAPL", "GOOGL"])
 
+    mock_download.assert_called_once()
+    assert mock_download.call_args.args[0] == ["AAPL", "GOOGL"]
     assert len(result) == 2
-    assert "AAPL" in result
-    assert "GOOGL" in result
-    assert result["AAPL"] is not None
-    assert result["GOOGL"] is not None
+    assert result["AAPL"]["current_price"] == Decimal("180.50")
+    assert result["AAPL"]["previous_close"] == Decimal("175.25")
+    assert result["GOOGL"]["current_price"] == Decimal("141.40")
+    assert result["GOOGL"]["name"] == "GOOGL"  # No name in info: fallback to symbol
 
 
 def test_get_multiple_prices_partial_failure():
     """Test fetching multiple prices with some failures."""
+    frame = _download_frame({"AAPL": [175.0, 180.0], "INVALID": [None, None]})
 
-    def mock_get_stock_price(symbol):
-        if symbol == "AAPL":
-            return {
-                "current_price": Decimal("180.00"),
-                "previous_close": Decimal("175.00"),
-                "daily_change_pct": Decimal("2.86"),
-                "name": "Apple Inc.",
-            }
-        else:
-            raise StockNotFoundError("Invalid symbol")
-
-    with patch("app.services.stock_service.get_stock_price", side_effect=mock_get_stock_price):
+    with (
+        patch("app.services.stock_service.yf.download", return_value=frame),
+        patch("app.services.stock_service.yf.Ticker", return_value=_ticker({})) as mock_ticker,
+    ):
         result = get_multiple_prices(["AAPL", "INVALID"])
 
+    # Metadata is only looked up for symbols with data
+    mock_ticker.assert_called_once_with("AAPL")
+
     assert len(result) == 2
     assert result["AAPL"] is not None
     assert result["INVALID"] is None
 
 
+def test_get_multiple_prices_api_error():
+    """Test a failed download yields None for every symbol."""
+    with patch("app.services.stock_service.yf.download", side_effect=Exception("Network")):
+        result = get_multiple_prices(["AAPL", "MSFT"])
+
+    assert result == {"AAPL": None, "MSFT": None}
+
+
+def test_get_multiple_prices_uses_ticker_metadata():
+    """Test batch quotes reuse the name and currency of an earlier single lookup."""
+    import pandas as pd
+
+    mock_ticker = MagicMock()
+    mock_ticker.history.return_value = pd.DataFrame({"Close": [1000.0, 1010.0]})
+    mock_ticker.info = {"longName": "Vodafone Group", "currency": "GBp"}
+    frame = _download_frame({"VOD.L": [1010.0]}, {"VOD.L": [1000.0]})
+
+    with (
+        patch("app.services.stock_service.yf.Ticker", return_value=mock_ticker),
+        patch("app.services.stock_service.yf.download", return_value=frame),
+    ):
+        get_stock_price("VOD.L")
+        quote_cache.clear()
+        result = get_multiple_prices(["VOD.L"])
+
+    # Single bar: no previous close, so no change; pence are converted to pounds
+    assert result["VOD.L"]["name"] == "Vodafone Group"
+    assert result["VOD.L"]["currency"] == "GBP"
+    assert result["VOD.L"]["current_price"] == Decimal("10.1")
+    assert result["VOD.L"]["previous_close"] == Decimal("10.1")
+    assert result["VOD.L"]["daily_change_pct"] == 0
+
+
+def test_get_multiple_prices_fetches_unknown_metadata():
+    """Test symbols never looked up get their currency from info, or no quote at all."""
+    failing = MagicMock()
+    type(failing).info = PropertyMock(side_effect=Exception("Not found"))
+    tickers = {"VOD.L": _ticker({"longName": "Vodafone Group", "currency": "GBp"}), "BP.L": failing}
+    frame = _download_frame({"VOD.L": [1000.0, 1010.0], "BP.L": [450.0, 455.0]})
+
+    with (
+        patch("app.services.stock_service.yf.Ticker", side_effect=tickers.get) as mock_ticker,
+        patch("app.services.stock_service.yf.download", return_value=frame),
+    ):
+        result = get_multiple_prices(["VOD.L", "BP.L"])
+        quote_cache.clear()
+        get_multiple_prices(["VOD.L"])
+
+    assert result["VOD.L"]["name"] == "Vodafone Group"
+    assert result["VOD.L"]["currency"] == "GBP"
+    assert result["VOD.L"]["current_price"] == Decimal("10.1")
+    # Unknown currency: no quote rather than pence taken for dollars
+    assert result["BP.L"] is None
+    # Metadata is fetched once per symbol
+    assert [c.args[0] for c in mock_ticker.call_args_list].count("VOD.L") == 1
+
+
+@pytest.mark.parametrize(("retry_seconds", "lookups"), [(900, 1), (0, 2)])
+def test_failed_metadata_lookups_are_retried_after_a_while(retry_seconds, lookups):
+    """Test a symbol whose metadata lookup failed is not looked up on every fetch."""
+    failing = MagicMock()
+    type(failing).info = PropertyMock(side_effect=Exception("Not found"))
+    frame = _download_frame({"BP.L": [450.0, 455.0]})
+
+    with (
+        patch("app.services.stock_service.yf.Ticker", return_value=failing) as mock_ticker,
+        patch("app.services.stock_service.yf.download", return_value=frame),
+        patch.object(settings, "quote_metadata_retry_seconds", retry_seconds),
+    ):
+        assert get_multiple_prices(["BP.L"])["BP.L"] is None
+        assert get_multiple_prices(["BP.L"])["BP.L"] is None
+
+    assert mock_ticker.call_count == lookups
+
+
 def test_get_stock_price_single_day_history():
-    """Test with only one day of history (use open as previous)."""
+    """Test with only one day of history (previous close from info, never the open)."""
     import pandas as pd
 
     mock_ticker = MagicMock()
     # Create a real pandas DataFrame with one day
     mock_hist = pd.DataFrame({"Close": [180.50], "Open": [175.00]})
     mock_ticker.history.return_value = mock_hist
-    mock_ticker.info = {"longName": "Test Stock"}
+    mock_ticker.info = {"longName": "Test Stock", "regularMarketPreviousClose": 178.0}
 
     with patch("app.services.stock_service.yf.Ticker", return_value=mock_ticker):
         result = get_stock_price("AAPL")
 
     assert result["current_price"] == Decimal("180.50")
-    assert result["previous_close"] == Decimal("175.00")
+    assert result["previous_close"] == Decimal("178.00")
+
+    # Without one in info, there is no change rather than a change since the open
+    mock_ticker.info = {"longName": "Test Stock"}
+    with patch("app.services.stock_service.yf.Ticker", return_value=mock_ticker):
+        result = get_stock_price("NEWCO")
+
+    assert result["previous_close"] == Decimal("180.50")
+    assert result["daily_change_pct"] == 0
+
+
+def test_get_stock_price_served_from_cache():
+    """Test a cached quote is returned without a fetch, unless it lacks the name."""
+    quote = {
+        "current_price": Decimal("180.00"),
+        "previous_close": Decimal("175.00"),
+        "daily_change_pct": Decimal("2.86"),
+        "name": "Apple Inc.",
+        "currency": "USD",
+    }
+    quote_cache.put("AAPL", quote, ttl_seconds=300)
+    quote_cache.put("MSFT", {**quote, "name": "MSFT"}, ttl_seconds=300)
+
+    with patch.object(get_provider(), "get_stock_price", return_value=quote) as mock_fetch:
+        assert get_stock_price("AAPL") == quote
+        mock_fetch.assert_not_called()
+
+        get_stock_price("MSFT")
+        mock_fetch.assert_called_once_with("MSFT")
+
+
+def test_get_daily_closes_batched():
+    """Test daily closes for several symbols come from one download call."""
+    import pandas as pd
+
+    index = pd.to_datetime(["2026-01-05", "2026-01-06"])
+    columns = pd.MultiIndex.from_product([["Close", "Open"], ["AAPL", "MSFT"]])
+    frame = pd.DataFrame(
+        [[180.5, 400.0, 179.0, 398.0], [181.25, None, 180.0, None]], index=index, columns=columns
+    )
+
+    with (
+        patch("app.services.stock_service.yf.download", return_value=frame) as mock_download,
+        patch("app.services.stock_service.yf.Ticker", return_value=_ticker({})),
+    ):
+        result = get_daily_closes(["AAPL", "MSFT"], date(2026, 1, 5), date(2026, 1, 6))
+
+    mock_download.assert_called_once()
+    assert result["AAPL"] == {
+        date(2026, 1, 5): Decimal("180.5"),
+        date(2026, 1, 6): Decimal("181.25"),
+    }
+    assert result["MSFT"] == {date(2026, 1, 5): Decimal("400.0")}
+
+
+def test_get_daily_closes_minor_currency_units():
+    """Test closes in pence are stored in pounds, like quotes, without losing precision."""
+    frame = _download_frame({"VOD.L": [1012.5, 1010.25]})
+
+    with (
+        patch("app.services.stock_service.yf.download", return_value=frame),
+        patch("app.services.stock_service.yf.Ticker", return_value=_ticker({"currency": "GBp"})),
+    ):
+        result = get_daily_closes(["VOD.L"], date(2026, 1, 5), date(2026, 1, 6))
+
+    assert result["VOD.L"] == {
+        date(2026, 1, 5): Decimal("10.125"),
+        date(2026, 1, 6): Decimal("10.1025"),
+    }
+
+
+def test_get_multiple_prices_uses_quote_cache():
+    """Test fresh cached quotes are not fetched again."""
+    quote = {
+        "current_price": Decimal("180.00"),
+        "previous_close": Decimal("175.00"),
+        "daily_change_pct": Decimal("2.86"),
+        "name": "Apple Inc.",
+    }
+
+    with patch.object(
+        get_provider(), "get_quotes", side_effect=lambda symbols: dict.fromkeys(symbols, quote)
+    ) as mock_get_quotes:
+        get_multiple_prices(["AAPL"])
+        result = get_multiple_prices(["AAPL", "MSFT"])
+
+    assert result["AAPL"] == quote
+    assert [c.args[0] for c in mock_get_quotes.call_args_list] == [["AAPL"], ["MSFT"]]
+
+
+def test_set_provider_swaps_quote_source():
+    """Test quotes and daily closes come from the configured provider."""
+    quote = {
+        "current_price": Decimal("10.00"),
+        "previous_close": Decimal("9.00"),
+        "daily_change_pct": Decimal("11.11"),
+        "name": "Fake Co.",
+    }
+    provider = MagicMock()
+    provider.get_stock_price.return_value = quote
+    provider.get_daily_closes.return_value = {"FAKE": {date(2026, 1, 5): Decimal("10")}}
+
+    previous = set_provider(provider)
+    try:
+        assert get_stock_price("FAKE") == quote
+        assert get_daily_closes(["FAKE"], date(2026, 1, 5), date(2026, 1, 5)) == {
+            "FAKE": {date(2026, 1, 5): Decimal("10")}
+        }
+    finally:
+        set_provider(previous)
+
+    assert get_provider() is previous
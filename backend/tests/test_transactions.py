@@ -0,0 +1,173 @@
+"""Tests for the transaction ledger API and holdings materialization."""
+
+from decimal import Decimal
+from unittest.mock import patch
+
+import pytest
+
+from app.models import Holding, Transaction
+from app.services.ledger_service import rebuild_holdings
+
+MOCK_STOCK_DATA = {
+    "current_price": Decimal("180.00"),
+    "previous_close": Decimal("175.00"),
+    "daily_change_pct": Decimal("2.86"),
+    "name": "Apple Inc.",
+}
+
+
+@pytest.fixture
+def mock_stock():
+    with patch("app.routers.holdings.get_stock_price", return_value=MOCK_STOCK_DATA) as mock:
+        yield mock
+
+
+def _post(client, **txn):
+    return client.post("/transactions", json=txn)
+
+
+def _holding(db, symbol="AAPL"):
+    db.expire_all()
+    return db.query(Holding).filter(Holding.symbol == symbol).one()
+
+
+def test_buy_and_sell_update_holding(client, test_user, db, mock_stock):
+    """Test buys and sells are applied incrementally to the holding."""
+    _post(client, symbol="aapl", type="buy", trade_date="2026-01-05", shares=10, price=100)
+    _post(client, symbol="AAPL", type="buy", trade_date="2026-01-06", shares=10, price=200)
+    response = _post(client, symbol="AAPL", type="sell", trade_date="2026-01-07", shares=5, price=250)
+
+    assert response.status_code == 201
+    assert response.json()["symbol"] == "AAPL"
+    holding = _holding(db)
+    assert holding.shares == Decimal("15.00")
+    assert holding.avg_cost == Decimal("150.00")
+    assert holding.name == "Apple Inc."
+    # Name is only looked up when the holding is created
+    assert mock_stock.call_count == 1
+
+
+def test_sell_more_than_held(client, test_user, db, mock_stock):
+    """Test overselling is rejected and not recorded."""
+    _post(client, symbol="AAPL", type="buy", trade_date="2026-01-05", shares=10, price=100)
+    response = _post(client, symbol="AAPL", type="sell", trade_date="2026-01-06", shares=11, price=100)
+
+    assert response.status_code == 400
+    assert "Cannot sell" in response.json()["detail"]
+    assert db.query(Transaction).count() == 1
+
+
+def test_split_and_dividend(client, test_user, db, mock_stock):
+    """Test a split scales shares and cost; a dividend leaves the position unchanged."""
+    _post(client, symbol="AAPL", type="buy", trade_date="2026-01-05", shares=10, price=100)
+    _post(client, symbol="AAPL", type="dividend", trade_date="2026-01-06", price="0.25")
+    _post(client, symbol="AAPL", type="split", trade_date="2026-01-07", ratio=4)
+
+    holding = _holding(db)
+    assert holding.shares == Decimal("40.00")
+    assert holding.avg_cost == Decimal("25.00")
+
+
+def test_transaction_validation(client, test_user):
+    """Test type-specific fields are required."""
+    response = _post(client, symbol="AAPL", type="split", trade_date="2026-01-07")
+    assert response.status_code == 422
+
+
+def test_backdated_transaction_replays_symbol(client, test_user, db, mock_stock):
+    """Test an entry dated before the latest one is applied in date order."""
+    _post(client, symbol="AAPL", type="buy", trade_date="2026-01-05", shares=10, price=100)
+    _post(client, symbol="AAPL", type="sell", trade_date="2026-01-07", shares=10, price=120)
+    _post(client, symbol="AAPL", type="buy", trade_date="2026-01-08", shares=10, price=200)
+    # Applied on top of the current position this would give 20 @ 250; in date order the
+    # Jan 6 buy is averaged before the sell, giving 20 @ 200
+    response = _post(client, symbol="AAPL", type="buy", trade_date="2026-01-06", shares=10, price=300)
+
+    assert response.status_code == 201
+    holding = _holding(db)
+    assert holding.shares == Decimal("20.00")
+    assert holding.avg_cost == Decimal("200.00")
+
+
+def test_import_transactions(client, test_user, db, mock_stock):
+    """Test a batch import is applied in trade date order."""
+    response = client.post(
+        "/transactions/import",
+        json=[
+            {"symbol": "AAPL", "type": "sell", "trade_date": "2026-01-07", "shares": 5, "price": 1},
+            {"symbol": "AAPL", "type": "buy", "trade_date": "2026-01-05", "shares": 10, "price": 100},
+        ],
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"imported": 2, "symbols": ["AAPL"]}
+    assert _holding(db).shares == Decimal("5.00")
+
+    listed = client.get("/transactions?symbol=aapl").json()
+    assert [t["type"] for t in listed] == ["buy", "sell"]
+
+
+def test_import_is_all_or_nothing(client, test_user, db, mock_stock):
+    """Test an invalid entry rolls back the whole import."""
+    response = client.post(
+        "/transactions/import",
+        json=[
+            {"symbol": "AAPL", "type": "buy", "trade_date": "2026-01-05", "shares": 10, "price": 100},
+            {"symbol": "AAPL", "type": "sell", "trade_date": "2026-01-06", "shares": 50, "price": 1},
+        ],
+    )
+
+    assert response.status_code == 400
+    assert db.query(Transaction).count() == 0
+    assert db.query(Holding).count() == 0
+
+
+def test_holding_endpoints_write_ledger(client, test_user, db, mock_stock):
+    """Test POST/PUT/DELETE /holdings keep the ledger in sync."""
+    created = client.post("/holdings", json={"symbol": "AAPL", "shares": 10, "avg_cost": 150})
+    holding_id = created.json()["id"]
+    client.put(f"/holdings/{holding_id}", json={"shares": 20})
+
+    types = [t.type for t in db.query(Transaction).order_by(Transaction.created_at)]
+    assert types == ["buy", "adjustment"]
+
+    # Deleting closes the position; the ledger keeps its history
+    client.delete(f"/holdings/{holding_id}")
+    types = [t.type for t in db.query(Transaction).order_by(Transaction.created_at)]
+    assert types == ["buy", "adjustment", "adjustment"]
+    assert db.query(Holding).count() == 0
+
+    assert client.put(f"/holdings/{holding_id}", json={"shares": 0}).status_code == 422
+
+
+def test_selling_everything_removes_holding(client, test_user, db, mock_stock):
+    """Test a position closed to zero shares leaves no holding behind."""
+    _post(client, symbol="AAPL", type="buy", trade_date="2026-01-05", shares=10, price=100)
+    _post(client, symbol="AAPL", type="sell", trade_date="2026-01-06", shares=10, price=120)
+
+    assert db.query(Holding).count() == 0
+    assert db.query(Transaction).count() == 2
+
+
+def test_rebuild_holdings_replays_ledger(client, test_user, db, mock_stock):
+    """Test rebuilding restores holdings from the ledger."""
+    _post(client, symbol="AAPL", type="buy", trade_date="2026-01-05", shares=10, price=100)
+    _post(client, symbol="AAPL", type="buy", trade_date="2026-01-06", shares=30, price=200)
+
+    _post(client, symbol="MSFT", type="buy", trade_date="2026-01-05", shares=5, price=300)
+    _post(client, symbol="MSFT", type="sell", trade_date="2026-01-06", shares=5, price=310)
+
+    # A lost AAPL holding and a stray MSFT one
+    holding = _holding(db)
+    db.add(Holding(user_id=holding.user_id, symbol="MSFT", name="MSFT", shares=1, avg_cost=1))
+    db.delete(holding)
+    db.commit()
+
+    lookup = lambda symbol: ("Apple Inc.", "USD")  # noqa: E731
+    assert rebuild_holdings(db, lookup, batch_size=1) == 2
+
+    holding = _holding(db)
+    assert holding.shares == Decimal("40.00")
+    assert holding.avg_cost == Decimal("175.00")
+    assert holding.name == "Apple Inc."
+    assert db.query(Holding).filter(Holding.symbol == "MSFT").count() == 0
@@ -0,0 +1,99 @@
+"""Tests for watchlist endpoints."""
+
+from unittest.mock import patch
+
+from app.services.quote_cache import quote_cache
+from app.services.stock_service import get_provider
+from tests.conftest import make_quote
+
+
+def _fake_quotes(symbols):
+    return {s: None if s.startswith("INVALID") else make_quote(name=f"{s} Inc.") for s in symbols}
+
+
+def test_watchlist_crud(client, test_user):
+    """Test create, rename, add/remove symbols and delete."""
+    response = client.post(
+        "/watchlists", json={"name": "Tech", "symbols": ["aapl", "MSFT", "AAPL"]}
+    )
+    assert response.status_code == 201
+    watchlist = response.json()
+    assert watchlist["symbols"] == ["AAPL", "MSFT"]
+    url = f"/watchlists/{watchlist['id']}"
+
+    renamed = client.patch(url, json={"name": "Big Tech"})
+    assert renamed.json()["name"] == "Big Tech"
+
+    added = client.post(f"{url}/symbols", json={"symbols": ["NVDA", "MSFT"]})
+    assert added.json()["symbols"] == ["AAPL", "MSFT", "NVDA"]
+
+    assert client.delete(f"{url}/symbols/msft").status_code == 204
+    assert client.delete(f"{url}/symbols/MSFT").status_code == 404
+    assert client.get(url).json()["symbols"] == ["AAPL", "NVDA"]
+    assert [w["name"] for w in client.get("/watchlists").json()] == ["Big Tech"]
+
+    assert client.delete(url).status_code == 204
+    assert client.get(url).status_code == 404
+    assert client.get("/watchlists").json() == []
+
+
+def test_watchlist_symbol_limit(client, test_user):
+    """Test a watchlist cannot grow past the configured number of symbols."""
+    with patch("app.routers.watchlists.settings.watchlist_max_symbols", 2):
+        watchlist = client.post("/watchlists", json={"name": "Small", "symbols": ["AAPL"]}).json()
+        response = client.post(
+            f"/watchlists/{watchlist['id']}/symbols", json={"symbols": ["MSFT", "NVDA"]}
+        )
+
+    assert response.status_code == 400
+
+
+def test_watchlist_quotes_use_one_batched_fetch(client, test_user):
+    """Test a large watchlist costs one upstream call, and cached quotes none."""
+    symbols = [f"SYM{i:03d}" for i in range(199)] + ["INVALID"]
+    watchlist = client.post("/watchlists", json={"name": "Many", "symbols": symbols}).json()
+    url = f"/watchlists/{watchlist['id']}/quotes"
+
+    with patch.object(get_provider(), "get_quotes", side_effect=_fake_quotes) as mock_get_quotes:
+        first = client.get(url)
+        second = client.get(url)
+
+    assert first.status_code == 200
+    # One call for all 200 symbols; the second request refetches only the one without data
+    calls = [c.args[0] for c in mock_get_quotes.call_args_list]
+    assert [len(c) for c in calls] == [200, 1]
+    assert calls[1] == ["INVALID"]
+    data = first.json()
+    assert len(data["quotes"]) == 199
+    assert data["quotes"][0]["symbol"] == "SYM000"
+    assert data["unavailable"] == ["INVALID"]
+    assert second.json()["quotes"] == data["quotes"]
+
+
+def test_watchlist_quotes_share_dashboard_cache(client, test_user):
+    """Test quotes already cached (e.g. by the dashboard) are not fetched again."""
+    quote_cache.put("AAPL", make_quote(name="AAPL Inc."))
+    watchlist = client.post("/watchlists", json={"name": "Cached", "symbols": ["AAPL"]}).json()
+
+    with patch.object(get_provider(), "get_quotes") as mock_get_quotes:
+        response = client.get(f"/watchlists/{watchlist['id']}/quotes")
+
+    mock_get_quotes.assert_not_called()
+    assert response.json()["quotes"][0]["name"] == "AAPL Inc."
+
+
+def test_watchlist_not_found_for_other_user(client, test_user, db):
+    """Test watchlists are scoped to their owner."""
+    import uuid
+
+    from app import models
+
+    other = models.User(id=uuid.uuid4(), email="other@example.com")
+    db.add(other)
+    db.flush()
+    watchlist = models.Watchlist(user_id=other.id, name="Theirs")
+    db.add(watchlist)
+    db.commit()
+
+    assert client.get(f"/watchlists/{watchlist.id}").status_code == 404
+    assert client.get(f"/watchlists/{watchlist.id}/quotes").status_code == 404
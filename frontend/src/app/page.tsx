@@ -58,7 +58,7 @@ function DashboardContent() {
 
       <div className="grid gap-6 lg:grid-cols-3">
         <div className="lg:col-span-2">
-          <Heatmap holdings={data.holdings} />
+          <Heatmap />
         </div>
         <div>
           <AllocationChart holdings={data.holdings} />
@@ -1,12 +1,12 @@
 "use client";
 
-import { Treemap, ResponsiveContainer } from "recharts";
-import type { DashboardHolding } from "@/lib/types";
+import { useLayoutEffect, useRef, useState } from "react";
+import { useHeatmap } from "@/hooks/useHeatmap";
 import { formatUSD, formatPercent } from "@/lib/format";
 
-interface Props {
-  holdings: DashboardHolding[];
-}
+const HEIGHT = 400;
+// Round the measured width so similar screens share the server-side layout cache
+const WIDTH_STEP = 50;
 
 function getHeatmapColor(dailyChangePct: number): string {
   if (dailyChangePct > 0) {
@@ -25,110 +25,100 @@ function getHeatmapColor(dailyChangePct: number): string {
   return "#9ca3af";
 }
 
-interface CustomContentProps {
-  x: number;
-  y: number;
-  width: number;
-  height: number;
-  name: string;
-  dailyChangePct: number;
-  marketValue: number;
-}
+// Server color buckets -3..3, drawn at a representative daily change for each bucket
+const BUCKET_COLORS: Record<number, string> = {
+  [-3]: getHeatmapColor(-5),
+  [-2]: getHeatmapColor(-3),
+  [-1]: getHeatmapColor(-1.25),
+  0: getHeatmapColor(0),
+  1: getHeatmapColor(1.25),
+  2: getHeatmapColor(3),
+  3: getHeatmapColor(5),
+};
 
-function CustomContent({
-  x,
-  y,
-  width,
-  height,
-  name,
-  dailyChangePct,
-  marketValue,
-}: CustomContentProps) {
-  const showLabel = width > 50 && height > 40;
-  const showDetails = width > 80 && height > 60;
+export default function Heatmap() {
+  const containerRef = useRef<HTMLDivElement>(null);
+  const [layoutWidth, setLayoutWidth] = useState(0);
+  const { data } = useHeatmap(layoutWidth, HEIGHT);
 
-  return (
-    <g>
-      <rect
-        x={x}
-        y={y}
-        width={width}
-        height={height}
-        fill={getHeatmapColor(dailyChangePct)}
-        stroke="#0a0e2a"
-        strokeWidth={2}
-        rx={4}
-      />
-      {showLabel && (
-        <>
-          <text
-            x={x + width / 2}
-            y={y + height / 2 - (showDetails ? 12 : 0)}
-            textAnchor="middle"
-            dominantBaseline="central"
-            fill="#fff"
-            fontSize={14}
-            fontWeight="bold"
-          >
-            {name}
-          </text>
-          {showDetails && (
-            <>
-              <text
-                x={x + width / 2}
-                y={y + height / 2 + 6}
-                textAnchor="middle"
-                dominantBaseline="central"
-                fill="rgba(255,255,255,0.9)"
-                fontSize={11}
-              >
-                {formatPercent(dailyChangePct)}
-              </text>
-              <text
-                x={x + width / 2}
-                y={y + height / 2 + 22}
-                textAnchor="middle"
-                dominantBaseline="central"
-                fill="rgba(255,255,255,0.8)"
-                fontSize={10}
-              >
-                {formatUSD(marketValue)}
-              </text>
-            </>
-          )}
-        </>
-      )}
-    </g>
-  );
-}
-
-export default function Heatmap({ holdings }: Props) {
-  const data = holdings.map((h) => ({
-    name: h.symbol,
-    size: Math.max(h.market_value, 1),
-    dailyChangePct: h.daily_change_pct,
-    marketValue: h.market_value,
-  }));
+  useLayoutEffect(() => {
+    const measured = containerRef.current?.clientWidth ?? 0;
+    setLayoutWidth(Math.max(WIDTH_STEP * 2, Math.round(measured / WIDTH_STEP) * WIDTH_STEP));
+  }, []);
 
   return (
-    <div>
-      <ResponsiveContainer width="100%" height={400}>
-        <Treemap
-          data={data}
-          dataKey="size"
-          content={
-            <CustomContent
-              x={0}
-              y={0}
-              width={0}
-              height={0}
-              name=""
-              dailyChangePct={0}
-              marketValue={0}
-            />
-          }
-        />
-      </ResponsiveContainer>
+    <div ref={containerRef}>
+      {data && (
+        <svg
+          width="100%"
+          height={HEIGHT}
+          viewBox={`0 0 ${data.width} ${data.height}`}
+          preserveAspectRatio="none"
+        >
+          {data.symbols.map((symbol, i) => {
+            const x = data.x[i];
+            const y = data.y[i];
+            const width = data.w[i];
+            const height = data.h[i];
+            const showLabel = width > 50 && height > 40;
+            const showDetails = width > 80 && height > 60;
+
+            return (
+              <g key={symbol}>
+                <rect
+                  x={x}
+                  y={y}
+                  width={width}
+                  height={height}
+                  fill={BUCKET_COLORS[data.bucket[i]]}
+                  stroke="#0a0e2a"
+                  strokeWidth={2}
+                  rx={4}
+                />
+                {showLabel && (
+                  <>
+                    <text
+                      x={x + width / 2}
+                      y={y + height / 2 - (showDetails ? 12 : 0)}
+                      textAnchor="middle"
+                      dominantBaseline="central"
+                      fill="#fff"
+                      fontSize={14}
+                      fontWeight="bold"
+                    >
+                      {symbol}
+                    </text>
+                    {showDetails && (
+                      <>
+                        <text
+                          x={x + width / 2}
+                          y={y + height / 2 + 6}
+                          textAnchor="middle"
+                          dominantBaseline="central"
+                          fill="rgba(255,255,255,0.9)"
+                          fontSize={11}
+                        >
+                          {formatPercent(data.change_pct[i])}
+                        </text>
+                        <text
+                          x={x + width / 2}
+                          y={y + height / 2 + 22}
+                          textAnchor="middle"
+                          dominantBaseline="central"
+                          fill="rgba(255,255,255,0.8)"
+                          fontSize={10}
+                        >
+                          {formatUSD(data.value[i])}
+                        </text>
+                      </>
+                    )}
+                  </>
+                )}
+              </g>
+            );
+          })}
+        </svg>
+      )}
     </div>
   );
 }
@@ -0,0 +1,30 @@
+"use client";
+
+import { useState, useEffect, useCallback } from "react";
+import { getHeatmap } from "@/lib/api";
+import type { HeatmapLayout } from "@/lib/types";
+
+export function useHeatmap(width: number, height: number) {
+  const [data, setData] = useState<HeatmapLayout | null>(null);
+  const [loading, setLoading] = useState(true);
+  const [error, setError] = useState<string | null>(null);
+
+  const fetchHeatmap = useCallback(async () => {
+    if (width <= 0) return;
+    setLoading(true);
+    setError(null);
+    try {
+      setData(await getHeatmap(width, height));
+    } catch (e) {
+      setError(e instanceof Error ? e.message : "Failed to load heatmap");
+    } finally {
+      setLoading(false);
+    }
+  }, [width, height]);
+
+  useEffect(() => {
+    fetchHeatmap();
+  }, [fetchHeatmap]);
+
+  return { data, loading, error, refetch: fetchHeatmap };
+}
@@ -1,4 +1,11 @@
-import type { Holding, HoldingCreate, HoldingUpdate, Dashboard, DashboardHolding } from "./types";
+import type {
+  Holding,
+  HoldingCreate,
+  HoldingUpdate,
+  Dashboard,
+  DashboardHolding,
+  HeatmapLayout,
+} from "./types";
 
 const BASE_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:8000";
 
@@ -90,3 +97,6 @@ export const getDashboard = async (): Promise<Dashboard> => {
   const raw = await request<Record<string, unknown>>("/dashboard");
   return parseDashboard(raw);
 };
+
+export const getHeatmap = (width: number, height: number): Promise<HeatmapLayout> =>
+  request<HeatmapLayout>(`/dashboard/heatmap?width=${width}&height=${height}`);
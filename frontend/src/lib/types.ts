@@ -43,3 +43,18 @@ export interface Dashboard {
   last_updated: string;
   holdings: DashboardHolding[];
 }
+
+// Heatmap (from GET /dashboard/heatmap); parallel arrays, index i is one position
+export interface HeatmapLayout {
+  as_of: string;
+  width: number;
+  height: number;
+  symbols: string[];
+  x: number[];
+  y: number[];
+  w: number[];
+  h: number[];
+  bucket: number[];
+  change_pct: number[];
+  value: number[];
+}